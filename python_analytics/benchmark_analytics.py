@@ -0,0 +1,722 @@
+"""
+Benchmarks de rendimiento para FisheryAnalytics.
+
+Genera datasets sintéticos con el esquema real (desembarques, producción y
+plantas) y mide latencia de los distintos caminos de cálculo.
+
+Uso:
+    python benchmark_analytics.py                 # todos los benchmarks
+    python benchmark_analytics.py approximate     # solo uno
+    python benchmark_analytics.py --rows 1000000 --repeat 5
+"""
+
+import argparse
+import io
+import subprocess
+import sys
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Agregar path para imports
+sys.path.append(os.path.dirname(__file__))
+
+from fishery_analytics import FisheryAnalytics
+
+
+REGIONS = {
+    'ARICA Y PARINACOTA': ['ARICA'],
+    'TARAPACA': ['IQUIQUE'],
+    'ANTOFAGASTA': ['MEJILLONES', 'TOCOPILLA', 'ANTOFAGASTA'],
+    'ATACAMA': ['CALDERA', 'CHANARAL'],
+    'COQUIMBO': ['COQUIMBO', 'LOS VILOS'],
+    'VALPARAISO': ['SAN ANTONIO', 'VALPARAISO', 'QUINTERO'],
+    'BIOBIO': ['TALCAHUANO', 'CORONEL', 'LEBU', 'TOME'],
+    'LOS RIOS': ['CORRAL', 'VALDIVIA'],
+    'LAGOS': ['PUERTO MONTT', 'CALBUCO', 'ANCUD', 'QUELLON', 'CASTRO', 'DALCAHUE'],
+    'AYSEN': ['CHACABUCO', 'PUERTO AYSEN', 'MELINKA'],
+    'MAGALLANES': ['PUNTA ARENAS', 'PORVENIR', 'PUERTO NATALES'],
+}
+AGENTS = ['Industrial', 'Artesanal', 'Acuicultura']
+LINES = ['Congelado', 'Fresco enfriado', 'Harina', 'Aceite', 'Conserva', 'Ahumado', 'Salado']
+
+
+def generate_synthetic_data(n_rows: int = 200_000, n_species: int = 60, seed: int = 0):
+    """
+    Genera los 3 DataFrames sintéticos con el esquema esperado por FisheryAnalytics.
+
+    Args:
+        n_rows: Filas de desembarque (producción y plantas escalan con este valor)
+        n_species: Número de especies distintas
+        seed: Semilla del generador
+
+    Returns:
+        Tupla (df_desembarque, df_produccion, df_plantas)
+    """
+    rng = np.random.default_rng(seed)
+    species = np.array([f'ESPECIE {i:03d}' for i in range(n_species)])
+    region_names = np.array(list(REGIONS))
+
+    # Desembarques: puertos ligados a su región, volúmenes log-normales
+    ports = [(region, port) for region, region_ports in REGIONS.items() for port in region_ports]
+    port_idx = rng.integers(0, len(ports), n_rows)
+    port_weights = rng.zipf(1.6, n_species).astype(float)
+    species_idx = rng.choice(n_species, n_rows, p=port_weights / port_weights.sum())
+    df_desembarque = pd.DataFrame({
+        'Año': rng.integers(2000, 2025, n_rows),
+        'Mes': rng.integers(1, 13, n_rows),
+        'Región': [ports[i][0] for i in port_idx],
+        'Puerto': [ports[i][1] for i in port_idx],
+        'Especie': species[species_idx],
+        'Tipo de agente': rng.choice(AGENTS, n_rows, p=[0.45, 0.45, 0.10]),
+        'Toneladas': np.round(rng.lognormal(3.0, 1.5, n_rows), 3)
+    })
+
+    # Producción: materia prima y rendimiento por línea
+    n_prod = max(n_rows // 10, 10)
+    materia_prima = np.round(rng.lognormal(4.0, 1.2, n_prod), 3)
+    df_produccion = pd.DataFrame({
+        'Año': rng.integers(2010, 2025, n_prod),
+        'Región': rng.choice(region_names, n_prod),
+        'Especie': species[rng.integers(0, n_species, n_prod)],
+        'Línea de elaboración': rng.choice(LINES, n_prod),
+        'Materia Prima': materia_prima,
+        'Producción': np.round(materia_prima * rng.uniform(0.2, 0.9, n_prod), 3)
+    })
+
+    # Plantas: nombres recurrentes por región
+    n_plantas = max(n_rows // 100, 10)
+    df_plantas = pd.DataFrame({
+        'Año': rng.integers(2010, 2025, n_plantas),
+        'Región': rng.choice(region_names, n_plantas),
+        'Nombre Planta': [f'PLANTA {i:04d}' for i in rng.integers(0, max(n_plantas // 5, 2), n_plantas)],
+        'Línea de producción': rng.choice(LINES, n_plantas)
+    })
+
+    return df_desembarque, df_produccion, df_plantas
+
+
+def _timeit(fn: Callable[[], Any], repeat: int) -> float:
+    """Retorna la mediana del tiempo de ejecución de fn en milisegundos."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def _print_table(rows: List[Dict[str, Any]]):
+    """Imprime una lista de dicts como tabla de texto."""
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {col: max(len(str(col)), *(len(str(row[col])) for row in rows)) for col in columns}
+    print('  '.join(str(col).ljust(widths[col]) for col in columns))
+    print('  '.join('-' * widths[col] for col in columns))
+    for row in rows:
+        print('  '.join(str(row[col]).ljust(widths[col]) for col in columns))
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def bench_approximate(frames, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Latencia y precisión del modo aproximado (exact=False) vs exacto.
+
+    La precisión se mide sobre todos los grupos del resultado exacto (top_n
+    sin límite), no sobre los primeros del ranking aproximado: comparar solo
+    los grupos que la muestra puso arriba sesga el error hacia sobreestimaciones.
+    El error es Σ|estimación - exacto| / Σ exacto; un grupo ausente de la
+    muestra cuenta con estimación 0 y como no cubierto por el intervalo.
+    """
+    analytics = FisheryAnalytics(*frames)
+    calls = {
+        'top_ports': lambda top_n=10, **kw: analytics.get_top_ports(year=2020, top_n=top_n, **kw),
+        'agent_distribution': lambda top_n=None, **kw: analytics.get_agent_distribution(year=2020, **kw),
+        'species_by_agent_breakdown': lambda top_n=10, **kw: analytics.get_species_by_agent_breakdown(
+            year=2020, top_n=top_n, **kw
+        ),
+    }
+    value_keys = {
+        'top_ports': ('puerto', 'toneladas', 'toneladas_ic_inf', 'toneladas_ic_sup'),
+        'agent_distribution': ('tipo_agente', 'toneladas', 'toneladas_ic_inf', 'toneladas_ic_sup'),
+        'species_by_agent_breakdown': ('especie', 'total', 'total_ic_inf', 'total_ic_sup'),
+    }
+    all_groups = 10 ** 6
+
+    rows = []
+    for name, call in calls.items():
+        key, value, low, high = value_keys[name]
+        exact_ms = _timeit(lambda: call(exact=True), repeat)
+        exact = {r[key]: r[value] for r in call(top_n=all_groups, exact=True)['data']}
+
+        for fraction in (0.01, 0.05, 0.1, 0.25):
+            analytics.build_stratified_sample(fraction=fraction)
+            approx_ms = _timeit(lambda: call(exact=False), repeat)
+            approx = {r[key]: r for r in call(top_n=all_groups, exact=False)['data']}
+
+            abs_error, covered = 0.0, 0
+            for group, truth in exact.items():
+                record = approx.get(group)
+                abs_error += abs((record[value] if record else 0.0) - truth)
+                covered += bool(record) and record[low] <= truth <= record[high]
+            total = sum(exact.values())
+
+            rows.append({
+                'analisis': name,
+                'fraccion': fraction,
+                'grupos': len(exact),
+                'exacto_ms': round(exact_ms, 2),
+                'aprox_ms': round(approx_ms, 2),
+                'speedup': round(exact_ms / approx_ms, 1) if approx_ms > 0 else None,
+                'error_rel_pct': round(abs_error / total * 100, 2) if total else None,
+                'cobertura_ic_pct': round(covered / len(exact) * 100, 1) if exact else None,
+            })
+    return rows
+
+
+def bench_compact(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Memoria y latencia del modo compacto (compact=True) vs normal."""
+    regular = FisheryAnalytics(*frames)
+    compact = FisheryAnalytics(*frames, compact=True)
+    report = compact.memory_report()
+
+    rows = []
+    for name, dataset in report['datasets'].items():
+        rows.append({
+            'medida': f'memoria {name}',
+            'normal': f"{dataset['bytes_originales'] / 1e6:.2f} MB",
+            'compacto': f"{dataset['bytes_actuales'] / 1e6:.2f} MB",
+            'variacion': f"-{dataset['reduccion_pct']}%",
+        })
+    for analysis in ('supply_vs_demand', 'agent_share', 'top_ports', 'seasonal_context'):
+        regular_ms = _timeit(getattr(regular, f'get_{analysis}'), repeat)
+        compact_ms = _timeit(getattr(compact, f'get_{analysis}'), repeat)
+        rows.append({
+            'medida': f'{analysis} (ms)',
+            'normal': round(regular_ms, 2),
+            'compacto': round(compact_ms, 2),
+            'variacion': f'x{regular_ms / compact_ms:.2f}' if compact_ms > 0 else None,
+        })
+    return rows
+
+
+def _bench_engines(frames, repeat: int, calls: Dict[str, Callable]) -> List[Dict[str, Any]]:
+    """Latencia de cada llamada con engine='pandas' vs engine='numpy'."""
+    engines = {name: FisheryAnalytics(*frames, engine=name) for name in FisheryAnalytics.ENGINES}
+    rows = []
+    for name, call in calls.items():
+        # Primera llamada fuera de la medición: construye las estructuras precomputadas
+        build_start = time.perf_counter()
+        call(engines['numpy'])
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        pandas_ms = _timeit(lambda: call(engines['pandas']), repeat)
+        numpy_ms = _timeit(lambda: call(engines['numpy']), repeat)
+        rows.append({
+            'consulta': name,
+            'pandas_ms': round(pandas_ms, 2),
+            'numpy_ms': round(numpy_ms, 2),
+            'speedup': round(pandas_ms / numpy_ms, 1) if numpy_ms > 0 else None,
+            'primera_llamada_ms': round(build_ms, 2),
+        })
+    return rows
+
+
+def bench_supply(frames, repeat: int) -> List[Dict[str, Any]]:
+    """get_supply_vs_demand con el cubo Año×Especie×Región vs groupby + merge."""
+    return _bench_engines(frames, repeat, {
+        'todas las regiones': lambda a: a.get_supply_vs_demand(start_year=2000),
+        'región LAGOS': lambda a: a.get_supply_vs_demand(start_year=2000, region='LAGOS'),
+        '2015-2018 AYSEN': lambda a: a.get_supply_vs_demand(start_year=2015, end_year=2018, region='AYSEN'),
+    })
+
+
+def bench_groupby(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Análisis con el kernel de bincount sobre dimensiones codificadas vs pandas groupby."""
+    return _bench_engines(frames, repeat, {
+        'top_ports': lambda a: a.get_top_ports(),
+        'top_ports 2020 LAGOS': lambda a: a.get_top_ports(year=2020, region='LAGOS'),
+        'agent_distribution': lambda a: a.get_agent_distribution(),
+        'longitudinal_evolution': lambda a: a.get_longitudinal_evolution(),
+        'agent_share puerto': lambda a: a.get_agent_share(level='puerto'),
+    })
+
+
+def bench_cosechas(frames, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Módulo de cosechas: filas con groupby (engine='pandas') vs tensor disperso de desembarques.
+
+    Las toneladas sintéticas tienen 3 decimales, así que el tensor se construye
+    con exact_tonnage=True (kilogramos enteros; sin esa opción no se colapsa).
+    """
+    rows_engine = FisheryAnalytics(*frames, engine='pandas')
+    cube_engine = FisheryAnalytics(*frames, exact_tonnage=True)
+    cube = cube_engine.build_coded_tables()['desembarque']
+
+    rows = [
+        {'medida': 'filas / celdas no vacías', 'filas': len(frames[0]), 'tensor': cube.n_rows,
+         'variacion': f'x{len(frames[0]) / max(cube.n_rows, 1):.1f}'},
+        {'medida': 'memoria desembarque', 'filas': f"{rows_engine.memory_report()['datasets']['desembarque']['bytes_actuales'] / 1e6:.2f} MB",
+         'tensor': f'{cube.nbytes / 1e6:.2f} MB', 'variacion': f"densidad {cube.describe()['densidad']}"},
+    ]
+    calls = {
+        'agent_distribution': lambda a: a.get_agent_distribution(year=2020),
+        'top_ports': lambda a: a.get_top_ports(region='LAGOS'),
+        'species_by_agent_breakdown': lambda a: a.get_species_by_agent_breakdown(),
+        'seasonal_context': lambda a: a.get_seasonal_context(),
+    }
+    for name, call in calls.items():
+        rows_ms = _timeit(lambda: call(rows_engine), repeat)
+        cube_ms = _timeit(lambda: call(cube_engine), repeat)
+        rows.append({
+            'medida': f'{name} (ms)',
+            'filas': round(rows_ms, 2),
+            'tensor': round(cube_ms, 2),
+            'variacion': f'x{rows_ms / cube_ms:.1f}' if cube_ms > 0 else None,
+        })
+    return rows
+
+
+def bench_heatmap(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Heatmap Año×Mes de todas las regiones: una llamada vs get_seasonal_context por año y región."""
+    analytics = FisheryAnalytics(*frames)
+    df = analytics.df_desembarque
+    years = sorted(int(year) for year in df['Año'].dropna().unique())
+    regions = [None] + sorted(df['Región'].dropna().unique())
+
+    heatmap_ms = _timeit(lambda: analytics.get_seasonal_heatmap(), repeat)
+    loop_ms = _timeit(lambda: [
+        analytics.get_seasonal_context(current_year=year, region=region) for year in years for region in regions
+    ], 1)
+    return [{
+        'grillas': len(regions),
+        'llamadas_seasonal_context': len(years) * len(regions),
+        'get_seasonal_heatmap_ms': round(heatmap_ms, 1),
+        'bucle_seasonal_context_ms': round(loop_ms, 1),
+        'speedup': round(loop_ms / heatmap_ms, 1),
+    }]
+
+
+def bench_trajectories(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Trayectorias de ranking de puertos: una llamada vs get_top_ports por año."""
+    analytics = FisheryAnalytics(*frames)
+    years = sorted(int(year) for year in analytics.df_desembarque['Año'].dropna().unique())
+
+    trajectories_ms = _timeit(lambda: analytics.get_port_rank_trajectories(), repeat)
+    loop_ms = _timeit(lambda: [analytics.get_top_ports(year=year, top_n=10_000) for year in years], repeat)
+    return [{
+        'años': len(years),
+        'get_port_rank_trajectories_ms': round(trajectories_ms, 1),
+        'bucle_top_ports_ms': round(loop_ms, 1),
+        'speedup': round(loop_ms / trajectories_ms, 1),
+    }]
+
+
+def bench_flow(frames, repeat: int) -> List[Dict[str, Any]]:
+    """get_species_flow con las tablas codificadas vs groupby de ambos datasets."""
+    return _bench_engines(frames, repeat, {
+        'nacional': lambda a: a.get_species_flow(),
+        'año 2018': lambda a: a.get_species_flow(year=2018),
+        'región LAGOS, todas las especies': lambda a: a.get_species_flow(region='LAGOS', top_n=None),
+    })
+
+
+def bench_editions(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Ediciones versionadas: memoria de deltas vs copias completas, as_of y diff."""
+    from fishery_editions import EditionStore
+
+    df_desembarque, df_produccion, df_plantas = frames
+    rng = np.random.default_rng(0)
+    store = EditionStore()
+    edition = df_desembarque
+    rows = []
+    for year in range(2020, 2025):
+        # Cada edición revisa ~1% de las cifras y agrega ~0,5% de registros
+        if year > 2020:
+            edition = edition.copy()
+            revised = rng.choice(len(edition), len(edition) // 100, replace=False)
+            edition.iloc[revised, edition.columns.get_loc('Toneladas')] *= 1.05
+            edition = pd.concat([edition, edition.sample(len(edition) // 200, random_state=year)], ignore_index=True)
+        start = time.perf_counter()
+        store.add_edition(str(year), edition, df_produccion, df_plantas)
+        add_ms = (time.perf_counter() - start) * 1000
+        rows.append({'medida': f'add_edition {year} (ms)', 'valor': round(add_ms, 1)})
+
+    description = store.describe()
+    rows.append({'medida': 'almacén (MB)', 'valor': round(description['bytes_almacen'] / 1e6, 2)})
+    rows.append({'medida': 'copias completas (MB)', 'valor': round(description['bytes_copias_completas_estimado'] / 1e6, 2)})
+    rows.append({'medida': 'frames as_of 2020 (ms)', 'valor': round(_timeit(lambda: store.frames('2020'), repeat), 1)})
+    rows.append({'medida': 'diff 2020 -> 2024 por Año×Región (ms)',
+                 'valor': round(_timeit(lambda: store.diff('2020', '2024', by=['Año', 'Región']), repeat), 1)})
+    return rows
+
+
+def _anomalies_per_series_loop(df: pd.DataFrame, threshold: float = 3.5) -> int:
+    """Referencia: mismo z-score robusto estacional, serie por serie con pandas."""
+    flagged = 0
+    monthly = df.groupby(['Región', 'Puerto', 'Especie', 'Año', 'Mes'], observed=True)['Toneladas'].sum()
+    for _, series in monthly.groupby(level=[0, 1, 2], observed=True):
+        series = series.droplevel([0, 1, 2])
+        if len(series) < 12:
+            continue
+        years = series.index.get_level_values('Año')
+        full = series.reindex(pd.MultiIndex.from_product(
+            [range(years.min(), years.max() + 1), range(1, 13)], names=['Año', 'Mes']
+        ), fill_value=0.0)
+        logged = np.log1p(full)
+        residual = logged - logged.groupby(level='Mes').transform('median')
+        deviation = (residual - residual.median()).abs()
+        scale = 1.4826 * deviation.median() or 1.2533 * deviation.mean()
+        if scale > 0:
+            flagged += int((deviation / scale > threshold).sum())
+    return flagged
+
+
+def bench_anomalies(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Anomalías de todas las series a la vez (NumPy) vs un bucle por serie."""
+    df = frames[0]
+    analytics = FisheryAnalytics(*frames)
+
+    def vectorized():
+        analytics._derived.pop('landing_anomaly_scores', None)
+        return analytics.get_landing_anomalies()
+
+    vectorized()
+    n_series = analytics._landing_anomaly_scores().panel.n_series
+
+    loop_ms = _timeit(lambda: _anomalies_per_series_loop(df), 1)
+    vector_ms = _timeit(vectorized, repeat)
+    query_ms = _timeit(lambda: analytics.get_landing_anomalies(year=2020, region='LAGOS'), repeat)
+    return [
+        {'camino': 'bucle por serie (pandas)', 'series': n_series, 'ms': round(loop_ms, 1)},
+        {'camino': 'vectorizado (construcción + consulta)', 'series': n_series, 'ms': round(vector_ms, 1)},
+        {'camino': 'consulta con puntajes memorizados', 'series': n_series, 'ms': round(query_ms, 1)},
+    ]
+
+
+def bench_forecast(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Throughput (series/segundo) de los pronósticos por lotes vs un bucle por serie."""
+    from fishery_forecast import BatchForecaster
+
+    # Series sintéticas: nivel log-normal, estacionalidad y ruido, 10 años mensuales
+    rng = np.random.default_rng(0)
+    n_series, n_months = 5000, 120
+    level = rng.lognormal(5, 1, (n_series, 1))
+    seasonal = 1 + 0.4 * np.sin(2 * np.pi * (np.arange(n_months) + rng.integers(0, 12, (n_series, 1))) / 12)
+    history = level * seasonal * rng.lognormal(0, 0.2, (n_series, n_months))
+    loop_series = 200
+
+    rows = []
+    for model in ('auto', *BatchForecaster.MODELS):
+        batch_ms = _timeit(lambda: BatchForecaster(history).forecast(12, model), repeat)
+        loop_ms = _timeit(lambda: [
+            BatchForecaster(history[i:i + 1]).forecast(12, model) for i in range(loop_series)
+        ], 1) * n_series / loop_series
+        rows.append({
+            'modelo': model,
+            'series': n_series,
+            'lote_series_s': int(n_series / batch_ms * 1000),
+            'bucle_series_s': int(n_series / loop_ms * 1000),
+            'speedup': round(loop_ms / batch_ms, 1),
+        })
+
+    analytics = FisheryAnalytics(*frames)
+    analytics.get_forecast()
+    rows.append({
+        'modelo': 'get_forecast() (datos sintéticos)',
+        'series': analytics.get_forecast()['summary']['series_pronosticadas'],
+        'lote_series_s': int(analytics.get_forecast()['summary']['series_pronosticadas']
+                             / _timeit(analytics.get_forecast, repeat) * 1000),
+        'bucle_series_s': None,
+        'speedup': None,
+    })
+    return rows
+
+
+def bench_concentration(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Concentración de puertos para todos los Año×Región: una llamada vs get_top_ports por combinación."""
+    analytics = FisheryAnalytics(*frames)
+    df = analytics.df_desembarque
+    groups = df[['Año', 'Región']].drop_duplicates().itertuples(index=False)
+    groups = [(int(year), region) for year, region in groups]
+
+    batch_ms = _timeit(lambda: analytics.get_concentration('puerto'), repeat)
+    loop_ms = _timeit(lambda: [
+        analytics.get_top_ports(year=year, region=region, top_n=10) for year, region in groups
+    ], 1)
+    return [{
+        'grupos_año_region': len(groups),
+        'get_concentration_ms': round(batch_ms, 1),
+        'get_top_ports_bucle_ms': round(loop_ms, 1),
+        'speedup': round(loop_ms / batch_ms, 1),
+    }]
+
+
+def bench_cache(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Primer pedido de cada análisis en un worker nuevo: sin caché vs caché persistente ya poblada."""
+    from fishery_cache import ResultCache
+    from fishery_service import ANALYSIS_DEFAULTS
+
+    def serve_all(analytics):
+        for name in ANALYSIS_DEFAULTS:
+            getattr(analytics, f'get_{name}')()
+
+    def first_requests_ms(**options) -> float:
+        # Cada repetición usa una instancia nueva (worker recién iniciado); la carga no se mide
+        times = []
+        for _ in range(repeat):
+            analytics = FisheryAnalytics(*frames, **options)
+            start = time.perf_counter()
+            serve_all(analytics)
+            times.append((time.perf_counter() - start) * 1000)
+        return min(times)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.sqlite')
+        serve_all(FisheryAnalytics(*frames, result_cache=path))
+        cache = ResultCache(path)
+        rows = [
+            {'escenario': 'worker nuevo sin caché', 'ms_primeros_pedidos': round(first_requests_ms(), 1)},
+            {'escenario': 'worker nuevo con caché', 'ms_primeros_pedidos': round(first_requests_ms(result_cache=cache), 1)},
+        ]
+        for row in rows:
+            row.update({'analisis': len(ANALYSIS_DEFAULTS), 'bytes_cache': cache.stats()['bytes']})
+        cache.close()
+    return rows
+
+
+def bench_worker(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Worker persistente por socket Unix vs un proceso nuevo por solicitud."""
+    from concurrent.futures import ThreadPoolExecutor
+    from fishery_worker import WorkerClient, encode, write_frame
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    years = sorted(frames[0]['Año'].unique())[-4:]
+    requests = [
+        (name, {'year': int(year)}) for year in years for name in ('top_ports', 'agent_distribution')
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, 'datos.pkl')
+        FisheryAnalytics(*frames).save_snapshot(snapshot)
+
+        def spawn_per_request():
+            # Lo que haría el backend sin worker: un proceso (import + carga) por solicitud
+            for analysis_type, params in requests:
+                stream = io.BytesIO()
+                write_frame(stream, encode({'id': 1, 'analysis': analysis_type, 'params': params}))
+                subprocess.run([sys.executable, 'fishery_worker.py', '--snapshot', snapshot, '--stdio'],
+                               input=stream.getvalue(), cwd=here, capture_output=True, check=True)
+
+        def start_pool(workers: int):
+            path = os.path.join(directory, f'worker-{workers}.sock')
+            process = subprocess.Popen(
+                [sys.executable, 'fishery_worker.py', '--snapshot', snapshot, '--socket', path,
+                 '--workers', str(workers)], cwd=here, stderr=subprocess.DEVNULL
+            )
+            while not os.path.exists(path):
+                time.sleep(0.02)
+            return process, path
+
+        rows = [{'escenario': 'proceso nuevo por solicitud', 'ms_total': _timeit(spawn_per_request, 1)}]
+
+        process, path = start_pool(1)
+        with WorkerClient(path) as client:
+            client.pipeline(requests)  # Calentar (estructuras precalculadas perezosas)
+            rows.append({'escenario': 'worker, solicitudes en serie', 'ms_total': _timeit(
+                lambda: [client.request(name, **params) for name, params in requests], repeat
+            )})
+            rows.append({'escenario': 'worker, pipelining', 'ms_total': _timeit(
+                lambda: client.pipeline(requests), repeat
+            )})
+        process.terminate()
+        process.wait()
+
+        workers = 4
+        process, path = start_pool(workers)
+        clients = [WorkerClient(path) for _ in range(workers)]
+        batches = [requests[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(workers) as executor:
+            run = lambda: list(executor.map(lambda pair: pair[0].pipeline(pair[1]), zip(clients, batches)))
+            run()
+            rows.append({'escenario': f'pool de {workers} workers, {workers} conexiones', 'ms_total': _timeit(run, repeat)})
+        for client in clients:
+            client.close()
+        process.terminate()
+        process.wait()
+
+    for row in rows:
+        row['ms_total'] = round(row['ms_total'], 1)
+        row['solicitudes'] = len(requests)
+        row['ms_por_solicitud'] = round(row['ms_total'] / len(requests), 1)
+    return rows
+
+
+# Cliente Node (src/services/analyticsWorkerClient.js) que mide la mediana de
+# un lote de solicitudes con cada codec; imprime {codec: ms}
+_NODE_CODEC_BENCH = """
+const { AnalyticsWorkerClient } = require(process.argv[1]);
+const [socketPath, requests, repeat] = [process.argv[2], JSON.parse(process.argv[3]), Number(process.argv[4])];
+(async () => {
+  const timings = {};
+  for (const codec of ['json', 'msgpack']) {
+    const client = await new AnalyticsWorkerClient(socketPath, 1, { codec }).connect();
+    const run = () => Promise.all(requests.map(([name, params]) => client.request(name, params)));
+    await run();
+    const samples = [];
+    for (let i = 0; i < repeat; i++) {
+      const start = process.hrtime.bigint();
+      await run();
+      samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    samples.sort((a, b) => a - b);
+    timings[codec] = samples[Math.floor(samples.length / 2)];
+    client.close();
+  }
+  console.log(JSON.stringify(timings));
+})();
+"""
+
+
+def bench_codec(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Codec del worker desde el cliente Node: JSON vs msgpack (tamaño y latencia de punta a punta)."""
+    import json
+    import shutil
+    from fishery_worker import encode
+
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return [{'nota': 'requiere el paquete msgpack (pip install msgpack)'}]
+    if shutil.which('node') is None:
+        return [{'nota': 'requiere node en el PATH'}]
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    client_module = os.path.join(here, '..', 'src', 'services', 'analyticsWorkerClient.js')
+    analytics = FisheryAnalytics(*frames)
+    requests = [
+        ('supply_vs_demand', {}),
+        ('species_by_agent_breakdown', {'top_n': 100}),
+        ('seasonal_heatmap', {}),
+        ('landing_anomalies', {'threshold': 2.0}),
+    ]
+
+    rows = []
+    for codec in ('json', 'msgpack'):
+        size = sum(
+            len(encode({'id': 1, 'ok': True, 'result': getattr(analytics, f'get_{name}')(**params)}, codec))
+            for name, params in requests
+        )
+        rows.append({'codec': codec, 'bytes_respuestas': size})
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, 'datos.pkl')
+        analytics.save_snapshot(snapshot)
+        path = os.path.join(directory, 'worker.sock')
+        # Con la caché de resultados la latencia medida es la del protocolo, no la del cálculo
+        process = subprocess.Popen(
+            [sys.executable, 'fishery_worker.py', '--snapshot', snapshot, '--socket', path,
+             '--cache', os.path.join(directory, 'cache.sqlite')],
+            cwd=here, stderr=subprocess.DEVNULL
+        )
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.02)
+            output = subprocess.run(
+                ['node', '-e', _NODE_CODEC_BENCH, client_module, path, json.dumps(requests), str(max(repeat, 3))],
+                capture_output=True, text=True, check=True
+            ).stdout
+        finally:
+            process.terminate()
+            process.wait()
+
+    timings = json.loads(output)
+    for row in rows:
+        row['solicitudes'] = len(requests)
+        row['ms_lote'] = round(timings[row['codec']], 1)
+    return rows
+
+
+def bench_startup(frames, repeat: int) -> List[Dict[str, Any]]:
+    """Tiempo de arranque en frío: servicio liviano vs importar FisheryAnalytics."""
+    from fishery_service import ResultStore, materialize
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as store_dir:
+        materialize(FisheryAnalytics(*frames), ResultStore(store_dir))
+        commands = {
+            'import fishery_service': 'import fishery_service',
+            'import fishery_analytics': 'import fishery_analytics',
+            'servir top_ports (almacén)': (
+                'from fishery_service import LightweightAnalytics; '
+                f'LightweightAnalytics({store_dir!r}).get("top_ports")'
+            ),
+        }
+
+        rows = []
+        for name, code in commands.items():
+            probe = f'{code}; import sys; print("pandas" in sys.modules)'
+            run = lambda: subprocess.run([sys.executable, '-c', probe], cwd=here,
+                                         capture_output=True, text=True, check=True)
+            rows.append({
+                'proceso': name,
+                'ms': round(_timeit(run, repeat), 1),
+                'pandas_cargado': run().stdout.strip(),
+            })
+    return rows
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    'approximate': bench_approximate,
+    'compact': bench_compact,
+    'startup': bench_startup,
+    'supply': bench_supply,
+    'groupby': bench_groupby,
+    'cosechas': bench_cosechas,
+    'heatmap': bench_heatmap,
+    'trajectories': bench_trajectories,
+    'flow': bench_flow,
+    'editions': bench_editions,
+    'anomalies': bench_anomalies,
+    'forecast': bench_forecast,
+    'concentration': bench_concentration,
+    'cache': bench_cache,
+    'worker': bench_worker,
+    'codec': bench_codec,
+}
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description='Benchmarks de FisheryAnalytics')
+    parser.add_argument('benchmarks', nargs='*', default=[],
+                        help=f"Benchmarks a ejecutar: {', '.join(BENCHMARKS)} (default: todos)")
+    parser.add_argument('--rows', type=int, default=200_000, help='Filas de desembarque sintéticas')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por medición')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del dataset sintético')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Benchmarks desconocidos: {', '.join(unknown)}")
+
+    frames = generate_synthetic_data(args.rows, seed=args.seed)
+
+    for name in args.benchmarks or list(BENCHMARKS):
+        print('=' * 80)
+        print(f'BENCHMARK: {name} ({args.rows:,} filas, {args.repeat} repeticiones)')
+        print('=' * 80)
+        _print_table(BENCHMARKS[name](frames, args.repeat))
+        print()
+
+
+if __name__ == '__main__':
+    main()
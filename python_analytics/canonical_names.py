@@ -0,0 +1,307 @@
+"""
+Diccionario persistente de nombres canónicos para Región, Especie y Puerto.
+
+Las variantes de escritura de los últimos 25 años (tildes, "REGION DE LOS
+LAGOS" vs "LOS LAGOS", códigos "X" o "10", renombres de puertos) se resuelven
+una sola vez por valor único y se guardan en un archivo JSON que se reutiliza
+en cada carga y para normalizar los argumentos de consulta. El remapeo de las
+columnas se hace sobre las categorías, de modo que el costo de normalizar es
+proporcional al número de valores únicos y no al número de filas.
+
+Por defecto FisheryAnalytics conserva las etiquetas de los datos y usa el
+nombre canónico solo para resolver los argumentos de consulta (label_groups);
+el reemplazo de las columnas por su nombre canónico es opcional
+(canonical_labels=True).
+
+Las reglas de región replican src/utils/normalizar.js (normalizarRegion) para
+que el backend Node y este módulo produzcan los mismos nombres.
+
+Las reglas (base_key, canonical_region) solo usan la biblioteca estándar;
+pandas/NumPy se importan al remapear columnas, para que el punto de entrada
+liviano (fishery_service) pueda normalizar argumentos sin cargarlos.
+"""
+
+import json
+import os
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Formato del archivo persistido
+FORMAT_VERSION = 1
+
+# Dimensiones normalizadas
+DIMENSIONS = ('Región', 'Especie', 'Puerto')
+
+# Código numérico oficial de región -> nombre canónico
+REGION_CODES = {
+    1: 'TARAPACA',
+    2: 'ANTOFAGASTA',
+    3: 'ATACAMA',
+    4: 'COQUIMBO',
+    5: 'VALPARAISO',
+    6: 'OHIGGINS',
+    7: 'MAULE',
+    8: 'BIOBIO',
+    9: 'ARAUCANIA',
+    10: 'LAGOS',
+    11: 'AYSEN',
+    12: 'MAGALLANES',
+    13: 'METROPOLITANA',
+    14: 'LOS RIOS',
+    15: 'ARICA Y PARINACOTA',
+    16: 'NUBLE',
+}
+
+# Palabras clave (sobre el texto sin tildes) -> nombre canónico, en orden de prioridad.
+# Las tres primeras coinciden con normalizarRegion del backend Node.
+REGION_KEYWORDS = (
+    ('LAGOS', 'LAGOS'),
+    ('AYSEN', 'AYSEN'),
+    ('AISEN', 'AYSEN'),
+    ('MAGALLANES', 'MAGALLANES'),
+    ('ANTARTICA', 'MAGALLANES'),
+    ('ARICA', 'ARICA Y PARINACOTA'),
+    ('TARAPACA', 'TARAPACA'),
+    ('ANTOFAGASTA', 'ANTOFAGASTA'),
+    ('ATACAMA', 'ATACAMA'),
+    ('COQUIMBO', 'COQUIMBO'),
+    ('VALPARAISO', 'VALPARAISO'),
+    ('HIGGINS', 'OHIGGINS'),
+    ('LIBERTADOR', 'OHIGGINS'),
+    ('METROPOLITANA', 'METROPOLITANA'),
+    ('MAULE', 'MAULE'),
+    ('NUBLE', 'NUBLE'),
+    ('BIOBIO', 'BIOBIO'),
+    ('BIO BIO', 'BIOBIO'),
+    ('ARAUCANIA', 'ARAUCANIA'),
+    ('RIOS', 'LOS RIOS'),
+)
+
+ROMAN_NUMERALS = {
+    'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6, 'VII': 7, 'VIII': 8,
+    'IX': 9, 'X': 10, 'XI': 11, 'XII': 12, 'XIII': 13, 'XIV': 14, 'XV': 15, 'XVI': 16,
+}
+
+# "X", "10", "10,0", "X REGION", "REGION X", "10 REGION"...
+_REGION_CODE_RE = re.compile(r'^(?:REGION\s+)?([IVX]+|\d+(?:[.,]0+)?)(?:\s+REGION)?$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def base_key(value: Any) -> str:
+    """
+    Clave base de un nombre: sin espacios extremos, mayúsculas, sin tildes y
+    con espacios internos colapsados.
+    """
+    text = unicodedata.normalize('NFKD', str(value).strip().upper())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = text.replace('-', ' ').replace("'", '')
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def canonical_region(value: Any) -> str:
+    """Nombre canónico de una región a partir de su nombre o código."""
+    key = base_key(value)
+
+    match = _REGION_CODE_RE.match(key)
+    if match:
+        code = match.group(1)
+        number = ROMAN_NUMERALS.get(code)
+        if number is None and code[0].isdigit():
+            number = int(float(code.replace(',', '.')))
+        if number in REGION_CODES:
+            return REGION_CODES[number]
+
+    for keyword, canonical in REGION_KEYWORDS:
+        if keyword in key:
+            return canonical
+
+    return key
+
+
+# Regla de normalización por dimensión
+RULES = {
+    'Región': canonical_region,
+    'Especie': base_key,
+    'Puerto': base_key,
+}
+
+
+class CanonicalNames:
+    """
+    Diccionario nombre crudo -> nombre canónico, por dimensión.
+
+    Cada valor crudo se resuelve una sola vez (alias manual o regla de la
+    dimensión) y el resultado queda memorizado en `mapping`; si se indica
+    `path`, el diccionario se carga al iniciar y se guarda con save().
+    Los alias manuales (p. ej. renombres de puertos) se declaran sobre la
+    clave base y también se persisten.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Archivo JSON del diccionario (None = solo en memoria)
+        """
+        self.path = path
+        self.mapping: Dict[str, Dict[str, str]] = {dimension: {} for dimension in DIMENSIONS}
+        self.aliases: Dict[str, Dict[str, str]] = {dimension: {} for dimension in DIMENSIONS}
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def load(self, path: str):
+        """Carga mapping y alias desde un archivo JSON."""
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        if payload.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Versión de diccionario no soportada en {path}: {payload.get('version')}")
+
+        for dimension in DIMENSIONS:
+            self.mapping[dimension].update(payload.get('mapping', {}).get(dimension, {}))
+            self.aliases[dimension].update(payload.get('aliases', {}).get(dimension, {}))
+        self._dirty = False
+
+    def save(self, path: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Guarda el diccionario si hubo cambios (escritura atómica).
+
+        Args:
+            path: Destino (default: el path del constructor)
+            force: Guardar aunque no haya cambios
+
+        Returns:
+            True si se escribió el archivo
+        """
+        path = path or self.path
+        if not path or not (self._dirty or force):
+            return False
+
+        payload = {
+            'version': FORMAT_VERSION,
+            'aliases': self.aliases,
+            'mapping': self.mapping,
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, path)
+
+        self._dirty = False
+        return True
+
+    # ------------------------------------------------------------------
+    # Resolución de nombres
+    # ------------------------------------------------------------------
+
+    def add_alias(self, dimension: str, raw: Any, canonical: str):
+        """
+        Declara que `raw` (y cualquier variante con su misma clave base) es `canonical`.
+
+        Invalida las entradas memorizadas afectadas para que se recalculen.
+        """
+        key = base_key(raw)
+        self.aliases[dimension][key] = canonical
+        self.mapping[dimension] = {
+            raw_value: value for raw_value, value in self.mapping[dimension].items()
+            if base_key(raw_value) != key
+        }
+        self._dirty = True
+
+    def canonical(self, dimension: str, value: Any) -> str:
+        """Nombre canónico de un valor (memorizado)."""
+        raw = str(value)
+        mapping = self.mapping[dimension]
+        canonical = mapping.get(raw)
+        if canonical is None:
+            key = base_key(raw)
+            canonical = self.aliases[dimension].get(key) or RULES[dimension](raw)
+            mapping[raw] = canonical
+            self._dirty = True
+        return canonical
+
+    def update(self, dimension: str, values: Iterable[Any]) -> int:
+        """
+        Agrega al diccionario los valores que aún no están.
+
+        Returns:
+            Número de valores nuevos
+        """
+        known = self.mapping[dimension]
+        new_values = [value for value in values if str(value) not in known]
+        for value in new_values:
+            self.canonical(dimension, value)
+        return len(new_values)
+
+    def canonicalize(self, series: 'pd.Series', dimension: str) -> 'pd.Series':
+        """
+        Reemplaza cada valor de la serie por su nombre canónico.
+
+        Los valores se factorizan una vez; solo las categorías únicas pasan por
+        el diccionario y las filas se remapean por código. Conserva el dtype de
+        texto original (o category, si la serie ya era categórica); los nulos
+        se mantienen.
+        """
+        return remap_categories(series, lambda value: self.canonical(dimension, value))
+
+    def label_groups(self, dimension: str, labels: Iterable[Any]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Etiquetas de los datos agrupadas por nombre canónico.
+
+        Un argumento de consulta selecciona todas las etiquetas de su grupo
+        (p. ej. "LOS LAGOS" y "REGIÓN DE LOS LAGOS"), en orden alfabético.
+        """
+        groups: Dict[str, List[str]] = {}
+        for label in sorted({str(label) for label in labels}):
+            groups.setdefault(self.canonical(dimension, label), []).append(label)
+        return {key: tuple(group) for key, group in groups.items()}
+
+
+def remap_categories(series: 'pd.Series', function: Callable[[Any], str]) -> 'pd.Series':
+    """
+    Aplica `function` a cada valor único de la serie y remapea las filas por código.
+
+    Conserva el dtype de texto original (o category, si la serie ya era
+    categórica); los nulos se mantienen.
+    """
+    import numpy as np
+    import pandas as pd
+
+    categorical = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    categories = categorical.cat.categories
+    if len(categories) == 0:
+        return series.copy()
+
+    mapped = [function(value) for value in categories]
+    new_categories, lookup = np.unique(np.array(mapped, dtype=object), return_inverse=True)
+
+    codes = categorical.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, lookup[np.maximum(codes, 0)], -1)
+    result = pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=new_categories),
+        index=series.index,
+        name=series.name
+    )
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return result
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+        return result.astype(series.dtype)
+    return result.astype(object)
+
+
+def upper_labels(series: 'pd.Series') -> 'pd.Series':
+    """Etiquetas sin espacios extremos y en mayúsculas (normalización por defecto de Región y Especie)."""
+    return remap_categories(series, lambda value: str(value).strip().upper())
@@ -10,10 +10,30 @@ Date: 2025-11-19
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Iterable, Union, TYPE_CHECKING
+import copy
+import glob
+import hashlib
 import json
+import os
+import sys
+import threading
 from datetime import datetime
 
+from canonical_names import CanonicalNames, DIMENSIONS as CANONICAL_DIMENSIONS, upper_labels
+
+from fishery_memory import DerivedStore, MemoryGovernor
+from fishery_quality import quality_masks, profile_datasets
+from fishery_hierarchy import RegionHierarchy
+from fishery_arrow import format_result, validate_output_format
+from fishery_service import json_default
+
+if TYPE_CHECKING:
+    from fishery_cubes import SupplyCube
+    from fishery_groupby import CodedTable
+    from fishery_hierarchy import HierarchyAggregates
+    from fishery_sampling import StratifiedSample
+
 
 class FisheryAnalytics:
     """
@@ -23,11 +43,50 @@ class FisheryAnalytics:
     comparativo listos para ser consumidos por una API REST.
     """
     
+    # Análisis disponibles (cada uno expone get_<nombre> e iter_analysis('<nombre>'))
+    ANALYSIS_TYPES = (
+        'supply_vs_demand',
+        'conversion_efficiency',
+        'species_flow',
+        'regional_dynamics',
+        'longitudinal_evolution',
+        'agent_share',
+        'agent_distribution',
+        'top_ports',
+        'port_rank_trajectories',
+        'species_by_agent_breakdown',
+        'seasonal_context',
+        'seasonal_heatmap',
+        'plant_capacity_analysis',
+        'landing_anomalies',
+        'forecast',
+        'concentration',
+    )
+    
+    # Dimensiones que se normalizan a mayúsculas sin espacios extremos
+    UPPER_DIMENSIONS = ('Región', 'Especie')
+    
+    # Motores de cálculo: 'numpy' (acelerado) y 'pandas' (implementación de referencia)
+    ENGINES = ('numpy', 'pandas')
+    
+    # Tamaño de lote por defecto para las variantes iter_*
+    DEFAULT_BATCH_SIZE = 500
+    
     def __init__(
         self, 
         df_desembarque: pd.DataFrame,
         df_produccion: pd.DataFrame,
-        df_plantas: pd.DataFrame
+        df_plantas: pd.DataFrame,
+        compact: bool = False,
+        canonical_names_path: Optional[str] = None,
+        canonical_labels: bool = False,
+        engine: str = 'numpy',
+        memory_budget: Optional[Any] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
+        clean: bool = False,
+        macro_zones: Optional[Any] = None,
+        result_cache: Optional[Any] = None,
+        exact_tonnage: bool = False
     ):
         """
         Inicializa la clase con los 3 datasets principales.
@@ -41,17 +100,102 @@ class FisheryAnalytics:
                                    Materia Prima, Producción
             df_plantas: DataFrame con infraestructura (2010-2024)
                 Columnas esperadas: Año, Región, Nombre Planta, Línea de producción
+            compact: Si es True, almacena los DataFrames con tipos compactos
+                (ver _compact_dataframes); los resultados no cambian
+            canonical_names_path: Archivo JSON del diccionario de nombres
+                canónicos (Región/Especie/Puerto). Si existe se reutiliza y se
+                actualiza con los valores nuevos; None = diccionario en memoria
+            canonical_labels: Si es True, reemplaza Región/Especie/Puerto por su
+                nombre canónico (une variantes en un solo grupo). Por defecto se
+                conservan las etiquetas de los datos (Región y Especie sin
+                espacios extremos y en mayúsculas) y el nombre canónico solo
+                se usa para resolver los argumentos de consulta
+            engine: 'numpy' usa estructuras precomputadas (cubos densos) donde
+                existen; 'pandas' calcula siempre con groupby/merge (referencia)
+            memory_budget: Presupuesto de memoria (bytes o texto como '512MB')
+                para DataFrames + estructuras derivadas; al excederlo se
+                descartan las estructuras derivadas menos usadas (se
+                reconstruyen bajo demanda). None = sin límite
+            memory_governor: MemoryGovernor compartido con otras instancias
+                (un único presupuesto para todas); excluyente con memory_budget
+            clean: Si es True, elimina una sola vez al cargar las filas
+                inválidas (años o meses fuera de rango, toneladas negativas o
+                infinitas, filas duplicadas) y los análisis omiten su filtrado
+                por consulta; sin clean el perfil de calidad se calcula bajo
+                demanda (ver data_quality_report())
+            macro_zones: Macrozonas para los análisis con level='macrozona':
+                dict {macrozona: [regiones]} o ruta a un JSON con ese formato
+                (default: Norte, Centro, Sur y Austral; ver fishery_hierarchy)
+            result_cache: fishery_cache.ResultCache (o ruta a su archivo SQLite)
+                compartida entre procesos: get_<análisis> busca primero ahí el
+                resultado, con clave = huella del contenido de los datos +
+                análisis + parámetros (ver content_fingerprint)
+            exact_tonnage: Si es True, el kernel numpy acumula las toneladas
+                con hasta 6 decimales como unidades enteras (p. ej.
+                kilogramos): las sumas son exactas y los desembarques se
+                colapsan a celdas también con datos decimales. Cada total es
+                el float64 más cercano a la suma decimal, que puede diferir en
+                el último bit del de engine='pandas' (ver fishery_groupby)
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine debe ser uno de {self.ENGINES}")
+        if memory_budget is not None and memory_governor is not None:
+            raise ValueError("Use memory_budget o memory_governor, no ambos")
+        self.engine = engine
+        self.exact_tonnage = exact_tonnage
+        
         # Almacenar copias para evitar modificaciones externas
         self.df_desembarque = df_desembarque.copy()
         self.df_produccion = df_produccion.copy()
         self.df_plantas = df_plantas.copy()
         
-        # Normalizar nombres de columnas
+        # Jerarquía Nación > Macrozona > Región > Puerto de los análisis regionales
+        if isinstance(macro_zones, str):
+            self.region_hierarchy = RegionHierarchy.from_json(macro_zones)
+        else:
+            self.region_hierarchy = RegionHierarchy(macro_zones)
+        
+        # Normalizar nombres de columnas y valores (diccionario de nombres canónicos)
+        self.canonical_names = CanonicalNames(canonical_names_path)
+        self.canonical_labels = canonical_labels
+        self._label_groups: Dict[str, Dict[str, Tuple[str, ...]]] = {}
         self._normalize_dataframes()
         
         # Validar estructura
         self._validate_dataframes()
+        
+        # Limpieza opcional (una pasada vectorizada); sin clean el perfil de
+        # calidad se calcula recién en la primera llamada a data_quality_report()
+        self.clean = clean
+        self._quality_report: Optional[Dict[str, Any]] = None
+        if clean:
+            self._profile_data_quality()
+        
+        # Representación compacta opcional (Año/Mes enteros pequeños, toneladas
+        # como enteros escalados y dimensiones como categorías)
+        self.compact = compact
+        self._scaled_columns: Dict[str, int] = {}
+        self._memory_before = self._memory_footprint()
+        if compact:
+            self._compact_dataframes()
+        
+        # Estructuras derivadas opcionales (muestras, índices), construidas bajo
+        # demanda y descartables por el governor de memoria (ver fishery_memory)
+        self.memory_governor = memory_governor or MemoryGovernor(memory_budget)
+        self._derived = DerivedStore(self.memory_governor, self._memory_footprint(), name=f'FisheryAnalytics@{id(self):x}')
+        # Serializa la construcción de estructuras derivadas y de la huella
+        # entre hilos que comparten la instancia (p. ej. el exportador)
+        self._build_lock = threading.RLock()
+        # Parámetros de la muestra del modo aproximado (los de build_stratified_sample)
+        self._sample_params: Dict[str, Any] = {'fraction': 0.1, 'min_per_stratum': 20, 'seed': 42}
+        self.memory_governor.enforce()
+        
+        # Caché persistente de resultados (opcional)
+        if isinstance(result_cache, str):
+            from fishery_cache import ResultCache
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        self._content_id: Optional[str] = None
     
     def _normalize_dataframes(self):
         """Normaliza nombres de columnas y datos para consistencia."""
@@ -60,22 +204,61 @@ class FisheryAnalytics:
         self.df_produccion.columns = self.df_produccion.columns.str.strip()
         self.df_plantas.columns = self.df_plantas.columns.str.strip()
         
-        # Normalizar regiones (strip y uppercase para consistencia)
-        if 'Región' in self.df_desembarque.columns:
-            self.df_desembarque['Región'] = self.df_desembarque['Región'].str.strip().str.upper()
-        
-        if 'Región' in self.df_produccion.columns:
-            self.df_produccion['Región'] = self.df_produccion['Región'].str.strip().str.upper()
-        
-        if 'Región' in self.df_plantas.columns:
-            self.df_plantas['Región'] = self.df_plantas['Región'].str.strip().str.upper()
+        # Normalizar regiones y especies (strip y uppercase para consistencia) o,
+        # con canonical_labels, regiones, especies y puertos a su nombre canónico
+        # (variantes con tildes, prefijos "REGION DE", códigos X/10, alias de puertos)
+        labels: Dict[str, set] = {dimension: set() for dimension in CANONICAL_DIMENSIONS}
+        for df in (self.df_desembarque, self.df_produccion, self.df_plantas):
+            for dimension in CANONICAL_DIMENSIONS:
+                if dimension not in df.columns:
+                    continue
+                if self.canonical_labels:
+                    df[dimension] = self.canonical_names.canonicalize(df[dimension], dimension)
+                elif dimension in self.UPPER_DIMENSIONS:
+                    df[dimension] = upper_labels(df[dimension])
+                labels[dimension].update(df[dimension].dropna().unique())
+        
+        # Índice nombre canónico -> etiquetas de los 3 datasets para los argumentos
+        # de consulta; los nombres nuevos se persisten para las próximas cargas
+        if not self.canonical_labels:
+            self._label_groups = {
+                dimension: self.canonical_names.label_groups(dimension, values)
+                for dimension, values in labels.items()
+            }
+        self.canonical_names.save()
+    
+    def _query_labels(self, dimension: str, value: Any) -> Tuple[str, ...]:
+        """
+        Etiquetas de los datos que corresponden a un argumento de consulta (Región/Especie/Puerto).
         
-        # Normalizar especies
-        if 'Especie' in self.df_desembarque.columns:
-            self.df_desembarque['Especie'] = self.df_desembarque['Especie'].str.strip().str.upper()
+        Son todas las etiquetas con el mismo nombre canónico que el argumento
+        (p. ej. 'LOS LAGOS' y 'REGIÓN DE LOS LAGOS'), en cualquiera de los 3
+        datasets; los filtros las seleccionan con isin. Una etiqueta que no
+        está en un dataset no selecciona filas de ese dataset.
+        """
+        canonical = self.canonical_names.canonical(dimension, value)
+        if self.canonical_labels:
+            return (canonical,)
+        label = str(value).strip().upper() if dimension in self.UPPER_DIMENSIONS else str(value)
+        return self._label_groups.get(dimension, {}).get(canonical, (label,))
+    
+    def region_labels(self, region: str) -> Tuple[str, ...]:
+        """Etiquetas de región de los datos que corresponden a un argumento de consulta."""
+        return self._query_labels('Región', region)
+    
+    def region_label_index(self) -> Dict[str, Any]:
+        """
+        Lo necesario para resolver region_labels sin cargar los datos (ver fishery_service).
         
-        if 'Especie' in self.df_produccion.columns:
-            self.df_produccion['Especie'] = self.df_produccion['Especie'].str.strip().str.upper()
+        Returns:
+            Dict con canonical_labels, los alias de región del diccionario y
+            las etiquetas de región por nombre canónico
+        """
+        return {
+            'canonical_labels': self.canonical_labels,
+            'aliases': dict(self.canonical_names.aliases['Región']),
+            'groups': {key: list(labels) for key, labels in self._label_groups.get('Región', {}).items()},
+        }
     
     def _validate_dataframes(self):
         """Valida que los DataFrames tengan las columnas mínimas requeridas."""
@@ -95,6 +278,263 @@ class FisheryAnalytics:
             if col not in self.df_plantas.columns:
                 raise ValueError(f"Columna '{col}' faltante en df_plantas")
     
+    def _profile_data_quality(self):
+        """Calcula el reporte de calidad y reemplaza los DataFrames por su versión limpia (clean=True)."""
+        frames, self._quality_report = profile_datasets(self._frames(), clean=True)
+        self.df_desembarque = frames['desembarque']
+        self.df_produccion = frames['produccion']
+        self.df_plantas = frames['plantas']
+    
+    def data_quality_report(self) -> Dict[str, Any]:
+        """
+        Reporte de calidad de datos.
+        
+        Con clean=True se calcula al construir la instancia (junto con la
+        limpieza); sin clean se calcula en la primera llamada sobre los datos
+        decodificados y queda memorizado.
+        
+        Returns:
+            Dict con 'clean', 'total_problemas', 'total_filas_eliminadas' y por
+            dataset: filas, nulos por columna, conteo por regla (ver
+            fishery_quality) y filas eliminadas
+        """
+        if self._quality_report is None:
+            frames = {name: self._decoded(df) for name, df in self._frames().items()}
+            self._quality_report = profile_datasets(frames)[1]
+        return copy.deepcopy(self._quality_report)
+    
+    def data_quality_rows(self, dataset: str, check: str) -> pd.DataFrame:
+        """
+        Filas actuales de un dataset que incumplen una regla de calidad.
+        
+        Args:
+            dataset: 'desembarque', 'produccion' o 'plantas'
+            check: Regla del reporte (p. ej. 'produccion_mayor_materia_prima')
+        """
+        frames = self._frames()
+        if dataset not in frames:
+            raise ValueError(f"dataset debe ser uno de {tuple(frames)}")
+        df = self._decoded(frames[dataset])
+        masks = quality_masks(dataset, df)
+        if check not in masks:
+            raise ValueError(f"Regla '{check}' no aplicable a {dataset}; disponibles: {tuple(masks)}")
+        return df.loc[masks[check]]
+    
+    # ============================================================================
+    # REPRESENTACIÓN COMPACTA
+    # ============================================================================
+    
+    # Columnas de calendario que se reducen a int16/int8
+    CALENDAR_COLUMNS = ('Año', 'Mes')
+    
+    # Columnas de toneladas que se almacenan como enteros escalados (kilogramos)
+    TONNAGE_COLUMNS = ('Toneladas', 'Materia Prima', 'Producción')
+    
+    # Factor de escala: 1 tonelada = 1000 kg (3 decimales exactos)
+    TONNAGE_SCALE = 1000
+    
+    # Máxima proporción de valores únicos para convertir texto a categoría
+    CATEGORY_MAX_RATIO = 0.5
+    
+    def _frames(self) -> Dict[str, pd.DataFrame]:
+        """Retorna los 3 DataFrames indexados por nombre de dataset."""
+        return {
+            'desembarque': self.df_desembarque,
+            'produccion': self.df_produccion,
+            'plantas': self.df_plantas
+        }
+    
+    def _memory_footprint(self) -> Dict[str, int]:
+        """Bytes ocupados por cada DataFrame (memory_usage con deep=True)."""
+        return {
+            name: int(df.memory_usage(deep=True).sum())
+            for name, df in self._frames().items()
+        }
+    
+    def _compact_dataframes(self):
+        """
+        Convierte los DataFrames a tipos compactos sin pérdida de precisión.
+        
+        - Año/Mes: entero más pequeño posible (int16/int8), incluso si venían
+          como texto, siempre que la conversión no introduzca nulos.
+        - Toneladas/Materia Prima/Producción: kilogramos como int32 (o int64),
+          solo si el valor original se recupera exactamente al dividir por 1000.
+          Si no, la columna se mantiene en float64.
+        - Texto de baja cardinalidad: category.
+        
+        Los análisis leen las toneladas a través de _decoded, que reconstruye
+        valores float64 idénticos a los originales antes de agregar.
+        """
+        for name, df in self._frames().items():
+            for col in df.columns:
+                if col in self.CALENDAR_COLUMNS:
+                    df[col] = self._compact_calendar(df[col])
+                elif col in self.TONNAGE_COLUMNS:
+                    scaled = self._compact_tonnage(df[col])
+                    if scaled is not None:
+                        df[col] = scaled
+                        self._scaled_columns[col] = self.TONNAGE_SCALE
+                elif df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+                    if len(df) > 0 and df[col].nunique() <= len(df) * self.CATEGORY_MAX_RATIO:
+                        df[col] = df[col].astype('category')
+    
+    def _compact_calendar(self, values: pd.Series) -> pd.Series:
+        """Reduce una columna de año o mes al entero más pequeño que la contiene."""
+        numeric = pd.to_numeric(values, errors='coerce')
+        if numeric.isna().any() or not (numeric == numeric.round()).all():
+            return values
+        return pd.to_numeric(numeric, downcast='integer')
+    
+    def _compact_tonnage(self, values: pd.Series) -> Optional[pd.Series]:
+        """
+        Convierte toneladas a kilogramos enteros si la conversión es reversible.
+        
+        Returns:
+            Serie entera (int32/int64, nullable si hay nulos) o None si se perdería precisión
+        """
+        if not pd.api.types.is_numeric_dtype(values):
+            return None
+        
+        original = values.to_numpy(dtype='float64', na_value=np.nan)
+        kilos = np.round(original * self.TONNAGE_SCALE)
+        missing = np.isnan(original)
+        
+        if np.isinf(original).any():
+            return None
+        if not np.array_equal(kilos[~missing] / self.TONNAGE_SCALE, original[~missing]):
+            return None
+        
+        limit = np.abs(kilos[~missing]).max() if (~missing).any() else 0
+        if limit >= 2 ** 63:
+            return None
+        dtype = 'int32' if limit < 2 ** 31 else 'int64'
+        
+        if missing.any():
+            return pd.Series(
+                pd.array(np.where(missing, 0, kilos).astype(dtype), dtype=dtype.capitalize()),
+                index=values.index
+            ).mask(missing)
+        return pd.Series(kilos.astype(dtype), index=values.index)
+    
+    def _decoded(self, df: pd.DataFrame, copy: bool = False) -> pd.DataFrame:
+        """
+        Retorna df con las columnas de toneladas en float64 (valores originales).
+        
+        Las agregaciones se hacen siempre sobre este resultado, de modo que el
+        modo compacto acumula en float64 igual que el modo normal.
+        
+        Args:
+            df: DataFrame (o subconjunto) almacenado por la clase
+            copy: Garantiza una copia aunque no haya columnas que decodificar
+        """
+        columns = {
+            col: df[col].to_numpy(dtype='float64', na_value=np.nan) / scale
+            for col, scale in self._scaled_columns.items()
+            if col in df.columns
+        }
+        if columns:
+            return df.assign(**columns)
+        return df.copy() if copy else df
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Reporte de memoria por DataFrame antes y después de la compactación.
+        
+        Returns:
+            Dict con bytes originales, bytes actuales, reducción porcentual y
+            dtypes de cada dataset, más el total
+        """
+        after = self._memory_footprint()
+        datasets = {}
+        for name, df in self._frames().items():
+            before = self._memory_before[name]
+            datasets[name] = {
+                'filas': len(df),
+                'bytes_originales': before,
+                'bytes_actuales': after[name],
+                'reduccion_pct': round((1 - after[name] / before) * 100, 2) if before > 0 else 0.0,
+                'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+                'columnas_escaladas': {
+                    col: scale for col, scale in self._scaled_columns.items() if col in df.columns
+                }
+            }
+        
+        total_before = sum(self._memory_before.values())
+        total_after = sum(after.values())
+        return {
+            'compact': self.compact,
+            'datasets': datasets,
+            'total_bytes_originales': total_before,
+            'total_bytes_actuales': total_after,
+            'reduccion_total_pct': round((1 - total_after / total_before) * 100, 2) if total_before > 0 else 0.0
+        }
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """
+        Uso de memoria contabilizado para monitoreo.
+        
+        Incluye los bytes de cada DataFrame (memory_usage con deep=True), el
+        tamaño estimado de cada estructura derivada retenida (de la más a la
+        menos usada recientemente) y el estado del presupuesto. Si el
+        governor es compartido, 'governor' resume todas sus instancias.
+        
+        Returns:
+            Dict con frames_bytes, derived_bytes, total_bytes y governor
+        """
+        own = self._derived.usage()
+        governor = self.memory_governor.usage()
+        return {
+            'frames_bytes': own['fixed_bytes'],
+            'derived_bytes': own['derived_bytes'],
+            'total_bytes': own['total_bytes'],
+            'governor': {key: value for key, value in governor.items() if key != 'stores'},
+        }
+    
+    # ============================================================================
+    # SNAPSHOTS (CARGA RÁPIDA SIN CSV)
+    # ============================================================================
+    
+    # Versión del formato de snapshot
+    SNAPSHOT_VERSION = 1
+    
+    def save_snapshot(self, path: str):
+        """
+        Guarda los 3 DataFrames ya normalizados en un archivo pickle.
+        
+        Cargarlo con from_snapshot evita volver a parsear los CSV y a resolver
+        nombres canónicos. Las columnas de toneladas se guardan decodificadas
+        (float64), de modo que el snapshot sirve para modo normal y compacto.
+        
+        Args:
+            path: Archivo de destino (escritura atómica)
+        """
+        payload = {
+            'version': self.SNAPSHOT_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'frames': {name: self._decoded(df) for name, df in self._frames().items()}
+        }
+        tmp_path = f'{path}.tmp'
+        pd.to_pickle(payload, tmp_path)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def from_snapshot(cls, path: str, **options) -> 'FisheryAnalytics':
+        """
+        Crea una instancia desde un snapshot de save_snapshot.
+        
+        Solo deben cargarse snapshots de origen confiable (formato pickle).
+        
+        Args:
+            path: Archivo generado por save_snapshot
+            **options: Opciones del constructor (compact, canonical_names_path, ...)
+        """
+        payload = pd.read_pickle(path)
+        if not isinstance(payload, dict) or payload.get('version') != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot no soportado: {path}")
+        
+        frames = payload['frames']
+        return cls(frames['desembarque'], frames['produccion'], frames['plantas'], **options)
+    
     def _to_serializable(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
         Convierte un DataFrame a una lista de diccionarios JSON-serializable.
@@ -111,12 +551,275 @@ class FisheryAnalytics:
         # Convertir a registros
         return df.to_dict('records')
     
+    def _compute(self, analysis_type: str, **params) -> Dict[str, Any]:
+        """
+        Ejecuta el constructor privado de un análisis registrado.
+        
+        Args:
+            analysis_type: Nombre del análisis (ver ANALYSIS_TYPES)
+            **params: Parámetros del método get_<analysis_type>
+            
+        Returns:
+            Resultado con la tabla 'data' todavía como DataFrame
+        """
+        if analysis_type not in self.ANALYSIS_TYPES:
+            raise ValueError(f"Análisis desconocido: '{analysis_type}'")
+        
+        return getattr(self, f'_build_{analysis_type}')(**params)
+    
+    def _run(self, analysis_type: str, output_format: str = 'dict', **params) -> Union[Dict[str, Any], bytes]:
+        """
+        Ejecuta un análisis y serializa su tabla 'data' a registros.
+        
+        Con output_format 'arrow' o 'record_batch' la tabla pasa del DataFrame a
+        Arrow por columnas, sin construir registros (ni usar la caché de resultados,
+        que guarda registros JSON).
+        """
+        validate_output_format(output_format)
+        if output_format != 'dict':
+            return format_result(self._compute(analysis_type, **params), output_format)
+        
+        if self.result_cache is not None:
+            from fishery_service import normalize_params
+            
+            # La región de la clave son las etiquetas que el filtro selecciona en
+            # estos datos (con alias propios dos nombres canónicos pueden diferir)
+            key_params = normalize_params(analysis_type, params, self.region_labels)
+            if key_params.get('exact') is False:
+                # Un resultado aproximado depende de la muestra vigente
+                key_params['sample'] = dict(self._sample_params)
+            cached = self.result_cache.get(analysis_type, key_params, self.content_fingerprint())
+            if cached is not None:
+                return cached
+        
+        result = self._compute(analysis_type, **params)
+        
+        if isinstance(result.get('data'), pd.DataFrame):
+            result['data'] = self._to_serializable(result['data'])
+        
+        # Solo se guardan resultados exitosos
+        if self.result_cache is not None and result.get('success'):
+            self.result_cache.put(analysis_type, key_params, self.content_fingerprint(), result)
+        
+        return result
+    
+    # Versión del formato de resultados; las claves de caché incluyen además
+    # el código fuente de los módulos de análisis
+    RESULT_FORMAT_VERSION = 1
+    
+    def content_fingerprint(self) -> str:
+        """
+        Huella del contenido de los datos y de la configuración que afecta los resultados.
+        
+        Combina el hash de cada fila de los 3 DataFrames normalizados (con
+        valores numéricos como float64, así que el modo compacto no la cambia), sus
+        columnas, el motor de cálculo (y exact_tonnage), las macrozonas y el código fuente de
+        los módulos de análisis (un despliegue con código nuevo no reutiliza
+        resultados viejos). Se calcula una vez por instancia.
+        """
+        with self._build_lock:
+            if self._content_id is None:
+                digest = hashlib.sha256()
+                digest.update(
+                    f'v{self.RESULT_FORMAT_VERSION};engine={self.engine};exact_tonnage={self.exact_tonnage};'.encode()
+                )
+                digest.update(json.dumps(self.region_hierarchy.zone_of, sort_keys=True).encode())
+                for name, df in self._frames().items():
+                    decoded = self._decoded(df)
+                    # Columnas numéricas como float64: enteros compactos y originales dan la misma huella
+                    decoded = decoded.astype({
+                        col: 'float64' for col, dtype in decoded.dtypes.items()
+                        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                    })
+                    digest.update(f'{name}:{list(decoded.columns)}:{len(decoded)};'.encode())
+                    digest.update(pd.util.hash_pandas_object(decoded, index=False).to_numpy().tobytes())
+                digest.update(_source_fingerprint().encode())
+                self._content_id = digest.hexdigest()[:32]
+        return self._content_id
+    
+    # ============================================================================
+    # VARIANTES POR EVENTOS (GENERADORES, SERIALIZACIÓN POR LOTES)
+    # ============================================================================
+    
+    def iter_analysis(
+        self,
+        analysis_type: str,
+        batch_size: Optional[int] = None,
+        **params
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Ejecuta un análisis y entrega su resultado como secuencia de eventos.
+        
+        El orden de los eventos es 'metadata' (primero), 'row' o 'batch' (uno
+        por fila o por lote de batch_size filas) y 'summary' (al final). Si el
+        análisis falla se emite un único evento 'error' con el mismo contenido
+        que retornaría get_<analysis_type>.
+        
+        Los análisis con un constructor por partes (_stream_<analysis_type>,
+        hoy supply_vs_demand, un DataFrame por año) entregan cada parte apenas
+        se calcula: el evento 'metadata' sale antes de calcular la primera
+        parte y trae total_rows=None, y el total de filas llega en el evento
+        'summary'. Los demás análisis (una fila por año o por unidad
+        territorial, ordenadas por totales globales) se calculan completos
+        antes del primer evento y solo la conversión a diccionarios se hace
+        lote a lote. Con result_cache el análisis pasa por la caché igual que
+        get_<analysis_type> (se lee de ahí o se calcula completo y se guarda)
+        y los eventos recorren sus registros.
+        
+        Args:
+            analysis_type: Nombre del análisis (ver ANALYSIS_TYPES)
+            batch_size: Filas por evento 'batch' (None = un evento 'row' por fila)
+            **params: Parámetros del método get_<analysis_type>
+            
+        Yields:
+            Dicts {'type': 'metadata' | 'row' | 'batch' | 'summary' | 'error', ...}
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size debe ser un entero positivo")
+        
+        stream = getattr(self, f'_stream_{analysis_type}', None)
+        if self.result_cache is None and analysis_type in self.ANALYSIS_TYPES and stream is not None:
+            yield from self._iter_parts(stream(**params), batch_size)
+            return
+        
+        if self.result_cache is not None:
+            result = self._run(analysis_type, **params)
+        else:
+            result = self._compute(analysis_type, **params)
+        
+        if not result.get('success', False):
+            yield {'type': 'error', **result}
+            return
+        
+        # DataFrame recién calculado o registros de la caché
+        data = result['data']
+        
+        yield {
+            'type': 'metadata',
+            'success': True,
+            'analysis_type': result['analysis_type'],
+            'metadata': result['metadata'],
+            'total_rows': len(data)
+        }
+        
+        step = batch_size or self.DEFAULT_BATCH_SIZE
+        for start in range(0, len(data), step):
+            if isinstance(data, list):
+                records = data[start:start + step]
+            else:
+                records = self._to_serializable(data.iloc[start:start + step])
+            yield from self._record_events(records, batch_size)
+        
+        yield {'type': 'summary', 'summary': result['summary']}
+    
+    def _iter_parts(self, parts: Iterator[Any], batch_size: Optional[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Eventos de iter_analysis a partir de un constructor por partes.
+        
+        parts entrega el encabezado del resultado, los DataFrames de filas y
+        al final {'summary': ...}. Sin batch_size cada fila sale apenas llega
+        su parte; con batch_size las filas se reagrupan en lotes de ese tamaño
+        (el último puede ser menor) y las partes se convierten a diccionarios
+        de a un lote, así que solo se retiene un lote más la parte en curso.
+        """
+        header = next(parts)
+        if not header.get('success', False):
+            yield {'type': 'error', **header}
+            return
+        
+        yield {
+            'type': 'metadata',
+            'success': True,
+            'analysis_type': header['analysis_type'],
+            'metadata': header['metadata'],
+            'total_rows': None
+        }
+        
+        # Registros que no completaron un lote y partes aún sin serializar
+        pending: List[Dict[str, Any]] = []
+        frames: List[pd.DataFrame] = []
+        total_rows, summary = 0, {}
+        for part in parts:
+            if not isinstance(part, pd.DataFrame):
+                summary = part['summary']
+                continue
+            total_rows += len(part)
+            if batch_size is None:
+                yield from self._record_events(self._to_serializable(part), None)
+                continue
+            # Las partes se serializan juntas recién cuando completan un lote
+            frames.append(part)
+            if len(pending) + sum(len(frame) for frame in frames) < batch_size:
+                continue
+            pending.extend(self._to_serializable(pd.concat(frames)))
+            frames = []
+            full = len(pending) - len(pending) % batch_size
+            for start in range(0, full, batch_size):
+                yield from self._record_events(pending[start:start + batch_size], batch_size)
+            pending = pending[full:]
+        if frames:
+            pending.extend(self._to_serializable(pd.concat(frames)))
+        if pending:
+            yield from self._record_events(pending, batch_size)
+        
+        yield {'type': 'summary', 'summary': summary, 'total_rows': total_rows}
+    
+    def _record_events(self, records: List[Dict[str, Any]], batch_size: Optional[int]) -> Iterator[Dict[str, Any]]:
+        """Un evento 'row' por registro o un único evento 'batch' (si hay batch_size)."""
+        if batch_size is None:
+            for record in records:
+                yield {'type': 'row', 'data': record}
+        else:
+            yield {'type': 'batch', 'data': records}
+    
+    def iter_supply_vs_demand(
+        self,
+        start_year: int = 2010,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_supply_vs_demand (ver iter_analysis)."""
+        return self.iter_analysis(
+            'supply_vs_demand', batch_size,
+            start_year=start_year, end_year=end_year, region=region
+        )
+    
+    def iter_conversion_efficiency(
+        self,
+        top_n: int = 20,
+        min_materia_prima: float = 100.0,
+        batch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_conversion_efficiency (ver iter_analysis)."""
+        return self.iter_analysis(
+            'conversion_efficiency', batch_size,
+            top_n=top_n, min_materia_prima=min_materia_prima
+        )
+    
+    def iter_regional_dynamics(self, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_regional_dynamics (ver iter_analysis)."""
+        return self.iter_analysis('regional_dynamics', batch_size)
+    
+    def iter_longitudinal_evolution(self, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_longitudinal_evolution (ver iter_analysis)."""
+        return self.iter_analysis('longitudinal_evolution', batch_size)
+    
+    def iter_agent_share(self, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_agent_share (ver iter_analysis)."""
+        return self.iter_analysis('agent_share', batch_size)
+    
+    def iter_plant_capacity_analysis(self, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Variante por eventos (serializada por lotes) de get_plant_capacity_analysis (ver iter_analysis)."""
+        return self.iter_analysis('plant_capacity_analysis', batch_size)
+    
     def get_supply_vs_demand(
         self, 
         start_year: int = 2010,
         end_year: Optional[int] = None,
-        region: Optional[str] = None
-    ) -> Dict[str, Any]:
+        region: Optional[str] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Comparación Oferta vs Demanda: Capturas vs Materia Prima Industrial.
         
@@ -127,6 +830,7 @@ class FisheryAnalytics:
             start_year: Año inicial de análisis (default: 2010)
             end_year: Año final (default: último año disponible)
             region: Filtro opcional por región
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -136,9 +840,140 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run(
+            'supply_vs_demand', start_year=start_year, end_year=end_year, region=region, output_format=output_format
+        )
+    
+    def _build_supply_vs_demand(
+        self, 
+        start_year: int = 2010,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Construye el resultado de supply_vs_demand con la tabla 'data' como DataFrame."""
+        if end_year is None:
+            end_year = self.df_desembarque['Año'].max()
+        
+        region_labels = self.region_labels(region) if region else None
+        
+        if self.engine == 'numpy' and self._supply_cube().can_combine(region_labels):
+            # Corte de las matrices Año×Especie(×Región) precomputadas
+            comparison = self._supply_cube().comparison(start_year, end_year, region_labels)
+        else:
+            comparison = self._supply_comparison_pandas(start_year, end_year, region_labels)
+        
+        comparison = self._supply_rows(comparison)
+        
+        return {
+            'success': True,
+            'analysis_type': 'supply_vs_demand',
+            'metadata': self._supply_metadata(start_year, end_year, region),
+            'data': comparison,
+            'summary': self._supply_summary(comparison)
+        }
+    
+    def _stream_supply_vs_demand(
+        self,
+        start_year: int = 2010,
+        end_year: Optional[int] = None,
+        region: Optional[str] = None
+    ) -> Iterator[Any]:
+        """
+        Variante por años de _build_supply_vs_demand para iter_analysis.
+        
+        Entrega primero el encabezado del resultado (sin 'data' ni 'summary'),
+        luego un DataFrame por año, con las mismas filas y el mismo orden que
+        _build_supply_vs_demand, y al final {'summary': ...}. Con engine='numpy'
+        cada año es un corte del cubo que se calcula recién al pedirlo; el
+        resumen se calcula al final sobre los DataFrames de los años entregados
+        (columnas numéricas, sin registros), igual que en el resultado completo.
+        """
         if end_year is None:
             end_year = self.df_desembarque['Año'].max()
         
+        region_labels = self.region_labels(region) if region else None
+        
+        yield {
+            'success': True,
+            'analysis_type': 'supply_vs_demand',
+            'metadata': self._supply_metadata(start_year, end_year, region)
+        }
+        
+        if self.engine == 'numpy' and self._supply_cube().can_combine(region_labels):
+            cube = self._supply_cube()
+            years = cube.years[(cube.years >= start_year) & (cube.years <= end_year)]
+            chunks = (cube.comparison(year, year, region_labels) for year in years)
+        else:
+            comparison = self._supply_comparison_pandas(start_year, end_year, region_labels)
+            chunks = (chunk for _, chunk in comparison.groupby('Año', sort=True))
+        
+        delivered = []
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk = self._supply_rows(chunk)
+            delivered.append(chunk)
+            yield chunk
+        
+        yield {'summary': self._supply_summary(pd.concat(delivered) if delivered else self._supply_rows(
+            pd.DataFrame({col: [] for col in ('Año', 'Especie', 'Capturas', 'Materia Prima')})
+        ))}
+    
+    def _supply_rows(self, comparison: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agrega Delta y Porcentaje_Utilizado, ordena por año y capturas y redondea.
+        
+        Opera sobre arreglos y arma un solo DataFrame (se llama una vez por año
+        desde _stream_supply_vs_demand); np.lexsort es estable, igual que
+        sort_values con varias columnas.
+        """
+        years = comparison['Año'].to_numpy()
+        capturas = comparison['Capturas'].to_numpy()
+        materia = comparison['Materia Prima'].to_numpy()
+        
+        # Calcular delta y porcentaje
+        with np.errstate(divide='ignore', invalid='ignore'):
+            porcentaje = np.where(capturas > 0, np.round(materia / capturas * 100, 2), 0)
+        delta = capturas - materia
+        
+        # Ordenar por año y capturas (descendente)
+        order = np.lexsort((-capturas, years))
+        
+        # Redondear valores
+        rounded = {'Capturas': np.round(capturas[order], 2), 'Materia Prima': np.round(materia[order], 2)}
+        return pd.DataFrame({
+            **{col: rounded[col] if col in rounded else comparison[col].to_numpy()[order] for col in comparison.columns},
+            'Delta': np.round(delta[order], 2),
+            'Porcentaje_Utilizado': porcentaje[order]
+        }, index=comparison.index[order])
+    
+    def _supply_summary(self, comparison: pd.DataFrame) -> Dict[str, Any]:
+        """Resumen de supply_vs_demand sobre las filas ya redondeadas."""
+        return {
+            'total_capturas': float(comparison['Capturas'].sum()),
+            'total_materia_prima': float(comparison['Materia Prima'].sum()),
+            'delta_total': float(comparison['Delta'].sum()),
+            'porcentaje_utilizado_promedio': float(comparison['Porcentaje_Utilizado'].mean()),
+            'especies_analizadas': int(comparison['Especie'].nunique()),
+            'años_analizados': int(comparison['Año'].nunique())
+        }
+    
+    def _supply_metadata(self, start_year: int, end_year: Any, region: Optional[str]) -> Dict[str, Any]:
+        """Metadata de supply_vs_demand."""
+        return {
+            'start_year': start_year,
+            'end_year': end_year,
+            'region': region,
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    def _supply_comparison_pandas(
+        self,
+        start_year: int,
+        end_year: int,
+        region_labels: Optional[Tuple[str, ...]]
+    ) -> pd.DataFrame:
+        """Capturas y materia prima por Año/Especie con groupby + merge (motor 'pandas')."""
         # Filtrar desembarques por año
         df_capturas = self.df_desembarque[
             (self.df_desembarque['Año'] >= start_year) & 
@@ -152,75 +987,39 @@ class FisheryAnalytics:
         ].copy()
         
         # Filtro regional si se especifica
-        if region:
-            region_upper = region.strip().upper()
+        if region_labels:
             if 'Región' in df_capturas.columns:
-                df_capturas = df_capturas[df_capturas['Región'] == region_upper]
+                df_capturas = df_capturas[df_capturas['Región'].isin(region_labels)]
             if 'Región' in df_prod.columns:
-                df_prod = df_prod[df_prod['Región'] == region_upper]
+                df_prod = df_prod[df_prod['Región'].isin(region_labels)]
+        
+        df_capturas = self._decoded(df_capturas)
+        df_prod = self._decoded(df_prod)
         
         # Agrupar capturas por Año y Especie
-        capturas_agg = df_capturas.groupby(['Año', 'Especie'], as_index=False).agg({
+        capturas_agg = df_capturas.groupby(['Año', 'Especie'], as_index=False, observed=True).agg({
             'Toneladas': 'sum'
         }).rename(columns={'Toneladas': 'Capturas'})
         
         # Agrupar producción por Año y Especie
-        produccion_agg = df_prod.groupby(['Año', 'Especie'], as_index=False).agg({
+        produccion_agg = df_prod.groupby(['Año', 'Especie'], as_index=False, observed=True).agg({
             'Materia Prima': 'sum'
         })
         
         # Merge para comparar
-        comparison = pd.merge(
+        return pd.merge(
             capturas_agg,
             produccion_agg,
             on=['Año', 'Especie'],
             how='outer'
         ).fillna(0)
-        
-        # Calcular delta y porcentaje
-        comparison['Delta'] = comparison['Capturas'] - comparison['Materia Prima']
-        comparison['Porcentaje_Utilizado'] = np.where(
-            comparison['Capturas'] > 0,
-            (comparison['Materia Prima'] / comparison['Capturas'] * 100).round(2),
-            0
-        )
-        
-        # Ordenar por año y capturas
-        comparison = comparison.sort_values(['Año', 'Capturas'], ascending=[True, False])
-        
-        # Redondear valores
-        comparison['Capturas'] = comparison['Capturas'].round(2)
-        comparison['Materia Prima'] = comparison['Materia Prima'].round(2)
-        comparison['Delta'] = comparison['Delta'].round(2)
-        
-        # Calcular resumen
-        summary = {
-            'total_capturas': float(comparison['Capturas'].sum()),
-            'total_materia_prima': float(comparison['Materia Prima'].sum()),
-            'delta_total': float(comparison['Delta'].sum()),
-            'porcentaje_utilizado_promedio': float(comparison['Porcentaje_Utilizado'].mean()),
-            'especies_analizadas': int(comparison['Especie'].nunique()),
-            'años_analizados': int(comparison['Año'].nunique())
-        }
-        
-        return {
-            'success': True,
-            'analysis_type': 'supply_vs_demand',
-            'metadata': {
-                'start_year': start_year,
-                'end_year': end_year,
-                'region': region,
-                'generated_at': datetime.now().isoformat()
-            },
-            'data': self._to_serializable(comparison),
-            'summary': summary
-        }
     
     def get_conversion_efficiency(
         self,
         top_n: int = 20,
-        min_materia_prima: float = 100.0
-    ) -> Dict[str, Any]:
+        min_materia_prima: float = 100.0,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Eficiencia de Conversión: Rendimiento Industrial por Especie y Línea.
         
@@ -230,6 +1029,7 @@ class FisheryAnalytics:
         Args:
             top_n: Número de resultados a retornar (default: 20)
             min_materia_prima: Mínimo de materia prima para incluir (filtro de ruido)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -239,10 +1039,21 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run(
+            'conversion_efficiency', top_n=top_n, min_materia_prima=min_materia_prima, output_format=output_format
+        )
+    
+    def _build_conversion_efficiency(
+        self,
+        top_n: int = 20,
+        min_materia_prima: float = 100.0
+    ) -> Dict[str, Any]:
+        """Construye el resultado de conversion_efficiency con la tabla 'data' como DataFrame."""
         # Agrupar por Especie y Línea de elaboración
-        efficiency = self.df_produccion.groupby(
+        efficiency = self._decoded(self.df_produccion).groupby(
             ['Especie', 'Línea de elaboración'], 
-            as_index=False
+            as_index=False,
+            observed=True
         ).agg({
             'Materia Prima': 'sum',
             'Producción': 'sum'
@@ -287,17 +1098,234 @@ class FisheryAnalytics:
                 'min_materia_prima': min_materia_prima,
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(efficiency),
+            'data': efficiency,
             'summary': summary
         }
     
-    def get_regional_dynamics(self) -> Dict[str, Any]:
-        """
+    # Nombres de los nodos agregados del diagrama de flujo
+    FLOW_OTHER_SPECIES = 'OTRAS ESPECIES'
+    FLOW_UNPROCESSED = 'Sin procesar'
+    FLOW_WASTE = 'Merma'
+    
+    def get_species_flow(
+        self,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        top_n: Optional[int] = 10,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Flujo por Especie: Captura → Materia Prima por Línea → Producción (Sankey).
+        
+        Une los desembarques por especie con la materia prima y la producción
+        por especie y línea de elaboración. Los nodos son las especies, las
+        líneas de elaboración y sus productos; la captura que no llega a
+        ninguna línea fluye a 'Sin procesar' y la materia prima que no termina
+        en producto a 'Merma'.
+        
+        Args:
+            year: Año específico para filtrar (opcional)
+            region: Región específica para filtrar (opcional)
+            top_n: Especies con nodo propio, por el mayor entre captura y
+                materia prima; el resto se agrupa en 'OTRAS ESPECIES' (None = todas)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'success': True,
+                'data': [{'source': 0, 'target': 3, 'value': 1234.5,
+                          'especie': 'SALMON', 'tipo': 'materia_prima'}],
+                'summary': {'nodos': [{'id': 0, 'name': 'SALMON', 'nivel': 0,
+                                       'tipo': 'especie', 'toneladas': 2345.6}], ...}
+            }
+            'source'/'target' son posiciones en summary['nodos'] (formato de
+            d3-sankey y ECharts); 'tipo' es materia_prima, sin_procesar,
+            produccion o merma.
+        """
+        return self._run('species_flow', year=year, region=region, top_n=top_n, output_format=output_format)
+    
+    def _build_species_flow(
+        self,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        top_n: Optional[int] = 10
+    ) -> Dict[str, Any]:
+        """Construye el resultado de species_flow con la tabla 'data' como DataFrame."""
+        if top_n is not None and top_n < 1:
+            raise ValueError("top_n debe ser un entero positivo o None")
+        
+        region_labels = self.region_labels(region) if region is not None else None
+        if self.engine == 'numpy':
+            capture, processing = self._species_flow_from_coded(year, region_labels)
+        else:
+            capture, processing = self._species_flow_pandas(year, region_labels)
+        
+        if capture.empty and processing.empty:
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        # Dominio entero común de especies para unir ambos agregados
+        species_codes, species = pd.factorize(
+            pd.concat([capture['Especie'], processing['Especie']], ignore_index=True).astype(object), sort=True
+        )
+        capture_codes, processing_codes = species_codes[:len(capture)], species_codes[len(capture):]
+        line_codes, lines = pd.factorize(processing['Línea de elaboración'].astype(object), sort=True)
+        
+        captured = np.bincount(
+            capture_codes, weights=capture['Toneladas'].to_numpy(dtype=np.float64), minlength=len(species)
+        )
+        raw = np.zeros((len(species), len(lines)))
+        output = np.zeros((len(species), len(lines)))
+        raw[processing_codes, line_codes] = processing['Materia Prima'].to_numpy(dtype=np.float64)
+        output[processing_codes, line_codes] = processing['Producción'].to_numpy(dtype=np.float64)
+        
+        # Especies por volumen (empates en orden alfabético); el resto en una sola fila
+        order = np.argsort(-np.maximum(captured, raw.sum(axis=1)), kind='stable')
+        names = list(species[order])
+        if top_n is not None and len(order) > top_n:
+            rest = order[top_n:]
+            order = order[:top_n]
+            names = names[:top_n] + [self.FLOW_OTHER_SPECIES]
+            captured = np.append(captured[order], captured[rest].sum())
+            raw = np.vstack([raw[order], raw[rest].sum(axis=0)])
+            output = np.vstack([output[order], output[rest].sum(axis=0)])
+        else:
+            captured, raw, output = captured[order], raw[order], output[order]
+        
+        # Líneas por materia prima recibida, sin las que no tienen flujo
+        line_order = np.argsort(-raw.sum(axis=0), kind='stable')
+        line_order = line_order[(raw.sum(axis=0) + output.sum(axis=0))[line_order] > 0]
+        lines = lines[line_order]
+        raw, output = raw[:, line_order], output[:, line_order]
+        unprocessed = np.clip(captured - raw.sum(axis=1), 0, None)
+        waste = np.clip(raw - output, 0, None)
+        
+        # Nodos: especies (nivel 0), líneas y sin procesar (nivel 1), productos y merma (nivel 2)
+        nodes = [(name, 0, 'especie', value) for name, value in zip(names, captured)]
+        line_base = len(nodes)
+        nodes += [(line, 1, 'linea', value) for line, value in zip(lines, raw.sum(axis=0))]
+        unprocessed_id = len(nodes)
+        if unprocessed.sum() > 0:
+            nodes.append((self.FLOW_UNPROCESSED, 1, 'sin_procesar', unprocessed.sum()))
+        product_base = len(nodes)
+        nodes += [(f'{line} (producto)', 2, 'producto', value) for line, value in zip(lines, output.sum(axis=0))]
+        waste_id = len(nodes)
+        if waste.sum() > 0:
+            nodes.append((self.FLOW_WASTE, 2, 'merma', waste.sum()))
+        
+        # Enlaces por especie (np.nonzero recorre especie y luego línea)
+        links = []
+        species_idx, line_idx = np.nonzero(raw > 0)
+        links.append((species_idx, line_base + line_idx, raw[species_idx, line_idx], species_idx, 'materia_prima'))
+        species_idx = np.flatnonzero(unprocessed > 0)
+        links.append((species_idx, np.full(len(species_idx), unprocessed_id), unprocessed[species_idx], species_idx,
+                      'sin_procesar'))
+        species_idx, line_idx = np.nonzero(output > 0)
+        links.append((line_base + line_idx, product_base + line_idx, output[species_idx, line_idx], species_idx,
+                      'produccion'))
+        species_idx, line_idx = np.nonzero(waste > 0)
+        links.append((line_base + line_idx, np.full(len(line_idx), waste_id), waste[species_idx, line_idx],
+                      species_idx, 'merma'))
+        
+        names = np.asarray(names, dtype=object)
+        flows = pd.DataFrame({
+            'source': np.concatenate([link[0] for link in links]).astype(int),
+            'target': np.concatenate([link[1] for link in links]).astype(int),
+            'value': np.round(np.concatenate([link[2] for link in links]), 2),
+            'especie': names[np.concatenate([link[3] for link in links]).astype(int)],
+            'tipo': np.concatenate([np.full(len(link[0]), link[4], dtype=object) for link in links]),
+        })
+        
+        total_raw = float(raw.sum())
+        summary = {
+            'nodos': [
+                {'id': i, 'name': name, 'nivel': level, 'tipo': kind, 'toneladas': round(float(value), 2)}
+                for i, (name, level, kind, value) in enumerate(nodes)
+            ],
+            'especies': len(names),
+            'lineas': len(lines),
+            'total_captura': round(float(captured.sum()), 2),
+            'total_materia_prima': round(total_raw, 2),
+            'total_produccion': round(float(output.sum()), 2),
+            'total_sin_procesar': round(float(unprocessed.sum()), 2),
+            'total_merma': round(float(waste.sum()), 2),
+            'rendimiento_global': round(float(output.sum()) / total_raw * 100, 2) if total_raw > 0 else None
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'species_flow',
+            'metadata': {
+                'year': year,
+                'region': region,
+                'top_n': top_n,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': flows,
+            'summary': summary
+        }
+    
+    def _species_flow_pandas(
+        self,
+        year: Optional[int],
+        region_labels: Optional[Tuple[str, ...]]
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Captura por Especie y materia prima/producción por Especie y Línea con groupby (motor pandas)."""
+        frames = []
+        for df in (self.df_desembarque, self.df_produccion):
+            df = self._decoded(df)
+            if year is not None:
+                df = df[df['Año'] == year]
+            if region_labels is not None and 'Región' in df.columns:
+                df = df[df['Región'].isin(region_labels)]
+            frames.append(df)
+        
+        capture = frames[0].groupby('Especie', as_index=False, observed=True).agg({'Toneladas': 'sum'})
+        processing = frames[1].groupby(['Especie', 'Línea de elaboración'], as_index=False, observed=True).agg({
+            'Materia Prima': 'sum',
+            'Producción': 'sum'
+        })
+        return capture, processing
+    
+    def _species_flow_from_coded(
+        self,
+        year: Optional[int],
+        region_labels: Optional[Tuple[str, ...]]
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Mismos agregados que _species_flow_pandas, reduciendo las tablas codificadas."""
+        landings, production = self._coded('desembarque'), self._coded('produccion')
+        masks = [
+            table.mask({'Año': year, 'Región': region_labels if 'Región' in table.codes else None})
+            for table in (landings, production)
+        ]
+        capture = landings.aggregate(['Especie'], values=['Toneladas'], mask=masks[0])
+        processing = production.aggregate(
+            ['Especie', 'Línea de elaboración'], values=['Materia Prima', 'Producción'], mask=masks[1]
+        )
+        return capture, processing
+    
+    def get_regional_dynamics(
+        self,
+        level: Optional[str] = None,
+        within: Optional[str] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
         Dinámica Regional: Comparación Extractiva vs Productiva por Región.
         
         Compara el volumen de capturas (actividad extractiva) con el volumen
         de producción industrial (actividad productiva) para cada región.
         
+        Args:
+            level: Nivel territorial: 'nacion', 'macrozona' o 'region' (None = 'region')
+            within: Macrozona (o región) a la que se restringe el resultado (opcional)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+        
         Returns:
             Dict con estructura:
             {
@@ -305,7 +1333,12 @@ class FisheryAnalytics:
                 'data': [{'Region', 'Capturas_Totales', 'Produccion_Total', 'Ratio_Prod_Captura'}],
                 'summary': {...}
             }
+            Con otro nivel, 'Region' se reemplaza por 'Nacion' o 'Macrozona'.
         """
+        return self._run('regional_dynamics', level=level, within=within, output_format=output_format)
+    
+    def _build_regional_dynamics(self, level: Optional[str] = None, within: Optional[str] = None) -> Dict[str, Any]:
+        """Construye el resultado de regional_dynamics con la tabla 'data' como DataFrame."""
         # Agrupar capturas por región
         if 'Región' not in self.df_desembarque.columns:
             return {
@@ -313,10 +1346,6 @@ class FisheryAnalytics:
                 'error': 'Columna Región no disponible en df_desembarque'
             }
         
-        capturas_regional = self.df_desembarque.groupby('Región', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).rename(columns={'Toneladas': 'Capturas_Totales'})
-        
         # Agrupar producción por región
         if 'Región' not in self.df_produccion.columns:
             return {
@@ -324,15 +1353,26 @@ class FisheryAnalytics:
                 'error': 'Columna Región no disponible en df_produccion'
             }
         
-        produccion_regional = self.df_produccion.groupby('Región', as_index=False).agg({
-            'Producción': 'sum'
-        }).rename(columns={'Producción': 'Produccion_Total'})
+        tables, labels = self._level_tables(level, within)
+        if 'capturas_total' not in tables or 'produccion_total' not in tables:
+            return {
+                'success': False,
+                'error': f'Nivel "{level}" no disponible para capturas y producción'
+            }
+        
+        capturas_regional = tables['capturas_total'][labels + ['Toneladas']].rename(
+            columns={'Toneladas': 'Capturas_Totales'}
+        )
+        
+        produccion_regional = tables['produccion_total'][labels + ['Producción']].rename(
+            columns={'Producción': 'Produccion_Total'}
+        )
         
-        # Merge por región
+        # Merge por unidad territorial
         dynamics = pd.merge(
             capturas_regional,
             produccion_regional,
-            on='Región',
+            on=labels,
             how='outer'
         ).fillna(0)
         
@@ -350,35 +1390,34 @@ class FisheryAnalytics:
         dynamics['Capturas_Totales'] = dynamics['Capturas_Totales'].round(2)
         dynamics['Produccion_Total'] = dynamics['Produccion_Total'].round(2)
         
-        # Renombrar región
-        dynamics = dynamics.rename(columns={'Región': 'Region'})
-        
         # Calcular resumen
+        label = labels[-1]
         summary = {
             'total_capturas_nacional': float(dynamics['Capturas_Totales'].sum()),
             'total_produccion_nacional': float(dynamics['Produccion_Total'].sum()),
             'regiones_analizadas': len(dynamics),
-            'region_mayor_captura': dynamics.iloc[0]['Region'] if len(dynamics) > 0 else None,
-            'region_mayor_produccion': dynamics.sort_values('Produccion_Total', ascending=False).iloc[0]['Region'] if len(dynamics) > 0 else None
+            'region_mayor_captura': dynamics.iloc[0][label] if len(dynamics) > 0 else None,
+            'region_mayor_produccion': dynamics.sort_values('Produccion_Total', ascending=False).iloc[0][label] if len(dynamics) > 0 else None
         }
         
         return {
             'success': True,
             'analysis_type': 'regional_dynamics',
-            'metadata': {
-                'generated_at': datetime.now().isoformat()
-            },
-            'data': self._to_serializable(dynamics),
+            'metadata': self._level_metadata(level, within),
+            'data': dynamics,
             'summary': summary
         }
     
-    def get_longitudinal_evolution(self) -> Dict[str, Any]:
+    def get_longitudinal_evolution(self, output_format: str = 'dict') -> Union[Dict[str, Any], bytes]:
         """
         Evolución Temporal: Capturas y Plantas a lo largo del tiempo.
         
         Analiza la evolución de capturas totales (2000-2024) y el número
         de plantas únicas (2010-2024) año por año.
         
+        Args:
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
         Returns:
             Dict con estructura:
             {
@@ -387,15 +1426,25 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
-        # Serie temporal de capturas (desde 2000)
-        capturas_temporal = self.df_desembarque.groupby('Año', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).rename(columns={'Toneladas': 'Capturas_Totales'})
-        
-        # Serie temporal de plantas únicas (desde 2010)
-        plantas_temporal = self.df_plantas.groupby('Año', as_index=False).agg({
-            'Nombre Planta': 'nunique'
-        }).rename(columns={'Nombre Planta': 'Num_Plantas'})
+        return self._run('longitudinal_evolution', output_format=output_format)
+    
+    def _build_longitudinal_evolution(self) -> Dict[str, Any]:
+        """Construye el resultado de longitudinal_evolution con la tabla 'data' como DataFrame."""
+        if self.engine == 'numpy':
+            # Capturas y plantas distintas por año con el kernel de códigos enteros
+            capturas_temporal = self._coded('desembarque').aggregate(['Año'], values=['Toneladas'])
+            plantas_temporal = self._coded('plantas').aggregate(['Año'], nunique='Nombre Planta')
+        else:
+            capturas_temporal = self._decoded(self.df_desembarque).groupby('Año', as_index=False, observed=True).agg({
+                'Toneladas': 'sum'
+            })
+            plantas_temporal = self.df_plantas.groupby('Año', as_index=False, observed=True).agg({
+                'Nombre Planta': 'nunique'
+            })
+        
+        # Series temporales de capturas (desde 2000) y de plantas únicas (desde 2010)
+        capturas_temporal = capturas_temporal.rename(columns={'Toneladas': 'Capturas_Totales'})
+        plantas_temporal = plantas_temporal.rename(columns={'Nombre Planta': 'Num_Plantas'})
         
         # Merge temporal (outer para incluir todos los años)
         evolution = pd.merge(
@@ -443,17 +1492,28 @@ class FisheryAnalytics:
             'metadata': {
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(evolution),
+            'data': evolution,
             'summary': summary
         }
     
-    def get_agent_share(self) -> Dict[str, Any]:
+    def get_agent_share(
+        self,
+        level: Optional[str] = None,
+        within: Optional[str] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Comparación por Tipo de Agente: Participación por Región.
         
         Crea una tabla pivote mostrando las toneladas capturadas por
         cada tipo de agente en cada región.
         
+        Args:
+            level: Nivel territorial: 'nacion', 'macrozona', 'region' (None = 'region') o 'puerto'
+            within: Macrozona o región a la que se restringe el resultado (opcional;
+                p. ej. level='puerto', within='Los Lagos')
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+        
         Returns:
             Dict con estructura:
             {
@@ -461,7 +1521,13 @@ class FisheryAnalytics:
                 'data': [{'Region', 'Artesanal', 'Industrial', ...}],
                 'summary': {...}
             }
+            Con otro nivel, 'Region' se reemplaza por 'Nacion', 'Macrozona' o
+            'Region' + 'Puerto'.
         """
+        return self._run('agent_share', level=level, within=within, output_format=output_format)
+    
+    def _build_agent_share(self, level: Optional[str] = None, within: Optional[str] = None) -> Dict[str, Any]:
+        """Construye el resultado de agent_share con la tabla 'data' como DataFrame."""
         if 'Tipo de agente' not in self.df_desembarque.columns:
             return {
                 'success': False,
@@ -474,20 +1540,26 @@ class FisheryAnalytics:
                 'error': 'Columna "Región" no disponible en df_desembarque'
             }
         
+        tables, labels = self._level_tables(level, within)
+        if 'capturas' not in tables:
+            return {
+                'success': False,
+                'error': f'Nivel "{level}" no disponible en df_desembarque'
+            }
+        
         # Crear tabla pivote
-        pivot_agents = self.df_desembarque.pivot_table(
-            index='Región',
+        pivot_agents = tables['capturas'].pivot_table(
+            index=labels,
             columns='Tipo de agente',
             values='Toneladas',
             aggfunc='sum',
-            fill_value=0
+            fill_value=0,
+            observed=True
         ).reset_index()
+        pivot_agents.columns.name = None
         
-        # Renombrar columna de región
-        pivot_agents = pivot_agents.rename(columns={'Región': 'Region'})
-        
-        # Calcular total por región
-        agent_columns = [col for col in pivot_agents.columns if col != 'Region']
+        # Calcular total por unidad territorial
+        agent_columns = [col for col in pivot_agents.columns if col not in labels]
         pivot_agents['Total'] = pivot_agents[agent_columns].sum(axis=1)
         
         # Calcular porcentajes
@@ -519,10 +1591,8 @@ class FisheryAnalytics:
         return {
             'success': True,
             'analysis_type': 'agent_share',
-            'metadata': {
-                'generated_at': datetime.now().isoformat()
-            },
-            'data': self._to_serializable(pivot_agents),
+            'metadata': self._level_metadata(level, within),
+            'data': pivot_agents,
             'summary': summary
         }
     
@@ -533,8 +1603,10 @@ class FisheryAnalytics:
     def get_agent_distribution(
         self, 
         year: Optional[int] = None, 
-        region: Optional[str] = None
-    ) -> Dict[str, Any]:
+        region: Optional[str] = None,
+        exact: bool = True,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Distribución por Tipo de Agente: Industrial vs Artesanal.
         
@@ -544,6 +1616,9 @@ class FisheryAnalytics:
         Args:
             year: Año específico para filtrar (opcional)
             region: Región específica para filtrar (opcional)
+            exact: Si es False, estima sobre la muestra estratificada por
+                Año/Región y agrega intervalos de confianza (ver build_stratified_sample)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -553,26 +1628,28 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run('agent_distribution', year=year, region=region, exact=exact, output_format=output_format)
+    
+    def _build_agent_distribution(
+        self, 
+        year: Optional[int] = None, 
+        region: Optional[str] = None,
+        exact: bool = True
+    ) -> Dict[str, Any]:
+        """Construye el resultado de agent_distribution con la tabla 'data' como DataFrame."""
         if 'Tipo de agente' not in self.df_desembarque.columns:
             return {
                 'success': False,
                 'error': 'Columna "Tipo de agente" no disponible en df_desembarque'
             }
         
-        # Crear copia para filtrado
-        df = self.df_desembarque.copy()
-        
-        # Aplicar filtros opcionales
-        if year is not None:
-            df = df[df['Año'] == year]
+        if not exact:
+            return self._build_agent_distribution_approx(year, region)
         
-        if region is not None:
-            region_upper = region.strip().upper()
-            if 'Región' in df.columns:
-                df = df[df['Región'] == region_upper]
+        grouped = self._landings_by(['Tipo de agente'], year, region)
         
         # Validar que haya datos después del filtrado
-        if df.empty:
+        if grouped is None:
             return {
                 'success': False,
                 'error': 'No hay datos disponibles para los filtros especificados',
@@ -580,21 +1657,16 @@ class FisheryAnalytics:
                 'summary': {}
             }
         
-        # Agrupar por Tipo de agente y sumar toneladas
-        distribution = df.groupby('Tipo de agente', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).rename(columns={'Tipo de agente': 'tipo_agente', 'Toneladas': 'toneladas'})
-        
-        # Manejar valores nulos
-        distribution = distribution.dropna(subset=['tipo_agente'])
-        distribution['toneladas'] = distribution['toneladas'].fillna(0)
+        # Toneladas por Tipo de agente
+        distribution = grouped[0].rename(columns={'Tipo de agente': 'tipo_agente', 'Toneladas': 'toneladas'})
         
         # Calcular total
         total_toneladas = distribution['toneladas'].sum()
         
         # Calcular porcentajes
         distribution['porcentaje'] = (
-            (distribution['toneladas'] / total_toneladas * 100) if total_toneladas > 0 else 0
+            (distribution['toneladas'] / total_toneladas * 100) if total_toneladas > 0
+            else pd.Series(0.0, index=distribution.index)
         ).round(2)
         
         # Redondear toneladas
@@ -619,7 +1691,7 @@ class FisheryAnalytics:
                 'region': region,
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(distribution),
+            'data': distribution,
             'summary': summary
         }
     
@@ -627,8 +1699,10 @@ class FisheryAnalytics:
         self, 
         year: Optional[int] = None, 
         region: Optional[str] = None,
-        top_n: int = 10
-    ) -> Dict[str, Any]:
+        top_n: int = 10,
+        exact: bool = True,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Ranking de Puertos por Volumen de Capturas.
         
@@ -639,6 +1713,9 @@ class FisheryAnalytics:
             year: Año específico para filtrar (opcional)
             region: Región específica para filtrar (opcional)
             top_n: Número de puertos a retornar (default: 10)
+            exact: Si es False, estima sobre la muestra estratificada por
+                Año/Región y agrega intervalos de confianza (ver build_stratified_sample)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -648,26 +1725,29 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run('top_ports', year=year, region=region, top_n=top_n, exact=exact, output_format=output_format)
+    
+    def _build_top_ports(
+        self, 
+        year: Optional[int] = None, 
+        region: Optional[str] = None,
+        top_n: int = 10,
+        exact: bool = True
+    ) -> Dict[str, Any]:
+        """Construye el resultado de top_ports con la tabla 'data' como DataFrame."""
         if 'Puerto' not in self.df_desembarque.columns:
             return {
                 'success': False,
                 'error': 'Columna "Puerto" no disponible en df_desembarque'
             }
         
-        # Crear copia para filtrado
-        df = self.df_desembarque.copy()
-        
-        # Aplicar filtros opcionales
-        if year is not None:
-            df = df[df['Año'] == year]
+        if not exact:
+            return self._build_top_ports_approx(year, region, top_n)
         
-        if region is not None:
-            region_upper = region.strip().upper()
-            if 'Región' in df.columns:
-                df = df[df['Región'] == region_upper]
+        grouped = self._landings_by(['Puerto'], year, region)
         
         # Validar que haya datos después del filtrado
-        if df.empty:
+        if grouped is None:
             return {
                 'success': False,
                 'error': 'No hay datos disponibles para los filtros especificados',
@@ -675,14 +1755,9 @@ class FisheryAnalytics:
                 'summary': {}
             }
         
-        # Agrupar por Puerto y sumar toneladas
-        ports = df.groupby('Puerto', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).rename(columns={'Puerto': 'puerto', 'Toneladas': 'toneladas'})
-        
-        # Manejar valores nulos
-        ports = ports.dropna(subset=['puerto'])
-        ports['toneladas'] = ports['toneladas'].fillna(0)
+        # Toneladas por Puerto
+        ports, total_general = grouped
+        ports = ports.rename(columns={'Puerto': 'puerto', 'Toneladas': 'toneladas'})
         
         # Ordenar por toneladas descendente
         ports = ports.sort_values('toneladas', ascending=False)
@@ -697,14 +1772,14 @@ class FisheryAnalytics:
         ports['toneladas'] = ports['toneladas'].round(2)
         
         # Calcular resumen
+        num_puertos_total = len(grouped[0])
         total_top_n = ports['toneladas'].sum()
-        total_general = df['Toneladas'].sum()
         
         summary = {
             'total_toneladas_top_n': float(total_top_n),
             'total_toneladas_general': float(total_general),
             'porcentaje_concentracion': float((total_top_n / total_general * 100).round(2)) if total_general > 0 else 0,
-            'num_puertos_total': int(df['Puerto'].nunique()),
+            'num_puertos_total': num_puertos_total,
             'puerto_lider': ports.iloc[0]['puerto'] if len(ports) > 0 else None
         }
         
@@ -717,7 +1792,158 @@ class FisheryAnalytics:
                 'top_n': top_n,
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(ports),
+            'data': ports,
+            'summary': summary
+        }
+    
+    def get_port_rank_trajectories(
+        self,
+        region: Optional[str] = None,
+        top_n: int = 10,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Trayectoria del ranking y la participación de cada puerto año a año.
+        
+        Propósito: Mostrar qué puertos suben, bajan, entran o salen del top N
+        a lo largo de los años sin llamar a get_top_ports una vez por año. La
+        matriz Año × Puerto de toneladas se construye una vez y todos los
+        años se rankean a la vez (argsort por fila).
+        
+        Args:
+            region: Región específica para filtrar (opcional)
+            top_n: Tamaño del top (define qué puertos se reportan y las entradas/salidas)
+            start_year: Primer año (opcional)
+            end_year: Último año (opcional)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'success': True,
+                'data': [{'puerto': 'PUERTO MONTT', 'rankings': [1, 1, 2, ...],
+                          'participaciones': [35.2, 36.0, ...], 'cambio_ranking': -1, ...}],
+                'summary': {'años': [2000, ..., 2024], ...}
+            }
+            Un ranking None indica que el puerto no tuvo desembarques ese año;
+            cambio_ranking > 0 significa que el puerto subió.
+        """
+        return self._run(
+            'port_rank_trajectories', region=region, top_n=top_n, start_year=start_year, end_year=end_year,
+            output_format=output_format
+        )
+    
+    def _build_port_rank_trajectories(
+        self,
+        region: Optional[str] = None,
+        top_n: int = 10,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Construye el resultado de port_rank_trajectories con la tabla 'data' como DataFrame."""
+        if 'Puerto' not in self.df_desembarque.columns:
+            return {
+                'success': False,
+                'error': 'Columna "Puerto" no disponible en df_desembarque'
+            }
+        if top_n < 1:
+            raise ValueError("top_n debe ser un entero positivo")
+        
+        grouped = self._landings_by(['Año', 'Puerto'], region=region)
+        totals = grouped[0] if grouped is not None else pd.DataFrame(columns=['Año', 'Puerto', 'Toneladas'])
+        if start_year is not None:
+            totals = totals[totals['Año'] >= start_year]
+        if end_year is not None:
+            totals = totals[totals['Año'] <= end_year]
+        
+        if totals.empty:
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        # Matriz Año × Puerto (años continuos; puertos en orden alfabético)
+        years = np.arange(int(totals['Año'].min()), int(totals['Año'].max()) + 1)
+        port_codes, ports = pd.factorize(totals['Puerto'], sort=True)
+        tonnage = np.zeros((len(years), len(ports)))
+        tonnage[totals['Año'].to_numpy(dtype=np.int64) - years[0], port_codes] = totals['Toneladas'].to_numpy(dtype=np.float64)
+        
+        # Ranking de todos los años a la vez; empates por nombre de puerto, sin ranking sin desembarques
+        order = np.argsort(-tonnage, axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(ports) + 1)[None, :].repeat(len(years), axis=0), axis=1)
+        active = tonnage > 0
+        ranks = np.where(active, ranks, 0)
+        year_totals = tonnage.sum(axis=1, keepdims=True)
+        shares = np.divide(tonnage * 100, year_totals, out=np.zeros_like(tonnage), where=year_totals > 0)
+        
+        # Puertos que estuvieron en el top N algún año
+        in_top = active & (ranks <= top_n)
+        selected = np.flatnonzero(in_top.any(axis=0))
+        entries = (in_top[1:] & ~in_top[:-1]).sum(axis=0)
+        exits = (in_top[:-1] & ~in_top[1:]).sum(axis=0)
+        first_rank, last_rank = ranks[0].astype(float), ranks[-1].astype(float)
+        first_rank[first_rank == 0] = np.nan
+        last_rank[last_rank == 0] = np.nan
+        change = first_rank - last_rank
+        best = np.where(active, ranks, np.iinfo(ranks.dtype).max).min(axis=0)
+        worst = ranks.max(axis=0)
+        
+        def optional_ints(values: np.ndarray) -> pd.Series:
+            # object para que los rankings sigan siendo enteros junto a None
+            return pd.Series([int(v) if not np.isnan(v) and v > 0 else None for v in values], dtype=object)
+        
+        trajectories = pd.DataFrame({
+            'puerto': ports[selected],
+            'rankings': [optional_ints(ranks[:, j].astype(float)).tolist() for j in selected],
+            'participaciones': [np.round(shares[:, j], 2).tolist() for j in selected],
+            'ranking_inicial': optional_ints(first_rank[selected]),
+            'ranking_final': optional_ints(last_rank[selected]),
+            'cambio_ranking': pd.Series([int(c) if not np.isnan(c) else None for c in change[selected]], dtype=object),
+            'mejor_ranking': best[selected].astype(int),
+            'peor_ranking': worst[selected].astype(int),
+            'años_en_top': in_top[:, selected].sum(axis=0),
+            'entradas_top': entries[selected],
+            'salidas_top': exits[selected],
+        })
+        # Orden: ranking del último año (los puertos sin desembarques ese año al final)
+        trajectories = trajectories.sort_values(
+            ['ranking_final', 'mejor_ranking'], na_position='last', kind='stable'
+        ).reset_index(drop=True)
+        
+        comparable = trajectories.dropna(subset=['cambio_ranking'])
+        riser = comparable.loc[comparable['cambio_ranking'].idxmax()] if len(comparable) else None
+        faller = comparable.loc[comparable['cambio_ranking'].idxmin()] if len(comparable) else None
+        leaders = [ports[order[i, 0]] if active[i].any() else None for i in range(len(years))]
+        
+        summary = {
+            'años': years.tolist(),
+            'top_n': top_n,
+            'num_puertos_total': len(ports),
+            'puertos_en_trayectoria': len(trajectories),
+            'lider_por_año': leaders,
+            'mayor_ascenso': {'puerto': riser['puerto'], 'cambio_ranking': int(riser['cambio_ranking'])}
+            if riser is not None and riser['cambio_ranking'] > 0 else None,
+            'mayor_caida': {'puerto': faller['puerto'], 'cambio_ranking': int(faller['cambio_ranking'])}
+            if faller is not None and faller['cambio_ranking'] < 0 else None,
+            'entradas_top_por_año': [0] + (in_top[1:] & ~in_top[:-1]).sum(axis=1).tolist()
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'port_rank_trajectories',
+            'metadata': {
+                'region': region,
+                'top_n': top_n,
+                'start_year': start_year,
+                'end_year': end_year,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': trajectories,
             'summary': summary
         }
     
@@ -725,8 +1951,10 @@ class FisheryAnalytics:
         self,
         year: Optional[int] = None,
         region: Optional[str] = None,
-        top_n: int = 10
-    ) -> Dict[str, Any]:
+        top_n: int = 10,
+        exact: bool = True,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Desglose de Especies por Tipo de Agente (Stacked Bar Chart).
         
@@ -737,6 +1965,9 @@ class FisheryAnalytics:
             year: Año específico para filtrar (opcional)
             region: Región específica para filtrar (opcional)
             top_n: Número de especies top a analizar (default: 10)
+            exact: Si es False, estima sobre la muestra estratificada por
+                Año/Región y agrega intervalos de confianza (ver build_stratified_sample)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -746,6 +1977,18 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run(
+            'species_by_agent_breakdown', year=year, region=region, top_n=top_n, exact=exact, output_format=output_format
+        )
+    
+    def _build_species_by_agent_breakdown(
+        self,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        top_n: int = 10,
+        exact: bool = True
+    ) -> Dict[str, Any]:
+        """Construye el resultado de species_by_agent_breakdown con la tabla 'data' como DataFrame."""
         if 'Especie' not in self.df_desembarque.columns:
             return {
                 'success': False,
@@ -758,20 +2001,16 @@ class FisheryAnalytics:
                 'error': 'Columna "Tipo de agente" no disponible en df_desembarque'
             }
         
-        # Crear copia para filtrado
-        df = self.df_desembarque.copy()
-        
-        # Aplicar filtros opcionales
-        if year is not None:
-            df = df[df['Año'] == year]
+        if not exact:
+            return self._build_species_by_agent_breakdown_approx(year, region, top_n)
         
-        if region is not None:
-            region_upper = region.strip().upper()
-            if 'Región' in df.columns:
-                df = df[df['Región'] == region_upper]
+        if self.engine == 'numpy':
+            breakdown = self._species_by_agent_from_cube(year, region, top_n)
+        else:
+            breakdown = self._species_by_agent_pandas(year, region, top_n)
         
         # Validar que haya datos después del filtrado
-        if df.empty:
+        if breakdown is None:
             return {
                 'success': False,
                 'error': 'No hay datos disponibles para los filtros especificados',
@@ -779,25 +2018,6 @@ class FisheryAnalytics:
                 'summary': {}
             }
         
-        # Paso 1: Identificar top N especies por volumen total
-        top_species = df.groupby('Especie', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).sort_values('Toneladas', ascending=False).head(top_n)
-        
-        top_species_list = top_species['Especie'].tolist()
-        
-        # Paso 2: Filtrar dataframe solo para esas especies
-        df_filtered = df[df['Especie'].isin(top_species_list)]
-        
-        # Paso 3: Crear pivot por Especie y Tipo de agente
-        breakdown = df_filtered.pivot_table(
-            index='Especie',
-            columns='Tipo de agente',
-            values='Toneladas',
-            aggfunc='sum',
-            fill_value=0
-        ).reset_index()
-        
         # Renombrar columna de especie
         breakdown = breakdown.rename(columns={'Especie': 'especie'})
         
@@ -833,15 +2053,81 @@ class FisheryAnalytics:
                 'top_n': top_n,
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(breakdown),
+            'data': breakdown,
             'summary': summary
         }
     
+    def _species_by_agent_pandas(
+        self,
+        year: Optional[int],
+        region: Optional[str],
+        top_n: int
+    ) -> Optional[pd.DataFrame]:
+        """Pivot Especie × Tipo de agente de las top N especies con groupby (motor pandas)."""
+        # Crear copia para filtrado
+        df = self._decoded(self.df_desembarque, copy=True)
+        
+        # Aplicar filtros opcionales
+        if year is not None:
+            df = df[df['Año'] == year]
+        
+        if region is not None:
+            if 'Región' in df.columns:
+                df = df[df['Región'].isin(self.region_labels(region))]
+        
+        if df.empty:
+            return None
+        
+        # Paso 1: Identificar top N especies por volumen total
+        top_species = df.groupby('Especie', as_index=False, observed=True).agg({
+            'Toneladas': 'sum'
+        }).sort_values('Toneladas', ascending=False).head(top_n)
+        
+        top_species_list = top_species['Especie'].tolist()
+        
+        # Paso 2: Filtrar dataframe solo para esas especies
+        df_filtered = df[df['Especie'].isin(top_species_list)]
+        
+        # Paso 3: Crear pivot por Especie y Tipo de agente
+        return df_filtered.pivot_table(
+            index='Especie',
+            columns='Tipo de agente',
+            values='Toneladas',
+            aggfunc='sum',
+            fill_value=0,
+            observed=True
+        ).reset_index()
+    
+    def _species_by_agent_from_cube(
+        self,
+        year: Optional[int],
+        region: Optional[str],
+        top_n: int
+    ) -> Optional[pd.DataFrame]:
+        """Mismo pivot que _species_by_agent_pandas, reduciendo el tensor disperso de desembarques."""
+        cube = self._coded('desembarque')
+        mask = cube.mask({
+            'Año': year,
+            'Región': self.region_labels(region) if region is not None and 'Región' in cube.codes else None
+        })
+        if not mask.any():
+            return None
+        
+        top_species = cube.aggregate(['Especie'], values=['Toneladas'], mask=mask).sort_values(
+            'Toneladas', ascending=False
+        ).head(top_n)
+        mask &= cube.mask({'Especie': lambda species: np.isin(species, top_species['Especie'].to_numpy())})
+        
+        pairs = cube.aggregate(['Especie', 'Tipo de agente'], values=['Toneladas'], mask=mask)
+        breakdown = pairs.pivot(index='Especie', columns='Tipo de agente', values='Toneladas').fillna(0)
+        return breakdown.reset_index()
+    
     def get_seasonal_context(
         self,
         current_year: int = 2023,
-        region: Optional[str] = None
-    ) -> Dict[str, Any]:
+        region: Optional[str] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Contexto Estacional: Año Actual vs Promedio Histórico.
         
@@ -851,6 +2137,7 @@ class FisheryAnalytics:
         Args:
             current_year: Año actual a comparar (default: 2023)
             region: Región específica para filtrar (opcional)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
             
         Returns:
             Dict con estructura:
@@ -863,23 +2150,27 @@ class FisheryAnalytics:
                 'summary': {...}
             }
         """
+        return self._run('seasonal_context', current_year=current_year, region=region, output_format=output_format)
+    
+    def _build_seasonal_context(
+        self,
+        current_year: int = 2023,
+        region: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Construye el resultado de seasonal_context con la tabla 'data' como DataFrame."""
         if 'Mes' not in self.df_desembarque.columns:
             return {
                 'success': False,
                 'error': 'Columna "Mes" no disponible en df_desembarque'
             }
         
-        # Crear copia para filtrado
-        df = self.df_desembarque.copy()
-        
-        # Aplicar filtro regional si se especifica
-        if region is not None:
-            region_upper = region.strip().upper()
-            if 'Región' in df.columns:
-                df = df[df['Región'] == region_upper]
+        if self.engine == 'numpy':
+            monthly = self._seasonal_from_cube(current_year, region)
+        else:
+            monthly = self._seasonal_pandas(current_year, region)
         
         # Validar que haya datos
-        if df.empty:
+        if monthly is None:
             return {
                 'success': False,
                 'error': 'No hay datos disponibles para los filtros especificados',
@@ -887,15 +2178,7 @@ class FisheryAnalytics:
                 'summary': {}
             }
         
-        # Paso 1: Calcular suma mensual para el año actual
-        df_actual = df[df['Año'] == current_year].groupby('Mes', as_index=False).agg({
-            'Toneladas': 'sum'
-        }).rename(columns={'Toneladas': 'actual'})
-        
-        # Paso 2: Calcular promedio mensual histórico (años anteriores)
-        df_historico = df[df['Año'] < current_year].groupby('Mes', as_index=False).agg({
-            'Toneladas': 'mean'
-        }).rename(columns={'Toneladas': 'historico'})
+        df_actual, df_historico, historic_years = monthly
         
         # Paso 3: Merge por mes
         seasonal = pd.merge(
@@ -946,7 +2229,7 @@ class FisheryAnalytics:
         
         summary = {
             'año_actual': current_year,
-            'años_historicos_incluidos': int(df[df['Año'] < current_year]['Año'].nunique()),
+            'años_historicos_incluidos': historic_years,
             'total_actual': float(total_actual),
             'total_historico': float(total_historico),
             'diferencia_total': float((total_actual - total_historico).round(2)),
@@ -963,7 +2246,1049 @@ class FisheryAnalytics:
                 'region': region,
                 'generated_at': datetime.now().isoformat()
             },
-            'data': self._to_serializable(seasonal),
+            'data': seasonal,
+            'summary': summary
+        }
+    
+    def _seasonal_pandas(self, current_year: int, region: Optional[str]):
+        """
+        Toneladas por mes del año actual, promedio por mes de los años
+        anteriores y número de años anteriores, con groupby (motor pandas).
+        
+        Returns:
+            Tupla (df_actual, df_historico, años históricos) o None si no hay datos
+        """
+        # Crear copia para filtrado
+        df = self._decoded(self.df_desembarque, copy=True)
+        
+        # Aplicar filtro regional si se especifica
+        if region is not None:
+            if 'Región' in df.columns:
+                df = df[df['Región'].isin(self.region_labels(region))]
+        
+        if df.empty:
+            return None
+        
+        # Paso 1: Calcular suma mensual para el año actual
+        df_actual = df[df['Año'] == current_year].groupby('Mes', as_index=False, observed=True).agg({
+            'Toneladas': 'sum'
+        }).rename(columns={'Toneladas': 'actual'})
+        
+        # Paso 2: Calcular promedio mensual histórico (años anteriores)
+        df_historico = df[df['Año'] < current_year].groupby('Mes', as_index=False, observed=True).agg({
+            'Toneladas': 'mean'
+        }).rename(columns={'Toneladas': 'historico'})
+        
+        return df_actual, df_historico, int(df[df['Año'] < current_year]['Año'].nunique())
+    
+    def _seasonal_from_cube(self, current_year: int, region: Optional[str]):
+        """
+        Mismo resultado que _seasonal_pandas reduciendo el tensor disperso de
+        desembarques; el promedio histórico es suma / número de registros no
+        nulos de cada mes (igual que groupby(...).mean()).
+        """
+        cube = self._coded('desembarque')
+        mask = cube.mask({
+            'Región': self.region_labels(region) if region is not None and 'Región' in cube.codes else None
+        })
+        if not mask.any():
+            return None
+        
+        df_actual = cube.aggregate(
+            ['Mes'], values=['Toneladas'], mask=mask & cube.mask({'Año': current_year})
+        ).rename(columns={'Toneladas': 'actual'})
+        
+        previous = mask & cube.mask({'Año': lambda years: years < current_year})
+        historic = cube.aggregate(['Mes'], values=['Toneladas'], counts={'Registros': 'Toneladas'}, mask=previous)
+        df_historico = pd.DataFrame({
+            'Mes': historic['Mes'],
+            'historico': historic['Toneladas'] / historic['Registros'].where(historic['Registros'] > 0)
+        })
+        
+        return df_actual, df_historico, len(cube.aggregate(['Año'], mask=previous))
+    
+    def get_seasonal_heatmap(
+        self,
+        region: Optional[str] = None,
+        species: Optional[str] = None,
+        by_region: bool = True,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Mapa de calor Año × Mes de desembarques: la grilla completa en una llamada.
+        
+        Propósito: Alimentar un heatmap con todos los años y meses (y una
+        grilla por región) sin llamar a get_seasonal_context una vez por año
+        y región. Las toneladas por Región × Año × Mes se agregan en una sola
+        pasada y se ubican en una matriz; cada fila de 'data' trae su grilla
+        como matriz [año][mes] en lugar de un registro por celda.
+        
+        Args:
+            region: Región específica (una sola grilla)
+            species: Especie específica para filtrar (opcional)
+            by_region: Si es True (y no se filtra región), agrega una grilla por región
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'success': True,
+                'data': [
+                    {'region': None, 'toneladas': [[ene, feb, ..., dic], ...], 'total': 1234.5},
+                    {'region': 'AYSEN', 'toneladas': [[...], ...], 'total': 456.7},
+                    ...
+                ],
+                'summary': {'años': [2000, ..., 2024], 'meses': [1, ..., 12], ...}
+            }
+            La primera grilla (region None) es el total nacional, que incluye
+            los registros sin región; las filas de cada grilla siguen summary['años'].
+        """
+        return self._run(
+            'seasonal_heatmap', region=region, species=species, by_region=by_region, output_format=output_format
+        )
+    
+    def _build_seasonal_heatmap(
+        self,
+        region: Optional[str] = None,
+        species: Optional[str] = None,
+        by_region: bool = True
+    ) -> Dict[str, Any]:
+        """Construye el resultado de seasonal_heatmap con la tabla 'data' como DataFrame."""
+        if 'Mes' not in self.df_desembarque.columns:
+            return {
+                'success': False,
+                'error': 'Columna "Mes" no disponible en df_desembarque'
+            }
+        
+        region_labels = self.region_labels(region) if region is not None else None
+        species_labels = self._query_labels('Especie', species) if species is not None else None
+        has_region = 'Región' in self.df_desembarque.columns
+        keys = ['Región', 'Año', 'Mes'] if has_region else ['Año', 'Mes']
+        
+        # Toneladas por Región × Año × Mes (los nulos de Región se conservan para el total)
+        if self.engine == 'numpy':
+            cube = self._coded('desembarque')
+            mask = cube.mask({'Región': region_labels if has_region else None, 'Especie': species_labels})
+            cells = cube.aggregate(keys, values=['Toneladas'], mask=mask, dropna=False)
+        else:
+            df = self._decoded(self.df_desembarque)
+            if region_labels is not None and has_region:
+                df = df[df['Región'].isin(region_labels)]
+            if species_labels is not None:
+                df = df[df['Especie'].isin(species_labels)]
+            cells = df.groupby(keys, observed=True, dropna=False)['Toneladas'].sum().reset_index()
+        
+        # Con clean=True los años y meses fuera de rango ya se eliminaron al cargar
+        if self.clean:
+            cells = cells[cells['Mes'].notna()]
+        else:
+            cells = cells[cells['Año'].notna() & cells['Mes'].isin(range(1, 13))]
+        if cells.empty:
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        # Matriz [región, año, mes]; la última región agrupa los registros sin región
+        years = np.arange(int(cells['Año'].min()), int(cells['Año'].max()) + 1)
+        region_codes, regions = pd.factorize(cells['Región'], sort=True) if has_region else (
+            np.full(len(cells), -1), pd.Index([])
+        )
+        grid = np.zeros((len(regions) + 1, len(years), 12))
+        grid[
+            np.where(region_codes >= 0, region_codes, len(regions)),
+            cells['Año'].to_numpy(dtype=np.int64) - years[0],
+            cells['Mes'].to_numpy(dtype=np.int64) - 1
+        ] = cells['Toneladas'].to_numpy(dtype=np.float64)
+        national = grid.sum(axis=0)
+        
+        grids = [(' / '.join(region_labels) if region_labels is not None else None, national)]
+        if by_region and region_labels is None and has_region:
+            grids += list(zip(regions.tolist(), grid[:len(regions)]))
+        heatmap = pd.DataFrame({
+            'region': [name for name, _ in grids],
+            'toneladas': [np.round(matrix, 2).tolist() for _, matrix in grids],
+            'total': [round(float(matrix.sum()), 2) for _, matrix in grids],
+        })
+        
+        monthly = national.sum(axis=0)
+        summary = {
+            'años': years.tolist(),
+            'meses': list(range(1, 13)),
+            'grillas': len(heatmap),
+            'total_toneladas': round(float(national.sum()), 2),
+            'mes_pico': int(monthly.argmax()) + 1 if monthly.any() else None,
+            'celdas_sin_datos': int((national == 0).sum())
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'seasonal_heatmap',
+            'metadata': {
+                'region': region,
+                'species': species,
+                'by_region': by_region,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': heatmap,
+            'summary': summary
+        }
+    
+    # ============================================================================
+    # DETECCIÓN DE ANOMALÍAS EN DESEMBARQUES
+    # ============================================================================
+    
+    # Umbral por defecto de |z| robusto para marcar una anomalía
+    ANOMALY_THRESHOLD = 3.5
+    
+    # Meses con desembarques necesarios para evaluar una serie, y proporción
+    # mínima de meses activos dentro de su tramo (excluye series intermitentes)
+    ANOMALY_MIN_ACTIVE_MONTHS = 12
+    ANOMALY_MIN_ACTIVE_SHARE = 0.5
+    
+    def get_landing_anomalies(
+        self,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        threshold: float = 3.5,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Desembarques anómalos por Puerto × Especie × Mes (alzas/caídas bruscas, errores de reporte).
+        
+        Cada serie mensual Región×Puerto×Especie se compara con su perfil
+        estacional (mediana de cada mes entre años); un mes es anómalo si el
+        z-score robusto de su residuo (basado en MAD) supera el umbral. Los
+        puntajes de todas las series se calculan una vez, con NumPy, y se
+        reutilizan entre consultas.
+        
+        Args:
+            year: Año de los meses a reportar (opcional; el perfil usa toda la historia)
+            region: Región específica para filtrar (opcional)
+            threshold: Umbral de |z| robusto (default: 3.5)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'data': [{'año', 'mes', 'region', 'puerto', 'especie', 'toneladas',
+                          'esperado', 'desviacion', 'z_score', 'tipo'}],
+                'summary': {...}
+            }
+        """
+        return self._run(
+            'landing_anomalies', year=year, region=region, threshold=threshold, output_format=output_format
+        )
+    
+    def _landing_anomaly_scores(self):
+        """Retorna los z-scores de todas las series Región×Puerto×Especie (memorizados)."""
+        def build():
+            from fishery_anomalies import AnomalyScores
+            from fishery_series import MonthlyPanel
+            
+            keys = [col for col in ('Región', 'Puerto', 'Especie') if col in self.df_desembarque.columns]
+            panel = MonthlyPanel(self._decoded(self.df_desembarque), keys)
+            scores = AnomalyScores(
+                panel,
+                min_active_months=self.ANOMALY_MIN_ACTIVE_MONTHS,
+                min_active_share=self.ANOMALY_MIN_ACTIVE_SHARE
+            )
+            self._derived['landing_anomaly_scores'] = scores
+            return scores
+        
+        return self._derived_structure('landing_anomaly_scores', build)
+    
+    def _build_landing_anomalies(
+        self,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        threshold: float = 3.5
+    ) -> Dict[str, Any]:
+        """Construye el resultado de landing_anomalies con la tabla 'data' como DataFrame."""
+        if threshold <= 0:
+            raise ValueError("threshold debe ser positivo")
+        
+        for column in ('Puerto', 'Mes'):
+            if column not in self.df_desembarque.columns:
+                return {
+                    'success': False,
+                    'error': f'Columna "{column}" no disponible en df_desembarque'
+                }
+        
+        scores = self._landing_anomaly_scores()
+        panel = scores.panel
+        
+        # Series y meses del calendario que cubren los filtros
+        series_mask = scores.evaluated.copy()
+        if region is not None and 'Región' in panel.keys.columns:
+            series_mask &= np.isin(panel.keys['Región'].to_numpy(), self.region_labels(region))
+        period_mask = np.ones(scores.z.shape[1], dtype=bool)
+        if year is not None:
+            period_mask = np.repeat(panel.years == year, 12)
+        
+        evaluated_points = int(np.isfinite(scores.z[series_mask][:, period_mask]).sum())
+        if evaluated_points == 0:
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        flagged = scores.flagged(threshold)
+        keep = series_mask[flagged['series']] & period_mask[flagged['periodo']]
+        series, period, z = flagged['series'][keep], flagged['periodo'][keep], flagged['z'][keep]
+        
+        anio, mes = panel.period(period)
+        toneladas = panel.flat()[series, period]
+        esperado = scores.expected[series, mes - 1]
+        
+        anomalies = panel.keys.iloc[series].reset_index(drop=True).rename(columns={
+            'Región': 'region', 'Puerto': 'puerto', 'Especie': 'especie'
+        })
+        anomalies.insert(0, 'mes', mes)
+        anomalies.insert(0, 'año', anio)
+        anomalies['toneladas'] = np.round(toneladas, 2)
+        anomalies['esperado'] = np.round(esperado, 2)
+        anomalies['desviacion'] = np.round(toneladas - esperado, 2)
+        anomalies['z_score'] = np.round(z, 2)
+        anomalies['tipo'] = np.where(z > 0, 'alza', 'caida')
+        
+        # Ordenar por magnitud del z-score
+        anomalies = anomalies.iloc[np.argsort(-np.abs(z), kind='stable')].reset_index(drop=True)
+        
+        summary = {
+            'series_evaluadas': int(series_mask.sum()),
+            'meses_evaluados': evaluated_points,
+            'total_anomalias': int(len(anomalies)),
+            'alzas': int((anomalies['tipo'] == 'alza').sum()),
+            'caidas': int((anomalies['tipo'] == 'caida').sum()),
+            'tasa_anomalias_pct': round(len(anomalies) / evaluated_points * 100, 2),
+            'puerto_mas_anomalias': anomalies['puerto'].value_counts().index[0] if len(anomalies) > 0 else None,
+            'especie_mas_anomalias': anomalies['especie'].value_counts().index[0] if len(anomalies) > 0 else None
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'landing_anomalies',
+            'metadata': {
+                'year': year,
+                'region': region,
+                'threshold': threshold,
+                'min_meses_activos': self.ANOMALY_MIN_ACTIVE_MONTHS,
+                'min_proporcion_activa': self.ANOMALY_MIN_ACTIVE_SHARE,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': anomalies,
+            'summary': summary
+        }
+    
+    # ============================================================================
+    # PRONÓSTICOS POR LOTES
+    # ============================================================================
+    
+    def get_forecast(
+        self,
+        horizon: int = 12,
+        region: Optional[str] = None,
+        species: Optional[str] = None,
+        model: str = 'auto',
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Proyección mensual de capturas para cada serie Especie × Región.
+        
+        Todas las series se pronostican a la vez (ver fishery_forecast):
+        'seasonal_naive', 'exp_smoothing' (Holt-Winters aditivo),
+        'linear_seasonal' (tendencia + efectos mensuales) o 'auto', que elige
+        por serie el modelo con menor error al pronosticar los últimos 12
+        meses observados. Las series sin desembarques en los últimos 12 meses
+        no se pronostican.
+        
+        Args:
+            horizon: Meses a proyectar desde el último mes con datos (default: 12)
+            region: Región específica para filtrar (opcional)
+            species: Especie específica para filtrar (opcional)
+            model: Modelo a usar o 'auto' (default)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'data': [{'especie', 'region', 'año', 'mes', 'pronostico', 'modelo', 'mae_validacion'}],
+                'summary': {...}
+            }
+        """
+        return self._run(
+            'forecast', horizon=horizon, region=region, species=species, model=model, output_format=output_format
+        )
+    
+    def _forecast_panel(self):
+        """Retorna el panel mensual Especie×Región de desembarques (memorizado)."""
+        def build():
+            from fishery_series import MonthlyPanel
+            
+            keys = [col for col in ('Especie', 'Región') if col in self.df_desembarque.columns]
+            panel = MonthlyPanel(self._decoded(self.df_desembarque), keys)
+            self._derived['forecast_panel'] = panel
+            return panel
+        
+        return self._derived_structure('forecast_panel', build)
+    
+    def _build_forecast(
+        self,
+        horizon: int = 12,
+        region: Optional[str] = None,
+        species: Optional[str] = None,
+        model: str = 'auto'
+    ) -> Dict[str, Any]:
+        """Construye el resultado de forecast con la tabla 'data' como DataFrame."""
+        from fishery_forecast import BatchForecaster, SEASON
+        
+        if model != 'auto' and model not in BatchForecaster.MODELS:
+            raise ValueError(f"model debe ser 'auto' o uno de {BatchForecaster.MODELS}")
+        if horizon < 1:
+            raise ValueError("horizon debe ser un entero positivo")
+        if 'Mes' not in self.df_desembarque.columns:
+            return {
+                'success': False,
+                'error': 'Columna "Mes" no disponible en df_desembarque'
+            }
+        
+        panel = self._forecast_panel()
+        
+        # Historia común: hasta el último mes con datos en cualquier serie
+        observed_periods = np.flatnonzero(panel.rows.reshape(panel.n_series, -1).any(axis=0))
+        n_periods = int(observed_periods[-1]) + 1 if len(observed_periods) else 0
+        history = panel.flat()[:, :n_periods]
+        recent_rows = panel.rows.reshape(panel.n_series, -1)[:, max(n_periods - SEASON, 0):n_periods]
+        
+        # Series activas que cubren los filtros
+        mask = recent_rows.sum(axis=1) > 0
+        inactive = int((~mask).sum())
+        if region is not None and 'Región' in panel.keys.columns:
+            mask &= np.isin(panel.keys['Región'].to_numpy(), self.region_labels(region))
+        if species is not None:
+            mask &= np.isin(panel.keys['Especie'].to_numpy(), self._query_labels('Especie', species))
+        
+        if not mask.any() or n_periods < SEASON:
+            return {
+                'success': False,
+                'error': 'No hay datos suficientes para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        forecaster = BatchForecaster(history[mask], first_month=0)
+        prediction, chosen, errors = forecaster.forecast(horizon, model)
+        
+        # Tabla larga: una fila por serie y mes proyectado
+        n_series = int(mask.sum())
+        future_year, future_month = panel.period(np.arange(n_periods, n_periods + horizon))
+        keys = panel.keys[mask].reset_index(drop=True).rename(columns={'Especie': 'especie', 'Región': 'region'})
+        forecast = keys.loc[np.repeat(np.arange(n_series), horizon)].reset_index(drop=True)
+        forecast['año'] = np.tile(future_year, n_series)
+        forecast['mes'] = np.tile(future_month, n_series)
+        forecast['pronostico'] = np.round(prediction.ravel(), 2)
+        forecast['modelo'] = np.asarray(BatchForecaster.MODELS)[np.repeat(chosen, horizon)]
+        forecast['mae_validacion'] = np.round(np.repeat(errors, horizon), 2)
+        
+        last_year, last_month = panel.period(np.array([n_periods - 1]))
+        models_used = pd.Series(np.asarray(BatchForecaster.MODELS)[chosen]).value_counts()
+        summary = {
+            'series_pronosticadas': n_series,
+            'series_inactivas': inactive,
+            'horizonte_meses': horizon,
+            'ultimo_periodo_observado': f'{int(last_year[0])}-{int(last_month[0]):02d}',
+            'total_pronosticado': float(np.round(prediction.sum(), 2)),
+            'modelos_usados': {name: int(count) for name, count in models_used.items()},
+            'mae_validacion_promedio': round(float(np.nanmean(errors)), 2) if np.isfinite(errors).any() else None
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'forecast',
+            'metadata': {
+                'horizon': horizon,
+                'region': region,
+                'species': species,
+                'model': model,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': forecast,
+            'summary': summary
+        }
+    
+    # ============================================================================
+    # CONCENTRACIÓN (HHI, GINI, CRn)
+    # ============================================================================
+    
+    # Dimensiones de concentración: nombre del parámetro -> columna de df_desembarque
+    CONCENTRATION_DIMENSIONS = {'puerto': 'Puerto', 'especie': 'Especie', 'tipo_agente': 'Tipo de agente'}
+    
+    def get_concentration(
+        self,
+        dimension: Optional[str] = None,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        by_region: bool = True,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Concentración de desembarques por puerto, especie o tipo de agente.
+        
+        Calcula el índice Herfindahl-Hirschman (0-10.000), el coeficiente de
+        Gini y las razones CR4/CR10 para todos los grupos Año × Región en una
+        sola pasada (ver fishery_concentration), en lugar de una consulta de
+        get_top_ports por combinación.
+        
+        Args:
+            dimension: 'puerto', 'especie' o 'tipo_agente' (None = las tres)
+            year: Año específico para filtrar (opcional)
+            region: Región específica para filtrar (opcional)
+            by_region: Si es False, calcula por Año a nivel nacional
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+            
+        Returns:
+            Dict con estructura:
+            {
+                'data': [{'dimension', 'año', 'region', 'participantes', 'toneladas',
+                          'hhi', 'gini', 'cr4', 'cr10', 'lider', 'participacion_lider'}],
+                'summary': {...}
+            }
+        """
+        return self._run(
+            'concentration', dimension=dimension, year=year, region=region, by_region=by_region, output_format=output_format
+        )
+    
+    def _build_concentration(
+        self,
+        dimension: Optional[str] = None,
+        year: Optional[int] = None,
+        region: Optional[str] = None,
+        by_region: bool = True
+    ) -> Dict[str, Any]:
+        """Construye el resultado de concentration con la tabla 'data' como DataFrame."""
+        from fishery_concentration import HHI_HIGH, concentration_metrics, share_matrix
+        
+        if dimension is not None and dimension not in self.CONCENTRATION_DIMENSIONS:
+            raise ValueError(f"dimension debe ser una de {tuple(self.CONCENTRATION_DIMENSIONS)}")
+        dimensions = [
+            name for name in ([dimension] if dimension else self.CONCENTRATION_DIMENSIONS)
+            if self.CONCENTRATION_DIMENSIONS[name] in self.df_desembarque.columns
+        ]
+        if not dimensions:
+            return {
+                'success': False,
+                'error': f'Columna "{self.CONCENTRATION_DIMENSIONS[dimension]}" no disponible en df_desembarque'
+            }
+        
+        df = self.df_desembarque
+        if year is not None:
+            df = df[df['Año'] == year]
+        if region is not None and 'Región' in df.columns:
+            df = df[df['Región'].isin(self.region_labels(region))]
+        if df.empty:
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        df = self._decoded(df)
+        group_keys = ['Año', 'Región'] if by_region and 'Región' in df.columns else ['Año']
+        
+        tables = []
+        for name in dimensions:
+            keys, matrix, members = share_matrix(df, group_keys, self.CONCENTRATION_DIMENSIONS[name])
+            metrics = concentration_metrics(matrix)
+            table = keys.rename(columns={'Año': 'año', 'Región': 'region'})
+            if 'region' not in table.columns:
+                table['region'] = None
+            table.insert(0, 'dimension', name)
+            table['participantes'] = metrics['participantes']
+            table['toneladas'] = np.round(metrics['total'], 2)
+            for metric in ('hhi', 'gini', 'cr4', 'cr10', 'participacion_lider'):
+                table[metric] = np.round(metrics[metric], 4 if metric == 'gini' else 2)
+            table['lider'] = members[metrics['lider']] if len(members) else None
+            tables.append(table)
+        
+        concentration = pd.concat(tables, ignore_index=True)[[
+            'dimension', 'año', 'region', 'participantes', 'toneladas',
+            'hhi', 'gini', 'cr4', 'cr10', 'lider', 'participacion_lider'
+        ]]
+        concentration.loc[concentration['toneladas'] <= 0, 'lider'] = None
+        
+        by_dimension = concentration.groupby('dimension', sort=False)
+        summary = {
+            'grupos': int(concentration.groupby(['año', 'region'], dropna=False).ngroups),
+            'nivel': 'año_region' if 'Región' in group_keys else 'año_nacional',
+            'hhi_promedio': {name: round(float(value), 2) for name, value in by_dimension['hhi'].mean().items()},
+            'gini_promedio': {name: round(float(value), 4) for name, value in by_dimension['gini'].mean().items()},
+            'grupos_alta_concentracion': {
+                name: int(count) for name, count in (concentration['hhi'] > HHI_HIGH).groupby(concentration['dimension'], sort=False).sum().items()
+            },
+            'umbral_hhi_alto': HHI_HIGH
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'concentration',
+            'metadata': {
+                'dimension': dimension,
+                'year': year,
+                'region': region,
+                'by_region': by_region,
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': concentration,
+            'summary': summary
+        }
+    
+    # ============================================================================
+    # ESTRUCTURAS PRECOMPUTADAS (MOTOR NUMPY)
+    # ============================================================================
+    
+    # Dimensiones y valores codificados de cada dataset (ver fishery_groupby)
+    CODED_COLUMNS = {
+        'desembarque': (('Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente'), ('Toneladas',)),
+        'produccion': (('Año', 'Región', 'Especie', 'Línea de elaboración'), ('Materia Prima', 'Producción')),
+        'plantas': (('Año', 'Región', 'Nombre Planta'), ()),
+    }
+    
+    def _derived_structure(self, key: str, build):
+        """
+        Retorna la estructura derivada `key`, construyéndola con build() si no existe.
+        
+        La construcción es exclusiva (un solo hilo construye y los demás
+        esperan y reutilizan el resultado); la lectura de una estructura ya
+        construida no toma el lock.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            with self._build_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = build()
+        return value
+    
+    def build_coded_tables(self) -> Dict[str, 'CodedTable']:
+        """
+        Codifica como enteros las dimensiones de los 3 datasets.
+        
+        Se construye automáticamente la primera vez que un análisis agrega con
+        engine='numpy'; después cada agregación es un np.bincount sobre los
+        códigos (ver fishery_groupby.CodedTable). Los desembarques se guardan
+        como tensor disperso Año×Mes×Región×Puerto×Especie×Tipo de agente
+        (una fila por celda no vacía, ver CodedTable.collapse) si sus sumas son
+        exactas (toneladas múltiplos de 1/1024 o, con exact_tonnage, con hasta
+        6 decimales): los análisis del módulo de cosechas cortan y reducen ese
+        tensor sin reagrupar filas.
+        
+        Returns:
+            Dict dataset -> CodedTable
+        """
+        from fishery_groupby import CodedTable
+        
+        tables = {
+            name: CodedTable(self._decoded(df), *self.CODED_COLUMNS[name], decimal=self.exact_tonnage)
+            for name, df in self._frames().items()
+        }
+        tables['desembarque'] = tables['desembarque'].collapse()
+        self._derived['coded_tables'] = tables
+        return tables
+    
+    def _coded(self, dataset: str) -> 'CodedTable':
+        """Retorna la tabla codificada de un dataset, construyéndolas si no existen."""
+        tables = self._derived_structure('coded_tables', self.build_coded_tables)
+        return tables[dataset]
+    
+    def _landings_by(
+        self,
+        keys: List[str],
+        year: Optional[int] = None,
+        region: Optional[str] = None
+    ):
+        """
+        Toneladas de desembarque por `keys` con filtros opcionales de año y región.
+        
+        Returns:
+            Tupla (DataFrame keys + Toneladas ordenado por keys, total de
+            toneladas de las filas filtradas) o None si el filtro no deja filas
+        """
+        region_labels = self.region_labels(region) if region is not None else None
+        
+        if self.engine == 'numpy':
+            coded = self._coded('desembarque')
+            mask = coded.mask({
+                'Año': year,
+                'Región': region_labels if 'Región' in coded.codes else None
+            })
+            if not mask.any():
+                return None
+            return coded.aggregate(keys, values=['Toneladas'], mask=mask), coded.total('Toneladas', mask)
+        
+        df = self._decoded(self.df_desembarque)
+        if year is not None:
+            df = df[df['Año'] == year]
+        if region_labels is not None and 'Región' in df.columns:
+            df = df[df['Región'].isin(region_labels)]
+        if df.empty:
+            return None
+        grouped = df.groupby(keys, as_index=False, observed=True).agg({'Toneladas': 'sum'})
+        return grouped, df['Toneladas'].sum()
+    
+    def build_supply_cube(self) -> 'SupplyCube':
+        """
+        Precomputa las matrices Año×Especie×Región de capturas y materia prima.
+        
+        Se construye automáticamente la primera vez que get_supply_vs_demand
+        corre con engine='numpy'; después cada consulta es un corte de arreglos.
+        
+        Returns:
+            El cubo construido
+        """
+        from fishery_cubes import SupplyCube
+        
+        cube = SupplyCube(
+            self._decoded(self.df_desembarque),
+            self._decoded(self.df_produccion)
+        )
+        self._derived['supply_cube'] = cube
+        return cube
+    
+    def _supply_cube(self) -> 'SupplyCube':
+        """Retorna el cubo de oferta/demanda, construyéndolo si no existe."""
+        return self._derived_structure('supply_cube', self.build_supply_cube)
+    
+    def build_hierarchy_aggregates(self) -> 'HierarchyAggregates':
+        """
+        Precomputa los agregados Nación/Macrozona/Región/Puerto de los análisis regionales.
+        
+        Se construye automáticamente la primera vez que un análisis regional
+        corre con engine='numpy'; después cualquier nivel se responde desde
+        los agregados, sin recorrer las filas originales.
+        
+        Returns:
+            Los agregados construidos
+        """
+        from fishery_hierarchy import HierarchyAggregates
+        
+        aggregates = HierarchyAggregates(
+            self._coded('desembarque'),
+            self._coded('produccion'),
+            self.df_plantas,
+            self.region_hierarchy
+        )
+        self._derived['hierarchy_aggregates'] = aggregates
+        return aggregates
+    
+    def _hierarchy_aggregates(self) -> 'HierarchyAggregates':
+        """Retorna los agregados por nivel territorial, construyéndolos si no existen."""
+        return self._derived_structure('hierarchy_aggregates', self.build_hierarchy_aggregates)
+    
+    def _level_metadata(self, level: Optional[str], within: Optional[str]) -> Dict[str, Any]:
+        """Metadata de los análisis por nivel territorial (level/within solo si se indicaron)."""
+        metadata: Dict[str, Any] = {}
+        if level is not None or within is not None:
+            metadata.update(level=level or 'region', within=within)
+        metadata['generated_at'] = datetime.now().isoformat()
+        return metadata
+    
+    def _level_tables(self, level: Optional[str], within: Optional[str] = None):
+        """
+        Agregados de capturas, producción y plantas en un nivel territorial.
+        
+        Args:
+            level: Nivel de fishery_hierarchy.LEVELS (None = 'region')
+            within: Macrozona o región canónica/variante a la que se restringe
+            
+        Returns:
+            Tupla (dict dataset -> DataFrame con columnas de salida, columnas
+            que identifican la unidad territorial: ['Nacion'], ['Macrozona'],
+            ['Region'] o ['Region', 'Puerto'])
+        """
+        from fishery_hierarchy import LEVELS, distinct_plants, level_aggregates
+        from canonical_names import base_key
+        
+        if level is None:
+            level = 'region'
+        if level not in LEVELS:
+            raise ValueError(f"level debe ser uno de {LEVELS}")
+        
+        if self.engine == 'numpy':
+            tables = self._hierarchy_aggregates().levels[level]
+        else:
+            hierarchy = self.region_hierarchy
+            tables = level_aggregates(
+                hierarchy.with_levels(self._decoded(self.df_desembarque)),
+                hierarchy.with_levels(self._decoded(self.df_produccion)),
+                distinct_plants(hierarchy.with_levels(self.df_plantas)),
+                level
+            )
+        
+        if within is not None:
+            zone = base_key(within)
+            if zone in self.region_hierarchy.macro_zones:
+                column, members, parent = 'Macrozona', (zone,), 'macrozona'
+            else:
+                column, members, parent = 'Región', self.region_labels(within), 'region'
+            if LEVELS.index(parent) >= LEVELS.index(level):
+                raise ValueError(f"within debe ser una unidad de un nivel superior a '{level}'")
+            tables = {name: table[table[column].isin(members)] for name, table in tables.items()}
+        
+        labels = {'nacion': ['Nacion'], 'macrozona': ['Macrozona'], 'region': ['Region'], 'puerto': ['Region', 'Puerto']}[level]
+        tables = {
+            name: (table.drop(columns='Macrozona') if level in ('region', 'puerto') else table).rename(columns={'Región': 'Region'})
+            for name, table in tables.items()
+        }
+        return tables, labels
+    
+    # ============================================================================
+    # MODO APROXIMADO (MUESTRA ESTRATIFICADA POR AÑO/REGIÓN)
+    # ============================================================================
+    
+    # Nivel de confianza de los intervalos del modo aproximado
+    APPROXIMATE_CONFIDENCE = 0.95
+    
+    def build_stratified_sample(
+        self,
+        fraction: float = 0.1,
+        min_per_stratum: int = 20,
+        seed: int = 42
+    ) -> 'StratifiedSample':
+        """
+        Precomputa la muestra estratificada usada por los análisis con exact=False.
+        
+        Se construye automáticamente con los valores por defecto la primera vez
+        que se pide un resultado aproximado; llamar a este método permite
+        elegir otra fracción de muestreo.
+        
+        Args:
+            fraction: Fracción de filas a muestrear por estrato Año/Región
+            min_per_stratum: Mínimo de filas por estrato
+            seed: Semilla para reproducibilidad
+            
+        Returns:
+            La muestra construida
+        """
+        from fishery_sampling import StratifiedSample
+        
+        sample = StratifiedSample(
+            self._decoded(self.df_desembarque),
+            strata=('Año', 'Región'),
+            fraction=fraction,
+            min_per_stratum=min_per_stratum,
+            seed=seed
+        )
+        # Los parámetros se recuerdan para reconstruir la misma muestra si el
+        # governor de memoria la descarta
+        self._sample_params = {'fraction': fraction, 'min_per_stratum': min_per_stratum, 'seed': seed}
+        self._derived['stratified_sample'] = sample
+        return sample
+    
+    def _stratified_sample(self) -> 'StratifiedSample':
+        """Retorna la muestra estratificada, construyéndola si no existe."""
+        return self._derived_structure(
+            'stratified_sample', lambda: self.build_stratified_sample(**self._sample_params)
+        )
+    
+    def _approx_filtered_sample(self, year: Optional[int], region: Optional[str]):
+        """Retorna (muestra, máscara de estratos) para los filtros de año y región."""
+        sample = self._stratified_sample()
+        region_labels = self.region_labels(region) if region is not None else None
+        return sample, sample.select(**{'Año': year, 'Región': region_labels})
+    
+    def _approx_metadata(self, sample, **params) -> Dict[str, Any]:
+        """Metadata común de los resultados aproximados."""
+        return {
+            **params,
+            'exact': False,
+            'confidence': self.APPROXIMATE_CONFIDENCE,
+            'sample': sample.describe(),
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    def _build_agent_distribution_approx(
+        self,
+        year: Optional[int],
+        region: Optional[str]
+    ) -> Dict[str, Any]:
+        """Versión estimada de agent_distribution sobre la muestra estratificada."""
+        sample, strata = self._approx_filtered_sample(year, region)
+        
+        if not strata.any():
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        confidence = self.APPROXIMATE_CONFIDENCE
+        total = sample.estimate_totals(strata, confidence=confidence)
+        total_toneladas = float(total['estimacion'].iloc[0])
+        
+        distribution = sample.estimate_totals(strata, ['Tipo de agente'], confidence=confidence)
+        distribution = distribution.rename(columns={
+            'Tipo de agente': 'tipo_agente',
+            'estimacion': 'toneladas',
+            'ic_inf': 'toneladas_ic_inf',
+            'ic_sup': 'toneladas_ic_sup'
+        }).drop(columns='error_estandar')
+        
+        distribution['porcentaje'] = (
+            (distribution['toneladas'] / total_toneladas * 100) if total_toneladas > 0
+            else pd.Series(0.0, index=distribution.index)
+        ).round(2)
+        
+        for col in ['toneladas', 'toneladas_ic_inf', 'toneladas_ic_sup']:
+            distribution[col] = distribution[col].round(2)
+        
+        distribution = distribution.sort_values('toneladas', ascending=False)
+        distribution = distribution[['tipo_agente', 'toneladas', 'porcentaje', 'toneladas_ic_inf', 'toneladas_ic_sup']]
+        
+        summary = {
+            'total_toneladas': round(total_toneladas, 2),
+            'total_toneladas_ic': [round(float(total['ic_inf'].iloc[0]), 2), round(float(total['ic_sup'].iloc[0]), 2)],
+            'num_tipos_agente': len(distribution),
+            'tipo_dominante': distribution.iloc[0]['tipo_agente'] if len(distribution) > 0 else None,
+            'porcentaje_dominante': float(distribution.iloc[0]['porcentaje']) if len(distribution) > 0 else 0
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'agent_distribution',
+            'metadata': self._approx_metadata(sample, year=year, region=region),
+            'data': distribution,
+            'summary': summary
+        }
+    
+    def _build_top_ports_approx(
+        self,
+        year: Optional[int],
+        region: Optional[str],
+        top_n: int
+    ) -> Dict[str, Any]:
+        """Versión estimada de top_ports sobre la muestra estratificada."""
+        sample, strata = self._approx_filtered_sample(year, region)
+        
+        if not strata.any():
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        confidence = self.APPROXIMATE_CONFIDENCE
+        total_general = float(sample.estimate_totals(strata, confidence=confidence)['estimacion'].iloc[0])
+        
+        ports = sample.estimate_totals(strata, ['Puerto'], confidence=confidence)
+        ports = ports.rename(columns={
+            'Puerto': 'puerto',
+            'estimacion': 'toneladas',
+            'ic_inf': 'toneladas_ic_inf',
+            'ic_sup': 'toneladas_ic_sup'
+        }).drop(columns='error_estandar')
+        
+        ports_all = ports
+        ports = ports.sort_values('toneladas', ascending=False).head(top_n)
+        ports['ranking'] = range(1, len(ports) + 1)
+        
+        for col in ['toneladas', 'toneladas_ic_inf', 'toneladas_ic_sup']:
+            ports[col] = ports[col].round(2)
+        
+        ports = ports[['puerto', 'toneladas', 'ranking', 'toneladas_ic_inf', 'toneladas_ic_sup']]
+        total_top_n = ports['toneladas'].sum()
+        
+        summary = {
+            'total_toneladas_top_n': float(total_top_n),
+            'total_toneladas_general': round(total_general, 2),
+            'porcentaje_concentracion': round(float(total_top_n / total_general * 100), 2) if total_general > 0 else 0,
+            # Cota inferior: solo cuenta puertos presentes en la muestra
+            'num_puertos_total': len(ports_all),
+            'puerto_lider': ports.iloc[0]['puerto'] if len(ports) > 0 else None
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'top_ports',
+            'metadata': self._approx_metadata(sample, year=year, region=region, top_n=top_n),
+            'data': ports,
+            'summary': summary
+        }
+    
+    def _build_species_by_agent_breakdown_approx(
+        self,
+        year: Optional[int],
+        region: Optional[str],
+        top_n: int
+    ) -> Dict[str, Any]:
+        """Versión estimada de species_by_agent_breakdown sobre la muestra estratificada."""
+        sample, strata = self._approx_filtered_sample(year, region)
+        
+        if not strata.any():
+            return {
+                'success': False,
+                'error': 'No hay datos disponibles para los filtros especificados',
+                'data': [],
+                'summary': {}
+            }
+        
+        confidence = self.APPROXIMATE_CONFIDENCE
+        
+        # Paso 1: Top N especies según el total estimado
+        species_totals = sample.estimate_totals(strata, ['Especie'], confidence=confidence)
+        species_totals = species_totals.sort_values('estimacion', ascending=False).head(top_n)
+        
+        # Paso 2: Estimaciones por Especie y Tipo de agente
+        cells = sample.estimate_totals(strata, ['Especie', 'Tipo de agente'], confidence=confidence)
+        cells = cells[cells['Especie'].isin(species_totals['Especie'])]
+        breakdown = cells.pivot_table(
+            index='Especie',
+            columns='Tipo de agente',
+            values='estimacion',
+            aggfunc='sum',
+            fill_value=0,
+            observed=True
+        ).reset_index()
+        breakdown.columns.name = None
+        
+        agent_columns = [col for col in breakdown.columns if col != 'Especie']
+        
+        breakdown = breakdown.merge(
+            species_totals[['Especie', 'estimacion', 'ic_inf', 'ic_sup']].rename(columns={
+                'estimacion': 'total',
+                'ic_inf': 'total_ic_inf',
+                'ic_sup': 'total_ic_sup'
+            }),
+            on='Especie'
+        ).rename(columns={'Especie': 'especie'})
+        
+        breakdown = breakdown.sort_values('total', ascending=False)
+        
+        for col in agent_columns + ['total', 'total_ic_inf', 'total_ic_sup']:
+            breakdown[col] = breakdown[col].round(2)
+        
+        summary = {
+            'num_especies': len(breakdown),
+            'tipos_agente': agent_columns,
+            'total_toneladas': float(breakdown['total'].sum()),
+            'especie_lider': breakdown.iloc[0]['especie'] if len(breakdown) > 0 else None,
+            'participacion_por_tipo': {
+                agente: float(breakdown[agente].sum())
+                for agente in agent_columns
+            }
+        }
+        
+        return {
+            'success': True,
+            'analysis_type': 'species_by_agent_breakdown',
+            'metadata': self._approx_metadata(sample, year=year, region=region, top_n=top_n),
+            'data': breakdown,
             'summary': summary
         }
     
@@ -971,13 +3296,23 @@ class FisheryAnalytics:
     # MÉTODOS DE ANÁLISIS GENERAL
     # ============================================================================
     
-    def get_plant_capacity_analysis(self) -> Dict[str, Any]:
+    def get_plant_capacity_analysis(
+        self,
+        level: Optional[str] = None,
+        within: Optional[str] = None,
+        output_format: str = 'dict'
+    ) -> Union[Dict[str, Any], bytes]:
         """
         Capacidad vs Producción: Productividad por Planta.
         
         Analiza la relación entre el número de plantas activas y el volumen
         de producción para calcular la productividad promedio por planta.
         
+        Args:
+            level: Nivel territorial: 'nacion', 'macrozona' o 'region' (None = 'region')
+            within: Macrozona (o región) a la que se restringe el resultado (opcional)
+            output_format: 'dict' (default), 'arrow' (bytes Arrow IPC) o 'record_batch' (ver fishery_arrow)
+        
         Returns:
             Dict con estructura:
             {
@@ -985,22 +3320,32 @@ class FisheryAnalytics:
                 'data': [{'Año', 'Region', 'Num_Plantas', 'Produccion_Total', 'Promedio_Por_Planta'}],
                 'summary': {...}
             }
+            Con otro nivel, 'Region' se reemplaza por 'Nacion' o 'Macrozona'.
         """
-        # Contar plantas únicas por Región y Año
-        plantas_count = self.df_plantas.groupby(['Año', 'Región'], as_index=False).agg({
-            'Nombre Planta': 'nunique'
-        }).rename(columns={'Nombre Planta': 'Num_Plantas'})
+        return self._run('plant_capacity_analysis', level=level, within=within, output_format=output_format)
+    
+    def _build_plant_capacity_analysis(self, level: Optional[str] = None, within: Optional[str] = None) -> Dict[str, Any]:
+        """Construye el resultado de plant_capacity_analysis con la tabla 'data' como DataFrame."""
+        tables, labels = self._level_tables(level, within)
+        if 'plantas' not in tables or 'produccion' not in tables:
+            return {
+                'success': False,
+                'error': f'Nivel "{level}" no disponible para plantas y producción'
+            }
         
-        # Sumar producción por Región y Año
-        produccion_total = self.df_produccion.groupby(['Año', 'Región'], as_index=False).agg({
-            'Producción': 'sum'
-        }).rename(columns={'Producción': 'Produccion_Total'})
+        # Plantas únicas por unidad territorial y Año
+        plantas_count = tables['plantas']
         
-        # Merge por Año y Región
+        # Producción por unidad territorial y Año
+        produccion_total = tables['produccion'].dropna(subset=['Año']).rename(
+            columns={'Producción': 'Produccion_Total'}
+        )
+        
+        # Merge por Año y unidad territorial
         capacity_analysis = pd.merge(
             plantas_count,
             produccion_total,
-            on=['Año', 'Región'],
+            on=['Año'] + labels,
             how='outer'
         ).fillna(0)
         
@@ -1017,63 +3362,130 @@ class FisheryAnalytics:
         # Redondear producción
         capacity_analysis['Produccion_Total'] = capacity_analysis['Produccion_Total'].round(2)
         
-        # Renombrar región
-        capacity_analysis = capacity_analysis.rename(columns={'Región': 'Region'})
-        
         # Ordenar por año y producción
         capacity_analysis = capacity_analysis.sort_values(['Año', 'Produccion_Total'], ascending=[True, False])
         
         # Calcular resumen
+        label = labels[-1]
         summary = {
             'años_analizados': int(capacity_analysis['Año'].nunique()),
-            'regiones_analizadas': int(capacity_analysis['Region'].nunique()),
+            'regiones_analizadas': int(capacity_analysis[label].nunique()),
             'total_plantas_maximas': int(capacity_analysis['Num_Plantas'].max()),
             'produccion_total_periodo': float(capacity_analysis['Produccion_Total'].sum()),
             'promedio_productividad': float(capacity_analysis['Promedio_Por_Planta'].mean()),
-            'region_mas_productiva': capacity_analysis.sort_values('Promedio_Por_Planta', ascending=False).iloc[0]['Region'] if len(capacity_analysis) > 0 else None
+            'region_mas_productiva': capacity_analysis.sort_values('Promedio_Por_Planta', ascending=False).iloc[0][label] if len(capacity_analysis) > 0 else None
         }
         
         return {
             'success': True,
             'analysis_type': 'plant_capacity_analysis',
-            'metadata': {
-                'generated_at': datetime.now().isoformat()
-            },
-            'data': self._to_serializable(capacity_analysis),
+            'metadata': self._level_metadata(level, within),
+            'data': capacity_analysis,
             'summary': summary
         }
     
-    def export_all_analyses(self, output_format: str = 'json') -> Dict[str, Any]:
+    def export_all_analyses(self, output_format: str = 'json') -> Union[str, Dict[str, Any]]:
         """
         Ejecuta todos los análisis y retorna un diccionario completo.
         
         Args:
-            output_format: Formato de salida ('json' o 'dict')
+            output_format: 'json' (string JSON), 'arrow' (cada análisis es un
+                stream Arrow IPC en bytes, ver fishery_arrow); cualquier otro
+                valor retorna el dict
             
         Returns:
-            Dict con todos los análisis
+            Dict con todos los análisis (string JSON con output_format='json')
         """
+        result_format = 'arrow' if output_format == 'arrow' else 'dict'
+        
         all_analyses = {
             'generated_at': datetime.now().isoformat(),
-            'supply_vs_demand': self.get_supply_vs_demand(),
-            'conversion_efficiency': self.get_conversion_efficiency(),
-            'regional_dynamics': self.get_regional_dynamics(),
-            'longitudinal_evolution': self.get_longitudinal_evolution(),
-            'agent_share': self.get_agent_share(),
-            'plant_capacity_analysis': self.get_plant_capacity_analysis()
+            'supply_vs_demand': self.get_supply_vs_demand(output_format=result_format),
+            'conversion_efficiency': self.get_conversion_efficiency(output_format=result_format),
+            'regional_dynamics': self.get_regional_dynamics(output_format=result_format),
+            'longitudinal_evolution': self.get_longitudinal_evolution(output_format=result_format),
+            'agent_share': self.get_agent_share(output_format=result_format),
+            'plant_capacity_analysis': self.get_plant_capacity_analysis(output_format=result_format)
         }
         
         if output_format == 'json':
-            return json.dumps(all_analyses, indent=2, ensure_ascii=False)
+            # default=json_default: los escalares NumPy de los resúmenes no interrumpen la exportación
+            return json.dumps(all_analyses, indent=2, ensure_ascii=False, default=json_default)
         
         return all_analyses
 
 
+def to_ndjson(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Convierte eventos de iter_analysis en líneas NDJSON (una por evento).
+    
+    Útil para respuestas HTTP en streaming (p. ej. StreamingResponse de FastAPI
+    con media_type='application/x-ndjson').
+    
+    Args:
+        events: Eventos producidos por FisheryAnalytics.iter_analysis
+        
+    Yields:
+        Líneas JSON terminadas en salto de línea
+    """
+    for event in events:
+        yield json.dumps(event, ensure_ascii=False, default=str) + '\n'
+
+
+# Columnas de texto que se leen directamente como categoría
+CSV_CATEGORY_COLUMNS = (
+    'Región', 'Puerto', 'Especie', 'Tipo de agente',
+    'Línea de elaboración', 'Nombre Planta', 'Línea de producción'
+)
+
+
+_SOURCE_FINGERPRINT: Optional[str] = None
+
+
+def _source_fingerprint() -> str:
+    """Hash del código fuente de los módulos de análisis (una vez por proceso)."""
+    global _SOURCE_FINGERPRINT
+    if _SOURCE_FINGERPRINT is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(here, 'fishery_*.py')) + [os.path.join(here, 'canonical_names.py')]):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _SOURCE_FINGERPRINT = digest.hexdigest()
+    return _SOURCE_FINGERPRINT
+
+
+def read_csv_fast(path: str) -> pd.DataFrame:
+    """
+    Lee un CSV de la base pesquera por el camino más rápido disponible.
+    
+    Usa el motor multihilo de pyarrow si está instalado; si no, el motor C
+    leyendo las columnas de texto como categoría (menos memoria y
+    normalización de nombres proporcional a los valores únicos).
+    
+    Args:
+        path: Ruta al CSV (UTF-8)
+        
+    Returns:
+        DataFrame con los mismos valores que pd.read_csv
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        header = pd.read_csv(path, encoding='utf-8', nrows=0).columns
+        dtype = {col: 'category' for col in header if col.strip() in CSV_CATEGORY_COLUMNS}
+        return pd.read_csv(path, encoding='utf-8', dtype=dtype)
+    
+    return pd.read_csv(path, encoding='utf-8', engine='pyarrow')
+
+
 # Función helper para cargar datos desde CSV
 def load_fishery_data(
     desembarque_path: str,
     produccion_path: str,
-    plantas_path: str
+    plantas_path: str,
+    fast: bool = False,
+    **options
 ) -> FisheryAnalytics:
     """
     Carga los 3 datasets desde archivos CSV y retorna una instancia de FisheryAnalytics.
@@ -1082,12 +3494,21 @@ def load_fishery_data(
         desembarque_path: Ruta al CSV de desembarques
         produccion_path: Ruta al CSV de producción
         plantas_path: Ruta al CSV de plantas
+        fast: Si es True, usa read_csv_fast en lugar de pd.read_csv
+        **options: Opciones del constructor (compact, canonical_names_path, ...)
         
     Returns:
         Instancia de FisheryAnalytics lista para usar
     """
-    df_desembarque = pd.read_csv(desembarque_path, encoding='utf-8')
-    df_produccion = pd.read_csv(produccion_path, encoding='utf-8')
-    df_plantas = pd.read_csv(plantas_path, encoding='utf-8')
+    read = read_csv_fast if fast else (lambda path: pd.read_csv(path, encoding='utf-8'))
+    df_desembarque = read(desembarque_path)
+    df_produccion = read(produccion_path)
+    df_plantas = read(plantas_path)
     
-    return FisheryAnalytics(df_desembarque, df_produccion, df_plantas)
+    return FisheryAnalytics(df_desembarque, df_produccion, df_plantas, **options)
+
+
+if __name__ == '__main__':
+    # python -m fishery_analytics export ... (ver fishery_export.py)
+    from fishery_export import main
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Detección vectorizada de anomalías en series mensuales de desembarques.
+
+Para cada serie (Región×Puerto×Especie) se estima un perfil estacional
+robusto (mediana de cada mes calendario entre años) y se calcula el z-score
+robusto del residuo con la desviación absoluta mediana (MAD). Se trabaja en
+escala log1p: los desembarques varían en órdenes de magnitud y las
+variaciones relevantes son multiplicativas (una caída a cero también se
+detecta). Todas las series se procesan a la vez sobre el arreglo
+[series, años, 12] de MonthlyPanel, sin bucles en Python por serie.
+"""
+
+import warnings
+from typing import Dict
+
+import numpy as np
+
+from fishery_series import MonthlyPanel
+
+
+# Constante de consistencia de la MAD con la desviación estándar normal
+MAD_SCALE = 1.4826
+
+# Constante de la desviación absoluta media como estimador de sigma (respaldo si MAD = 0)
+MEAN_AD_SCALE = 1.2533
+
+
+class AnomalyScores:
+    """
+    Z-scores robustos de todos los meses de todas las series de un panel.
+
+    Los meses anteriores al primer desembarque y posteriores al último de
+    cada serie no se evalúan (la serie aún no existía o dejó de reportar).
+    Las series con menos de `min_active_months` meses con desembarques, o
+    activas en menos de `min_active_share` de su tramo (series
+    intermitentes, cuyo perfil mediano es 0), no se evalúan.
+
+    Attributes:
+        panel: Panel de origen
+        expected: Perfil estacional en toneladas por [serie, mes-1]
+        z: Z-score robusto por [serie, mes del calendario] (NaN = no evaluado)
+        evaluated: Máscara de series evaluadas
+    """
+
+    def __init__(self, panel: MonthlyPanel, min_active_months: int = 12, min_active_share: float = 0.5):
+        """
+        Calcula los puntajes.
+
+        Args:
+            panel: Panel de series mensuales
+            min_active_months: Mínimo de meses con desembarques para evaluar una serie
+            min_active_share: Mínima proporción de meses con desembarques dentro del tramo
+        """
+        self.panel = panel
+        values = panel.values
+        n_series, n_years, _ = values.shape
+        if values.size == 0:
+            # Sin series o sin años con datos: nada que evaluar
+            self.evaluated = np.zeros(n_series, dtype=bool)
+            self.expected = np.zeros((n_series, 12))
+            self.z = np.full((n_series, n_years * 12), np.nan)
+            return
+        flat = values.reshape(n_series, -1)
+        n_periods = flat.shape[1]
+
+        # Tramo activo de cada serie: del primer al último mes con desembarques
+        active = panel.rows.reshape(n_series, -1) > 0
+        first = np.argmax(active, axis=1)
+        last = n_periods - 1 - np.argmax(active[:, ::-1], axis=1)
+        t = np.arange(n_periods)
+        in_span = (t >= first[:, None]) & (t <= last[:, None])
+        n_active = active.sum(axis=1)
+        self.evaluated = (n_active >= min_active_months) & (n_active >= min_active_share * (last - first + 1))
+        in_span &= self.evaluated[:, None]
+
+        observed = np.where(in_span, np.log1p(np.maximum(flat, 0)), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # meses/series sin datos -> NaN
+
+            # Perfil estacional: mediana de cada mes calendario entre años
+            profile = np.nanmedian(observed.reshape(n_series, n_years, 12), axis=1)
+            residual = observed - np.tile(profile, n_years)
+
+            # Z-score robusto: (r - mediana) / (1.4826 · MAD), con respaldo si MAD = 0
+            center = np.nanmedian(residual, axis=1, keepdims=True)
+            deviation = np.abs(residual - center)
+            scale = MAD_SCALE * np.nanmedian(deviation, axis=1, keepdims=True)
+            fallback = MEAN_AD_SCALE * np.nanmean(deviation, axis=1, keepdims=True)
+            scale = np.where(scale > 0, scale, fallback)
+
+            self.expected = np.expm1(profile)
+            self.z = np.where(scale > 0, (residual - center) / scale, np.where(np.isnan(residual), np.nan, 0.0))
+
+    def flagged(self, threshold: float) -> Dict[str, np.ndarray]:
+        """
+        Puntos con |z| > threshold.
+
+        Returns:
+            Dict con arreglos paralelos 'series', 'periodo', 'z'
+        """
+        with np.errstate(invalid='ignore'):
+            series, period = np.nonzero(np.abs(self.z) > threshold)
+        return {'series': series, 'periodo': period, 'z': self.z[series, period]}
@@ -0,0 +1,98 @@
+"""
+Resultados de FisheryAnalytics en formato Apache Arrow (requiere pyarrow).
+
+La tabla 'data' de un resultado se convierte columna a columna desde el
+DataFrame (sin pasar por una lista de diccionarios) a un RecordBatch; el
+resto del resultado (success, analysis_type, metadata, summary o error)
+viaja como JSON en la metadata del esquema, bajo ARROW_METADATA_KEY. En
+formato IPC (stream) cualquier lector Arrow (pyarrow, apache-arrow en
+Node o en el navegador) obtiene las columnas sin conversión por fila.
+
+Uso:
+    ipc = analytics.get_top_ports(year=2024, output_format='arrow')
+    result = read_result(ipc)          # mismo dict que get_top_ports()
+"""
+
+import json
+from typing import Any, Dict, Union
+
+import pandas as pd
+
+from fishery_service import json_default
+
+
+# Clave de los campos del resultado (todo excepto 'data') en la metadata del esquema
+ARROW_METADATA_KEY = b'fishery_analytics'
+
+# Formatos de salida de los métodos get_*
+OUTPUT_FORMATS = ('dict', 'arrow', 'record_batch')
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("Los formatos Arrow requieren pyarrow (pip install pyarrow)") from exc
+    return pa
+
+
+def validate_output_format(output_format: str):
+    """Lanza ValueError si output_format no es uno de OUTPUT_FORMATS."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format debe ser uno de {OUTPUT_FORMATS}")
+
+
+def to_record_batch(result: Dict[str, Any]):
+    """
+    Convierte un resultado (con 'data' como DataFrame o lista de registros) a RecordBatch.
+
+    Las columnas numéricas se copian sin conversión por fila; los nulos de
+    pandas (NaN/None/NaT) quedan como nulos de Arrow.
+    """
+    pa = _pyarrow()
+    data = result.get('data')
+    frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data or [])
+
+    header = {key: value for key, value in result.items() if key != 'data'}
+    metadata = {ARROW_METADATA_KEY: json.dumps(header, ensure_ascii=False, default=json_default).encode('utf-8')}
+    batch = pa.RecordBatch.from_pandas(frame, preserve_index=False)
+    return batch.replace_schema_metadata(metadata)
+
+
+def to_ipc(batch) -> bytes:
+    """Serializa un RecordBatch como stream Arrow IPC."""
+    pa = _pyarrow()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def format_result(result: Dict[str, Any], output_format: str) -> Union[bytes, Any]:
+    """Resultado en formato 'arrow' (bytes IPC) o 'record_batch'."""
+    validate_output_format(output_format)
+    batch = to_record_batch(result)
+    return batch if output_format == 'record_batch' else to_ipc(batch)
+
+
+def result_header(schema) -> Dict[str, Any]:
+    """Campos del resultado guardados en la metadata de un esquema Arrow."""
+    metadata = schema.metadata or {}
+    if ARROW_METADATA_KEY not in metadata:
+        raise ValueError('El esquema no contiene un resultado de FisheryAnalytics')
+    return json.loads(metadata[ARROW_METADATA_KEY].decode('utf-8'))
+
+
+def read_result(source) -> Dict[str, Any]:
+    """
+    Reconstruye el dict de get_* desde bytes IPC o un RecordBatch.
+
+    Útil para tests y para consumidores Python que necesitan registros; quien
+    pueda trabajar por columnas debería usar la tabla Arrow directamente.
+    """
+    pa = _pyarrow()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        table = pa.ipc.open_stream(pa.py_buffer(source)).read_all()
+    else:
+        table = source
+    return {**result_header(table.schema), 'data': table.to_pylist()}
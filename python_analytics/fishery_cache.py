@@ -0,0 +1,186 @@
+"""
+Caché persistente de resultados, direccionada por contenido (SQLite).
+
+Cada resultado se guarda bajo una clave que combina la huella del
+contenido de los datos (ver FisheryAnalytics.content_fingerprint), el
+nombre del análisis y sus parámetros normalizados. Como la clave no depende
+del proceso ni del archivo de origen, un worker reiniciado o recién creado
+que carga la misma versión de los datos encuentra de inmediato los
+resultados ya calculados por cualquier otro.
+
+Los resultados se guardan como JSON comprimido con zlib. Con max_bytes se
+limita el tamaño total: al excederlo se eliminan las entradas usadas hace
+más tiempo (LRU). SQLite en modo WAL permite lectores y escritores
+concurrentes de varios procesos. Solo usa la biblioteca estándar.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from fishery_service import json_default
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    encoding TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+class ResultCache:
+    """
+    Caché de resultados en un archivo SQLite, con límite de tamaño LRU.
+
+    Es segura para varios hilos (una conexión protegida por un lock) y para
+    varios procesos sobre el mismo archivo (bloqueo de SQLite; tras un fork
+    el proceso hijo abre su propia conexión).
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, compress: bool = True):
+        """
+        Args:
+            path: Archivo SQLite (se crea si no existe)
+            max_bytes: Tamaño máximo de los resultados guardados (None = sin límite)
+            compress: Comprime los resultados con zlib
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes debe ser no negativo")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._pid = None
+        self._db = None
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión del proceso actual (una conexión SQLite no debe cruzar un fork)."""
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+        return self._db
+
+    @staticmethod
+    def key(analysis_type: str, params: Dict[str, Any], dataset_id: str) -> str:
+        """Clave del resultado (parámetros ya normalizados)."""
+        payload = json.dumps(
+            {'analysis': analysis_type, 'dataset': dataset_id, 'params': params},
+            sort_keys=True, ensure_ascii=False, default=json_default
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, analysis_type: str, params: Dict[str, Any], dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna el resultado guardado (y lo marca como usado) o None."""
+        key = self.key(analysis_type, params, dataset_id)
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT encoding, payload FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                'UPDATE results SET last_access = ?, hits = hits + 1 WHERE key = ?', (time.time(), key)
+            )
+            self.hits += 1
+
+        encoding, payload = row
+        if encoding == 'zlib':
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
+
+    def put(self, analysis_type: str, params: Dict[str, Any], dataset_id: str, result: Dict[str, Any]) -> int:
+        """
+        Guarda un resultado y aplica el límite de tamaño.
+
+        Returns:
+            Bytes guardados (0 si el resultado solo no cabe en max_bytes)
+        """
+        payload = json.dumps(result, ensure_ascii=False, default=json_default).encode('utf-8')
+        encoding = 'json'
+        if self.compress:
+            payload, encoding = zlib.compress(payload, 6), 'zlib'
+        if self.max_bytes is not None and len(payload) > self.max_bytes:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results '
+                '(key, analysis, dataset, encoding, payload, size, created, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.key(analysis_type, params, dataset_id), analysis_type, dataset_id,
+                 encoding, payload, len(payload), now, now)
+            )
+            self._prune()
+        return len(payload)
+
+    def _prune(self):
+        """Elimina las entradas menos usadas recientemente hasta cumplir max_bytes."""
+        if self.max_bytes is None:
+            return
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale = []
+        for key, size in self._connection.execute('SELECT key, size FROM results ORDER BY last_access'):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany('DELETE FROM results WHERE key = ?', stale)
+        self.evictions += len(stale)
+
+    def clear(self, dataset_id: Optional[str] = None):
+        """Elimina todas las entradas (o solo las de una versión de los datos)."""
+        with self._lock:
+            if dataset_id is None:
+                self._connection.execute('DELETE FROM results')
+            else:
+                self._connection.execute('DELETE FROM results WHERE dataset = ?', (dataset_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Entradas, bytes y contadores de uso, para monitoreo."""
+        with self._lock:
+            entries, total = self._connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+            ).fetchone()
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db, self._pid = None, None
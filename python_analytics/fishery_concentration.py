@@ -0,0 +1,114 @@
+"""
+Métricas de concentración de desembarques para muchos grupos a la vez.
+
+Para una dimensión (Puerto, Especie o Tipo de agente) y una agrupación
+(p. ej. Año×Región) se arma una matriz densa [grupos, miembros] con las
+toneladas de cada miembro en cada grupo. Ordenando cada fila de mayor a
+menor, todas las métricas salen de operaciones sobre la matriz completa:
+
+- HHI: suma de participaciones al cuadrado, en escala 0-10.000
+- CRn: participación acumulada de los n mayores (cumsum de la fila ordenada)
+- Gini: desigualdad entre los miembros con toneladas > 0 (0 = todos iguales)
+
+Las toneladas netas negativas de un miembro se tratan como 0.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Umbral de HHI de mercado altamente concentrado (guías de fusiones DOJ/FTC)
+HHI_HIGH = 2500
+
+# Tamaños de CRn reportados
+CONCENTRATION_RATIOS = (4, 10)
+
+
+def share_matrix(
+    df: pd.DataFrame,
+    group_keys: Sequence[str],
+    member_column: str,
+    value_column: str = 'Toneladas'
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Toneladas por [grupo, miembro].
+
+    Args:
+        df: Desembarques (toneladas decodificadas)
+        group_keys: Columnas que definen cada grupo (pueden ser ninguna)
+        member_column: Columna cuyos valores compiten dentro del grupo
+        value_column: Columna numérica a acumular
+
+    Returns:
+        Tupla (claves de cada grupo como DataFrame, matriz [grupos, miembros],
+        valores de los miembros); se omiten filas con claves o miembro nulos
+    """
+    member_codes, members = pd.factorize(df[member_column], sort=True)
+    valid = member_codes >= 0
+
+    # Código de grupo de base mixta a partir de las claves
+    group_code = np.zeros(len(df), dtype=np.int64)
+    uniques = []
+    for column in group_keys:
+        codes, values = pd.factorize(df[column], sort=True)
+        group_code = group_code * max(len(values), 1) + codes
+        valid &= codes >= 0
+        uniques.append(np.asarray(values, dtype=object))
+
+    present, group_idx = np.unique(group_code[valid], return_inverse=True)
+    keys = pd.DataFrame(index=range(len(present)))
+    remainder = present
+    for column, values in reversed(list(zip(group_keys, uniques))):
+        remainder, codes = np.divmod(remainder, len(values))
+        keys[column] = values[codes]
+    keys = keys[list(group_keys)]
+
+    n_members = len(members)
+    values = pd.to_numeric(df[value_column], errors='coerce').to_numpy(dtype='float64')[valid]
+    matrix = np.bincount(
+        group_idx * n_members + member_codes[valid],
+        weights=np.nan_to_num(values, nan=0.0),
+        minlength=len(present) * n_members
+    ).reshape(len(present), n_members)
+    return keys, matrix, np.asarray(members, dtype=object)
+
+
+def concentration_metrics(matrix: np.ndarray, ratios: Sequence[int] = CONCENTRATION_RATIOS) -> Dict[str, np.ndarray]:
+    """
+    HHI, Gini y CRn de cada fila de una matriz [grupos, miembros].
+
+    Returns:
+        Dict de arreglos por grupo: 'total', 'participantes', 'hhi', 'gini',
+        'cr<n>' (en %), 'lider' (índice de columna) y 'participacion_lider' (%).
+        Los grupos sin toneladas tienen NaN en las métricas.
+    """
+    matrix = np.maximum(matrix, 0.0)
+    total = matrix.sum(axis=1)
+    participants = (matrix > 0).sum(axis=1)
+    n_members = matrix.shape[1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = matrix / total[:, None]
+        ordered = -np.sort(-shares, axis=1)
+        cumulative = np.cumsum(ordered, axis=1) if n_members else np.zeros_like(ordered)
+
+        metrics = {
+            'total': total,
+            'participantes': participants,
+            'hhi': (shares ** 2).sum(axis=1) * 10000,
+        }
+        for n in ratios:
+            metrics[f'cr{n}'] = (cumulative[:, min(n, n_members) - 1] * 100) if n_members else np.full(len(total), np.nan)
+
+        # Gini con la fórmula de rangos: posición ascendente i del j-ésimo mayor = n - j + 1
+        rank = np.maximum(participants[:, None] - np.arange(n_members)[None, :], 0)
+        metrics['gini'] = 2 * (rank * ordered).sum(axis=1) / participants - (participants + 1) / participants
+
+    empty = total <= 0
+    for name in ('hhi', 'gini', *(f'cr{n}' for n in ratios)):
+        metrics[name] = np.where(empty, np.nan, metrics[name])
+    metrics['lider'] = np.argmax(matrix, axis=1) if n_members else np.zeros(len(total), dtype=np.int64)
+    metrics['participacion_lider'] = np.where(empty, np.nan, ordered[:, 0] * 100 if n_members else np.nan)
+    return metrics
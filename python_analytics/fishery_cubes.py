@@ -0,0 +1,166 @@
+"""
+Cubos densos precomputados para análisis de FisheryAnalytics.
+
+SupplyCube alinea las claves Año, Especie y Región de desembarques y
+producción en un dominio entero común y acumula capturas y materia prima
+en matrices densas Año×Especie(×Región). Oferta vs demanda para cualquier
+rango de años y región se resuelve con cortes de arreglos y una resta, sin
+groupby ni merge en el momento de la consulta.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fishery_groupby import exact_sums, group_sums
+
+
+def _shared_domain(*series: pd.Series) -> np.ndarray:
+    """Valores únicos no nulos (ordenados) de varias series."""
+    uniques = [pd.unique(s.dropna()) for s in series if s is not None]
+    values = np.concatenate([np.asarray(u, dtype=object) for u in uniques]) if uniques else np.empty(0, dtype=object)
+    return np.unique(values) if len(values) else values
+
+
+def _encode(series: pd.Series, domain: np.ndarray) -> np.ndarray:
+    """
+    Código de cada fila en `domain` (-1 para nulos).
+
+    Se factoriza primero la serie, así la búsqueda en el dominio es
+    proporcional al número de valores únicos y no al de filas.
+    """
+    codes, uniques = pd.factorize(series)
+    lookup = np.searchsorted(domain, np.asarray(uniques, dtype=domain.dtype))
+    return np.where(codes >= 0, lookup[np.maximum(codes, 0)] if len(lookup) else -1, -1)
+
+
+class SupplyCube:
+    """
+    Capturas y materia prima por (Año, Especie, Región) como matrices densas.
+
+    Para cada dataset se guardan la suma por celda y el número de filas por
+    celda (para saber qué pares Año/Especie existen, igual que un groupby),
+    tanto con eje de región como ya totalizadas por región. Las filas sin
+    región quedan en una celda extra que solo cuenta en los totales.
+
+    Las sumas por celda y los totales por Año×Especie se calculan cada uno
+    desde las filas (group_sums), no sumando celdas: coinciden bit a bit con
+    groupby(['Año', 'Especie']).sum() de pandas sobre las mismas filas.
+    Varias etiquetas de región se combinan sumando sus celdas, lo que solo
+    conserva esa igualdad si las sumas son exactas (ver can_combine).
+    """
+
+    # Dataset -> columna de valor
+    VALUE_COLUMNS = {'capturas': 'Toneladas', 'materia_prima': 'Materia Prima'}
+
+    def __init__(self, df_desembarque: pd.DataFrame, df_produccion: pd.DataFrame):
+        """
+        Construye el cubo.
+
+        Args:
+            df_desembarque: Desembarques (normalizados, toneladas decodificadas)
+            df_produccion: Producción (normalizada, toneladas decodificadas)
+        """
+        frames = {'capturas': df_desembarque, 'materia_prima': df_produccion}
+
+        self.years = np.unique(np.concatenate([
+            frame['Año'].dropna().unique() for frame in frames.values()
+        ]))
+        self.species = _shared_domain(*(frame['Especie'] for frame in frames.values()))
+        self.regions = _shared_domain(*(frame.get('Región') for frame in frames.values()))
+        self._region_index = {region: i for i, region in enumerate(self.regions)}
+
+        shape = (len(self.years), len(self.species), len(self.regions) + 1)
+        self.sums: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, np.ndarray] = {}
+        self.total_sums: Dict[str, np.ndarray] = {}
+        self.total_counts: Dict[str, np.ndarray] = {}
+        self.filterable: Dict[str, bool] = {}
+        self.exact: Dict[str, bool] = {}
+
+        for name, frame in frames.items():
+            year_codes = np.searchsorted(self.years, frame['Año'].to_numpy())
+            year_valid = frame['Año'].notna().to_numpy()
+            species_codes = _encode(frame['Especie'], self.species)
+            self.filterable[name] = 'Región' in frame.columns
+            if self.filterable[name]:
+                region_codes = _encode(frame['Región'], self.regions)
+                region_codes = np.where(region_codes >= 0, region_codes, len(self.regions))
+            else:
+                region_codes = np.full(len(frame), len(self.regions))
+
+            # Mismas filas que agruparía groupby(['Año', 'Especie']): sin nulos en las claves
+            valid = year_valid & (species_codes >= 0)
+            cell = np.ravel_multi_index(
+                (year_codes[valid], species_codes[valid], region_codes[valid]), shape
+            )
+            total_cell = np.ravel_multi_index((year_codes[valid], species_codes[valid]), shape[:2])
+            values = pd.to_numeric(frame[self.VALUE_COLUMNS[name]], errors='coerce').to_numpy(dtype='float64')
+            values = values[valid]
+            exact = exact_sums(values)
+            self.exact[name] = exact
+
+            size = int(np.prod(shape))
+            counts = np.bincount(cell, minlength=size).astype(np.int32).reshape(shape)
+            self.sums[name] = group_sums(cell, values, size, exact).reshape(shape)
+            self.counts[name] = counts
+
+            # Totales por Año×Especie (consultas sin región: solo un corte)
+            self.total_sums[name] = group_sums(total_cell, values, size // shape[2], exact).reshape(shape[:2])
+            self.total_counts[name] = counts.sum(axis=2)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las matrices."""
+        arrays = [*self.sums.values(), *self.counts.values(), *self.total_sums.values(), *self.total_counts.values()]
+        return int(sum(array.nbytes for array in arrays))
+
+    def can_combine(self, regions: Optional[Sequence[str]]) -> bool:
+        """True si el corte de esas etiquetas de región coincide con groupby sobre sus filas."""
+        present = [region for region in regions or () if region in self._region_index]
+        return len(present) <= 1 or all(self.exact.values())
+
+    def _slice(self, name: str, year_mask: np.ndarray, regions: Optional[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sumas y conteos Año×Especie de un dataset para los años y etiquetas de región pedidos."""
+        if regions is None or not self.filterable[name]:
+            return self.total_sums[name][year_mask], self.total_counts[name][year_mask]
+
+        indices = [self._region_index[region] for region in regions if region in self._region_index]
+        sums = self.sums[name][year_mask][:, :, indices]
+        counts = self.counts[name][year_mask][:, :, indices]
+        return sums.sum(axis=2), counts.sum(axis=2)
+
+    def comparison(self, start_year, end_year, regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Capturas y materia prima por Año y Especie (pares con datos en alguno de los dos).
+
+        Args:
+            start_year: Año inicial (inclusive)
+            end_year: Año final (inclusive)
+            regions: Etiquetas de región (None = todas; ver can_combine)
+
+        Returns:
+            DataFrame con columnas Año, Especie, Capturas, Materia Prima,
+            ordenado por Año y Especie
+        """
+        year_mask = (self.years >= start_year) & (self.years <= end_year)
+        capturas, capturas_n = self._slice('capturas', year_mask, regions)
+        materia, materia_n = self._slice('materia_prima', year_mask, regions)
+
+        year_idx, species_idx = np.nonzero((capturas_n + materia_n) > 0)
+        return pd.DataFrame({
+            'Año': self.years[year_mask][year_idx],
+            'Especie': self.species[species_idx],
+            'Capturas': capturas[year_idx, species_idx],
+            'Materia Prima': materia[year_idx, species_idx],
+        })
+
+    def describe(self) -> Dict[str, int]:
+        """Resumen del cubo para diagnóstico."""
+        return {
+            'años': int(len(self.years)),
+            'especies': int(len(self.species)),
+            'regiones': int(len(self.regions)),
+            'bytes': self.nbytes,
+        }
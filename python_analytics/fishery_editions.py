@@ -0,0 +1,403 @@
+"""
+Ediciones versionadas de los datasets (Anuario Estadístico de SERNAPESCA).
+
+Cada edición del anuario revisa cifras históricas. EditionStore guarda la
+última edición completa y, para cada edición anterior, solo un delta
+inverso: las filas que la edición siguiente agregó o modificó (a eliminar)
+y las filas que tenía la edición anterior en su lugar (a restaurar). Las
+filas se identifican por sus columnas clave (para desembarques: Año, Mes,
+Región, Puerto, Especie, Tipo de agente) más el número de ocurrencia de la
+clave, así los registros repetidos también se versionan.
+
+- run(analysis, as_of=edición) materializa esa edición aplicando deltas a
+  la última y la analiza con FisheryAnalytics (se mantienen cargadas solo
+  las max_loaded ediciones usadas más recientemente).
+- changes()/diff() comparan dos ediciones recorriendo solo las claves que
+  tocan los deltas entre ellas, sin materializar ninguna de las dos.
+
+Uso:
+    store = EditionStore()
+    store.add_edition('2023', df_desembarque_2023, df_produccion_2023, df_plantas_2023)
+    store.add_edition('2024', df_desembarque_2024, df_produccion_2024, df_plantas_2024)
+    store.run('top_ports', as_of='2023', year=2020)
+    store.diff('2023', '2024', by=['Año', 'Región'])
+"""
+
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+
+
+# Columnas que identifican una fila en cada dataset (las que existan); el
+# resto de las columnas son valores que una edición puede revisar
+KEY_COLUMNS = {
+    'desembarque': ('Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente'),
+    'produccion': ('Año', 'Mes', 'Región', 'Especie', 'Línea de elaboración'),
+    'plantas': ('Año', 'Región', 'Nombre Planta', 'Línea de producción'),
+}
+
+# Columna de valor de cada dataset que resume diff()
+VALUE_COLUMNS = {'desembarque': 'Toneladas', 'produccion': 'Producción'}
+
+# Versión del formato de save()/load()
+STORE_VERSION = 1
+
+
+def row_keys(df: pd.DataFrame, keys: Sequence[str]) -> np.ndarray:
+    """
+    Clave uint64 de cada fila: hash de las columnas clave + ocurrencia.
+
+    La ocurrencia numera las filas que repiten la misma clave (en el orden
+    del DataFrame), de modo que la clave de cada fila es única. Los nulos
+    de las columnas clave forman parte de la clave. Si una edición elimina
+    un registro repetido, los siguientes con la misma clave cambian de
+    ocurrencia y aparecen como modificados (las sumas no se ven afectadas).
+    """
+    key_hash = pd.util.hash_pandas_object(df[list(keys)], index=False) if keys else pd.Series(
+        np.zeros(len(df), dtype=np.uint64)
+    )
+    occurrence = key_hash.groupby(key_hash.to_numpy()).cumcount()
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({'clave': key_hash.to_numpy(), 'ocurrencia': occurrence.to_numpy()}), index=False
+    ).to_numpy()
+
+
+def _changed_rows(before: pd.DataFrame, after: pd.DataFrame) -> np.ndarray:
+    """Claves presentes en ambos DataFrames (alineados por índice) cuyas filas difieren."""
+    common = before.index.intersection(after.index)
+    columns = before.columns.union(after.columns)
+    left = before.reindex(index=common, columns=columns)
+    right = after.reindex(index=common, columns=columns)
+    differs = np.zeros(len(common), dtype=bool)
+    for column in columns:
+        a, b = left[column], right[column]
+        if not (pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b)):
+            a, b = a.astype(object), b.astype(object)  # categorías distintas no se comparan directamente
+        differs |= ~((a.to_numpy() == b.to_numpy()) | (a.isna() & b.isna()).to_numpy())
+    return common[differs].to_numpy()
+
+
+class EditionStore:
+    """
+    Ediciones de los 3 datasets: la última completa y deltas inversos hacia atrás.
+
+    Los DataFrames se guardan normalizados por FisheryAnalytics (nombres de
+    columnas y valores canónicos), de modo que las diferencias de escritura
+    entre ediciones no aparecen como cambios.
+    """
+
+    DATASETS = ('desembarque', 'produccion', 'plantas')
+
+    def __init__(self, max_loaded: int = 1, **options):
+        """
+        Args:
+            max_loaded: Ediciones materializadas (instancias de FisheryAnalytics)
+                que se mantienen en memoria; las menos usadas se descartan
+            **options: Opciones del constructor de FisheryAnalytics para cada
+                edición (compact, engine, canonical_names_path, result_cache, ...)
+        """
+        if max_loaded < 1:
+            raise ValueError("max_loaded debe ser al menos 1")
+        self.max_loaded = max_loaded
+        self.options = options
+        self.editions: List[str] = []
+        self._latest: Dict[str, pd.DataFrame] = {}
+        # _deltas[i][dataset] = (claves a eliminar, filas a restaurar) para pasar de la edición i + 1 a la i
+        self._deltas: List[Dict[str, Tuple[np.ndarray, pd.DataFrame]]] = []
+        self._loaded: 'OrderedDict[str, FisheryAnalytics]' = OrderedDict()
+
+    def _position(self, edition: Optional[str]) -> int:
+        if not self.editions:
+            raise ValueError("El almacén no tiene ediciones")
+        if edition is None:
+            return len(self.editions) - 1
+        if edition not in self.editions:
+            raise ValueError(f"Edición desconocida: {edition!r} (disponibles: {self.editions})")
+        return self.editions.index(edition)
+
+    def add_edition(
+        self,
+        name: str,
+        df_desembarque: pd.DataFrame,
+        df_produccion: pd.DataFrame,
+        df_plantas: pd.DataFrame
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Agrega una edición posterior a las existentes.
+
+        La edición anterior pasa a guardarse como delta contra la nueva.
+
+        Returns:
+            Dict dataset -> {'agregadas', 'modificadas', 'eliminadas'} respecto
+            de la edición anterior (todas agregadas si es la primera)
+        """
+        if name in self.editions:
+            raise ValueError(f"La edición {name!r} ya existe")
+
+        analytics = FisheryAnalytics(df_desembarque, df_produccion, df_plantas, **self.options)
+        frames = {dataset: analytics._decoded(df) for dataset, df in analytics._frames().items()}
+        incoming = {}
+        for dataset, df in frames.items():
+            keys = [column for column in KEY_COLUMNS[dataset] if column in df.columns]
+            incoming[dataset] = df.set_axis(pd.Index(row_keys(df, keys), name='clave'), axis=0)
+
+        summary = {}
+        delta = {}
+        for dataset, after in incoming.items():
+            before = self._latest.get(dataset)
+            if before is None:
+                summary[dataset] = {'agregadas': len(after), 'modificadas': 0, 'eliminadas': 0}
+                continue
+            added = after.index.difference(before.index).to_numpy()
+            removed = before.index.difference(after.index).to_numpy()
+            modified = _changed_rows(before, after)
+            restore = before.loc[np.concatenate([modified, removed])] if len(modified) or len(removed) else before.iloc[:0]
+            delta[dataset] = (np.concatenate([added, modified]), restore)
+            summary[dataset] = {'agregadas': len(added), 'modificadas': len(modified), 'eliminadas': len(removed)}
+
+        if self._latest:
+            self._deltas.append(delta)
+        self._latest = incoming
+        self.editions.append(name)
+        self._remember(name, analytics)
+        return summary
+
+    def _remember(self, edition: str, analytics: FisheryAnalytics):
+        self._loaded[edition] = analytics
+        self._loaded.move_to_end(edition)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+
+    def frames(self, edition: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Materializa los 3 DataFrames de una edición (None = la última).
+
+        Parte de la última edición y aplica los deltas inversos hasta llegar
+        a la pedida; el orden de las filas puede diferir del original.
+        """
+        position = self._position(edition)
+        frames = dict(self._latest)
+        for delta in reversed(self._deltas[position:]):
+            for dataset, (drop, restore) in delta.items():
+                df = frames[dataset]
+                frames[dataset] = pd.concat([df[~df.index.isin(drop)], restore])
+        return {dataset: df.reset_index(drop=True) for dataset, df in frames.items()}
+
+    def analytics(self, edition: Optional[str] = None) -> FisheryAnalytics:
+        """FisheryAnalytics de una edición (None = la última), materializada bajo demanda."""
+        name = self.editions[self._position(edition)]
+        if name in self._loaded:
+            self._loaded.move_to_end(name)
+            return self._loaded[name]
+        frames = self.frames(name)
+        analytics = FisheryAnalytics(frames['desembarque'], frames['produccion'], frames['plantas'], **self.options)
+        self._remember(name, analytics)
+        return analytics
+
+    def run(self, analysis_type: str, as_of: Optional[str] = None, **params) -> Any:
+        """
+        Ejecuta get_<analysis_type>(**params) sobre una edición (None = la última).
+
+        Los resultados dict agregan metadata['edition']; output_format='arrow'
+        o 'record_batch' retorna el resultado sin modificar.
+        """
+        if analysis_type not in FisheryAnalytics.ANALYSIS_TYPES:
+            raise ValueError(f"Análisis desconocido: {analysis_type!r}")
+        name = self.editions[self._position(as_of)]
+        result = getattr(self.analytics(name), f'get_{analysis_type}')(**params)
+        if isinstance(result, dict):
+            result = {**result, 'metadata': {**result.get('metadata', {}), 'edition': name}}
+        return result
+
+    def _states(self, positions: Sequence[int], dataset: str) -> Dict[int, pd.DataFrame]:
+        """
+        Filas de las claves tocadas entre las ediciones pedidas, en cada una de ellas.
+
+        Solo recorre los deltas entre la edición más antigua pedida y la
+        última; las filas no tocadas por esos deltas son iguales en todas.
+        """
+        oldest = min(positions)
+        deltas = [delta[dataset] for delta in self._deltas[oldest:] if dataset in delta]
+        touched = np.unique(np.concatenate(
+            [np.empty(0, dtype=np.uint64)] + [np.concatenate([drop, restore.index.to_numpy()]) for drop, restore in deltas]
+        ))
+
+        latest = self._latest[dataset]
+        state = latest[latest.index.isin(touched)]
+        states = {}
+        for position in range(len(self.editions) - 1, oldest - 1, -1):
+            if position in positions:
+                states[position] = state
+            if position > oldest:
+                drop, restore = self._deltas[position - 1].get(dataset, (np.empty(0, dtype=np.uint64), state.iloc[:0]))
+                state = pd.concat([state[~state.index.isin(drop)], restore])
+        return states
+
+    def changes(self, from_edition: str, to_edition: str, dataset: str = 'desembarque') -> pd.DataFrame:
+        """
+        Filas que cambian entre dos ediciones, sin materializarlas.
+
+        Returns:
+            DataFrame con las columnas clave, cada columna de valor como
+            <columna>_antes / <columna>_despues y 'cambio' ('agregada',
+            'modificada' o 'eliminada')
+        """
+        if dataset not in self.DATASETS:
+            raise ValueError(f"dataset debe ser uno de {self.DATASETS}")
+        start, end = self._position(from_edition), self._position(to_edition)
+        states = self._states([start, end], dataset)
+        before, after = states[start], states[end]
+
+        columns = before.columns.union(after.columns, sort=False)
+        keys = [column for column in KEY_COLUMNS[dataset] if column in columns]
+        values = [column for column in columns if column not in keys]
+
+        added = after.index.difference(before.index)
+        removed = before.index.difference(after.index)
+        modified = pd.Index(_changed_rows(before, after), dtype=added.dtype)
+        index = added.append(modified).append(removed)
+
+        result = pd.concat([
+            after.reindex(index=added.append(modified), columns=keys),
+            before.reindex(index=removed, columns=keys)
+        ])
+        for column in values:
+            result[f'{column}_antes'] = before[column].reindex(index).to_numpy() if column in before else np.nan
+            result[f'{column}_despues'] = after[column].reindex(index).to_numpy() if column in after else np.nan
+        result['cambio'] = ['agregada'] * len(added) + ['modificada'] * len(modified) + ['eliminada'] * len(removed)
+        return result.reset_index(drop=True)
+
+    def diff(
+        self,
+        from_edition: str,
+        to_edition: str,
+        by: Sequence[str] = ('Año',),
+        dataset: str = 'desembarque'
+    ) -> Dict[str, Any]:
+        """
+        Revisión del valor principal del dataset entre dos ediciones, por grupos.
+
+        Como los grupos no tocados no cambian, la diferencia por grupo se
+        calcula solo con las filas de changes() (sin materializar ediciones).
+
+        Args:
+            from_edition: Edición de referencia
+            to_edition: Edición revisada
+            by: Columnas clave que definen los grupos
+            dataset: 'desembarque' (Toneladas) o 'produccion' (Producción)
+
+        Returns:
+            Dict con estructura:
+            {
+                'success': True,
+                'data': [{'Año': 2020, 'diferencia': -12.5, 'agregadas': 1,
+                          'modificadas': 3, 'eliminadas': 0}],
+                'summary': {...}
+            }
+        """
+        if dataset not in VALUE_COLUMNS:
+            raise ValueError(f"dataset debe ser uno de {tuple(VALUE_COLUMNS)}")
+        unknown = [column for column in by if column not in KEY_COLUMNS[dataset]]
+        if unknown:
+            raise ValueError(f"Columnas de agrupación no clave: {unknown}")
+
+        value = VALUE_COLUMNS[dataset]
+        changes = self.changes(from_edition, to_edition, dataset)
+        changes['diferencia'] = (
+            pd.to_numeric(changes[f'{value}_despues'], errors='coerce').fillna(0)
+            - pd.to_numeric(changes[f'{value}_antes'], errors='coerce').fillna(0)
+        )
+        by = [column for column in by if column in changes.columns]
+
+        grouped = changes.assign(
+            agregadas=changes['cambio'].eq('agregada'),
+            modificadas=changes['cambio'].eq('modificada'),
+            eliminadas=changes['cambio'].eq('eliminada')
+        ).groupby(by, observed=True, dropna=False).agg(
+            diferencia=('diferencia', 'sum'),
+            agregadas=('agregadas', 'sum'),
+            modificadas=('modificadas', 'sum'),
+            eliminadas=('eliminadas', 'sum')
+        ).reset_index() if by else pd.DataFrame(columns=['diferencia', 'agregadas', 'modificadas', 'eliminadas'])
+        grouped['diferencia'] = grouped['diferencia'].astype(float).round(2)
+        grouped = grouped.sort_values('diferencia', key=np.abs, ascending=False, kind='stable')
+
+        by_change = changes['cambio'].value_counts()
+        return {
+            'success': True,
+            'analysis_type': 'edition_diff',
+            'metadata': {
+                'from_edition': from_edition,
+                'to_edition': to_edition,
+                'dataset': dataset,
+                'by': list(by),
+                'generated_at': datetime.now().isoformat()
+            },
+            'data': grouped.replace({np.nan: None}).to_dict('records'),
+            'summary': {
+                'filas_agregadas': int(by_change.get('agregada', 0)),
+                'filas_modificadas': int(by_change.get('modificada', 0)),
+                'filas_eliminadas': int(by_change.get('eliminada', 0)),
+                'diferencia_total': float(round(changes['diferencia'].sum(), 2)),
+            }
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """Ediciones, filas de cada delta y memoria del almacén vs copias completas."""
+        latest_bytes = sum(int(df.memory_usage(index=True, deep=True).sum()) for df in self._latest.values())
+        delta_bytes = sum(
+            int(drop.nbytes) + int(restore.memory_usage(index=True, deep=True).sum())
+            for delta in self._deltas for drop, restore in delta.values()
+        )
+        return {
+            'editions': list(self.editions),
+            'loaded': list(self._loaded),
+            'deltas': {
+                self.editions[i]: {dataset: len(drop) + len(restore) for dataset, (drop, restore) in delta.items()}
+                for i, delta in enumerate(self._deltas)
+            },
+            'bytes_almacen': latest_bytes + delta_bytes,
+            'bytes_copias_completas_estimado': latest_bytes * len(self.editions),
+        }
+
+    def save(self, path: str):
+        """
+        Guarda las ediciones (última completa + deltas) en un archivo pickle.
+
+        Args:
+            path: Archivo de destino (escritura atómica)
+        """
+        payload = {
+            'version': STORE_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'editions': self.editions,
+            'latest': self._latest,
+            'deltas': self._deltas,
+        }
+        tmp_path = f'{path}.tmp'
+        pd.to_pickle(payload, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **options) -> 'EditionStore':
+        """
+        Carga un almacén guardado con save (solo archivos de origen confiable: pickle).
+
+        Args:
+            path: Archivo generado por save
+            **options: max_loaded y opciones de FisheryAnalytics
+        """
+        payload = pd.read_pickle(path)
+        if not isinstance(payload, dict) or payload.get('version') != STORE_VERSION:
+            raise ValueError(f"Almacén de ediciones no soportado: {path}")
+        store = cls(**options)
+        store.editions = list(payload['editions'])
+        store._latest = payload['latest']
+        store._deltas = payload['deltas']
+        return store
@@ -0,0 +1,475 @@
+"""
+Exportador por lotes de FisheryAnalytics.
+
+Carga los datos una vez (CSV con el lector rápido o un snapshot), expande
+cada análisis seleccionado sobre una grilla de parámetros y ejecuta los
+trabajos en paralelo. Cada resultado se escribe directo a disco, lote a
+lote desde iter_analysis, en JSON, CSV, Parquet o Arrow IPC; al final se
+escribe manifest.json con los archivos, resúmenes y tiempos de cada trabajo.
+
+Uso:
+    python -m fishery_analytics export --data-dir "../Base de Datos" --output exports
+    python -m fishery_analytics export --snapshot datos.pkl --format parquet \\
+        --analysis top_ports --analysis agent_distribution \\
+        --grid year=2015:2024 --grid region=LAGOS,AYSEN --param top_n=20 --jobs 4
+
+Parquet y Arrow requieren pyarrow.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fishery_analytics import FisheryAnalytics, load_fishery_data
+from fishery_arrow import ARROW_METADATA_KEY
+from fishery_service import ANALYSIS_DEFAULTS, default_data_paths, json_default, normalize_params
+
+
+# Extensión de archivo por formato de salida
+FORMATS = {
+    'json': '.json',
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Filas por lote al escribir
+EXPORT_BATCH_SIZE = 5000
+
+Job = Tuple[str, Dict[str, Any]]
+
+
+# ============================================================================
+# TRABAJOS
+# ============================================================================
+
+def build_jobs(
+    analyses: Iterable[str],
+    grid: Optional[Dict[str, List[Any]]] = None,
+    fixed: Optional[Dict[str, Any]] = None
+) -> List[Job]:
+    """
+    Expande cada análisis sobre el producto cartesiano de la grilla.
+
+    Cada análisis solo recibe los parámetros de la grilla y fijos que acepta
+    su método get_*; p. ej. year=2020,2021 genera dos trabajos de top_ports
+    pero uno solo de agent_share.
+
+    Args:
+        analyses: Nombres de análisis (ver FisheryAnalytics.ANALYSIS_TYPES)
+        grid: Parámetro -> lista de valores
+        fixed: Parámetros con un único valor
+
+    Returns:
+        Lista de (análisis, parámetros)
+    """
+    grid = grid or {}
+    fixed = fixed or {}
+
+    jobs = []
+    for analysis_type in analyses:
+        accepted = ANALYSIS_DEFAULTS[analysis_type]
+        params = {key: value for key, value in fixed.items() if key in accepted}
+        keys = [key for key in grid if key in accepted]
+        for values in itertools.product(*(grid[key] for key in keys)):
+            jobs.append((analysis_type, {**params, **dict(zip(keys, values))}))
+    return jobs
+
+
+def job_filename(analysis_type: str, params: Dict[str, Any], output_format: str) -> str:
+    """Nombre de archivo estable para un trabajo, p. ej. top_ports__year-2020.parquet."""
+    parts = [analysis_type]
+    for key in sorted(params):
+        value = re.sub(r'[^0-9A-Za-z._-]+', '_', str(params[key])).strip('_')
+        parts.append(f'{key}-{value}')
+    return '__'.join(parts) + FORMATS[output_format]
+
+
+# ============================================================================
+# ESCRITORES EN STREAMING
+# ============================================================================
+#
+# Cada escritor consume los eventos de iter_analysis (metadata, batch...,
+# summary) y escribe a medida que llegan; retorna el número de filas.
+
+def write_json(events: Iterator[Dict[str, Any]], f, header: Dict[str, Any]) -> int:
+    """Escribe el mismo objeto que get_<análisis>, fila a fila."""
+    dumps = lambda value: json.dumps(value, ensure_ascii=False, default=json_default)
+
+    f.write('{"success": true, "analysis_type": %s, "metadata": %s, "data": [' % (
+        dumps(header['analysis_type']), dumps(header['metadata'])
+    ))
+    rows, summary = 0, {}
+    for event in events:
+        if event['type'] == 'summary':
+            summary = event['summary']
+            continue
+        for record in event['data']:
+            f.write((',\n' if rows else '\n') + dumps(record))
+            rows += 1
+    f.write('\n], "summary": %s}\n' % dumps(summary))
+    return rows
+
+
+def write_csv(events: Iterator[Dict[str, Any]], f, header: Dict[str, Any]) -> int:
+    """Escribe la tabla 'data' como CSV (metadata y summary van al manifest)."""
+    writer, rows = None, 0
+    for event in events:
+        if event['type'] != 'batch' or not event['data']:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(f, fieldnames=list(event['data'][0]))
+            writer.writeheader()
+        writer.writerows(event['data'])
+        rows += len(event['data'])
+    return rows
+
+
+def _arrow_writer(output_format: str):
+    """Retorna una función que escribe lotes en Parquet o Arrow IPC (requiere pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(f"El formato '{output_format}' requiere pyarrow (pip install pyarrow)") from exc
+
+    def write(events: Iterator[Dict[str, Any]], f, header: Dict[str, Any]) -> int:
+        metadata = {ARROW_METADATA_KEY: json.dumps(
+            {'analysis_type': header['analysis_type'], 'metadata': header['metadata']},
+            ensure_ascii=False, default=json_default
+        ).encode('utf-8')}
+
+        writer, schema, rows = None, None, 0
+        for event in events:
+            if event['type'] != 'batch' or not event['data']:
+                continue
+            if writer is None:
+                schema = pa.RecordBatch.from_pylist(event['data']).schema.with_metadata(metadata)
+                writer = pq.ParquetWriter(f, schema) if output_format == 'parquet' else pa.ipc.new_file(f, schema)
+            writer.write_batch(pa.RecordBatch.from_pylist(event['data'], schema=schema))
+            rows += len(event['data'])
+
+        if writer is None:
+            schema = pa.schema([], metadata=metadata)
+            writer = pq.ParquetWriter(f, schema) if output_format == 'parquet' else pa.ipc.new_file(f, schema)
+        writer.close()
+        return rows
+
+    return write
+
+
+def get_writer(output_format: str):
+    """Escritor en streaming para un formato de FORMATS."""
+    if output_format == 'json':
+        return write_json
+    if output_format == 'csv':
+        return write_csv
+    if output_format in ('parquet', 'arrow'):
+        return _arrow_writer(output_format)
+    raise ValueError(f"Formato desconocido: '{output_format}'")
+
+
+def run_job(
+    analytics: FisheryAnalytics,
+    job: Job,
+    output_dir: str,
+    output_format: str = 'json',
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo y escribe su resultado (escritura atómica).
+
+    Un error del trabajo (análisis que falla o excepción al calcular o
+    escribir) no se propaga: se informa en la entrada y el archivo temporal
+    se elimina, de modo que en output_dir solo quedan resultados completos.
+
+    Returns:
+        Entrada del manifest: archivo, filas, bytes, tiempos (ms) y resumen;
+        si el trabajo falla, status='error' y el mensaje, sin archivo
+    """
+    analysis_type, params = job
+    entry = {'analysis_type': analysis_type, 'params': params, 'format': output_format}
+    path = os.path.join(output_dir, job_filename(analysis_type, params, output_format))
+    tmp_path = f'{path}.tmp'
+    start = time.perf_counter()
+    try:
+        return _write_job(analytics, entry, path, tmp_path, output_format, batch_size)
+    except Exception as exc:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {
+            **entry,
+            'status': 'error',
+            'error': f'{type(exc).__name__}: {exc}',
+            'total_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+
+
+def _write_job(
+    analytics: FisheryAnalytics,
+    entry: Dict[str, Any],
+    path: str,
+    tmp_path: str,
+    output_format: str,
+    batch_size: int
+) -> Dict[str, Any]:
+    """Calcula y escribe un trabajo en tmp_path y lo publica en path (ver run_job)."""
+    analysis_type, params = entry['analysis_type'], entry['params']
+    writer = get_writer(output_format)
+
+    start = time.perf_counter()
+    events = analytics.iter_analysis(analysis_type, batch_size, **params)
+    header = next(events)
+    # Tiempo hasta el primer evento: en los análisis que se entregan por partes
+    # (supply_vs_demand) el cálculo sigue durante la escritura y cae en write_ms
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    if header['type'] == 'error':
+        return {**entry, 'status': 'error', 'error': header.get('error'), 'compute_ms': round(compute_ms, 2)}
+
+    # Capturar el resumen al pasar, sin retener las filas
+    summary = {}
+
+    def tracked():
+        for event in events:
+            if event['type'] == 'summary':
+                summary.update(event['summary'])
+            yield event
+
+    write_start = time.perf_counter()
+    mode, newline = ('wb', None) if output_format in ('parquet', 'arrow') else ('w', '')
+    with open(tmp_path, mode, encoding=None if 'b' in mode else 'utf-8', newline=newline) as f:
+        rows = writer(tracked(), f, header)
+    os.replace(tmp_path, path)
+    write_ms = (time.perf_counter() - write_start) * 1000
+
+    return {
+        **entry,
+        'status': 'ok',
+        'file': os.path.basename(path),
+        'rows': rows,
+        'bytes': os.path.getsize(path),
+        'compute_ms': round(compute_ms, 2),
+        'write_ms': round(write_ms, 2),
+        'total_ms': round(compute_ms + write_ms, 2),
+        'summary': summary,
+    }
+
+
+# ============================================================================
+# EJECUCIÓN EN PARALELO
+# ============================================================================
+
+# Instancia heredada por los procesos hijos (fork) en modo 'process'
+_WORKER_ANALYTICS: Optional[FisheryAnalytics] = None
+
+
+def _run_worker_job(job: Job, output_dir: str, output_format: str, batch_size: int) -> Dict[str, Any]:
+    return run_job(_WORKER_ANALYTICS, job, output_dir, output_format, batch_size)
+
+
+def _job_result(future, job: Job, output_format: str) -> Dict[str, Any]:
+    """Entrada del manifest de un trabajo en paralelo (incluye fallas del pool, p. ej. un proceso caído)."""
+    try:
+        return future.result()
+    except Exception as exc:
+        analysis_type, params = job
+        return {
+            'analysis_type': analysis_type, 'params': params, 'format': output_format,
+            'status': 'error', 'error': f'{type(exc).__name__}: {exc}',
+        }
+
+
+def _executor(workers: int, mode: str) -> Executor:
+    """Pool de hilos, o de procesos con fork (comparten los datos ya cargados)."""
+    if mode == 'process' and 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(workers)
+
+
+def run_export(
+    analytics: FisheryAnalytics,
+    jobs: List[Job],
+    output_dir: str,
+    output_format: str = 'json',
+    workers: int = 1,
+    mode: str = 'thread',
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Ejecuta los trabajos y escribe output_dir/manifest.json.
+
+    Args:
+        analytics: Instancia con los datos cargados
+        jobs: Trabajos de build_jobs
+        output_dir: Directorio de salida (se crea si no existe)
+        output_format: 'json', 'csv', 'parquet' o 'arrow'
+        workers: Trabajos simultáneos
+        mode: 'thread' o 'process' (procesos con fork; en plataformas sin
+            fork se usan hilos)
+        batch_size: Filas por lote al escribir
+
+    Returns:
+        Manifest con una entrada por trabajo, en el orden de jobs; un
+        trabajo que falla queda con status='error' sin detener los demás
+    """
+    global _WORKER_ANALYTICS
+
+    get_writer(output_format)  # Validar formato (y pyarrow) antes de lanzar trabajos
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    if workers <= 1:
+        entries = [run_job(analytics, job, output_dir, output_format, batch_size) for job in jobs]
+    else:
+        _WORKER_ANALYTICS = analytics
+        try:
+            with _executor(workers, mode) as pool:
+                futures = [
+                    pool.submit(_run_worker_job, job, output_dir, output_format, batch_size)
+                    for job in jobs
+                ]
+                entries = [
+                    _job_result(future, job, output_format) for future, job in zip(futures, jobs)
+                ]
+        finally:
+            _WORKER_ANALYTICS = None
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'format': output_format,
+        'workers': workers,
+        'mode': mode if workers > 1 else 'serial',
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        'jobs': entries,
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, default=json_default)
+    return manifest
+
+
+# ============================================================================
+# LÍNEA DE COMANDOS
+# ============================================================================
+
+def _parse_value(raw: str) -> Any:
+    """Interpreta números, null y booleanos; el resto queda como texto."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+def _parse_assignment(text: str) -> Tuple[str, str]:
+    if '=' not in text:
+        raise argparse.ArgumentTypeError(f"Valor inválido '{text}' (formato clave=valor)")
+    key, raw = text.split('=', 1)
+    return key.strip(), raw
+
+
+def _parse_grid_values(raw: str) -> List[Any]:
+    """'2015:2024' (rango inclusivo de enteros) o 'a,b,c'."""
+    match = re.fullmatch(r'(-?\d+):(-?\d+)', raw.strip())
+    if match:
+        low, high = int(match.group(1)), int(match.group(2))
+        return list(range(low, high + 1))
+    return [_parse_value(value.strip()) for value in raw.split(',')]
+
+
+def _load(args) -> FisheryAnalytics:
+    options = {'compact': args.compact, 'clean': args.clean, 'memory_budget': args.memory_budget,
+               'result_cache': args.cache}
+    if args.snapshot:
+        return FisheryAnalytics.from_snapshot(args.snapshot, **options)
+    paths = default_data_paths(args.data_dir)
+    return load_fishery_data(paths['desembarque'], paths['produccion'], paths['plantas'], fast=True, **options)
+
+
+def _print_report(manifest: Dict[str, Any], load_ms: float):
+    print(f"{'trabajo':<60} {'filas':>8} {'calculo_ms':>11} {'escritura_ms':>13}")
+    for entry in manifest['jobs']:
+        name = entry.get('file') or f"{entry['analysis_type']} {entry['params']}"
+        if entry['status'] == 'ok':
+            print(f"{name:<60} {entry['rows']:>8} {entry['compute_ms']:>11.1f} {entry['write_ms']:>13.1f}")
+        else:
+            print(f"{name:<60} ERROR: {entry['error']}")
+    failed = sum(entry['status'] != 'ok' for entry in manifest['jobs'])
+    print(f"carga: {load_ms:.1f} ms | exportación: {manifest['elapsed_ms']:.1f} ms | "
+          f"{len(manifest['jobs']) - failed} ok, {failed} con error")
+
+
+def main(argv=None) -> int:
+    """Punto de entrada de `python -m fishery_analytics`."""
+    parser = argparse.ArgumentParser(prog='python -m fishery_analytics', description='Herramientas de FisheryAnalytics')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help='Exporta análisis a disco')
+    source = export.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help="Directorio con la estructura de 'Base de Datos'")
+    source.add_argument('--snapshot', help='Snapshot generado con --save-snapshot')
+    export.add_argument('--save-snapshot', help='Guarda los datos cargados como snapshot')
+    export.add_argument('--compact', action='store_true', help='Usa el modo compacto')
+    export.add_argument('--clean', action='store_true', help='Elimina filas inválidas al cargar (ver data_quality_report)')
+    export.add_argument('--cache', help='Caché persistente de resultados (archivo SQLite, ver fishery_cache)')
+    export.add_argument('--memory-budget', help="Presupuesto de memoria (p. ej. 512MB) para datos y estructuras derivadas")
+    export.add_argument('--analysis', action='append', choices=FisheryAnalytics.ANALYSIS_TYPES,
+                        help='Análisis a exportar (repetible; default: todos)')
+    export.add_argument('--grid', action='append', type=_parse_assignment, default=[],
+                        help='Grilla de parámetros: year=2015:2024 o region=LAGOS,AYSEN (repetible)')
+    export.add_argument('--param', action='append', type=_parse_assignment, default=[],
+                        help='Parámetro fijo clave=valor (repetible)')
+    export.add_argument('--format', choices=sorted(FORMATS), default='json', help='Formato de salida')
+    export.add_argument('--output', default='exports', help='Directorio de salida')
+    export.add_argument('--jobs', type=int, default=1, help='Trabajos en paralelo')
+    export.add_argument('--executor', choices=('thread', 'process'), default='thread',
+                        help='Hilos o procesos (fork) para los trabajos en paralelo')
+    export.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help='Filas por lote al escribir')
+    args = parser.parse_args(argv)
+
+    analyses = args.analysis or list(FisheryAnalytics.ANALYSIS_TYPES)
+    grid = {key: _parse_grid_values(raw) for key, raw in args.grid}
+    fixed = {key: _parse_value(raw) for key, raw in args.param}
+
+    accepted = set().union(*(ANALYSIS_DEFAULTS[name] for name in analyses))
+    unknown = sorted((set(grid) | set(fixed)) - accepted)
+    if unknown:
+        parser.error(f"Parámetros no aceptados por los análisis seleccionados: {', '.join(unknown)}")
+
+    jobs = build_jobs(analyses, grid, fixed)
+    try:
+        for analysis_type, params in jobs:
+            normalize_params(analysis_type, params)
+        get_writer(args.format)
+    except (ValueError, ImportError) as exc:
+        parser.error(str(exc))
+
+    source_paths = [args.snapshot] if args.snapshot else list(default_data_paths(args.data_dir).values())
+    missing = [path for path in source_paths if not os.path.exists(path)]
+    if missing:
+        parser.error(f"No existe: {', '.join(missing)}")
+
+    load_start = time.perf_counter()
+    analytics = _load(args)
+    load_ms = (time.perf_counter() - load_start) * 1000
+    if args.save_snapshot:
+        analytics.save_snapshot(args.save_snapshot)
+
+    manifest = run_export(
+        analytics, jobs, args.output, args.format,
+        workers=args.jobs, mode=args.executor, batch_size=args.batch_size
+    )
+    _print_report(manifest, load_ms)
+    return 0 if all(entry['status'] == 'ok' for entry in manifest['jobs']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Pronósticos por lotes para series mensuales de capturas.
+
+Ajusta modelos estacionales simples a todas las series a la vez, como
+operaciones sobre matrices [series, meses]:
+
+- 'seasonal_naive': repite los últimos 12 meses observados.
+- 'exp_smoothing': Holt-Winters aditivo sin tendencia; los parámetros de
+  suavizamiento se eligen por serie en una grilla, recorriendo el tiempo una
+  sola vez para todas las series y todas las combinaciones de la grilla.
+- 'linear_seasonal': tendencia lineal + efectos mensuales por mínimos
+  cuadrados; la matriz de diseño es común, así que todas las series se
+  resuelven con una sola llamada a lstsq con múltiples lados derechos.
+
+Con 'auto' se elige, por serie, el modelo con menor error absoluto medio
+(MAE) al pronosticar los últimos 12 meses con el resto de la historia.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+# Longitud de la estación (meses)
+SEASON = 12
+
+# Grilla de parámetros (alpha: nivel, gamma: estacionalidad) de Holt-Winters
+SMOOTHING_GRID = tuple((alpha, gamma) for alpha in (0.1, 0.2, 0.4, 0.6) for gamma in (0.05, 0.2))
+
+# Meses más recientes usados por la regresión tendencia + estacionalidad
+LINEAR_WINDOW = 60
+
+
+class BatchForecaster:
+    """
+    Pronosticador de muchas series mensuales alineadas.
+
+    Attributes:
+        history: Matriz [series, meses] de valores observados (sin nulos)
+        first_month: Mes calendario (0-11) de la primera columna
+    """
+
+    MODELS = ('seasonal_naive', 'exp_smoothing', 'linear_seasonal')
+
+    def __init__(self, history: np.ndarray, first_month: int = 0):
+        """
+        Args:
+            history: Matriz [series, meses]; requiere al menos 12 meses
+            first_month: Mes calendario (0 = enero) de la primera columna
+        """
+        history = np.asarray(history, dtype='float64')
+        if history.ndim != 2 or history.shape[1] < SEASON:
+            raise ValueError(f"Se requiere una matriz [series, meses] con al menos {SEASON} meses")
+        self.history = history
+        self.first_month = first_month
+
+    # ------------------------------------------------------------------
+    # Modelos (cada uno retorna [series, horizon])
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _seasonal_naive(y: np.ndarray, first_month: int, horizon: int) -> np.ndarray:
+        last_season = y[:, -SEASON:]
+        return last_season[:, np.arange(horizon) % SEASON]
+
+    @staticmethod
+    def _exp_smoothing(y: np.ndarray, first_month: int, horizon: int) -> np.ndarray:
+        n_series, n_periods = y.shape
+        alpha = np.array([a for a, _ in SMOOTHING_GRID])[:, None]
+        gamma = np.array([g for _, g in SMOOTHING_GRID])[:, None]
+        n_grid = len(SMOOTHING_GRID)
+
+        # Estado inicial: nivel = media del primer año, estacionalidad = desvíos del primer año
+        level = np.broadcast_to(y[:, :SEASON].mean(axis=1), (n_grid, n_series)).copy()
+        season = np.zeros((n_grid, n_series, SEASON))
+        first = (first_month + np.arange(SEASON)) % SEASON
+        season[:, :, first] = (y[:, :SEASON] - y[:, :SEASON].mean(axis=1, keepdims=True))[None]
+
+        sse = np.zeros((n_grid, n_series))
+        for t in range(n_periods):
+            month = (first_month + t) % SEASON
+            observed = y[:, t]
+            if t >= SEASON:
+                sse += (observed - (level + season[:, :, month])) ** 2
+            new_level = alpha * (observed - season[:, :, month]) + (1 - alpha) * level
+            season[:, :, month] = gamma * (observed - new_level) + (1 - gamma) * season[:, :, month]
+            level = new_level
+
+        best = np.argmin(sse, axis=0)
+        series = np.arange(n_series)
+        future_months = (first_month + n_periods + np.arange(horizon)) % SEASON
+        return level[best, series][:, None] + season[best, series][:, future_months]
+
+    @staticmethod
+    def _linear_seasonal(y: np.ndarray, first_month: int, horizon: int) -> np.ndarray:
+        n_periods = y.shape[1]
+        window = min(n_periods, LINEAR_WINDOW)
+        start = n_periods - window
+
+        def design(t: np.ndarray) -> np.ndarray:
+            months = (first_month + t) % SEASON
+            dummies = (months[:, None] == np.arange(1, SEASON)[None, :]).astype('float64')
+            return np.column_stack([np.ones(len(t)), (t - start) / SEASON, dummies])
+
+        coefficients, *_ = np.linalg.lstsq(design(np.arange(start, n_periods)), y[:, start:].T, rcond=None)
+        return (design(np.arange(n_periods, n_periods + horizon)) @ coefficients).T
+
+    def predict(self, model: str, horizon: int, history: np.ndarray = None) -> np.ndarray:
+        """
+        Pronóstico [series, horizon] de un modelo (valores negativos se truncan a 0).
+
+        Args:
+            model: Uno de MODELS
+            horizon: Meses a pronosticar
+            history: Historia alternativa (default: self.history)
+        """
+        if model not in self.MODELS:
+            raise ValueError(f"Modelo desconocido: '{model}'")
+        y = self.history if history is None else history
+        return np.maximum(getattr(self, f'_{model}')(y, self.first_month, horizon), 0.0)
+
+    def validation_errors(self, models: Sequence[str] = MODELS) -> Dict[str, np.ndarray]:
+        """
+        MAE de cada modelo al pronosticar los últimos 12 meses con la historia previa.
+
+        Args:
+            models: Modelos a evaluar (default: todos)
+
+        Returns:
+            Dict modelo -> MAE por serie (NaN si la historia es menor a 24 meses)
+        """
+        n_series, n_periods = self.history.shape
+        if n_periods < 2 * SEASON:
+            return {model: np.full(n_series, np.nan) for model in models}
+
+        train, test = self.history[:, :-SEASON], self.history[:, -SEASON:]
+        return {
+            model: np.abs(self.predict(model, SEASON, train) - test).mean(axis=1)
+            for model in models
+        }
+
+    def forecast(self, horizon: int = 12, model: str = 'auto') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pronostica todas las series.
+
+        Args:
+            horizon: Meses a pronosticar
+            model: Uno de MODELS, o 'auto' (mejor MAE de validación por serie)
+
+        Returns:
+            Tupla (pronóstico [series, horizon], índice del modelo en MODELS por
+            serie, MAE de validación del modelo usado por serie)
+        """
+        if horizon < 1:
+            raise ValueError("horizon debe ser un entero positivo")
+
+        n_series = self.history.shape[0]
+
+        if model != 'auto':
+            if model not in self.MODELS:
+                raise ValueError(f"Modelo desconocido: '{model}'")
+            chosen = np.full(n_series, self.MODELS.index(model))
+            return self.predict(model, horizon), chosen, self.validation_errors([model])[model]
+
+        errors = self.validation_errors()
+        error_matrix = np.vstack([errors[name] for name in self.MODELS])
+        if np.isnan(error_matrix).all():
+            chosen = np.zeros(n_series, dtype=np.int64)
+        else:
+            chosen = np.argmin(np.where(np.isnan(error_matrix), np.inf, error_matrix), axis=0)
+
+        forecast = np.zeros((n_series, horizon))
+        for index in np.unique(chosen):
+            rows = chosen == index
+            forecast[rows] = self.predict(self.MODELS[index], horizon, self.history[rows])
+
+        return forecast, chosen, error_matrix[chosen, np.arange(n_series)]
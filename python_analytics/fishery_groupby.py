@@ -0,0 +1,414 @@
+"""
+Kernel de agregación por grupos sobre dimensiones codificadas como enteros.
+
+CodedTable factoriza una sola vez las columnas de dimensión de un dataset
+(Año, Región, Puerto, ...) a códigos enteros. Cada agregación combina los
+códigos de las claves pedidas en un código de base mixta y acumula sumas,
+conteos y conteos distintos con np.bincount, sin hashear texto ni crear
+objetos por fila.
+
+Las sumas son idénticas, bit a bit, a las de groupby(...).sum() y
+Series.sum() de pandas: si todos los valores son múltiplos de 1/1024 y su
+magnitud total es acotada, cada suma parcial en float64 es exacta y el orden
+no importa (np.bincount); si no, se suma con el mismo algoritmo de pandas
+(suma compensada, en el orden original de las filas, ver group_sums). Los filtros por igualdad (año, región) son comparaciones
+de enteros sobre los mismos códigos.
+
+Los grupos salen ordenados por sus claves y sin filas con claves nulas
+(salvo dropna=False, que agrupa los nulos al final), igual que
+groupby(..., sort=True).
+
+collapse() convierte una tabla en un tensor disperso en formato COO: una
+fila por combinación presente de las dimensiones (celda no vacía), con las
+sumas y los conteos de valores de sus filas. La misma API de mask/aggregate
+corta y reduce el tensor a lo largo de cualquier eje, y la memoria queda
+proporcional al número de celdas no vacías y no al de filas. Solo se
+colapsan tablas cuyas sumas son exactas (sumar por celda no cambia el
+resultado); en otro caso collapse() retorna la tabla sin cambios.
+
+Con decimal=True, las columnas con hasta 6 decimales (p. ej. toneladas con
+3 decimales = kilogramos) se guardan como unidades enteras de 10**-d y se
+suman exactamente, así que también se colapsan. Cada suma es entonces el
+float64 más cercano a la suma decimal exacta, que puede diferir en el último
+bit de la suma en float64 de pandas.
+"""
+
+import copy
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Máximo de celdas para acumular directamente sobre el código combinado;
+# con más celdas se comprimen primero los códigos presentes (np.unique)
+DENSE_CELLS = 1 << 22
+
+# Límite del código combinado antes de comprimir (evita desbordar int64)
+_MAX_CODE = 1 << 62
+
+# Valores múltiplos de 1/EXACT_SCALE (potencia de 2) se suman sin error de redondeo
+EXACT_SCALE = 1024
+
+# Máximo de decimales de las columnas que se acumulan como unidades enteras (decimal=True)
+MAX_DECIMALS = 6
+
+
+def exact_sums(values: np.ndarray) -> bool:
+    """
+    True si cualquier suma de los valores no nulos es exacta en float64.
+
+    Se cumple cuando todos son múltiplos de 1/EXACT_SCALE y la suma de sus
+    magnitudes escaladas es menor que 2**53: entonces el resultado no depende
+    del orden ni del algoritmo de suma.
+    """
+    scaled = values[~np.isnan(values)] * EXACT_SCALE
+    return bool(
+        np.isfinite(scaled).all() and np.array_equal(np.round(scaled), scaled)
+        and np.abs(scaled).sum() < 2 ** 53
+    )
+
+
+def decimal_scale(values: np.ndarray) -> Optional[int]:
+    """
+    Menor potencia 10**d (d <= MAX_DECIMALS) que convierte los valores en enteros.
+
+    Returns:
+        La escala si cada valor no nulo se recupera exactamente al dividir sus
+        unidades enteras por ella y la suma de sus magnitudes escaladas es
+        menor que 2**53 (toda suma de unidades es exacta en float64); None si no
+    """
+    present = values[~np.isnan(values)]
+    if not np.isfinite(present).all():
+        return None
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        units = np.round(present * scale)
+        if np.array_equal(units / scale, present):
+            return scale if np.abs(units).sum() < 2 ** 53 else None
+    return None
+
+
+def group_sums(group: np.ndarray, values: np.ndarray, n_groups: int, exact: Optional[bool] = None) -> np.ndarray:
+    """
+    Suma de values por grupo, idéntica a groupby(group).sum() de pandas.
+
+    Args:
+        group: Grupo (0..n_groups-1) de cada fila, en el orden de las filas
+        values: Valores float64 de cada fila (NaN se omite)
+        n_groups: Número de grupos
+        exact: Resultado de exact_sums(values) si ya se conoce
+
+    Returns:
+        Arreglo de n_groups sumas (0.0 para grupos sin valores)
+    """
+    if exact is None:
+        exact = exact_sums(values)
+    if exact:
+        return np.bincount(group, weights=np.nan_to_num(values, nan=0.0), minlength=n_groups)
+    sums = pd.Series(values).groupby(group, sort=False).sum()
+    result = np.zeros(n_groups)
+    result[sums.index.to_numpy()] = sums.to_numpy()
+    return result
+
+
+def column_sum(values: np.ndarray) -> float:
+    """Suma de una columna idéntica a Series.sum() de pandas (NaN cuenta como 0)."""
+    return float(np.nan_to_num(values, nan=0.0).sum())
+
+
+class CodedTable:
+    """
+    Dimensiones de un DataFrame como códigos enteros y valores como float64.
+
+    Los códigos son índices sobre los valores únicos ordenados de cada
+    dimensión (-1 para nulos). Las columnas numéricas se guardan tal cual
+    (con NaN) y se suman con group_sums, así que los resultados coinciden
+    con los de pandas sobre las mismas filas. Con decimal=True, las columnas
+    decimales se guardan como unidades enteras (ver decimal_scale).
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        dimensions: Sequence[str],
+        values: Sequence[str] = (),
+        decimal: bool = False
+    ):
+        """
+        Args:
+            df: DataFrame (toneladas decodificadas)
+            dimensions: Columnas a codificar (se omiten las que no existen)
+            values: Columnas numéricas a acumular (se omiten las que no existen)
+            decimal: Si es True, las columnas cuyas sumas no son exactas en
+                float64 pero tienen hasta MAX_DECIMALS decimales se acumulan
+                como unidades enteras (sumas exactas; la tabla se puede colapsar)
+        """
+        self.n_rows = len(df)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.uniques: Dict[str, np.ndarray] = {}
+        self._index: Dict[str, Dict[Any, int]] = {}
+        for column in dimensions:
+            if column in df.columns:
+                codes, uniques = pd.factorize(df[column], sort=True)
+                self._add(column, codes, np.asarray(uniques))
+
+        # Valores a acumular (NaN se omite al sumar) y si sus sumas son exactas.
+        # _counts guarda cuántos valores no nulos representa cada fila (None = 1 por fila)
+        # y _scales, por cuánto dividir las sumas de las columnas guardadas como unidades
+        self._values: Dict[str, np.ndarray] = {}
+        self._exact: Dict[str, bool] = {}
+        self._counts: Dict[str, Optional[np.ndarray]] = {}
+        self._scales: Dict[str, int] = {}
+        for column in values:
+            if column in df.columns:
+                raw = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                missing = np.isnan(raw)
+                self._counts[column] = ~missing if missing.any() else None
+                self._values[column] = raw
+                self._exact[column] = exact_sums(raw)
+                scale = decimal_scale(raw) if decimal and not self._exact[column] else None
+                if scale is not None:
+                    # Unidades enteras en float64 (con NaN): sus sumas son exactas
+                    self._values[column] = np.round(raw * scale)
+                    self._exact[column] = True
+                    self._scales[column] = scale
+
+    def _add(self, column: str, codes: np.ndarray, uniques: np.ndarray):
+        dtype = np.int8 if len(uniques) < 2 ** 7 else np.int16 if len(uniques) < 2 ** 15 else np.int32
+        self.codes[column] = codes.astype(dtype, copy=False)
+        self.uniques[column] = uniques
+        self._index[column] = {value: i for i, value in enumerate(uniques.tolist())}
+
+    @property
+    def exact(self) -> bool:
+        """True si las sumas de todas las columnas de valores son exactas (ver exact_sums)."""
+        return all(self._exact.values())
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por códigos, valores únicos, valores y conteos."""
+        arrays = [
+            *self.codes.values(), *self.uniques.values(), *self._values.values(),
+            *(c for c in self._counts.values() if c is not None)
+        ]
+        return int(sum(array.nbytes for array in arrays))
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Filas (o celdas no vacías), cardinalidad de cada dimensión, memoria y
+        densidad (filas / celdas del cubo denso de las dimensiones).
+        """
+        cells = float(np.prod([max(len(u), 1) for u in self.uniques.values()], dtype=float))
+        return {
+            'filas': self.n_rows,
+            'dimensiones': {column: len(uniques) for column, uniques in self.uniques.items()},
+            'densidad': round(self.n_rows / cells, 6) if cells else 0.0,
+            'bytes': self.nbytes,
+        }
+
+    def with_constant(self, column: str, value: Any) -> 'CodedTable':
+        """Copia liviana (comparte los arreglos) con una dimensión constante."""
+        table = copy.copy(self)
+        table.codes, table.uniques, table._index = dict(self.codes), dict(self.uniques), dict(self._index)
+        table._add(column, np.zeros(self.n_rows, dtype=np.int8), np.array([value], dtype=object))
+        return table
+
+    def with_mapped(self, column: str, source: str, mapper: Callable[[pd.Series], pd.Series]) -> 'CodedTable':
+        """
+        Copia liviana con una dimensión derivada de otra (p. ej. Macrozona de Región).
+
+        mapper se aplica solo a los valores únicos de source; un valor que se
+        mapea a nulo deja la fila con código nulo en la nueva dimensión.
+        """
+        mapped = mapper(pd.Series(self.uniques[source], dtype=object))
+        codes, uniques = pd.factorize(mapped, sort=True)
+        source_codes = self.codes[source]
+        lookup = np.append(codes, -1)  # el código -1 de source indexa el último elemento
+        table = copy.copy(self)
+        table.codes, table.uniques, table._index = dict(self.codes), dict(self.uniques), dict(self._index)
+        table._add(column, lookup[source_codes], np.asarray(uniques))
+        return table
+
+    def mask(self, filters: Mapping[str, Any]) -> np.ndarray:
+        """
+        Filas que cumplen columna == valor para cada filtro (los valores None se ignoran).
+
+        Un valor que no existe en la dimensión no selecciona ninguna fila; una
+        lista, tupla o conjunto selecciona las filas con cualquiera de sus
+        valores (como isin). Un filtro callable recibe los valores únicos de la dimensión y retorna
+        cuáles se aceptan (p. ej. lambda años: años < 2023); se evalúa una vez
+        por valor único y no por fila. Las filas con la dimensión nula no
+        cumplen ningún filtro.
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if callable(value):
+                accepted = np.append(np.asarray(value(self.uniques[column]), dtype=bool), False)
+                mask &= accepted[self.codes[column]]  # el código -1 indexa el False final
+                continue
+            if isinstance(value, (list, tuple, set, frozenset)):
+                index = self._index[column]
+                codes = [index[v] for v in value if _hashable(v) and v in index]
+                mask &= np.isin(self.codes[column], codes)
+                continue
+            code = self._index[column].get(value, -2) if _hashable(value) else -2
+            mask &= self.codes[column] == code
+        return mask
+
+    def total(self, column: str, mask: Optional[np.ndarray] = None) -> float:
+        """Suma de una columna de valores sobre las filas de mask (como Series.sum())."""
+        values = self._values[column]
+        return column_sum(values if mask is None else values[mask]) / self._scales.get(column, 1)
+
+    def collapse(self, keys: Optional[Sequence[str]] = None) -> 'CodedTable':
+        """
+        Tensor disperso (COO): una fila por combinación presente de keys.
+
+        Las coordenadas de cada celda son los códigos de sus dimensiones
+        (los nulos se conservan como -1) y cada valor es la suma de las filas
+        de la celda; el número de valores no nulos queda en _counts, así que
+        aggregate(counts=...) sigue contando filas originales. Con una tabla
+        colapsada, size cuenta celdas.
+
+        Sumar primero por celda cambia el orden de las sumas, así que solo se
+        colapsa si las sumas son exactas (ver exact, y decimal=True para
+        columnas con decimales); si no, se retorna la misma tabla y las
+        agregaciones recorren las filas originales.
+
+        Args:
+            keys: Dimensiones del tensor (None = todas)
+        """
+        if not self.exact:
+            return self
+        keys = list(self.codes) if keys is None else list(keys)
+        rows, group, n_cells = self._groups(keys, None, dropna=False)
+        first = _first_rows(rows, group, n_cells)
+
+        table = copy.copy(self)
+        table.n_rows = n_cells
+        table.codes = {key: self.codes[key][first] for key in keys}
+        table.uniques = {key: self.uniques[key] for key in keys}
+        table._index = {key: self._index[key] for key in keys}
+        table._values = {
+            column: group_sums(group, values, n_cells, exact=True) for column, values in self._values.items()
+        }
+        table._exact = dict(self._exact)
+        table._counts = {
+            column: np.bincount(group, weights=counts, minlength=n_cells).astype(np.int64)
+            if counts is not None else np.bincount(group, minlength=n_cells)
+            for column, counts in self._counts.items()
+        }
+        return table
+
+    def _groups(self, keys: Sequence[str], mask: Optional[np.ndarray], dropna: bool) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Filas consideradas, grupo (ordenado por claves) de cada una y número de grupos."""
+        valid = np.ones(self.n_rows, dtype=bool) if mask is None else mask.copy()
+        combined = np.zeros(self.n_rows, dtype=np.int64)
+        cells = 1
+        for key in keys:
+            codes = self.codes[key].astype(np.int64)
+            radix = len(self.uniques[key])
+            if dropna:
+                valid &= codes >= 0
+            else:
+                codes = np.where(codes >= 0, codes, radix)  # nulos al final, como groupby
+                radix += 1
+            if cells * max(radix, 1) >= _MAX_CODE:
+                cells, combined = _compress(combined, valid)
+            combined = combined * max(radix, 1) + codes
+            cells *= max(radix, 1)
+
+        rows = np.flatnonzero(valid)
+        combined = combined[rows]
+        if cells <= max(DENSE_CELLS, 4 * len(rows)):
+            occupied = np.bincount(combined, minlength=cells) > 0
+            rank = np.cumsum(occupied) - 1
+            group = rank[combined]
+            n_groups = int(occupied.sum())
+        else:
+            _, group = np.unique(combined, return_inverse=True)
+            group = group.ravel()
+            n_groups = int(group.max()) + 1 if len(group) else 0
+        return rows, group, n_groups
+
+    def aggregate(
+        self,
+        keys: Sequence[str],
+        values: Sequence[str] = (),
+        size: Optional[str] = None,
+        nunique: Optional[str] = None,
+        mask: Optional[np.ndarray] = None,
+        dropna: bool = True,
+        counts: Optional[Mapping[str, str]] = None
+    ) -> pd.DataFrame:
+        """
+        Agregación por grupos (equivale a groupby(keys).agg(...)).
+
+        Args:
+            keys: Dimensiones que definen los grupos
+            values: Columnas de valores a sumar (la salida conserva su nombre)
+            size: Nombre de una columna con el número de filas de cada grupo
+            nunique: Dimensión cuyos valores distintos no nulos se cuentan por grupo
+            mask: Filas a considerar (None = todas)
+            dropna: Si es False, los nulos de cada clave forman su propio grupo
+            counts: Columna de salida -> columna de valores cuyos valores no
+                nulos se cuentan por grupo (como groupby(...).count())
+
+        Returns:
+            DataFrame con las claves, las sumas y los conteos pedidos, un grupo
+            por combinación de claves presente, ordenado por claves
+        """
+        counts = dict(counts or {})
+        rows, group, n_groups = self._groups(keys, mask, dropna)
+
+        # Una fila representativa por grupo para reconstruir sus claves
+        first = _first_rows(rows, group, n_groups)
+
+        result = {}
+        for key in keys:
+            codes = self.codes[key][first]
+            column = pd.Series(self.uniques[key].take(np.maximum(codes, 0)) if len(self.uniques[key]) else
+                               np.full(n_groups, np.nan, dtype=object))
+            result[key] = column.where(codes >= 0) if (codes < 0).any() else column
+        for column in values:
+            sums = group_sums(group, self._values[column][rows], n_groups, exact=self._exact[column])
+            result[column] = sums / self._scales[column] if column in self._scales else sums
+        for name, column in counts.items():
+            row_counts = self._counts[column]
+            result[name] = (np.bincount(group, minlength=n_groups) if row_counts is None else
+                            np.bincount(group, weights=row_counts[rows], minlength=n_groups).astype(np.int64))
+        if size is not None:
+            result[size] = np.bincount(group, minlength=n_groups)
+        if nunique is not None:
+            member = self.codes[nunique][rows].astype(np.int64)
+            present = member >= 0
+            pairs = np.unique(group[present] * max(len(self.uniques[nunique]), 1) + member[present])
+            result[nunique] = np.bincount(pairs // max(len(self.uniques[nunique]), 1), minlength=n_groups)
+        columns = list(keys) + list(values) + list(counts) + [c for c in (size, nunique) if c]
+        return pd.DataFrame(result, columns=columns)
+
+
+def _first_rows(rows: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """Primera fila (en orden de la tabla) de cada grupo."""
+    first = np.empty(n_groups, dtype=np.int64)
+    first[group[::-1]] = rows[::-1]
+    return first
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _compress(combined: np.ndarray, valid: np.ndarray) -> Tuple[int, np.ndarray]:
+    """Reemplaza el código combinado por su rango entre los códigos presentes."""
+    compressed = np.zeros_like(combined)
+    uniques, inverse = np.unique(combined[valid], return_inverse=True)
+    compressed[valid] = inverse.ravel()
+    return max(len(uniques), 1), compressed
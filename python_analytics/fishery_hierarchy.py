@@ -0,0 +1,236 @@
+"""
+Jerarquía territorial Nación > Macrozona > Región > Puerto.
+
+RegionHierarchy asigna cada región canónica a una macrozona (configurable;
+por defecto Norte, Centro, Sur y Austral). HierarchyAggregates precomputa,
+una sola vez, los agregados de desembarques, producción y plantas en cada
+nivel de la jerarquía; los análisis regionales se responden a cualquier
+nivel desde esos agregados.
+"""
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from canonical_names import canonical_region
+
+if TYPE_CHECKING:
+    from fishery_groupby import CodedTable
+
+
+# Niveles de la jerarquía, del más agregado al más detallado
+LEVELS = ('nacion', 'macrozona', 'region', 'puerto')
+
+# Columna de cada nivel (en los agregados y en los resultados)
+LEVEL_COLUMNS = {'nacion': 'Nacion', 'macrozona': 'Macrozona', 'region': 'Region', 'puerto': 'Puerto'}
+
+# Etiqueta del nivel nación y de las regiones sin macrozona configurada
+NATION_LABEL = 'NACIONAL'
+UNASSIGNED_ZONE = 'SIN MACROZONA'
+
+# Macrozonas por defecto (nombres canónicos de región)
+DEFAULT_MACRO_ZONES = {
+    'NORTE': ('ARICA Y PARINACOTA', 'TARAPACA', 'ANTOFAGASTA', 'ATACAMA', 'COQUIMBO'),
+    'CENTRO': ('VALPARAISO', 'METROPOLITANA', 'OHIGGINS', 'MAULE', 'NUBLE', 'BIOBIO'),
+    'SUR': ('ARAUCANIA', 'LOS RIOS', 'LAGOS'),
+    'AUSTRAL': ('AYSEN', 'MAGALLANES'),
+}
+
+
+class RegionHierarchy:
+    """
+    Asignación Región -> Macrozona.
+
+    Los nombres de región de la configuración se llevan a su forma canónica,
+    así que se aceptan variantes ('Los Lagos', 'X', 'Región de Aysén').
+    """
+
+    def __init__(self, macro_zones: Optional[Mapping[str, Sequence[str]]] = None):
+        """
+        Args:
+            macro_zones: Dict macrozona -> regiones (default: DEFAULT_MACRO_ZONES)
+        """
+        self.macro_zones = {
+            str(zone).strip().upper(): tuple(canonical_region(region) for region in regions)
+            for zone, regions in (macro_zones or DEFAULT_MACRO_ZONES).items()
+        }
+        self.zone_of: Dict[str, str] = {}
+        for zone, regions in self.macro_zones.items():
+            for region in regions:
+                if region in self.zone_of:
+                    raise ValueError(f"Región '{region}' asignada a más de una macrozona")
+                self.zone_of[region] = zone
+
+    @classmethod
+    def from_json(cls, path: str) -> 'RegionHierarchy':
+        """Carga la configuración desde un archivo JSON {macrozona: [regiones]}."""
+        with open(path, encoding='utf-8') as handle:
+            return cls(json.load(handle))
+
+    def zones(self, regions: pd.Series) -> pd.Series:
+        """
+        Macrozona de cada región (UNASSIGNED_ZONE si no está configurada; nulo
+        si la región es nula). Las etiquetas se buscan por su nombre canónico.
+        """
+        regions = regions.astype(object)
+        lookup = {region: self.zone_of.get(canonical_region(region)) for region in regions.dropna().unique()}
+        zones = regions.map(lookup)
+        return zones.where(regions.isna() | zones.notna(), UNASSIGNED_ZONE)
+
+    def with_levels(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Copia liviana de df con las columnas Nacion y Macrozona (si tiene Región)."""
+        columns: Dict[str, Any] = {'Nacion': NATION_LABEL}
+        if 'Región' in df.columns:
+            columns['Macrozona'] = self.zones(df['Región'])
+        return df.assign(**columns)
+
+    def with_coded_levels(self, table: 'CodedTable') -> 'CodedTable':
+        """Equivalente de with_levels para una CodedTable (la macrozona se asigna por región única)."""
+        table = table.with_constant('Nacion', NATION_LABEL)
+        if 'Región' in table.codes:
+            table = table.with_mapped('Macrozona', 'Región', self.zones)
+        return table
+
+
+# Columnas de agrupación de cada nivel; el puerto se agrupa junto a su región y
+# los niveles bajo la nación llevan su macrozona (para filtrar con `within`)
+LEVEL_KEYS = {
+    'nacion': ['Nacion'],
+    'macrozona': ['Macrozona'],
+    'region': ['Macrozona', 'Región'],
+    'puerto': ['Macrozona', 'Región', 'Puerto'],
+}
+
+
+def level_aggregates(landings: Optional[pd.DataFrame], production: Optional[pd.DataFrame],
+                     plants: Optional[pd.DataFrame], level: str) -> Dict[str, pd.DataFrame]:
+    """
+    Agregados de un nivel a partir de las filas originales con las columnas de
+    nivel de RegionHierarchy.with_levels.
+
+    Cada tabla sale de un único groupby sobre las filas (no de agregar otra
+    tabla), así las sumas son las mismas que las de los análisis por región.
+
+    Args:
+        landings: Desembarques con Toneladas (y Tipo de agente si existe)
+        production: Producción con Año y Producción
+        plants: Una fila por (Año, Región, Nombre Planta)
+        level: Nivel de LEVELS
+
+    Returns:
+        Dict con 'capturas' (Toneladas por [nivel, Tipo de agente]),
+        'capturas_total' (Toneladas por nivel), 'produccion' (Producción por
+        [Año, nivel]), 'produccion_total' (Producción por nivel) y 'plantas'
+        (Num_Plantas por [Año, nivel]); se omiten los datasets None o sin las
+        columnas del nivel. Solo se descartan las filas con claves de nivel nulas.
+    """
+    keys = LEVEL_KEYS[level]
+    tables = {}
+
+    if landings is not None and all(key in landings.columns for key in keys):
+        landings = landings.dropna(subset=keys)
+        agent = ['Tipo de agente'] if 'Tipo de agente' in landings.columns else []
+        tables['capturas'] = landings.groupby(
+            keys + agent, as_index=False, observed=True, dropna=False
+        )['Toneladas'].sum()
+        tables['capturas_total'] = landings.groupby(keys, as_index=False, observed=True)['Toneladas'].sum()
+
+    if production is not None and all(key in production.columns for key in keys):
+        production = production.dropna(subset=keys)
+        tables['produccion'] = production.groupby(
+            ['Año'] + keys, as_index=False, observed=True, dropna=False
+        )['Producción'].sum()
+        tables['produccion_total'] = production.groupby(keys, as_index=False, observed=True)['Producción'].sum()
+
+    if plants is not None and all(key in plants.columns for key in keys):
+        counts = plants.dropna(subset=keys).groupby(['Año'] + keys, observed=True).size()
+        tables['plantas'] = counts.rename('Num_Plantas').reset_index()
+
+    return tables
+
+
+def coded_level_aggregates(landings: 'CodedTable', production: 'CodedTable', level: str) -> Dict[str, pd.DataFrame]:
+    """
+    Equivalente de level_aggregates (sin plantas) sobre tablas codificadas con
+    las dimensiones de RegionHierarchy.with_coded_levels.
+    """
+    keys = LEVEL_KEYS[level]
+    tables = {}
+
+    if all(key in landings.codes for key in keys):
+        mask = _complete(landings, keys)
+        agent = ['Tipo de agente'] if 'Tipo de agente' in landings.codes else []
+        tables['capturas'] = landings.aggregate(keys + agent, values=['Toneladas'], mask=mask, dropna=False)
+        tables['capturas_total'] = landings.aggregate(keys, values=['Toneladas'], mask=mask)
+
+    if all(key in production.codes for key in keys):
+        mask = _complete(production, keys)
+        tables['produccion'] = production.aggregate(['Año'] + keys, values=['Producción'], mask=mask, dropna=False)
+        tables['produccion_total'] = production.aggregate(keys, values=['Producción'], mask=mask)
+
+    return tables
+
+
+def _complete(table: 'CodedTable', keys: Sequence[str]):
+    """Filas sin nulos en las claves."""
+    mask = table.codes[keys[0]] >= 0
+    for key in keys[1:]:
+        mask &= table.codes[key] >= 0
+    return mask
+
+
+def distinct_plants(plants: pd.DataFrame) -> pd.DataFrame:
+    """Una fila por (Año, Región, Nombre Planta), con columnas de nivel."""
+    columns = [col for col in ('Año', 'Nacion', 'Macrozona', 'Región', 'Nombre Planta') if col in plants.columns]
+    return plants.dropna(subset=['Nombre Planta'])[columns].drop_duplicates()
+
+
+class HierarchyAggregates:
+    """
+    Agregados precomputados por nivel de la jerarquía (ver level_aggregates).
+
+    Los agregados de desembarques y producción salen del kernel de códigos
+    enteros (fishery_groupby), cada uno directamente desde las filas. Las
+    plantas se cuentan como conjuntos distintos en cada nivel.
+    """
+
+    def __init__(self, landings: 'CodedTable', production: 'CodedTable',
+                 df_plantas: pd.DataFrame, hierarchy: RegionHierarchy):
+        """
+        Args:
+            landings: Desembarques codificados (con Toneladas)
+            production: Producción codificada (con Producción)
+            df_plantas: Plantas (normalizadas)
+            hierarchy: Asignación Región -> Macrozona
+        """
+        self.hierarchy = hierarchy
+
+        landings = hierarchy.with_coded_levels(landings)
+        production = hierarchy.with_coded_levels(production)
+        plants = distinct_plants(hierarchy.with_levels(df_plantas))
+
+        self.levels: Dict[str, Dict[str, pd.DataFrame]] = {
+            level: {
+                **coded_level_aggregates(landings, production, level),
+                **level_aggregates(None, None, plants, level)
+            }
+            for level in LEVELS
+        }
+
+    def get(self, level: str, dataset: str) -> Optional[pd.DataFrame]:
+        """Agregado de un dataset en un nivel (None si el nivel no aplica al dataset)."""
+        if level not in LEVELS:
+            raise ValueError(f"level debe ser uno de {LEVELS}")
+        return self.levels[level].get(dataset)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los agregados."""
+        return int(sum(
+            frame.memory_usage(deep=True).sum() for tables in self.levels.values() for frame in tables.values()
+        ))
+
+    def describe(self) -> Dict[str, Dict[str, int]]:
+        """Filas de cada agregado por nivel, para diagnóstico."""
+        return {level: {name: len(frame) for name, frame in tables.items()} for level, tables in self.levels.items()}
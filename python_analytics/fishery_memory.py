@@ -0,0 +1,232 @@
+"""
+Contabilidad y presupuesto de memoria para FisheryAnalytics.
+
+Cada instancia registra un DerivedStore: los bytes fijos de sus DataFrames
+(memory_usage(deep=True)) y las estructuras derivadas opcionales (muestras,
+cubos, paneles, cachés), cada una con su tamaño estimado y su último
+acceso. Un MemoryGovernor agrupa los stores de una o varias instancias
+(p. ej. varias ediciones o regiones cargadas en el mismo worker) y, si el
+total supera el presupuesto, descarta las estructuras derivadas usadas
+hace más tiempo (LRU). Las estructuras descartadas se reconstruyen bajo
+demanda, de modo que los resultados no cambian.
+"""
+
+import itertools
+import re
+import sys
+import threading
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*$', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_bytes(value: Union[int, str, None]) -> Optional[int]:
+    """Convierte 512MB, '1.5G', 1048576... a bytes (None se mantiene)."""
+    if value is None or isinstance(value, int):
+        return value
+    match = _SIZE_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Tamaño de memoria inválido: '{value}'")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def estimate_bytes(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estima la memoria ocupada por un objeto y lo que referencia.
+
+    Usa memory_usage(deep=True) para DataFrames/Series, nbytes para
+    arreglos NumPy y recorre dicts, listas, tuplas y atributos de objetos;
+    cada objeto se cuenta una sola vez.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return int(obj.nbytes) + sum(sys.getsizeof(item) for item in obj.ravel())
+        return int(obj.nbytes) if obj.base is None else 0
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_bytes(key, seen) + estimate_bytes(value, seen) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(item, seen) for item in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return sys.getsizeof(obj) + estimate_bytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+class MemoryGovernor:
+    """
+    Presupuesto de memoria compartido por uno o más DerivedStore.
+
+    Compartir un governor entre instancias de FisheryAnalytics aplica un
+    único presupuesto a todas; la expulsión elige la estructura derivada
+    menos usada recientemente entre todas ellas.
+    """
+
+    def __init__(self, budget_bytes: Union[int, str, None] = None):
+        """
+        Args:
+            budget_bytes: Presupuesto total (bytes o texto como '512MB'); None = sin límite
+        """
+        self.budget_bytes = parse_bytes(budget_bytes)
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._stores: 'weakref.WeakSet[DerivedStore]' = weakref.WeakSet()
+        self._clock = itertools.count()
+        self._lock = threading.RLock()
+
+    def _tick(self) -> int:
+        return next(self._clock)
+
+    def register(self, store: 'DerivedStore'):
+        with self._lock:
+            self._stores.add(store)
+
+    def total_bytes(self) -> int:
+        """Memoria contabilizada de todos los stores."""
+        with self._lock:
+            return sum(store.total_bytes for store in list(self._stores))
+
+    def over_budget(self) -> bool:
+        return self.budget_bytes is not None and self.total_bytes() > self.budget_bytes
+
+    def enforce(self) -> int:
+        """
+        Expulsa estructuras derivadas (LRU) hasta cumplir el presupuesto.
+
+        Returns:
+            Número de estructuras expulsadas
+        """
+        evicted = 0
+        with self._lock:
+            while self.over_budget():
+                candidates = [
+                    (last_used, id(store), store, key)
+                    for store in list(self._stores)
+                    for key, last_used in store._last_used.items()
+                ]
+                if not candidates:
+                    break
+                _, _, store, key = min(candidates, key=lambda item: item[:2])
+                self.evicted_bytes += store._sizes.get(key, 0)
+                store._evict(key)
+                self.evictions += 1
+                evicted += 1
+        return evicted
+
+    def usage(self) -> Dict[str, Any]:
+        """Uso de memoria total y por store, para monitoreo."""
+        with self._lock:
+            stores = [store.usage() for store in list(self._stores)]
+            total = sum(store['total_bytes'] for store in stores)
+        return {
+            'budget_bytes': self.budget_bytes,
+            'total_bytes': total,
+            'over_budget': self.budget_bytes is not None and total > self.budget_bytes,
+            'evictions': self.evictions,
+            'evicted_bytes': self.evicted_bytes,
+            'stores': stores,
+        }
+
+
+class DerivedStore:
+    """
+    Diccionario de estructuras derivadas con contabilidad de memoria.
+
+    Se usa como un dict (get, [], pop, in, clear); cada escritura mide el
+    objeto y pide al governor que haga cumplir el presupuesto. Una
+    estructura que por sí sola no cabe no se retiene (quien la construyó la
+    usa para la llamada en curso).
+    """
+
+    def __init__(self, governor: MemoryGovernor, fixed_bytes: Optional[Dict[str, int]] = None, name: Optional[str] = None):
+        """
+        Args:
+            governor: Governor que aplica el presupuesto
+            fixed_bytes: Bytes no expulsables por componente (p. ej. DataFrames)
+            name: Etiqueta para el reporte de uso
+        """
+        self.governor = governor
+        self.fixed_bytes = dict(fixed_bytes or {})
+        self.name = name
+        self._entries: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._last_used: Dict[str, int] = {}
+        governor.register(self)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.fixed_bytes.values()) + sum(self._sizes.values())
+
+    def _evict(self, key: str):
+        self._entries.pop(key, None)
+        self._sizes.pop(key, None)
+        self._last_used.pop(key, None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.governor._lock:
+            if key not in self._entries:
+                return default
+            self._last_used[key] = self.governor._tick()
+            return self._entries[key]
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        size = estimate_bytes(value)
+        with self.governor._lock:
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._last_used[key] = self.governor._tick()
+            self.governor.enforce()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self.governor._lock:
+            value = self._entries.get(key, default)
+            self._evict(key)
+            return value
+
+    def clear(self):
+        with self.governor._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def usage(self) -> Dict[str, Any]:
+        """Bytes fijos y de cada estructura derivada (de la más a la menos reciente)."""
+        with self.governor._lock:
+            order: List[Tuple[int, str]] = sorted(
+                ((last_used, key) for key, last_used in self._last_used.items()), reverse=True
+            )
+            return {
+                'name': self.name,
+                'total_bytes': self.total_bytes,
+                'fixed_bytes': dict(self.fixed_bytes),
+                'derived_bytes': {key: self._sizes[key] for _, key in order},
+            }
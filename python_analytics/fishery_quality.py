@@ -0,0 +1,147 @@
+"""
+Perfil de calidad de datos de los 3 datasets pesqueros.
+
+Todas las validaciones son vectorizadas (una máscara booleana por regla
+sobre columnas completas). FisheryAnalytics las ejecuta una sola vez: al
+construirse si clean=True (las filas inválidas se eliminan para que los
+análisis trabajen sobre datos ya limpios) y, si no, la primera vez que se
+pide data_quality_report(). El resultado es un reporte con conteos por
+columna y por regla.
+
+Reglas:
+- nulos por columna (solo se reportan)
+- año fuera de rango o no numérico; mes fuera de 1-12
+- toneladas negativas o infinitas (Toneladas, Materia Prima, Producción)
+- filas duplicadas (idénticas) y claves duplicadas (misma clave, valores distintos)
+- producción mayor que materia prima (solo se reporta)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Rango válido de años (el máximo por defecto es el año en curso)
+MIN_YEAR = 1950
+
+# Columnas que identifican un registro de cada dataset (se usan las presentes)
+KEY_COLUMNS = {
+    'desembarque': ('Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente'),
+    'produccion': ('Año', 'Región', 'Especie', 'Línea de elaboración'),
+    'plantas': ('Año', 'Región', 'Nombre Planta', 'Línea de producción'),
+}
+
+# Columnas de toneladas validadas (no negativas, finitas)
+TONNAGE_COLUMNS = ('Toneladas', 'Materia Prima', 'Producción')
+
+# Reglas cuyas filas se eliminan con clean=True (las demás solo se reportan)
+CLEANED_CHECKS = (
+    'año_nulo', 'año_fuera_de_rango', 'mes_fuera_de_rango',
+    'toneladas_negativas', 'toneladas_no_finitas', 'filas_duplicadas',
+)
+
+
+def quality_masks(name: str, df: pd.DataFrame, year_range: Optional[Tuple[int, int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Máscaras de filas que incumplen cada regla.
+
+    Args:
+        name: Nombre del dataset ('desembarque', 'produccion', 'plantas')
+        df: DataFrame normalizado (valores originales, sin compactar)
+        year_range: (mínimo, máximo) de años válidos; default (MIN_YEAR, año actual)
+
+    Returns:
+        Dict regla -> máscara booleana (solo reglas aplicables al dataset)
+    """
+    low, high = year_range or (MIN_YEAR, datetime.now().year)
+    masks: Dict[str, np.ndarray] = {}
+
+    if 'Año' in df.columns:
+        missing = df['Año'].isna().to_numpy()
+        year = pd.to_numeric(df['Año'], errors='coerce').to_numpy(dtype='float64')
+        masks['año_nulo'] = missing
+        masks['año_fuera_de_rango'] = ~missing & ~((year >= low) & (year <= high) & (year == np.round(year)))
+
+    if 'Mes' in df.columns:
+        month = pd.to_numeric(df['Mes'], errors='coerce').to_numpy(dtype='float64')
+        masks['mes_fuera_de_rango'] = df['Mes'].notna().to_numpy() & ~np.isin(month, np.arange(1, 13))
+
+    tonnage = [col for col in TONNAGE_COLUMNS if col in df.columns]
+    if tonnage:
+        values = np.column_stack([
+            pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64') for col in tonnage
+        ])
+        with np.errstate(invalid='ignore'):
+            masks['toneladas_negativas'] = (values < 0).any(axis=1)
+        masks['toneladas_no_finitas'] = np.isinf(values).any(axis=1)
+
+    masks['filas_duplicadas'] = df.duplicated(keep='first').to_numpy()
+    keys = [col for col in KEY_COLUMNS.get(name, ()) if col in df.columns]
+    if keys:
+        masks['claves_duplicadas'] = df.duplicated(subset=keys, keep=False).to_numpy() & ~df.duplicated(keep=False).to_numpy()
+
+    if {'Producción', 'Materia Prima'} <= set(df.columns):
+        produccion = pd.to_numeric(df['Producción'], errors='coerce').to_numpy(dtype='float64')
+        materia = pd.to_numeric(df['Materia Prima'], errors='coerce').to_numpy(dtype='float64')
+        with np.errstate(invalid='ignore'):
+            masks['produccion_mayor_materia_prima'] = produccion > materia
+
+    return masks
+
+
+def profile_dataset(name: str, df: pd.DataFrame, clean: bool = False,
+                    year_range: Optional[Tuple[int, int]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Perfila (y opcionalmente limpia) un dataset.
+
+    Args:
+        name: Nombre del dataset
+        df: DataFrame normalizado
+        clean: Si es True, elimina las filas que incumplen CLEANED_CHECKS
+        year_range: Rango de años válidos (ver quality_masks)
+
+    Returns:
+        Tupla (DataFrame resultante, reporte del dataset)
+    """
+    masks = quality_masks(name, df, year_range)
+    report: Dict[str, Any] = {
+        'filas': len(df),
+        'nulos': {col: int(count) for col, count in df.isna().sum().items() if count},
+        'problemas': {check: int(mask.sum()) for check, mask in masks.items()},
+        'filas_eliminadas': 0,
+    }
+
+    if clean:
+        invalid = np.zeros(len(df), dtype=bool)
+        for check in CLEANED_CHECKS:
+            if check in masks:
+                invalid |= masks[check]
+        if invalid.any():
+            df = df.loc[~invalid].reset_index(drop=True)
+        report['filas_eliminadas'] = int(invalid.sum())
+
+    return df, report
+
+
+def profile_datasets(frames: Dict[str, pd.DataFrame], clean: bool = False,
+                     year_range: Optional[Tuple[int, int]] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """
+    Perfila los datasets y arma el reporte consolidado.
+
+    Returns:
+        Tupla (DataFrames resultantes por nombre, reporte con 'datasets',
+        'total_problemas', 'total_filas_eliminadas' y 'clean')
+    """
+    results = {}
+    datasets = {}
+    for name, df in frames.items():
+        results[name], datasets[name] = profile_dataset(name, df, clean=clean, year_range=year_range)
+
+    return results, {
+        'clean': clean,
+        'datasets': datasets,
+        'total_problemas': int(sum(sum(info['problemas'].values()) for info in datasets.values())),
+        'total_filas_eliminadas': int(sum(info['filas_eliminadas'] for info in datasets.values())),
+    }
@@ -0,0 +1,303 @@
+"""
+Recarga en caliente de los datos de FisheryAnalytics por generaciones.
+
+Una generación es una instancia de FisheryAnalytics (DataFrames, tablas
+codificadas, cubos y agregados) que no se modifica una vez publicada.
+reload() construye la siguiente en un hilo de fondo, incluidas sus
+estructuras derivadas, y la publica con una sola asignación de referencia:
+los lectores no esperan la recarga ni ven una mezcla de dos generaciones.
+
+Cada lectura toma la generación vigente con acquire() y la devuelve al
+salir del bloque. Una generación reemplazada ya no acepta lectores nuevos y
+se libera cuando termina el último de los que tenía: se descartan sus
+estructuras derivadas y, si la nueva generación tiene otros datos, sus
+resultados en la caché persistente (indexada por la huella de contenido de
+cada generación, ver FisheryAnalytics.content_fingerprint) se eliminan en el
+hilo de recargas, fuera de la solicitud que liberó la generación.
+
+Uso:
+    generations = GenerationManager(lambda: load_fishery_data(...))
+    with generations.acquire() as generation:
+        generation.analytics.get_top_ports(year=2024)
+    generations.reload()   # Future con la nueva Generation
+"""
+
+import contextlib
+import itertools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# Estructuras derivadas que se construyen antes de publicar una generación
+# (engine='numpy'; el motor pandas no las usa)
+PREBUILT_STRUCTURES = ('build_coded_tables', 'build_supply_cube', 'build_hierarchy_aggregates')
+
+
+class Generation:
+    """
+    Una versión publicada de los datos y su contador de lectores.
+
+    Attributes:
+        number: Número correlativo (1 = carga inicial)
+        analytics: Instancia de FisheryAnalytics (None una vez liberada)
+        fingerprint: Huella del contenido (clave de la caché de resultados)
+        build_ms: Tiempo de carga y preparación
+        readers: Lecturas en curso
+        retired: Reemplazada por una generación más nueva
+        released: Liberada (sin lectores tras ser reemplazada)
+    """
+
+    def __init__(self, number: int, analytics, build_ms: float):
+        self.number = number
+        self.analytics = analytics
+        self._fingerprint: Optional[str] = None
+        self.created = time.time()
+        self.build_ms = build_ms
+        self.readers = 0
+        self.retired = False
+        self.released = False
+        self._lock = threading.Lock()
+        self._on_release: Optional[Callable[['Generation'], None]] = None
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        if self._fingerprint is None and self.analytics is not None:
+            self._fingerprint = self.analytics.content_fingerprint()
+        return self._fingerprint
+
+    def _enter(self) -> bool:
+        """Registra un lector; False si la generación ya fue reemplazada."""
+        with self._lock:
+            if self.retired:
+                return False
+            self.readers += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self.readers -= 1
+            release = self.retired and self.readers == 0 and not self.released
+            self.released = self.released or release
+        if release:
+            self._release()
+
+    def _retire(self):
+        with self._lock:
+            self.retired = True
+            release = self.readers == 0 and not self.released
+            self.released = self.released or release
+        if release:
+            self._release()
+
+    def _release(self):
+        if self._on_release is not None:
+            self._on_release(self)
+        self.analytics = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Estado de la generación, para monitoreo."""
+        return {
+            'generation': self.number,
+            'fingerprint': self._fingerprint,
+            'created': self.created,
+            'build_ms': round(self.build_ms, 1),
+            'readers': self.readers,
+            'retired': self.retired,
+            'released': self.released,
+        }
+
+
+class GenerationManager:
+    """
+    Generación vigente de FisheryAnalytics con recarga en segundo plano.
+
+    Leer la generación vigente es leer un atributo; solo el contador de
+    lectores de cada generación usa un lock propio (de duración constante),
+    así que una recarga en curso nunca bloquea a los lectores. Las recargas
+    y la limpieza de la caché de resultados se ejecutan de a una, en orden,
+    en un hilo dedicado.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], Any]] = None,
+        analytics: Any = None,
+        prebuild: Sequence[str] = PREBUILT_STRUCTURES,
+        warm: Iterable[Tuple[str, Dict[str, Any]]] = (),
+        purge_cache: bool = True
+    ):
+        """
+        Carga (o adopta) la primera generación.
+
+        Args:
+            loader: Función sin argumentos que retorna un FisheryAnalytics
+                nuevo (p. ej. leyendo los CSV); la usa reload()
+            analytics: Instancia ya cargada para la primera generación
+                (None = se llama a loader)
+            prebuild: Métodos build_* que se ejecutan antes de publicar cada
+                generación recargada con engine='numpy' (la primera los
+                construye bajo demanda, como cualquier instancia)
+            warm: Análisis (nombre, parámetros) que se calculan antes de
+                publicar cada generación recargada (llenan la caché de resultados)
+            purge_cache: Al liberar una generación, elimina (en el hilo de
+                recargas) las entradas de su huella de la caché de resultados
+                si la generación vigente tiene otra
+        """
+        if loader is None and analytics is None:
+            raise ValueError("Se requiere loader o analytics")
+        self.loader = loader
+        self.prebuild = tuple(prebuild)
+        self.warm = [(name, dict(params)) for name, params in warm]
+        self.purge_cache = purge_cache
+        self.stats = {
+            'reloads': 0,
+            'failed_reloads': 0,
+            'released': 0,
+            'last_reload_ms': None,
+            'last_error': None,
+        }
+        self._numbers = itertools.count(1)
+        self._retired: List[Generation] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Tras un fork el hilo de recargas no existe en el proceso hijo
+        if hasattr(os, 'register_at_fork'):
+            manager = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: manager() is not None and manager()._after_fork())
+
+        start = time.perf_counter()
+        if analytics is None:
+            analytics = loader()
+        elif hasattr(loader, 'adopt'):
+            # Loader incremental (fishery_watch.CsvLoader): la instancia adoptada es su última carga
+            loader.adopt(analytics)
+        self._current = self._generation(analytics, start)
+
+    @property
+    def current(self) -> Generation:
+        """Generación vigente (puede ser reemplazada en cualquier momento; ver acquire)."""
+        return self._current
+
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[Generation]:
+        """
+        Toma la generación vigente durante el bloque.
+
+        La generación entregada no se libera mientras el bloque siga abierto,
+        aunque una recarga publique otra entretanto.
+        """
+        while True:
+            generation = self._current
+            if generation._enter():
+                break
+            # Reemplazada entre la lectura y el registro: la vigente ya es otra
+        try:
+            yield generation
+        finally:
+            generation._exit()
+
+    def run(self, analysis_type: str, **params) -> Dict[str, Any]:
+        """Ejecuta get_<analysis_type>(**params) sobre la generación vigente."""
+        with self.acquire() as generation:
+            return getattr(generation.analytics, f'get_{analysis_type}')(**params)
+
+    def reload(self, loader: Optional[Callable[[], Any]] = None) -> 'Future[Generation]':
+        """
+        Construye una generación nueva en segundo plano y la publica.
+
+        Args:
+            loader: Función de carga para esta recarga (None = la del constructor)
+
+        Returns:
+            Future con la Generation publicada; si la carga falla, el Future
+            tiene la excepción y la generación vigente no cambia
+        """
+        loader = loader or self.loader
+        if loader is None:
+            raise ValueError("reload requiere un loader")
+        return self._submit(self._reload, loader)
+
+    def _submit(self, function: Callable[..., Any], *args) -> Future:
+        """Encola una tarea en el hilo de recargas (se crea la primera vez)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fishery-reload')
+            return self._executor.submit(function, *args)
+
+    def _reload(self, loader: Callable[[], Any]) -> Generation:
+        start = time.perf_counter()
+        try:
+            generation = self._generation(self._prepared(loader()), start)
+            # Huella de la generación saliente calculada aquí y no por su último lector
+            self._current.fingerprint
+        except Exception as exc:
+            self.stats['failed_reloads'] += 1
+            self.stats['last_error'] = f'{type(exc).__name__}: {exc}'
+            raise
+
+        with self._lock:
+            previous, self._current = self._current, generation
+            self._retired.append(previous)
+        previous._retire()
+        self.stats['reloads'] += 1
+        self.stats['last_reload_ms'] = round(generation.build_ms, 1)
+        self.stats['last_error'] = None
+        return generation
+
+    def _prepared(self, analytics):
+        """Construye las estructuras derivadas, la huella y los análisis precalculados antes de publicar."""
+        if analytics.engine == 'numpy':
+            for name in self.prebuild:
+                getattr(analytics, name)()
+        analytics.content_fingerprint()
+        for name, params in self.warm:
+            getattr(analytics, f'get_{name}')(**params)
+        return analytics
+
+    def _generation(self, analytics, start: float) -> Generation:
+        generation = Generation(next(self._numbers), analytics, (time.perf_counter() - start) * 1000)
+        generation._on_release = self._released
+        return generation
+
+    def _after_fork(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _released(self, generation: Generation):
+        """
+        Descarta las estructuras derivadas de una generación liberada.
+
+        Se llama desde el hilo del último lector; la eliminación de sus
+        resultados en la caché (una escritura SQLite) se encola en el hilo de
+        recargas para no demorar esa solicitud.
+        """
+        analytics = generation.analytics
+        analytics._derived.clear()
+        cache = analytics.result_cache
+        if self.purge_cache and cache is not None and generation.fingerprint != self._current.fingerprint:
+            self._submit(cache.clear, generation.fingerprint)
+        with self._lock:
+            self._retired = [g for g in self._retired if g is not generation]
+        self.stats['released'] += 1
+
+    def describe(self) -> Dict[str, Any]:
+        """Generación vigente, generaciones pendientes de liberar y contadores de recarga."""
+        with self._lock:
+            retired = [generation.describe() for generation in self._retired]
+        return {
+            'current': self._current.describe(),
+            'retired': retired,
+            **self.stats,
+        }
+
+    def close(self, wait: bool = True):
+        """Detiene el hilo de recargas (con wait=True espera la recarga y las limpiezas pendientes)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,232 @@
+"""
+Muestreo estratificado para consultas aproximadas sobre desembarques.
+
+Construye una muestra estratificada (por Año y Región) de df_desembarque y
+estima totales agrupados con el estimador de razón separado, incluyendo
+error estándar e intervalos de confianza. Lo usa FisheryAnalytics cuando un
+análisis se invoca con exact=False.
+
+Los totales exactos de cada estrato se conocen al construir la muestra; la
+muestra solo estima cómo se reparte cada uno entre los grupos (puertos,
+especies, tipos de agente). Las sumas de la muestra por grupo y estrato se
+acumulan una vez por combinación de columnas de agrupación y, como los filtros
+de año y región seleccionan estratos completos, cada consulta es un corte de
+esas matrices.
+"""
+
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class StratifiedSample:
+    """
+    Muestra estratificada precomputada de un DataFrame de desembarques.
+
+    Cada estrato (combinación de las columnas de estratificación) conserva
+    al menos `min_per_stratum` filas (o todas, si tiene menos) y en general
+    una fracción `fraction` de sus filas. Junto a la muestra se guardan el
+    número de filas y el total exacto de value_column de cada estrato.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        strata: Sequence[str] = ('Año', 'Región'),
+        fraction: float = 0.1,
+        min_per_stratum: int = 20,
+        value_column: str = 'Toneladas',
+        seed: int = 42
+    ):
+        """
+        Construye la muestra.
+
+        Args:
+            df: DataFrame de desembarques (ya normalizado)
+            strata: Columnas de estratificación (se ignoran las ausentes)
+            fraction: Fracción de filas a muestrear por estrato (0 < fraction <= 1)
+            min_per_stratum: Mínimo de filas por estrato
+            value_column: Columna numérica a estimar
+            seed: Semilla del generador aleatorio
+        """
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction debe estar en el intervalo (0, 1]")
+
+        self.strata = [col for col in strata if col in df.columns]
+        self.fraction = fraction
+        self.min_per_stratum = min_per_stratum
+        self.value_column = value_column
+        self.population_rows = len(df)
+
+        # Identificador de estrato por fila
+        if self.strata:
+            stratum_ids = df.groupby(self.strata, sort=True, dropna=False).ngroup().to_numpy()
+        else:
+            stratum_ids = np.zeros(len(df), dtype=np.int64)
+
+        population = np.bincount(stratum_ids, minlength=1) if len(df) else np.zeros(0, dtype=np.int64)
+        sizes = np.minimum(
+            population,
+            np.maximum(np.ceil(population * fraction).astype(np.int64), min_per_stratum)
+        )
+
+        # Selección aleatoria dentro de cada estrato: ordenar por (estrato, aleatorio)
+        # y quedarse con las primeras n_h posiciones de cada bloque
+        rng = np.random.default_rng(seed)
+        order = np.lexsort((rng.random(len(df)), stratum_ids))
+        block_start = np.concatenate(([0], np.cumsum(population)[:-1])) if len(population) else population
+        position = np.arange(len(df)) - block_start[stratum_ids[order]]
+        selected = np.sort(order[position < sizes[stratum_ids[order]]])
+
+        values = pd.to_numeric(df[value_column], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        self.frame = df.iloc[selected].copy()
+        self.frame[value_column] = values[selected]
+        self.frame['_estrato'] = stratum_ids[selected]
+
+        self.population_sizes = population
+        self.sample_sizes = sizes
+        self.population_totals = np.bincount(stratum_ids, weights=values, minlength=len(population))
+
+        # Valores de las columnas de estratificación de cada estrato (para filtrar estratos)
+        _, first = np.unique(stratum_ids, return_index=True)
+        self.stratum_values = df[self.strata].iloc[first].reset_index(drop=True)
+
+        # Sumas de y e y² de la muestra por estrato (denominadores de las razones)
+        y = values[selected]
+        self._sum_y = np.bincount(stratum_ids[selected], weights=y, minlength=len(population))
+        self._sum_y2 = np.bincount(stratum_ids[selected], weights=y ** 2, minlength=len(population))
+        self._aggregates: Dict[Tuple[str, ...], Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @property
+    def sample_rows(self) -> int:
+        """Número de filas en la muestra."""
+        return len(self.frame)
+
+    def select(self, **equals) -> np.ndarray:
+        """
+        Estratos que cumplen columna == valor para cada filtro (p. ej. Año=2020).
+
+        Solo se filtra por columnas de estratificación, así que se seleccionan
+        estratos completos y las estimaciones siguen siendo insesgadas. Una
+        lista o tupla de valores selecciona cualquiera de ellos (p. ej. las
+        etiquetas de una misma región); los valores None se ignoran.
+
+        Returns:
+            Máscara booleana de estratos
+        """
+        selected = np.ones(len(self.population_sizes), dtype=bool)
+        for column, value in equals.items():
+            if value is None:
+                continue
+            if column not in self.strata:
+                raise ValueError(f"Solo se puede filtrar por columnas de estratificación {self.strata}")
+            values = self.stratum_values[column]
+            selected &= (values.isin(value) if isinstance(value, (list, tuple)) else values == value).to_numpy()
+        return selected
+
+    def _group_aggregates(self, by: Tuple[str, ...]) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Grupos presentes en la muestra y sus sumas por estrato.
+
+        Returns:
+            Tupla (claves de cada grupo por columna, Σy, Σy² y filas como
+            matrices grupos × estratos); se calcula una vez por combinación de
+            columnas
+        """
+        aggregates = self._aggregates.get(by)
+        if aggregates is not None:
+            return aggregates
+
+        frame = self.frame
+        n_strata = len(self.population_sizes)
+        if by:
+            grouped = frame.groupby(list(by), sort=True, observed=True, dropna=True)
+            codes = grouped.ngroup().to_numpy()
+            valid = codes >= 0
+            keys = grouped.size().index.to_frame(index=False)
+            groups = {column: keys[column].to_numpy() for column in by}
+            n_groups = len(keys)
+        else:
+            codes = np.zeros(len(frame), dtype=np.int64)
+            valid = np.ones(len(frame), dtype=bool)
+            groups, n_groups = {}, 1
+
+        cell = codes[valid] * n_strata + frame['_estrato'].to_numpy()[valid]
+        size = n_groups * n_strata
+        y = frame[self.value_column].to_numpy()[valid]
+        aggregates = (
+            groups,
+            np.bincount(cell, weights=y, minlength=size).reshape(n_groups, n_strata),
+            np.bincount(cell, weights=y ** 2, minlength=size).reshape(n_groups, n_strata),
+            np.bincount(cell, minlength=size).reshape(n_groups, n_strata),
+        )
+        self._aggregates[by] = aggregates
+        return aggregates
+
+    def estimate_totals(
+        self,
+        selected: np.ndarray,
+        by: Optional[List[str]] = None,
+        confidence: float = 0.95
+    ) -> pd.DataFrame:
+        """
+        Estima totales de value_column por grupo con su intervalo de confianza.
+
+        Usa el estimador de razón separado Σ_h Y_h · R_h, con Y_h el total
+        exacto del estrato y R_h = Σ_i y_ghi / Σ_i y_hi la proporción del
+        grupo en la muestra del estrato, y su varianza
+        Σ_h N_h² (1 - n_h/N_h) s_eh² / n_h con residuos e_i = y_gi - R_h y_i.
+        El total sin agrupar es exacto (error estándar 0).
+
+        Args:
+            selected: Estratos a considerar (resultado de select)
+            by: Columnas de agrupación (None = total global)
+            confidence: Nivel de confianza del intervalo
+
+        Returns:
+            DataFrame con columnas by + ['estimacion', 'error_estandar',
+            'ic_inf', 'ic_sup'], un grupo por combinación presente en la
+            muestra de los estratos seleccionados, ordenado por by
+        """
+        groups, sum_y, sum_y2, rows = self._group_aggregates(tuple(by or ()))
+        strata = np.flatnonzero(selected)
+        sum_y, sum_y2 = sum_y[:, strata], sum_y2[:, strata]
+        present = rows[:, strata].sum(axis=1) > 0
+
+        n_h = self.sample_sizes[strata].astype('float64')
+        N_h = self.population_sizes[strata].astype('float64')
+        stratum_y, stratum_y2 = self._sum_y[strata], self._sum_y2[strata]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.where(stratum_y > 0, sum_y / stratum_y, 0.0)
+            residuals = sum_y2 * (1 - 2 * ratio) + ratio ** 2 * stratum_y2
+            s2 = np.where(n_h > 1, residuals / (n_h - 1), 0.0)
+        s2 = np.maximum(s2, 0.0)
+
+        estimate = (self.population_totals[strata] * ratio).sum(axis=1)
+        variance = (N_h ** 2 * (1 - n_h / N_h) * s2 / n_h).sum(axis=1)
+
+        if not by:
+            present = np.ones(1, dtype=bool)
+        estimate, error = estimate[present], np.sqrt(variance[present])
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        return pd.DataFrame({
+            **{column: keys[present] for column, keys in groups.items()},
+            'estimacion': estimate,
+            'error_estandar': error,
+            'ic_inf': np.maximum(estimate - z * error, 0.0),
+            'ic_sup': estimate + z * error
+        })
+
+    def describe(self) -> Dict[str, float]:
+        """Resumen de la muestra para incluir en metadata."""
+        return {
+            'fraccion_muestreo': self.fraction,
+            'filas_muestra': self.sample_rows,
+            'filas_poblacion': self.population_rows,
+            'estratos': int(len(self.population_sizes)),
+            'columnas_estrato': list(self.strata)
+        }
@@ -0,0 +1,82 @@
+"""
+Paneles de series mensuales de desembarques como arreglos NumPy.
+
+Agrupa df_desembarque por una combinación de claves (p. ej. Puerto×Especie)
+y acumula las toneladas de cada serie en un arreglo denso
+[series, años, 12], de modo que los modelos (anomalías, pronósticos) operan
+sobre todas las series a la vez en lugar de iterar serie por serie.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class MonthlyPanel:
+    """
+    Series mensuales alineadas en un calendario común.
+
+    Attributes:
+        keys: DataFrame con las columnas clave de cada serie (una fila por serie)
+        years: Años del calendario (contiguos, del mínimo al máximo con datos)
+        values: Toneladas por [serie, año, mes-1] (0 si no hubo desembarques)
+        rows: Filas de origen por [serie, año, mes-1]
+    """
+
+    def __init__(self, df: pd.DataFrame, keys: Sequence[str], value_column: str = 'Toneladas'):
+        """
+        Construye el panel.
+
+        Args:
+            df: Desembarques (normalizados, toneladas decodificadas) con Año y Mes
+            keys: Columnas que identifican cada serie
+            value_column: Columna numérica a acumular
+        """
+        self.key_columns = list(keys)
+
+        year = pd.to_numeric(df['Año'], errors='coerce').to_numpy(dtype='float64')
+        month = pd.to_numeric(df['Mes'], errors='coerce').to_numpy(dtype='float64')
+        valid = ~np.isnan(year) & (month >= 1) & (month <= 12)
+
+        # Código de serie de base mixta a partir de las claves (sin nulos)
+        series_code = np.zeros(len(df), dtype=np.int64)
+        uniques = []
+        for column in self.key_columns:
+            codes, values = pd.factorize(df[column], sort=True)
+            series_code = series_code * max(len(values), 1) + codes
+            valid &= codes >= 0
+            uniques.append(np.asarray(values, dtype=object))
+
+        present, series_idx = np.unique(series_code[valid], return_inverse=True)
+        keys_frame = pd.DataFrame(index=range(len(present)))
+        remainder = present
+        for column, values in reversed(list(zip(self.key_columns, uniques))):
+            remainder, codes = np.divmod(remainder, len(values))
+            keys_frame[column] = values[codes]
+        self.keys = keys_frame[self.key_columns] if self.key_columns else keys_frame
+
+        year = year[valid].astype(np.int64)
+        month = month[valid].astype(np.int64)
+        first_year = int(year.min()) if len(year) else 0
+        n_years = int(year.max()) - first_year + 1 if len(year) else 0
+        self.years = np.arange(first_year, first_year + n_years)
+
+        shape = (len(present), n_years, 12)
+        cell = np.ravel_multi_index((series_idx, year - first_year, month - 1), shape) if len(year) else year
+        size = int(np.prod(shape))
+        values = pd.to_numeric(df[value_column], errors='coerce').to_numpy(dtype='float64')[valid]
+        self.values = np.bincount(cell, weights=np.nan_to_num(values, nan=0.0), minlength=size).reshape(shape)
+        self.rows = np.bincount(cell, minlength=size).reshape(shape)
+
+    @property
+    def n_series(self) -> int:
+        return len(self.keys)
+
+    def flat(self) -> np.ndarray:
+        """Valores como matriz [serie, mes del calendario] (años × 12 columnas)."""
+        return self.values.reshape(self.n_series, -1)
+
+    def period(self, t: np.ndarray):
+        """Convierte índices de mes del calendario en (año, mes)."""
+        return self.years[0] + t // 12, t % 12 + 1
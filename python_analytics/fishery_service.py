@@ -0,0 +1,382 @@
+"""
+Punto de entrada liviano para servir análisis ya calculados.
+
+Responde solicitudes desde un almacén de resultados materializados (archivos
+JSON en disco) usando solo la biblioteca estándar. pandas/NumPy (a través de
+fishery_analytics) se importan únicamente cuando un resultado no está en el
+almacén y hay datos configurados para recalcularlo.
+
+Uso como módulo:
+    from fishery_service import LightweightAnalytics
+
+    service = LightweightAnalytics('results_store', data_dir='../Base de Datos')
+    service.get('top_ports', year=2024)
+
+Uso como CLI:
+    python fishery_service.py materialize --store results_store --data-dir "../Base de Datos"
+    python fishery_service.py get top_ports --store results_store --param year=2024
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from canonical_names import CanonicalNames, canonical_region
+
+
+# Parámetros por defecto de cada get_<análisis> de FisheryAnalytics.
+# Se replican aquí para normalizar claves sin importar pandas; test_service.py
+# verifica que coincidan con las firmas reales. output_format no es parte de
+# la clave: el servicio y las cachés guardan siempre el resultado como dict.
+ANALYSIS_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    'supply_vs_demand': {'start_year': 2010, 'end_year': None, 'region': None},
+    'conversion_efficiency': {'top_n': 20, 'min_materia_prima': 100.0},
+    'species_flow': {'year': None, 'region': None, 'top_n': 10},
+    'regional_dynamics': {'level': None, 'within': None},
+    'longitudinal_evolution': {},
+    'agent_share': {'level': None, 'within': None},
+    'agent_distribution': {'year': None, 'region': None, 'exact': True},
+    'top_ports': {'year': None, 'region': None, 'top_n': 10, 'exact': True},
+    'port_rank_trajectories': {'region': None, 'top_n': 10, 'start_year': None, 'end_year': None},
+    'species_by_agent_breakdown': {'year': None, 'region': None, 'top_n': 10, 'exact': True},
+    'seasonal_context': {'current_year': 2023, 'region': None},
+    'seasonal_heatmap': {'region': None, 'species': None, 'by_region': True},
+    'plant_capacity_analysis': {'level': None, 'within': None},
+    'landing_anomalies': {'year': None, 'region': None, 'threshold': 3.5},
+    'forecast': {'horizon': 12, 'region': None, 'species': None, 'model': 'auto'},
+    'concentration': {'dimension': None, 'year': None, 'region': None, 'by_region': True},
+}
+
+# Ubicación de los CSV dentro de "Base de Datos"
+DATASET_FILES = {
+    'desembarque': os.path.join('BD_desembarque', 'BD_desembarque.csv'),
+    'produccion': os.path.join('BD_materia_prima_produccion', 'BD_materia_prima_produccion.csv'),
+    'plantas': os.path.join('BD_plantas', 'BD_plantas.csv'),
+}
+
+
+def default_data_paths(data_dir: str) -> Dict[str, str]:
+    """Rutas de los 3 CSV dentro de un directorio con la estructura de 'Base de Datos'."""
+    return {name: os.path.join(data_dir, relative) for name, relative in DATASET_FILES.items()}
+
+
+def dataset_fingerprint(paths: Dict[str, str]) -> str:
+    """
+    Identificador de la versión de los datos a partir de nombre, tamaño y mtime.
+
+    Es barato (solo os.stat) y cambia cuando se reemplaza cualquiera de los CSV.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(paths):
+        stat = os.stat(paths[name])
+        digest.update(f'{name}:{os.path.abspath(paths[name])}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:16]
+
+
+def normalize_params(
+    analysis_type: str,
+    params: Dict[str, Any],
+    resolve_region: Optional[Callable[[str], Sequence[str]]] = None
+) -> Dict[str, Any]:
+    """
+    Completa los parámetros con sus valores por defecto y normaliza la región.
+
+    Dos solicitudes equivalentes (p. ej. con y sin top_n=10) producen la misma clave.
+
+    Args:
+        analysis_type: Análisis (clave de ANALYSIS_DEFAULTS)
+        params: Parámetros de la solicitud
+        resolve_region: Región -> etiquetas de los datos que selecciona (p. ej.
+            FisheryAnalytics.region_labels); si se da, la región queda como esas
+            etiquetas y no como su nombre canónico
+    """
+    if analysis_type not in ANALYSIS_DEFAULTS:
+        raise ValueError(f"Análisis desconocido: '{analysis_type}'")
+
+    defaults = ANALYSIS_DEFAULTS[analysis_type]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Parámetros no válidos para {analysis_type}: {', '.join(sorted(unknown))}")
+
+    normalized = {**defaults, **params}
+    if normalized.get('region') is not None:
+        region = normalized['region']
+        normalized['region'] = list(resolve_region(region)) if resolve_region else canonical_region(region)
+    return normalized
+
+
+def json_default(value: Any) -> Any:
+    """Serializa escalares NumPy y fechas sin importar NumPy."""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+# Directorio del almacén con los índices de etiquetas de región
+REGION_INDEX = '_regiones'
+
+
+class ResultStore:
+    """
+    Almacén de resultados materializados en disco.
+
+    Cada resultado se guarda como <root>/<análisis>/<clave>.json, donde la
+    clave es un hash de la versión de los datos y de los parámetros
+    normalizados, con la región como las etiquetas de los datos que
+    selecciona. Para resolverlas sin cargar los datos, cada versión guarda
+    también su índice de etiquetas de región en <root>/_regiones/. La
+    escritura es atómica (archivo temporal + os.replace).
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directorio del almacén (se crea si no existe)
+        """
+        self.root = root
+
+    def key(self, analysis_type: str, params: Dict[str, Any], dataset_id: str) -> str:
+        """Clave del resultado (parámetros ya normalizados)."""
+        payload = json.dumps(
+            {'dataset': dataset_id, 'params': params},
+            sort_keys=True, ensure_ascii=False, default=json_default
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, analysis_type: str, key: str) -> str:
+        return os.path.join(self.root, analysis_type, f'{key}.json')
+
+    def get(self, analysis_type: str, params: Dict[str, Any], dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna el resultado almacenado o None si no existe."""
+        return self._read(self._path(analysis_type, self.key(analysis_type, params, dataset_id)))
+
+    def put(self, analysis_type: str, params: Dict[str, Any], dataset_id: str, result: Dict[str, Any]) -> str:
+        """Guarda un resultado y retorna la ruta del archivo."""
+        return self._write(self._path(analysis_type, self.key(analysis_type, params, dataset_id)), result)
+
+    def get_region_index(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna el índice de etiquetas de región de una versión de los datos (o None)."""
+        return self._read(self._path(REGION_INDEX, self.key(REGION_INDEX, {}, dataset_id)))
+
+    def put_region_index(self, dataset_id: str, index: Dict[str, Any]) -> str:
+        """Guarda FisheryAnalytics.region_label_index() de una versión de los datos."""
+        return self._write(self._path(REGION_INDEX, self.key(REGION_INDEX, {}, dataset_id)), index)
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write(path: str, payload: Dict[str, Any]) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=json_default)
+        os.replace(tmp_path, path)
+        return path
+
+
+class LightweightAnalytics:
+    """
+    Fachada de solo lectura sobre un ResultStore con recálculo perezoso.
+
+    Mientras los resultados estén materializados no se importa pandas. Ante
+    un resultado faltante, si hay rutas de datos configuradas se importa
+    fishery_analytics, se cargan los CSV una sola vez, se calcula y se guarda
+    en el almacén; sin datos se retorna un resultado de error.
+    """
+
+    def __init__(
+        self,
+        store_dir: str,
+        data_dir: Optional[str] = None,
+        data_paths: Optional[Dict[str, str]] = None,
+        dataset_id: Optional[str] = None,
+        analytics_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            store_dir: Directorio del almacén de resultados
+            data_dir: Directorio con la estructura de 'Base de Datos' (opcional)
+            data_paths: Rutas explícitas {'desembarque', 'produccion', 'plantas'} (opcional)
+            dataset_id: Versión de los datos (default: huella de los CSV, o 'default')
+            analytics_options: Opciones del constructor de FisheryAnalytics
+        """
+        self.store = ResultStore(store_dir)
+        self.data_paths = data_paths or (default_data_paths(data_dir) if data_dir else None)
+        self.analytics_options = analytics_options or {}
+        self._analytics = None
+        self._region_index: Optional[Dict[str, Any]] = None
+        self.stats = {'hits': 0, 'misses': 0, 'recomputed': 0}
+
+        if dataset_id is None:
+            dataset_id = dataset_fingerprint(self.data_paths) if self.data_paths and all(
+                os.path.exists(path) for path in self.data_paths.values()
+            ) else 'default'
+        self.dataset_id = dataset_id
+
+    def _load_analytics(self):
+        """Importa fishery_analytics (pandas/NumPy) y carga los datos, una sola vez."""
+        if self._analytics is None:
+            from fishery_analytics import load_fishery_data
+
+            self._analytics = load_fishery_data(
+                self.data_paths['desembarque'],
+                self.data_paths['produccion'],
+                self.data_paths['plantas'],
+                **self.analytics_options
+            )
+        return self._analytics
+
+    def get(self, analysis_type: str, **params) -> Dict[str, Any]:
+        """
+        Retorna el resultado de get_<analysis_type>(**params).
+
+        Returns:
+            El mismo dict que FisheryAnalytics, desde el almacén si existe
+        """
+        normalized = normalize_params(analysis_type, params)
+        result = None
+        if normalized.get('region') is None or self._load_region_index() is not None:
+            key_params = normalize_params(analysis_type, params, self._region_labels)
+            result = self.store.get(analysis_type, key_params, self.dataset_id)
+        if result is not None:
+            self.stats['hits'] += 1
+            return result
+
+        self.stats['misses'] += 1
+        if not self.data_paths:
+            return {
+                'success': False,
+                'error': f"Resultado de '{analysis_type}' no materializado y sin datos para recalcularlo",
+                'data': [],
+                'summary': {}
+            }
+
+        # El análisis recibe la región tal como la escribió quien consulta
+        analytics = self._load_analytics()
+        result = getattr(analytics, f'get_{analysis_type}')(**{**ANALYSIS_DEFAULTS[analysis_type], **params})
+        self.stats['recomputed'] += 1
+        self.store.put(analysis_type, normalize_params(analysis_type, params, analytics.region_labels),
+                       self.dataset_id, result)
+        if self._region_index is None:
+            self._region_index = analytics.region_label_index()
+            self.store.put_region_index(self.dataset_id, self._region_index)
+        # Retornar lo mismo que se leería del almacén (tipos JSON nativos)
+        return json.loads(json.dumps(result, ensure_ascii=False, default=json_default))
+
+    def _load_region_index(self) -> Optional[Dict[str, Any]]:
+        """Índice de etiquetas de región de los datos (guardado por materialize o por get)."""
+        if self._region_index is None:
+            self._region_index = self.store.get_region_index(self.dataset_id)
+        return self._region_index
+
+    def _region_labels(self, region: str) -> Sequence[str]:
+        """Etiquetas que selecciona region, igual que FisheryAnalytics.region_labels, desde el índice."""
+        index = self._load_region_index()
+        names = CanonicalNames()
+        names.aliases['Región'].update(index['aliases'])
+        canonical = names.canonical('Región', region)
+        if index['canonical_labels']:
+            return [canonical]
+        return index['groups'].get(canonical, [str(region).strip().upper()])
+
+    @property
+    def pandas_loaded(self) -> bool:
+        """Indica si pandas ya fue importado en este proceso."""
+        return 'pandas' in sys.modules
+
+
+def materialize(
+    analytics: Any,
+    store: ResultStore,
+    dataset_id: str = 'default',
+    requests: Optional[Iterable[Tuple[str, Dict[str, Any]]]] = None
+) -> int:
+    """
+    Calcula y guarda resultados en el almacén.
+
+    Args:
+        analytics: Instancia de FisheryAnalytics
+        store: Almacén de destino
+        dataset_id: Versión de los datos con la que se guardan las claves
+        requests: Pares (análisis, parámetros); default: todos con parámetros por defecto
+
+    Returns:
+        Número de resultados guardados
+    """
+    if requests is None:
+        requests = [(analysis_type, {}) for analysis_type in ANALYSIS_DEFAULTS]
+
+    store.put_region_index(dataset_id, analytics.region_label_index())
+    count = 0
+    for analysis_type, params in requests:
+        key_params = normalize_params(analysis_type, params, analytics.region_labels)
+        result = getattr(analytics, f'get_{analysis_type}')(**{**ANALYSIS_DEFAULTS[analysis_type], **params})
+        store.put(analysis_type, key_params, dataset_id, result)
+        count += 1
+    return count
+
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    """Convierte 'clave=valor' en (clave, valor), interpretando números, null y booleanos."""
+    if '=' not in text:
+        raise argparse.ArgumentTypeError(f"Parámetro inválido '{text}' (formato clave=valor)")
+    key, raw = text.split('=', 1)
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    return key.strip(), value
+
+
+def main(argv=None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description='Servicio liviano de resultados de FisheryAnalytics')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    get_parser = subparsers.add_parser('get', help='Imprime el resultado de un análisis como JSON')
+    get_parser.add_argument('analysis', choices=sorted(ANALYSIS_DEFAULTS))
+    get_parser.add_argument('--param', action='append', type=_parse_param, default=[],
+                            help='Parámetro clave=valor (repetible)')
+
+    materialize_parser = subparsers.add_parser('materialize', help='Precalcula resultados en el almacén')
+    materialize_parser.add_argument('--analysis', action='append', choices=sorted(ANALYSIS_DEFAULTS),
+                                    help='Análisis a materializar (default: todos)')
+
+    for sub in (get_parser, materialize_parser):
+        sub.add_argument('--store', required=True, help='Directorio del almacén de resultados')
+        sub.add_argument('--data-dir', help="Directorio con la estructura de 'Base de Datos'")
+
+    args = parser.parse_args(argv)
+    service = LightweightAnalytics(args.store, data_dir=args.data_dir)
+
+    if args.command == 'get':
+        result = service.get(args.analysis, **dict(args.param))
+        json.dump(result, sys.stdout, ensure_ascii=False, default=json_default)
+        sys.stdout.write('\n')
+        return 0 if result.get('success') else 1
+
+    if not service.data_paths:
+        parser.error('materialize requiere --data-dir')
+    count = materialize(
+        service._load_analytics(),
+        service.store,
+        service.dataset_id,
+        [(name, {}) for name in (args.analysis or ANALYSIS_DEFAULTS)]
+    )
+    print(f'{count} resultados materializados en {args.store} (datos {service.dataset_id})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Recarga automática al reemplazar los CSV de 'Base de Datos'.
+
+DataWatcher observa los 3 archivos (BD_desembarque, BD_materia_prima_produccion
+y BD_plantas) y, cuando cambian, publica una generación nueva de los datos
+con GenerationManager.reload (ver fishery_reload) sin reiniciar el servicio:
+
+- Detección: inotify en Linux (vía ctypes, sin dependencias) sobre los
+  directorios de los CSV; donde no existe, revisión de os.stat cada
+  `poll_interval` segundos. Con inotify la revisión periódica se mantiene
+  como respaldo ante eventos perdidos.
+- Debounce: la recarga espera a que los archivos dejen de cambiar durante
+  `debounce` segundos (una copia grande o el reemplazo de los 3 CSV produce
+  una sola recarga).
+- Hash: un cambio de tamaño o mtime se confirma con el SHA-256 del
+  contenido; tocar o volver a copiar el mismo archivo no recarga.
+- Solo lo que cambió: CsvLoader vuelve a leer únicamente los datasets cuyo
+  contenido cambió y toma los demás de la última instancia cargada (como
+  from_snapshot, con los DataFrames ya normalizados).
+
+Uso:
+    loader = CsvLoader(default_data_paths('../Base de Datos'), compact=True)
+    generations = GenerationManager(loader)
+    watcher = DataWatcher(loader, generations.reload).start()
+    ...
+    watcher.describe()   # recargas, duración, último error
+    watcher.stop()
+"""
+
+import collections
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics, read_csv_fast
+
+
+# Eventos inotify que indican escritura, reemplazo o eliminación de un archivo
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+BACKENDS = ('auto', 'inotify', 'poll')
+
+# Recargas recientes que se conservan para describe()
+HISTORY_SIZE = 20
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 del contenido de un archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """(tamaño, mtime_ns) de un archivo, o None si no existe."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class CsvLoader:
+    """
+    Carga FisheryAnalytics desde los 3 CSV releyendo solo los que cambiaron.
+
+    Es el loader de GenerationManager: cada llamada compara el hash de cada
+    CSV con el de la carga anterior y toma los DataFrames de los datasets sin
+    cambios de la última instancia creada (si sigue viva). Una instancia
+    cargada por otra vía se registra con adopt().
+    """
+
+    def __init__(self, paths: Dict[str, str], fast: bool = True, **options):
+        """
+        Args:
+            paths: Ruta de cada dataset ('desembarque', 'produccion', 'plantas'),
+                p. ej. fishery_service.default_data_paths(data_dir)
+            fast: Usa read_csv_fast en lugar de pd.read_csv
+            **options: Opciones del constructor de FisheryAnalytics (compact, clean, ...)
+        """
+        missing = {'desembarque', 'produccion', 'plantas'} - set(paths)
+        if missing:
+            raise ValueError(f"Faltan rutas para: {', '.join(sorted(missing))}")
+        self.paths = dict(paths)
+        self.fast = fast
+        self.options = options
+        self.digests: Dict[str, str] = {}
+        self.signatures: Dict[str, Tuple[int, int]] = {}
+        self.last_changed: List[str] = []
+        self.last_read_ms: Optional[float] = None
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._last: Optional['weakref.ref[FisheryAnalytics]'] = None
+        self._lock = threading.Lock()
+
+        # El watcher puede tener el lock tomado al crear un worker con fork
+        if hasattr(os, 'register_at_fork'):
+            loader = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: loader() is not None and loader()._after_fork())
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _digest(self, name: str) -> Optional[Tuple[Tuple[int, int], str]]:
+        """(firma, hash) del CSV de un dataset; el hash se memoriza mientras no cambie la firma."""
+        path = self.paths[name]
+        signature = _signature(path)
+        if signature is None:
+            return None
+        with self._lock:
+            cached = self._hashes.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached
+        cached = (signature, file_digest(path))
+        with self._lock:
+            self._hashes[name] = cached
+        return cached
+
+    def adopt(self, analytics: Optional[FisheryAnalytics] = None):
+        """
+        Registra los CSV actuales como la última carga, sin leerlos con pandas.
+
+        Se usa cuando la primera instancia no la creó este loader (p. ej.
+        GenerationManager(loader, analytics=...)): sin esto el watcher vería
+        todos los archivos como nuevos y la primera recarga releería los 3.
+
+        Args:
+            analytics: Instancia cargada de estos CSV; sus DataFrames se
+                reutilizan para los datasets que no cambien en la próxima recarga
+        """
+        current = {name: self._digest(name) for name in self.paths}
+        current = {name: value for name, value in current.items() if value is not None}
+        self.digests = {name: digest for name, (_, digest) in current.items()}
+        self.signatures = {name: signature for name, (signature, _) in current.items()}
+        self.last_changed = []
+        self._last = weakref.ref(analytics) if analytics is not None else None
+
+    def changed(self) -> List[str]:
+        """Datasets cuyo contenido difiere del de la última carga (los CSV ausentes no cuentan)."""
+        changed = []
+        for name in self.paths:
+            current = self._digest(name)
+            if current is not None and current[1] != self.digests.get(name):
+                changed.append(name)
+        return changed
+
+    def __call__(self) -> FisheryAnalytics:
+        current = {name: self._digest(name) for name in self.paths}
+        absent = [self.paths[name] for name, value in current.items() if value is None]
+        if absent:
+            raise FileNotFoundError(f"No existe: {', '.join(absent)}")
+        digests = {name: digest for name, (_, digest) in current.items()}
+
+        previous = self._last() if self._last is not None else None
+        frames = {}
+        if previous is not None:
+            frames = {
+                name: previous._decoded(df) for name, df in previous._frames().items()
+                if digests[name] == self.digests.get(name)
+            }
+        changed = [name for name in self.paths if name not in frames]
+
+        read = read_csv_fast if self.fast else (lambda path: pd.read_csv(path, encoding='utf-8'))
+        start = time.perf_counter()
+        for name in changed:
+            frames[name] = read(self.paths[name])
+        read_ms = (time.perf_counter() - start) * 1000
+
+        analytics = FisheryAnalytics(frames['desembarque'], frames['produccion'], frames['plantas'], **self.options)
+        self.digests = digests
+        self.signatures = {name: signature for name, (signature, _) in current.items()}
+        self.last_changed = changed
+        self.last_read_ms = read_ms
+        self._last = weakref.ref(analytics)
+        return analytics
+
+
+class _Inotify:
+    """Descriptor inotify sobre un conjunto de directorios (solo Linux)."""
+
+    def __init__(self, directories: List[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, f'inotify_add_watch: {directory}')
+
+    def drain(self):
+        """Descarta los eventos pendientes (qué cambió se decide con os.stat)."""
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DataWatcher:
+    """
+    Hilo que recarga los datos cuando cambian los CSV.
+
+    Attributes:
+        backend: 'inotify' o 'poll' (el efectivo, tras resolver 'auto')
+        stats: Contadores (eventos, cambios detectados, recargas, recargas
+            omitidas por contenido igual, fallidas) y duración de la última recarga
+        history: Últimas recargas {at, datasets, reload_ms, read_ms, generation}
+    """
+
+    def __init__(
+        self,
+        loader: CsvLoader,
+        reload: Callable[[], Any],
+        debounce: float = 2.0,
+        poll_interval: float = 5.0,
+        backend: str = 'auto'
+    ):
+        """
+        Args:
+            loader: CsvLoader con las rutas observadas (el mismo que usa reload)
+            reload: Inicia la recarga; si retorna un Future se espera su
+                resultado para medir la duración (p. ej. GenerationManager.reload)
+            debounce: Segundos sin cambios antes de recargar
+            poll_interval: Segundos entre revisiones de os.stat
+            backend: 'auto' (inotify si está disponible), 'inotify' o 'poll'
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend debe ser uno de {BACKENDS}")
+        if debounce < 0 or poll_interval <= 0:
+            raise ValueError("debounce debe ser >= 0 y poll_interval > 0")
+        self.loader = loader
+        self.reload = reload
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.stats: Dict[str, Any] = {
+            'events': 0,
+            'changes': 0,
+            'reloads': 0,
+            'unchanged': 0,
+            'failed_reloads': 0,
+            'last_reload_ms': None,
+            'total_reload_ms': 0.0,
+            'last_error': None,
+        }
+        self.history: 'collections.deque[Dict[str, Any]]' = collections.deque(maxlen=HISTORY_SIZE)
+
+        self._inotify: Optional[_Inotify] = None
+        if backend != 'poll':
+            try:
+                directories = sorted({os.path.dirname(os.path.abspath(p)) for p in loader.paths.values()})
+                self._inotify = _Inotify(directories)
+            except (OSError, AttributeError) as exc:  # Sin inotify (otro SO) o directorio inexistente
+                if backend == 'inotify':
+                    raise OSError(f'inotify no disponible: {exc}') from exc
+        self.backend = 'inotify' if self._inotify is not None else 'poll'
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def start(self) -> 'DataWatcher':
+        """
+        Inicia el hilo de observación.
+
+        Si el loader aún no registra ninguna carga, los CSV actuales se toman
+        como la versión vigente (ver CsvLoader.adopt).
+        """
+        if self._closed:
+            raise RuntimeError('DataWatcher detenido')
+        if not self.loader.digests:
+            self.loader.adopt()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='fishery-watch', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Detiene el hilo (espera una recarga en curso) y cierra los descriptores; llamarlo de nuevo no hace nada."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        os.write(self._wake_w, b'x')
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._inotify is not None:
+            self._inotify.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _wait(self, timeout: float):
+        """Espera eventos de archivos (o el aviso de stop) hasta timeout segundos."""
+        fds = [self._wake_r] + ([self._inotify.fd] if self._inotify is not None else [])
+        ready, _, _ = select.select(fds, [], [], timeout)
+        if self._inotify is not None and self._inotify.fd in ready:
+            self._inotify.drain()
+            self.stats['events'] += 1
+
+    def _signatures(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        return {name: _signature(path) for name, path in self.loader.paths.items()}
+
+    def _run(self):
+        # Se parte de los archivos de la última carga: un cambio anterior al inicio también se detecta
+        signatures = {name: self.loader.signatures.get(name) for name in self.loader.paths}
+        changed_at: Optional[float] = None
+        while not self._stopping.is_set():
+            if changed_at is None:
+                timeout = self.poll_interval
+            else:
+                timeout = min(self.poll_interval, max(0.0, changed_at + self.debounce - time.monotonic()))
+            self._wait(timeout)
+            if self._stopping.is_set():
+                return
+
+            current = self._signatures()
+            if current != signatures:
+                # Sigue cambiando: se reinicia la espera del debounce
+                signatures = current
+                changed_at = time.monotonic()
+                self.stats['changes'] += 1
+            elif changed_at is not None and time.monotonic() - changed_at >= self.debounce:
+                changed_at = None
+                self.check()
+
+    def check(self) -> Optional[List[str]]:
+        """
+        Recarga si el contenido de algún CSV cambió desde la última carga.
+
+        Returns:
+            Datasets que cambiaron (None si no hubo recarga o si falló)
+        """
+        changed = self.loader.changed()
+        if not changed:
+            self.stats['unchanged'] += 1
+            return None
+
+        start = time.perf_counter()
+        try:
+            pending = self.reload()
+            generation = pending.result() if isinstance(pending, Future) else pending
+        except Exception as exc:  # La generación vigente sigue atendiendo; se informa y se sigue observando
+            self.stats['failed_reloads'] += 1
+            self.stats['last_error'] = f'{type(exc).__name__}: {exc}'
+            logger.warning('recarga fallida (%s): %s', ', '.join(changed), self.stats['last_error'])
+            return None
+        reload_ms = (time.perf_counter() - start) * 1000
+
+        self.stats['reloads'] += 1
+        self.stats['last_reload_ms'] = round(reload_ms, 1)
+        self.stats['total_reload_ms'] += reload_ms
+        self.stats['last_error'] = None
+        self.history.append({
+            'at': time.time(),
+            'datasets': changed,
+            'reload_ms': round(reload_ms, 1),
+            'read_ms': round(self.loader.last_read_ms, 1) if self.loader.last_read_ms is not None else None,
+            'generation': getattr(generation, 'number', None),
+        })
+        logger.info('recargado %s en %.0f ms', ', '.join(changed), reload_ms)
+        return changed
+
+    def describe(self) -> Dict[str, Any]:
+        """Estado del watcher, para monitoreo."""
+        reloads = self.stats['reloads']
+        return {
+            'backend': self.backend,
+            'paths': dict(self.loader.paths),
+            'debounce': self.debounce,
+            'poll_interval': self.poll_interval,
+            **{key: value for key, value in self.stats.items() if key != 'total_reload_ms'},
+            'mean_reload_ms': round(self.stats['total_reload_ms'] / reloads, 1) if reloads else None,
+            'history': list(self.history),
+        }
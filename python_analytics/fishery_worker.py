@@ -0,0 +1,608 @@
+"""
+Worker persistente de FisheryAnalytics para el backend Node.js.
+
+Carga los datos una sola vez y atiende solicitudes get_* por un socket Unix
+o por stdin/stdout, con un protocolo de frames binarios:
+
+    [4 bytes: largo del payload, big-endian][payload]
+
+El payload es un objeto JSON (UTF-8) o msgpack (opcional, requiere el
+paquete msgpack); el worker detecta el codec de cada solicitud y responde
+con el mismo.
+
+    Solicitud: {"id": 7, "analysis": "top_ports", "params": {"year": 2024}}
+               {"id": 8, "op": "ping"}   |   {"id": 9, "op": "stats"}   |   {"id": 10, "op": "reload"}
+    Respuesta: {"id": 7, "ok": true, "result": {...}}
+               {"id": 7, "ok": false, "error": "ValueError: ..."}
+
+Un cliente puede enviar varias solicitudes sin esperar las respuestas
+(pipelining); cada conexión las responde en orden, con el id de cada una.
+Con --workers N el proceso principal carga los datos, abre el socket y crea
+N procesos con fork que comparten los datos (copy-on-write) y aceptan
+conexiones del mismo socket; un worker que termina inesperadamente se
+reemplaza.
+
+La operación reload (o la señal SIGHUP, que el proceso principal reenvía a
+sus workers) vuelve a leer los datos en segundo plano y publica una
+generación nueva sin cortar las solicitudes en curso (ver fishery_reload).
+Cada proceso recarga su propia copia: tras una recarga los workers dejan de
+compartir los datos copy-on-write. Con --data-dir la recarga vuelve a leer
+solo los CSV cuyo contenido cambió, y con --watch se inicia sola al
+reemplazar los archivos (ver fishery_watch).
+
+Uso:
+    python fishery_worker.py --data-dir "../Base de Datos" --socket /tmp/fishery.sock --workers 4
+    python fishery_worker.py --data-dir "../Base de Datos" --socket /tmp/fishery.sock --watch
+    python fishery_worker.py --snapshot datos.pkl --stdio
+
+El cliente Node.js está en src/services/analyticsWorkerClient.js.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import threading
+import time
+import traceback
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fishery_service import default_data_paths, json_default
+
+
+# Encabezado de cada frame: largo del payload (uint32 big-endian)
+FRAME_HEADER = struct.Struct('>I')
+
+# Tamaño máximo aceptado para un frame de solicitud
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+CODECS = ('json', 'msgpack')
+
+
+# ============================================================================
+# PROTOCOLO
+# ============================================================================
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ImportError("El codec 'msgpack' requiere msgpack (pip install msgpack)") from exc
+    return msgpack
+
+
+def encode(message: Dict[str, Any], codec: str = 'json') -> bytes:
+    """Serializa un mensaje con el codec indicado."""
+    if codec == 'json':
+        return json.dumps(message, ensure_ascii=False, default=json_default, separators=(',', ':')).encode('utf-8')
+    if codec == 'msgpack':
+        return _msgpack().packb(message, default=json_default, use_bin_type=True)
+    raise ValueError(f"codec debe ser uno de {CODECS}")
+
+
+def decode(payload: bytes) -> Tuple[Any, str]:
+    """
+    Deserializa un payload y retorna (mensaje, codec).
+
+    Un objeto JSON empieza con '{'; cualquier otro payload se lee como msgpack.
+    """
+    if payload[:1] == b'{':
+        return json.loads(payload), 'json'
+    return _msgpack().unpackb(payload, raw=False), 'msgpack'
+
+
+def write_frame(stream: BinaryIO, payload: bytes):
+    """Escribe un frame (encabezado + payload) sin hacer flush."""
+    stream.write(FRAME_HEADER.pack(len(payload)))
+    stream.write(payload)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(stream: BinaryIO, max_bytes: int = MAX_FRAME_BYTES) -> Optional[bytes]:
+    """
+    Lee un frame completo.
+
+    Returns:
+        El payload, o None si el stream terminó entre frames
+
+    Raises:
+        ValueError: Si el frame excede max_bytes o el stream termina a mitad de un frame
+    """
+    header = _read_exact(stream, FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise ValueError('Frame incompleto: el stream terminó dentro del encabezado')
+
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > max_bytes:
+        raise ValueError(f'Frame de {size} bytes excede el máximo de {max_bytes}')
+    payload = _read_exact(stream, size)
+    if len(payload) < size:
+        raise ValueError('Frame incompleto: el stream terminó dentro del payload')
+    return payload
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+class AnalyticsWorker:
+    """
+    Atiende solicitudes sobre una instancia de FisheryAnalytics ya cargada.
+
+    Cada conexión se atiende en su propio hilo; los cálculos se serializan
+    con un lock (el GIL no permite paralelizarlos dentro de un proceso, para
+    eso está WorkerPool), mientras ping y stats responden de inmediato.
+    """
+
+    def __init__(self, analytics):
+        """
+        Args:
+            analytics: Instancia de FisheryAnalytics, o GenerationManager para
+                atender la operación reload
+        """
+        from fishery_reload import GenerationManager
+
+        if not isinstance(analytics, GenerationManager):
+            analytics = GenerationManager(analytics=analytics)
+        self.generations = analytics
+        self.started = time.time()
+        self.stats = {'requests': 0, 'errors': 0, 'compute_ms': 0.0}
+        self._lock = threading.Lock()
+
+    def handle(self, message: Any) -> Dict[str, Any]:
+        """Procesa una solicitud y retorna la respuesta (nunca lanza excepciones)."""
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            if not isinstance(message, dict):
+                raise ValueError('La solicitud debe ser un objeto')
+            op = message.get('op', 'analysis')
+            if op == 'ping':
+                result = {'pid': os.getpid()}
+            elif op == 'stats':
+                result = self.describe()
+            elif op == 'reload':
+                result = self.reload()
+            elif op == 'analysis':
+                result = self._analysis(message.get('analysis'), message.get('params') or {})
+            else:
+                raise ValueError(f"Operación desconocida: '{op}'")
+        except Exception as exc:  # Error de la solicitud: se informa y el worker sigue atendiendo
+            self.stats['errors'] += 1
+            return {'id': request_id, 'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+        return {'id': request_id, 'ok': True, 'result': result}
+
+    @property
+    def analytics(self):
+        """Instancia de FisheryAnalytics de la generación vigente."""
+        return self.generations.current.analytics
+
+    def reload(self) -> Dict[str, Any]:
+        """Inicia la recarga de los datos en segundo plano (las solicitudes siguen atendiéndose)."""
+        self.generations.reload()
+        return {'generation': self.generations.current.number, 'reloading': True}
+
+    def _analysis(self, analysis_type: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+        if analysis_type not in self.analytics.ANALYSIS_TYPES:
+            raise ValueError(f"Análisis desconocido: '{analysis_type}'")
+        if not isinstance(params, dict):
+            raise ValueError('params debe ser un objeto')
+        if params.get('output_format') == 'record_batch':
+            raise ValueError("output_format='record_batch' solo aplica dentro del proceso; usar 'arrow'")
+
+        with self._lock, self.generations.acquire() as generation:
+            start = time.perf_counter()
+            result = getattr(generation.analytics, f'get_{analysis_type}')(**params)
+            self.stats['requests'] += 1
+            self.stats['compute_ms'] += (time.perf_counter() - start) * 1000
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        """Estado del worker, para monitoreo."""
+        return {
+            'pid': os.getpid(),
+            'uptime_s': round(time.time() - self.started, 1),
+            'requests': self.stats['requests'],
+            'errors': self.stats['errors'],
+            'compute_ms': round(self.stats['compute_ms'], 1),
+            'generation': self.generations.current.number,
+            'reloads': self.generations.stats['reloads'],
+            'failed_reloads': self.generations.stats['failed_reloads'],
+            'last_reload_ms': self.generations.stats['last_reload_ms'],
+            'last_reload_error': self.generations.stats['last_error'],
+        }
+
+    def serve_stream(self, reader: BinaryIO, writer: BinaryIO):
+        """
+        Atiende frames de reader hasta que termine, respondiendo en writer.
+
+        Las respuestas se escriben en el orden de las solicitudes.
+        """
+        while True:
+            payload = read_frame(reader)
+            if payload is None:
+                return
+            try:
+                message, codec = decode(payload)
+            except (ValueError, ImportError) as exc:
+                message, codec = None, 'json'
+                response = {'id': None, 'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+                self.stats['errors'] += 1
+            else:
+                response = self.handle(message)
+                if codec == 'json' and isinstance(response.get('result'), bytes):
+                    # Los bytes Arrow IPC viajan como binario nativo de msgpack, no en JSON
+                    self.stats['errors'] += 1
+                    response = {'id': response['id'], 'ok': False,
+                                'error': "ValueError: output_format='arrow' requiere el codec msgpack"}
+            write_frame(writer, encode(response, codec))
+            writer.flush()
+
+    def _serve_connection(self, conn: socket.socket):
+        with conn, conn.makefile('rb') as reader, conn.makefile('wb') as writer:
+            try:
+                self.serve_stream(reader, writer)
+            except (OSError, ValueError) as exc:
+                print(f'[fishery_worker {os.getpid()}] conexión cerrada: {exc}', file=sys.stderr)
+
+    def serve_socket(self, sock: socket.socket):
+        """Acepta conexiones de un socket ya abierto, cada una en un hilo."""
+        while True:
+            conn, _ = sock.accept()
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+class WorkerPool:
+    """
+    Procesos worker (fork) que aceptan conexiones de un mismo socket.
+
+    Los datos se cargan antes del fork, así que los N procesos los comparten
+    copy-on-write y el kernel reparte las conexiones entre ellos.
+    """
+
+    def __init__(self, analytics, sock: socket.socket, workers: int):
+        """
+        Args:
+            analytics: Instancia de FisheryAnalytics ya cargada (o GenerationManager)
+            sock: Socket en escucha
+            workers: Número de procesos
+        """
+        from fishery_reload import GenerationManager
+
+        if workers < 1:
+            raise ValueError('workers debe ser >= 1')
+        if not isinstance(analytics, GenerationManager):
+            analytics = GenerationManager(analytics=analytics)
+        self.generations = analytics
+        self.sock = sock
+        self.workers = workers
+        self.pids: set = set()
+        self.restarts = 0
+        self._stopping = False
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                worker = AnalyticsWorker(self.generations)
+                _reload_on_sighup(worker.reload)
+                worker.serve_socket(self.sock)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.pids.add(pid)
+
+    def start(self):
+        """Crea los procesos worker."""
+        while len(self.pids) < self.workers:
+            self._spawn()
+
+    def supervise(self):
+        """Espera a los workers y reemplaza los que terminan; retorna al llamar stop()."""
+        while not self._stopping and self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                return
+            except InterruptedError:
+                continue
+            self.pids.discard(pid)
+            if not self._stopping:
+                print(f'[fishery_worker] worker {pid} terminó (estado {status}); se reemplaza', file=sys.stderr)
+                self.restarts += 1
+                self._spawn()
+
+    def reload(self):
+        """
+        Recarga los datos en cada worker (reenvía SIGHUP) y en este proceso.
+
+        La recarga local hace que los workers de reemplazo partan con los
+        datos nuevos.
+
+        Returns:
+            Future de la recarga de este proceso
+        """
+        pending = self.generations.reload()
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+        return pending
+
+    def stop(self):
+        """Termina los workers y espera su salida."""
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.pids.clear()
+
+
+def listen_unix(path: str, backlog: int = 128) -> socket.socket:
+    """Abre un socket Unix en escucha (reemplaza un socket previo en la misma ruta)."""
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise ValueError(f"'{path}' existe y no es un socket")
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(backlog)
+    return sock
+
+
+def _reload_on_sighup(reload: Callable[[], Any]):
+    """Ejecuta reload al recibir SIGHUP (solo desde el hilo principal, donde existe la señal)."""
+    if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+        return
+
+    def handler(*_):
+        try:
+            reload()
+        except ValueError as exc:  # Sin loader: se informa y se sigue atendiendo
+            print(f'[fishery_worker {os.getpid()}] recarga no disponible: {exc}', file=sys.stderr)
+
+    signal.signal(signal.SIGHUP, handler)
+
+
+def serve_unix(analytics, path: str, workers: int = 1, watch: Optional[Callable[[Callable[[], Any]], Any]] = None):
+    """
+    Atiende el socket Unix en path con `workers` procesos hasta recibir SIGTERM/SIGINT.
+
+    analytics puede ser un GenerationManager con loader: SIGHUP recarga los datos.
+    watch recibe la función de recarga (la del pool con workers > 1) y retorna
+    un DataWatcher iniciado, que se detiene al terminar (ver fishery_watch).
+    """
+    if threading.current_thread() is threading.main_thread():
+        # SIGTERM termina de forma ordenada: detiene los workers y elimina el socket
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sock = listen_unix(path)
+    pool = None
+    watcher = None
+    try:
+        if workers == 1:
+            worker = AnalyticsWorker(analytics)
+            _reload_on_sighup(worker.reload)
+            if watch is not None:
+                watcher = watch(worker.generations.reload)
+            worker.serve_socket(sock)
+        else:
+            pool = WorkerPool(analytics, sock, workers)
+            _reload_on_sighup(pool.reload)
+            pool.start()
+            if watch is not None:
+                watcher = watch(pool.reload)
+            pool.supervise()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if pool is not None:
+            pool.stop()
+        sock.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# ============================================================================
+# CLIENTE
+# ============================================================================
+
+class WorkerClient:
+    """
+    Cliente Python del worker por socket Unix (scripts, tests y benchmarks).
+
+    Uso:
+        with WorkerClient('/tmp/fishery.sock') as client:
+            client.request('top_ports', year=2024)
+            client.pipeline([('top_ports', {}), ('agent_distribution', {'year': 2024})])
+    """
+
+    def __init__(self, path: str, codec: str = 'json', timeout: Optional[float] = None):
+        """
+        Args:
+            path: Ruta del socket Unix
+            codec: 'json' o 'msgpack'
+            timeout: Timeout de socket en segundos (None = sin límite)
+        """
+        if codec not in CODECS:
+            raise ValueError(f"codec debe ser uno de {CODECS}")
+        self.codec = codec
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._reader = self._sock.makefile('rb')
+        self._writer = self._sock.makefile('wb')
+        self._next_id = 0
+
+    def _message(self, analysis_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_id += 1
+        return {'id': self._next_id, 'analysis': analysis_type, 'params': params}
+
+    def _send(self, messages: Iterable[Dict[str, Any]]):
+        for message in messages:
+            write_frame(self._writer, encode(message, self.codec))
+        self._writer.flush()
+
+    def _receive(self) -> Dict[str, Any]:
+        payload = read_frame(self._reader)
+        if payload is None:
+            raise ConnectionError('El worker cerró la conexión')
+        return decode(payload)[0]
+
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> Dict[str, Any]:
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error'))
+        return response['result']
+
+    def call(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Envía un mensaje crudo del protocolo y retorna la respuesta completa."""
+        self._send([message])
+        return self._receive()
+
+    def request(self, analysis_type: str, **params) -> Dict[str, Any]:
+        """
+        Retorna el resultado de get_<analysis_type>(**params) en el worker.
+
+        Raises:
+            RuntimeError: Si el worker responde con error
+        """
+        return self._result(self.call(self._message(analysis_type, params)))
+
+    def pipeline(self, requests: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Envía todas las solicitudes sin esperar y retorna los resultados en orden.
+
+        Las solicitudes se escriben desde otro hilo mientras se leen las
+        respuestas, así un lote grande no bloquea ambos extremos.
+        """
+        messages = [self._message(analysis_type, params) for analysis_type, params in requests]
+        sender = threading.Thread(target=self._send, args=(messages,), daemon=True)
+        sender.start()
+        responses = [self._receive() for _ in messages]
+        sender.join()
+
+        for message, response in zip(messages, responses):
+            if response.get('id') != message['id']:
+                raise ConnectionError(f"Respuesta fuera de orden: id {response.get('id')} (esperado {message['id']})")
+        return [self._result(response) for response in responses]
+
+    def close(self):
+        for stream in (self._writer, self._reader, self._sock):
+            stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _loader(args) -> Callable[[], Any]:
+    """Función de carga de los datos: el snapshot, o los CSV releyendo solo los que cambiaron."""
+    from fishery_analytics import FisheryAnalytics
+    from fishery_watch import CsvLoader
+
+    options = {'compact': args.compact, 'clean': args.clean, 'memory_budget': args.memory_budget,
+               'result_cache': args.cache}
+    if args.snapshot:
+        return lambda: FisheryAnalytics.from_snapshot(args.snapshot, **options)
+    return CsvLoader(default_data_paths(args.data_dir), fast=True, **options)
+
+
+def main(argv=None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description='Worker persistente de FisheryAnalytics')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help="Directorio con la estructura de 'Base de Datos'")
+    source.add_argument('--snapshot', help='Snapshot generado con FisheryAnalytics.save_snapshot')
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument('--socket', help='Ruta del socket Unix a atender')
+    transport.add_argument('--stdio', action='store_true', help='Atiende frames por stdin/stdout')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos worker (solo --socket)')
+    parser.add_argument('--compact', action='store_true', help='Usa el modo compacto')
+    parser.add_argument('--clean', action='store_true', help='Elimina filas inválidas al cargar')
+    parser.add_argument('--cache', help='Caché persistente de resultados (archivo SQLite, ver fishery_cache)')
+    parser.add_argument('--memory-budget', help='Presupuesto de memoria (p. ej. 512MB)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Recarga los datos al cambiar los CSV (solo --data-dir, ver fishery_watch)')
+    parser.add_argument('--watch-debounce', type=float, default=2.0,
+                        help='Segundos sin cambios en los CSV antes de recargar')
+    parser.add_argument('--watch-backend', choices=('auto', 'inotify', 'poll'), default='auto',
+                        help='Detección de cambios: inotify o revisión periódica')
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error('--workers debe ser >= 1')
+    if args.stdio and args.workers != 1:
+        parser.error('--workers solo aplica a --socket')
+    if args.watch and not args.data_dir:
+        parser.error('--watch requiere --data-dir')
+    # Los módulos (p. ej. fishery_watch) informan por logging; stdout queda para los frames de --stdio
+    logging.basicConfig(level=logging.INFO, format='[%(name)s] %(message)s', stream=sys.stderr)
+
+    from fishery_reload import GenerationManager
+    from fishery_watch import DataWatcher
+
+    start = time.perf_counter()
+    loader = _loader(args)
+    analytics = GenerationManager(loader)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    watch = None
+    if args.watch:
+        def watch(reload):
+            return DataWatcher(loader, reload, debounce=args.watch_debounce, backend=args.watch_backend).start()
+
+    if args.stdio:
+        watcher = watch(analytics.reload) if watch is not None else None
+        try:
+            AnalyticsWorker(analytics).serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+        finally:
+            if watcher is not None:
+                watcher.stop()
+        return 0
+
+    print(f'[fishery_worker] datos cargados en {load_ms:.0f} ms; escuchando {args.socket} '
+          f'con {args.workers} worker(s)', file=sys.stderr, flush=True)
+    try:
+        serve_unix(analytics, args.socket, args.workers, watch)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
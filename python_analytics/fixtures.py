@@ -0,0 +1,51 @@
+"""
+Datos mínimos compartidos por los tests unitarios.
+
+FisheryAnalytics exige los 3 datasets; los tests que ejercitan solo uno de
+ellos completan los demás con estas tablas de una fila.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+
+
+def minimal_produccion() -> pd.DataFrame:
+    """Producción de una sola fila (2020, LAGOS, SALMON)."""
+    return pd.DataFrame({
+        'Año': [2020], 'Región': ['LAGOS'], 'Especie': ['SALMON'],
+        'Línea de elaboración': ['Congelado'], 'Materia Prima': [800], 'Producción': [700]
+    })
+
+
+def minimal_plantas() -> pd.DataFrame:
+    """Plantas con una sola fila (2020, LAGOS, Planta A)."""
+    return pd.DataFrame({
+        'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+        'Línea de producción': ['Congelado']
+    })
+
+
+def analytics_with(
+    df_desembarque: pd.DataFrame,
+    df_produccion: Optional[pd.DataFrame] = None,
+    df_plantas: Optional[pd.DataFrame] = None,
+    **options
+) -> FisheryAnalytics:
+    """
+    FisheryAnalytics sobre los datasets del test.
+
+    Args:
+        df_desembarque: Desembarques del test
+        df_produccion: Producción (None = minimal_produccion())
+        df_plantas: Plantas (None = minimal_plantas())
+        **options: Argumentos de FisheryAnalytics (engine, compact, ...)
+    """
+    return FisheryAnalytics(
+        df_desembarque,
+        minimal_produccion() if df_produccion is None else df_produccion,
+        minimal_plantas() if df_plantas is None else df_plantas,
+        **options
+    )
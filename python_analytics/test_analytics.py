@@ -5,9 +5,10 @@ Valida el correcto funcionamiento de todos los métodos de análisis.
 """
 
 import unittest
+import json
 import pandas as pd
 import numpy as np
-from fishery_analytics import FisheryAnalytics
+from fishery_analytics import FisheryAnalytics, to_ndjson
 
 
 class TestFisheryAnalytics(unittest.TestCase):
@@ -133,6 +134,86 @@ class TestFisheryAnalytics(unittest.TestCase):
                 expected = record['Produccion_Total'] / record['Num_Plantas']
                 self.assertAlmostEqual(record['Promedio_Por_Planta'], expected, places=2)
     
+    def test_seasonal_heatmap(self):
+        """Test del método get_seasonal_heatmap (grilla nacional y por región)."""
+        result = self.analytics.get_seasonal_heatmap()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['summary']['años'], [2020, 2021, 2022])
+        self.assertEqual(result['summary']['mes_pico'], 1)
+
+        national, aysen = result['data'][0], result['data'][1]
+        self.assertIsNone(national['region'])
+        self.assertEqual(national['toneladas'][1][:3], [1200.0, 300.0, 0.0])
+        self.assertEqual(national['total'], 4650.0)
+        self.assertEqual(aysen['region'], 'AYSEN')
+        self.assertEqual(aysen['toneladas'][1], [0.0] * 12)
+        self.assertEqual([row['region'] for row in result['data'][1:]], ['AYSEN', 'LAGOS', 'MAGALLANES'])
+
+        # Filtros: una sola grilla, igual al motor pandas
+        lagos = self.analytics.get_seasonal_heatmap(region='LAGOS', species='SALMON')
+        reference = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, engine='pandas')
+        self.assertEqual(lagos['data'], reference.get_seasonal_heatmap(region='LAGOS', species='SALMON')['data'])
+        self.assertEqual(lagos['data'][0]['total'], 3300.0)
+        self.assertFalse(self.analytics.get_seasonal_heatmap(species='JUREL')['success'])
+
+    def test_port_rank_trajectories(self):
+        """Test del método get_port_rank_trajectories contra get_top_ports por año."""
+        result = self.analytics.get_port_rank_trajectories(top_n=1)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['summary']['años'], [2020, 2021, 2022])
+        for i, year in enumerate(result['summary']['años']):
+            ranking = self.analytics.get_top_ports(year=year)['data']
+            for row in result['data']:
+                expected = next((p['ranking'] for p in ranking if p['puerto'] == row['puerto']), None)
+                self.assertEqual(row['rankings'][i], expected, (year, row['puerto']))
+
+        leader = result['data'][0]
+        self.assertEqual(leader['rankings'], [1, 1, 1])
+        self.assertEqual((leader['cambio_ranking'], leader['años_en_top'], leader['entradas_top']), (0, 3, 0))
+        self.assertEqual(len(result['data']), 1)
+
+        # Con top_n=2 entra el segundo puerto de cada año (Chacabuco sale en 2021 y vuelve en 2022)
+        top2 = {row['puerto']: row for row in self.analytics.get_port_rank_trajectories(top_n=2)['data']}
+        chacabuco = top2[self.analytics.get_top_ports(year=2020)['data'][1]['puerto']]
+        self.assertEqual(chacabuco['rankings'], [2, None, 2])
+        self.assertEqual((chacabuco['entradas_top'], chacabuco['salidas_top']), (1, 1))
+        self.assertFalse(self.analytics.get_port_rank_trajectories(start_year=2030)['success'])
+
+    def test_species_flow(self):
+        """Test del método get_species_flow (nodos y enlaces del Sankey)."""
+        result = self.analytics.get_species_flow()
+
+        self.assertTrue(result['success'])
+        nodes = result['summary']['nodos']
+        self.assertEqual([n['name'] for n in nodes if n['tipo'] == 'especie'], ['SALMON', 'MERLUZA', 'CENTOLLA'])
+        self.assertEqual(result['summary']['total_captura'], 4650.0)
+        self.assertEqual(result['summary']['total_sin_procesar'], 4650.0 - 3200.0)
+
+        # Cada línea conserva el flujo: materia prima que entra = producción + merma que sale
+        inflow, outflow = {}, {}
+        for link in result['data']:
+            inflow[link['target']] = inflow.get(link['target'], 0) + link['value']
+            outflow[link['source']] = outflow.get(link['source'], 0) + link['value']
+        for node in nodes:
+            if node['tipo'] == 'linea':
+                self.assertAlmostEqual(inflow[node['id']], outflow[node['id']])
+                self.assertAlmostEqual(inflow[node['id']], node['toneladas'])
+            if node['tipo'] == 'especie':
+                self.assertAlmostEqual(outflow[node['id']], node['toneladas'])
+
+        # Filtros, agrupación de especies y motor de referencia
+        reference = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, engine='pandas')
+        for params in ({}, {'year': 2021}, {'region': 'lagos'}, {'top_n': 1}):
+            self.assertEqual(self.analytics.get_species_flow(**params)['data'],
+                             reference.get_species_flow(**params)['data'], params)
+        grouped = self.analytics.get_species_flow(top_n=1)['summary']['nodos']
+        self.assertEqual([n['name'] for n in grouped if n['tipo'] == 'especie'], ['SALMON', 'OTRAS ESPECIES'])
+        self.assertFalse(self.analytics.get_species_flow(year=1990)['success'])
+        with self.assertRaises(ValueError):
+            self.analytics.get_species_flow(top_n=0)
+
     def test_export_all_analyses(self):
         """Test del método export_all_analyses."""
         result = self.analytics.export_all_analyses(output_format='dict')
@@ -163,6 +244,101 @@ class TestFisheryAnalytics(unittest.TestCase):
         self.assertTrue(result['success'])
         self.assertEqual(result['metadata']['region'], 'LAGOS')
 
+    
+    def test_iter_supply_vs_demand(self):
+        """Test de la variante en streaming de get_supply_vs_demand."""
+        expected = self.analytics.get_supply_vs_demand(start_year=2020)
+        events = list(self.analytics.iter_supply_vs_demand(start_year=2020))
+        
+        self.assertEqual(events[0]['type'], 'metadata')
+        self.assertIsNone(events[0]['total_rows'])
+        self.assertEqual(events[-1]['type'], 'summary')
+        self.assertEqual(events[-1]['summary'], expected['summary'])
+        self.assertEqual(events[-1]['total_rows'], len(expected['data']))
+        
+        rows = [event['data'] for event in events if event['type'] == 'row']
+        self.assertEqual(rows, expected['data'])
+        
+        # Motor pandas y región: mismas filas y resumen, en lotes de tamaño fijo
+        reference = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, engine='pandas')
+        expected = reference.get_supply_vs_demand(start_year=2020, region='LAGOS')
+        events = list(reference.iter_supply_vs_demand(start_year=2020, region='LAGOS', batch_size=2))
+        batches = [event['data'] for event in events if event['type'] == 'batch']
+        self.assertTrue(all(len(batch) == 2 for batch in batches[:-1]))
+        self.assertEqual([row for batch in batches for row in batch], expected['data'])
+        self.assertEqual(events[-1]['summary'], expected['summary'])
+    
+    def test_iter_supply_vs_demand_streams_by_year(self):
+        """Test que cada año se calcula recién cuando el consumidor pide sus filas."""
+        cube = self.analytics._supply_cube()
+        calls = []
+        original = cube.comparison
+        
+        def comparison(start_year, end_year, regions=None):
+            calls.append(start_year)
+            return original(start_year, end_year, regions)
+        
+        cube.comparison = comparison
+        events = self.analytics.iter_supply_vs_demand(start_year=2020)
+        self.assertEqual(next(events)['type'], 'metadata')
+        self.assertEqual(calls, [])
+        first = next(events)
+        self.assertEqual((first['type'], first['data']['Año']), ('row', 2020))
+        self.assertEqual(calls, [2020])
+        list(events)
+        self.assertEqual(calls, [2020, 2021, 2022])
+    
+    def test_iter_analysis_batches(self):
+        """Test de lotes de tamaño fijo y salida NDJSON."""
+        expected = self.analytics.get_plant_capacity_analysis()
+        events = list(self.analytics.iter_analysis('plant_capacity_analysis', batch_size=2))
+        
+        batches = [event['data'] for event in events if event['type'] == 'batch']
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual([row for batch in batches for row in batch], expected['data'])
+        
+        lines = list(to_ndjson(events))
+        self.assertEqual(len(lines), len(events))
+        self.assertEqual(json.loads(lines[-1])['type'], 'summary')
+    
+    def test_iter_analysis_error(self):
+        """Test que los filtros sin datos producen un único evento de error."""
+        events = list(self.analytics.iter_analysis('top_ports', year=1990))
+        
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['type'], 'error')
+        self.assertFalse(events[0]['success'])
+    
+    def test_compact_mode_identical_results(self):
+        """Test que el modo compacto produce exactamente los mismos resultados."""
+        df_desembarque = self.df_desembarque.assign(Toneladas=[1000.125, 500.5, 1200, 300.001, 1100, 550])
+        regular = FisheryAnalytics(df_desembarque, self.df_produccion, self.df_plantas)
+        compact = FisheryAnalytics(df_desembarque, self.df_produccion, self.df_plantas, compact=True)
+        
+        for analysis in FisheryAnalytics.ANALYSIS_TYPES:
+            expected = getattr(regular, f'get_{analysis}')()
+            result = getattr(compact, f'get_{analysis}')()
+            expected.get('metadata', {}).pop('generated_at', None)
+            result.get('metadata', {}).pop('generated_at', None)
+            self.assertEqual(result, expected, analysis)
+    
+    def test_compact_mode_dtypes(self):
+        """Test de los tipos compactos y del reporte de memoria."""
+        compact = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, compact=True)
+        report = compact.memory_report()
+        
+        self.assertEqual(compact.df_desembarque['Año'].dtype, np.int16)
+        self.assertEqual(compact.df_desembarque['Mes'].dtype, np.int8)
+        self.assertEqual(report['datasets']['desembarque']['columnas_escaladas'], {'Toneladas': 1000})
+        self.assertLess(report['total_bytes_actuales'], report['total_bytes_originales'])
+    
+    def test_compact_mode_keeps_inexact_tonnage(self):
+        """Test que las toneladas con más de 3 decimales se mantienen en float64."""
+        df_desembarque = self.df_desembarque.assign(Toneladas=[0.0001, 1, 2, 3, 4, 5])
+        compact = FisheryAnalytics(df_desembarque, self.df_produccion, self.df_plantas, compact=True)
+        
+        self.assertEqual(compact.df_desembarque['Toneladas'].dtype, np.float64)
+        self.assertNotIn('Toneladas', compact.memory_report()['datasets']['desembarque']['columnas_escaladas'])
 
 if __name__ == '__main__':
     print("=" * 80)
@@ -0,0 +1,92 @@
+"""
+Tests unitarios para la detección de anomalías en desembarques.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_anomalies import AnomalyScores
+from fishery_series import MonthlyPanel
+from fixtures import analytics_with
+
+
+class TestLandingAnomalies(unittest.TestCase):
+    """Suite de tests para MonthlyPanel y get_landing_anomalies."""
+
+    def setUp(self):
+        """Series mensuales estacionales con una alza y una caída inyectadas."""
+        rng = np.random.default_rng(3)
+        rows = []
+        for region, port in (('LAGOS', 'PUERTO MONTT'), ('AYSEN', 'CHACABUCO')):
+            for species, base in (('SALMON', 1000), ('MERLUZA', 200)):
+                for year in range(2015, 2021):
+                    for month in range(1, 13):
+                        seasonal = base * (1.5 if month in (3, 4, 5) else 1.0)
+                        rows.append((year, month, region, port, species, 'Industrial',
+                                     round(seasonal * rng.lognormal(0, 0.1), 3)))
+        self.df_desembarque = pd.DataFrame(rows, columns=[
+            'Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente', 'Toneladas'
+        ])
+        spike = (self.df_desembarque['Puerto'] == 'PUERTO MONTT') & (self.df_desembarque['Especie'] == 'SALMON')
+        self.df_desembarque.loc[spike & (self.df_desembarque['Año'] == 2018) & (self.df_desembarque['Mes'] == 7), 'Toneladas'] = 25000
+        drop = (self.df_desembarque['Puerto'] == 'CHACABUCO') & (self.df_desembarque['Especie'] == 'MERLUZA')
+        self.df_desembarque.loc[drop & (self.df_desembarque['Año'] == 2019) & (self.df_desembarque['Mes'] == 2), 'Toneladas'] = 0.5
+
+        self.analytics = analytics_with(self.df_desembarque)
+
+    def test_panel_shape(self):
+        """Test que el panel acumula cada serie en [series, años, 12]."""
+        panel = MonthlyPanel(self.df_desembarque, ['Puerto', 'Especie'])
+
+        self.assertEqual(panel.values.shape, (4, 6, 12))
+        self.assertAlmostEqual(panel.values.sum(), self.df_desembarque['Toneladas'].sum(), places=6)
+        self.assertEqual(list(panel.keys.columns), ['Puerto', 'Especie'])
+
+    def test_detects_spike_and_drop(self):
+        """Test que la alza y la caída inyectadas son las anomalías más fuertes."""
+        result = self.analytics.get_landing_anomalies()
+
+        self.assertTrue(result['success'])
+        top = {(r['puerto'], r['especie'], r['año'], r['mes']): r for r in result['data'][:2]}
+        self.assertEqual(top[('PUERTO MONTT', 'SALMON', 2018, 7)]['tipo'], 'alza')
+        self.assertEqual(top[('CHACABUCO', 'MERLUZA', 2019, 2)]['tipo'], 'caida')
+        self.assertEqual(result['summary']['series_evaluadas'], 4)
+
+    def test_filters(self):
+        """Test de los filtros de año y región."""
+        result = self.analytics.get_landing_anomalies(year=2018, region='Los Lagos')
+
+        self.assertTrue(result['success'])
+        self.assertTrue(all(r['año'] == 2018 and r['region'] == 'LAGOS' for r in result['data']))
+        self.assertIn((2018, 7), [(r['año'], r['mes']) for r in result['data']])
+        self.assertEqual(result['summary']['meses_evaluados'], 24)
+
+    def test_threshold(self):
+        """Test que un umbral mayor reporta un subconjunto."""
+        loose = self.analytics.get_landing_anomalies(threshold=2)
+        strict = self.analytics.get_landing_anomalies(threshold=6)
+
+        self.assertLessEqual(strict['summary']['total_anomalias'], loose['summary']['total_anomalias'])
+        self.assertTrue(all(abs(r['z_score']) > 6 for r in strict['data']))
+        with self.assertRaises(ValueError):
+            self.analytics.get_landing_anomalies(threshold=0)
+
+    def test_no_data(self):
+        """Test que un filtro sin series retorna error."""
+        result = self.analytics.get_landing_anomalies(region='ATACAMA')
+
+        self.assertFalse(result['success'])
+
+    def test_no_complete_keys(self):
+        """Test que sin filas con Región/Puerto/Especie completos el panel queda vacío y no falla."""
+        df = self.df_desembarque.assign(Puerto=None)
+        scores = AnomalyScores(MonthlyPanel(df, ['Región', 'Puerto', 'Especie']))
+
+        self.assertEqual(scores.z.shape, (0, 0))
+        self.assertFalse(analytics_with(df).get_landing_anomalies()['success'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
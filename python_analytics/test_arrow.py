@@ -0,0 +1,115 @@
+"""
+Tests unitarios para los resultados en formato Arrow (output_format).
+"""
+
+import json
+import unittest
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_service import json_default
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _canonical(result):
+    """Resultado como JSON ordenado (tipos y NaN comparables)."""
+    return json.dumps(result, sort_keys=True, ensure_ascii=False, default=json_default)
+
+
+class TestArrowOutput(unittest.TestCase):
+    """Suite de tests para output_format='arrow' / 'record_batch'."""
+
+    def setUp(self):
+        """Datos mínimos con una región nula."""
+        self.analytics = FisheryAnalytics(
+            pd.DataFrame({
+                'Año': [2020, 2020, 2021, 2021],
+                'Mes': [1, 2, 1, 2],
+                'Región': ['LAGOS', 'AYSEN', 'LAGOS', None],
+                'Puerto': ['PUERTO MONTT', 'CHACABUCO', 'CALBUCO', 'PUERTO MONTT'],
+                'Especie': ['SALMON', 'MERLUZA', 'SALMON', 'JUREL'],
+                'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial', 'Artesanal'],
+                'Toneladas': [100.5, 20.25, 110.0, 8.0]
+            }),
+            pd.DataFrame({
+                'Año': [2020, 2021], 'Región': ['LAGOS', 'AYSEN'], 'Especie': ['SALMON', 'MERLUZA'],
+                'Línea de elaboración': ['Congelado'] * 2, 'Materia Prima': [80, 20], 'Producción': [70, 15]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+                'Línea de producción': ['Congelado']
+            })
+        )
+
+    def test_invalid_output_format(self):
+        """Test que un formato desconocido lanza ValueError (sin requerir pyarrow)."""
+        with self.assertRaises(ValueError):
+            self.analytics.get_top_ports(output_format='xml')
+
+    def test_export_all_keeps_previous_formats(self):
+        """Test que export_all_analyses conserva 'json' (string) y retorna el dict con cualquier otro formato."""
+        exported = self.analytics.export_all_analyses(output_format='json')
+        self.assertIsInstance(exported, str)
+        self.assertIn('\n  "supply_vs_demand"', exported)
+        self.assertIn('SALMON', exported)
+
+        for output_format in ('dict', 'xml', None):
+            result = self.analytics.export_all_analyses(output_format=output_format)
+            self.assertIsInstance(result, dict)
+            self.assertEqual(result['agent_share']['data'], self.analytics.get_agent_share()['data'])
+
+    @unittest.skipIf(HAS_PYARROW, 'pyarrow instalado')
+    def test_requires_pyarrow(self):
+        """Test del mensaje cuando falta pyarrow."""
+        with self.assertRaises(ImportError):
+            self.analytics.get_top_ports(output_format='arrow')
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow no instalado')
+    def test_ipc_roundtrip_matches_dict(self):
+        """Test que el stream IPC reconstruye el mismo resultado que el formato dict."""
+        from fishery_arrow import read_result
+
+        for analysis_type in FisheryAnalytics.ANALYSIS_TYPES:
+            method = getattr(self.analytics, f'get_{analysis_type}')
+            expected = method()
+            ipc = method(output_format='arrow')
+            self.assertIsInstance(ipc, bytes, analysis_type)
+            self.assertEqual(_canonical(read_result(ipc)), _canonical(expected), analysis_type)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow no instalado')
+    def test_record_batch_columns_and_metadata(self):
+        """Test de tipos columnares, nulos y metadata en el esquema."""
+        import pyarrow as pa
+        from fishery_arrow import result_header
+
+        batch = self.analytics.get_agent_share(output_format='record_batch')
+        self.assertIsInstance(batch, pa.RecordBatch)
+        self.assertTrue(pa.types.is_floating(batch.schema.field('Industrial').type))
+
+        header = result_header(batch.schema)
+        self.assertTrue(header['success'])
+        self.assertEqual(header['analysis_type'], 'agent_share')
+        self.assertNotIn('data', header)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow no instalado')
+    def test_errors_and_export_all(self):
+        """Test que un error viaja como tabla vacía y export_all_analyses en Arrow."""
+        from fishery_arrow import read_result
+
+        error = read_result(self.analytics.get_top_ports(year=1990, output_format='arrow'))
+        self.assertFalse(error['success'])
+        self.assertEqual(error['data'], [])
+
+        exported = self.analytics.export_all_analyses(output_format='arrow')
+        self.assertEqual(_canonical(read_result(exported['regional_dynamics'])),
+                         _canonical(self.analytics.get_regional_dynamics()))
+
+
+if __name__ == '__main__':
+    unittest.main()
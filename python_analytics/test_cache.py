@@ -0,0 +1,169 @@
+"""
+Tests unitarios para la caché persistente de resultados.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from canonical_names import CanonicalNames
+from fishery_analytics import FisheryAnalytics
+from fishery_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """Suite de tests para ResultCache y FisheryAnalytics(result_cache=...)."""
+
+    def setUp(self):
+        """Directorio temporal y datos mínimos."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache', 'results.sqlite')
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2021, 2021],
+            'Mes': [1, 2, 1, 2],
+            'Región': ['LAGOS', 'AYSEN', 'LAGOS', 'AYSEN'],
+            'Puerto': ['PUERTO MONTT', 'CHACABUCO', 'PUERTO MONTT', 'CHACABUCO'],
+            'Especie': ['SALMON', 'MERLUZA', 'SALMON', 'MERLUZA'],
+            'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial', 'Artesanal'],
+            'Toneladas': [100.5, 20.25, 110.0, 30.0]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2021], 'Región': ['LAGOS', 'AYSEN'], 'Especie': ['SALMON', 'MERLUZA'],
+            'Línea de elaboración': ['Congelado'] * 2, 'Materia Prima': [80, 20], 'Producción': [70, 15]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+            'Línea de producción': ['Congelado']
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _analytics(self, cache, df_desembarque=None, **options):
+        return FisheryAnalytics(
+            self.df_desembarque if df_desembarque is None else df_desembarque,
+            self.df_produccion, self.df_plantas, result_cache=cache, **options
+        )
+
+    def test_roundtrip_and_compression(self):
+        """Test que un resultado se recupera igual, comprimido o no."""
+        result = {'success': True, 'data': [{'a': 1, 'b': 'x' * 500}], 'summary': {'n': 1}}
+        for compress in (True, False):
+            cache = ResultCache(os.path.join(self.tmp.name, f'{compress}.sqlite'), compress=compress)
+            size = cache.put('top_ports', {'top_n': 10}, 'ds', result)
+            self.assertEqual(cache.get('top_ports', {'top_n': 10}, 'ds'), result)
+            self.assertIsNone(cache.get('top_ports', {'top_n': 5}, 'ds'))
+            self.assertIsNone(cache.get('top_ports', {'top_n': 10}, 'otro'))
+            if compress:
+                self.assertLess(size, 200)
+            cache.close()
+
+    def test_lru_size_limit(self):
+        """Test que al exceder max_bytes se eliminan las entradas usadas hace más tiempo."""
+        cache = ResultCache(self.path, max_bytes=250, compress=False)
+        result = {'data': 'x' * 80}
+        cache.put('a', {}, 'ds', result)
+        cache.put('b', {}, 'ds', result)
+        cache.get('a', {}, 'ds')
+        cache.put('c', {}, 'ds', result)
+
+        self.assertIsNotNone(cache.get('a', {}, 'ds'))
+        self.assertIsNone(cache.get('b', {}, 'ds'))
+        self.assertIsNotNone(cache.get('c', {}, 'ds'))
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stats['bytes'], 250)
+        self.assertEqual(stats['evictions'], 1)
+        # Un resultado que no cabe solo no se guarda
+        self.assertEqual(cache.put('d', {}, 'ds', {'data': 'x' * 1000}), 0)
+        cache.close()
+
+    def test_restarted_worker_hits_cache(self):
+        """Test que una instancia nueva (otro proceso) con los mismos datos no recalcula."""
+        first = self._analytics(self.path)
+        expected = first.get_top_ports(region='lagos')
+        first.result_cache.close()
+
+        second = self._analytics(ResultCache(self.path))
+        with mock.patch.object(FisheryAnalytics, '_compute', side_effect=AssertionError('recalculado')):
+            result = second.get_top_ports(region='LAGOS', top_n=10)
+        self.assertEqual(result['data'], expected['data'])
+        self.assertEqual(result['summary'], expected['summary'])
+        self.assertEqual(second.result_cache.stats()['hits'], 1)
+        second.result_cache.close()
+
+    def test_key_depends_on_content(self):
+        """Test que cambiar los datos invalida la clave y el modo compacto no."""
+        cache = ResultCache(self.path)
+        base = self._analytics(cache)
+        compact = self._analytics(cache, compact=True)
+        changed = self.df_desembarque.copy()
+        changed.loc[0, 'Toneladas'] = 999.0
+        modified = self._analytics(cache, df_desembarque=changed)
+
+        self.assertEqual(base.content_fingerprint(), compact.content_fingerprint())
+        self.assertNotEqual(base.content_fingerprint(), modified.content_fingerprint())
+        self.assertNotEqual(base.content_fingerprint(), self._analytics(cache, engine='pandas').content_fingerprint())
+
+        base.get_agent_distribution()
+        self.assertNotEqual(modified.get_agent_distribution()['summary'], base.get_agent_distribution()['summary'])
+        cache.close()
+
+    def test_approximate_key_depends_on_sample(self):
+        """Test que un resultado aproximado no se reutiliza después de cambiar la muestra."""
+        cache = ResultCache(self.path)
+        rows = self.df_desembarque.sample(400, replace=True, random_state=0).reset_index(drop=True)
+        rows['Toneladas'] = range(1, 401)
+        # Un tercer puerto repartido entre estratos para que la muestra estime su participación
+        rows.loc[::3, 'Puerto'] = 'CALBUCO'
+        analytics = self._analytics(cache, df_desembarque=rows)
+        analytics.build_stratified_sample(fraction=0.1, min_per_stratum=2, seed=0)
+        first = analytics.get_top_ports(exact=False)
+
+        analytics.build_stratified_sample(fraction=0.5, min_per_stratum=2, seed=1)
+        second = analytics.get_top_ports(exact=False)
+        self.assertNotEqual(second['data'], first['data'])
+        self.assertEqual(cache.stats()['hits'], 0)
+        self.assertEqual(analytics.get_top_ports(exact=False), second)
+        self.assertEqual(cache.stats()['hits'], 1)
+        cache.close()
+
+    def test_key_uses_resolved_region_labels(self):
+        """Test que dos regiones con la misma región canónica pero distintas etiquetas no comparten clave."""
+        names = CanonicalNames(os.path.join(self.tmp.name, 'nombres.json'))
+        names.add_alias('Región', 'X', 'ISLA X')
+        names.save()
+        rows = self.df_desembarque.copy()
+        rows.loc[2:, ['Región', 'Puerto']] = [['X', 'ANCUD'], ['X', 'ANCUD']]
+        cache = ResultCache(self.path)
+        analytics = self._analytics(cache, df_desembarque=rows, canonical_names_path=names.path)
+
+        self.assertEqual(analytics.get_top_ports(region='LAGOS')['data'][0]['puerto'], 'PUERTO MONTT')
+        self.assertEqual(analytics.get_top_ports(region='X')['data'][0]['puerto'], 'ANCUD')
+        self.assertEqual(cache.stats()['hits'], 0)
+        cache.close()
+
+    def test_errors_not_cached(self):
+        """Test que los resultados de error no se guardan."""
+        cache = ResultCache(self.path)
+        analytics = self._analytics(cache)
+        self.assertFalse(analytics.get_top_ports(year=1990)['success'])
+        self.assertEqual(cache.stats()['entries'], 0)
+        cache.close()
+
+    def test_clear_by_dataset(self):
+        """Test de limpieza por versión de datos."""
+        cache = ResultCache(self.path)
+        cache.put('a', {}, 'ds1', {'x': 1})
+        cache.put('a', {}, 'ds2', {'x': 2})
+        cache.clear('ds1')
+        self.assertIsNone(cache.get('a', {}, 'ds1'))
+        self.assertEqual(cache.get('a', {}, 'ds2'), {'x': 2})
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests unitarios para el diccionario de nombres canónicos.
+"""
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from canonical_names import CanonicalNames, canonical_region, base_key
+from fishery_analytics import FisheryAnalytics
+
+
+class TestCanonicalNames(unittest.TestCase):
+    """Suite de tests para CanonicalNames y su uso en FisheryAnalytics."""
+
+    def setUp(self):
+        """Datos con variantes de escritura de la misma región, especie y puerto."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2021, 2021],
+            'Mes': [1, 2, 1, 2],
+            'Región': ['REGION DE LOS LAGOS', 'Los Lagos', 'X', 'Aysén'],
+            'Puerto': ['Puerto Montt', 'PUERTO  MONTT', 'puerto montt ', 'Chacabuco'],
+            'Especie': ['Salmón', 'SALMON', ' salmon', 'MERLUZA'],
+            'Tipo de agente': ['Industrial', 'Industrial', 'Artesanal', 'Artesanal'],
+            'Toneladas': [100, 200, 300, 400]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020], 'Región': ['10'], 'Especie': ['SALMÓN'],
+            'Línea de elaboración': ['Congelado'], 'Materia Prima': [800], 'Producción': [700]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020], 'Región': ['Región de Los Lagos'], 'Nombre Planta': ['Planta A'],
+            'Línea de producción': ['Congelado']
+        })
+
+    def test_region_rules(self):
+        """Test de nombres, códigos y números romanos de región."""
+        for raw in ['LAGOS', 'Los Lagos', 'REGION DE LOS LAGOS', 'X', '10', '10,0', 'X REGION']:
+            self.assertEqual(canonical_region(raw), 'LAGOS', raw)
+        self.assertEqual(canonical_region('Aysén del General Carlos Ibáñez del Campo'), 'AYSEN')
+        self.assertEqual(canonical_region('XII'), 'MAGALLANES')
+        self.assertEqual(canonical_region('Región del Biobío'), 'BIOBIO')
+        self.assertEqual(canonical_region('DE LOS RÍOS'), 'LOS RIOS')
+        self.assertEqual(base_key('  Puerto   Aysén '), 'PUERTO AYSEN')
+
+    def test_labels_are_kept_by_default(self):
+        """Test que por defecto se conservan las etiquetas y los argumentos se resuelven por nombre canónico."""
+        analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas)
+
+        self.assertEqual(sorted(analytics.df_desembarque['Región'].unique()),
+                         ['AYSÉN', 'LOS LAGOS', 'REGION DE LOS LAGOS', 'X'])
+        self.assertEqual(analytics.df_desembarque['Especie'].iloc[0], 'SALMÓN')
+        self.assertEqual(analytics.df_desembarque['Puerto'].iloc[0], 'Puerto Montt')
+
+        # Un argumento selecciona todas las etiquetas con su nombre canónico
+        ports = analytics.get_top_ports(region='x')
+        self.assertEqual([r['toneladas'] for r in ports['data']], [300, 200, 100])
+        self.assertEqual(analytics.get_top_ports(region='Aysen')['data'][0]['puerto'], 'Chacabuco')
+        supply = analytics.get_supply_vs_demand(start_year=2020, region=' Los Lagos')
+        self.assertEqual(supply['summary']['total_capturas'], 600)
+
+    def test_query_matches_labels_of_every_dataset(self):
+        """Test que una región escrita distinto en cada dataset no pierde filas en ningún motor."""
+        df_desembarque = self.df_desembarque.assign(Región='LOS LAGOS', Especie='SALMON')
+        df_produccion = self.df_produccion.assign(Región='Región de Los Lagos', Especie='SALMON')
+        for engine in FisheryAnalytics.ENGINES:
+            analytics = FisheryAnalytics(df_desembarque, df_produccion, self.df_plantas, engine=engine)
+            supply = analytics.get_supply_vs_demand(start_year=2020, region='Los Lagos')
+            salmon = [r for r in supply['data'] if r['Año'] == 2020]
+            self.assertEqual((salmon[0]['Capturas'], salmon[0]['Materia Prima']), (300, 800), engine)
+            flow = analytics.get_species_flow(region='Los Lagos')
+            self.assertEqual(flow['summary']['total_materia_prima'], 800, engine)
+
+    def test_variants_are_merged(self):
+        """Test que con canonical_labels las variantes quedan en un único grupo en los análisis."""
+        analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas,
+                                     canonical_labels=True)
+
+        self.assertEqual(sorted(analytics.df_desembarque['Región'].unique()), ['AYSEN', 'LAGOS'])
+        self.assertEqual(analytics.df_desembarque['Puerto'].nunique(), 2)
+        self.assertEqual(analytics.df_produccion['Región'].iloc[0], 'LAGOS')
+
+        result = analytics.get_top_ports(region='los lagos')
+        self.assertEqual(result['data'][0]['puerto'], 'PUERTO MONTT')
+        self.assertEqual(result['data'][0]['toneladas'], 600)
+
+        supply = analytics.get_supply_vs_demand(start_year=2020, region='Región X')
+        salmon = [r for r in supply['data'] if r['Especie'] == 'SALMON' and r['Año'] == 2020]
+        self.assertEqual(salmon[0]['Materia Prima'], 800)
+
+    def test_persistence_and_aliases(self):
+        """Test que el diccionario se guarda, se reutiliza y respeta los alias."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'nombres.json')
+            names = CanonicalNames(path)
+            names.add_alias('Puerto', 'Chacabuco', 'PUERTO CHACABUCO')
+            names.save()
+
+            analytics = FisheryAnalytics(
+                self.df_desembarque, self.df_produccion, self.df_plantas,
+                canonical_names_path=path, canonical_labels=True
+            )
+            self.assertIn('PUERTO CHACABUCO', set(analytics.df_desembarque['Puerto']))
+
+            reloaded = CanonicalNames(path)
+            self.assertEqual(reloaded.mapping['Región']['Los Lagos'], 'LAGOS')
+            self.assertEqual(reloaded.update('Región', ['Los Lagos', 'X']), 0)
+            self.assertFalse(reloaded.save())
+
+    def test_nulls_are_preserved(self):
+        """Test que los valores nulos no se convierten en texto."""
+        names = CanonicalNames()
+        result = names.canonicalize(pd.Series(['Lagos', None, 'Aysén']), 'Región')
+
+        self.assertEqual(result.iloc[0], 'LAGOS')
+        self.assertTrue(pd.isna(result.iloc[1]))
+        self.assertEqual(result.iloc[2], 'AYSEN')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
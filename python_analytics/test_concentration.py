@@ -0,0 +1,113 @@
+"""
+Tests unitarios para las métricas de concentración.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_concentration import concentration_metrics, share_matrix
+from fixtures import analytics_with
+
+
+class TestConcentration(unittest.TestCase):
+    """Suite de tests para fishery_concentration y get_concentration."""
+
+    def setUp(self):
+        """Desembarques de varios puertos, especies y agentes en dos regiones y dos años."""
+        rng = np.random.default_rng(5)
+        rows = []
+        ports = {'LAGOS': ['PUERTO MONTT', 'CALBUCO', 'ANCUD', 'QUELLON', 'CASTRO'], 'AYSEN': ['CHACABUCO']}
+        for year in (2020, 2021):
+            for region, region_ports in ports.items():
+                for port in region_ports:
+                    for species in ('SALMON', 'MERLUZA', 'JUREL'):
+                        for agent in ('Industrial', 'Artesanal'):
+                            rows.append((year, 1, region, port, species, agent, round(rng.uniform(1, 500), 3)))
+        self.df_desembarque = pd.DataFrame(rows, columns=[
+            'Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente', 'Toneladas'
+        ])
+        self.analytics = analytics_with(self.df_desembarque)
+
+    def test_metrics_known_values(self):
+        """Test de HHI, Gini y CRn sobre distribuciones conocidas."""
+        matrix = np.array([
+            [25.0, 25.0, 25.0, 25.0, 0.0],   # 4 iguales
+            [100.0, 0.0, 0.0, 0.0, 0.0],     # monopolio
+            [0.0, 0.0, 0.0, 0.0, 0.0],       # sin toneladas
+            [60.0, 30.0, 10.0, 0.0, 0.0],
+        ])
+        metrics = concentration_metrics(matrix, ratios=(1, 4))
+
+        np.testing.assert_allclose(metrics['hhi'][[0, 1, 3]], [2500, 10000, 4600])
+        np.testing.assert_allclose(metrics['cr1'][[0, 1, 3]], [25, 100, 60])
+        np.testing.assert_allclose(metrics['cr4'][[0, 1, 3]], [100, 100, 100])
+        self.assertAlmostEqual(metrics['gini'][0], 0.0)
+        self.assertAlmostEqual(metrics['gini'][1], 0.0)
+        # Gini de (10, 30, 60): sum_i sum_j |xi - xj| / (2 n^2 media)
+        values = np.array([10.0, 30.0, 60.0])
+        expected = np.abs(values[:, None] - values[None, :]).sum() / (2 * len(values) ** 2 * values.mean())
+        self.assertAlmostEqual(metrics['gini'][3], expected)
+        self.assertTrue(np.isnan(metrics['hhi'][2]))
+        self.assertEqual(metrics['participantes'].tolist(), [4, 1, 0, 3])
+
+    def test_share_matrix(self):
+        """Test que la matriz acumula las toneladas de cada miembro por grupo."""
+        keys, matrix, members = share_matrix(self.df_desembarque, ['Año', 'Región'], 'Puerto')
+
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(matrix.shape, (4, 6))
+        self.assertAlmostEqual(matrix.sum(), self.df_desembarque['Toneladas'].sum(), places=6)
+        self.assertIn('CHACABUCO', members)
+
+    def test_matches_per_group_reference(self):
+        """Test contra un cálculo por grupo con pandas."""
+        data = pd.DataFrame(self.analytics.get_concentration('especie')['data'])
+
+        for row in data.itertuples(index=False):
+            subset = self.df_desembarque[(self.df_desembarque['Año'] == row.año) &
+                                         (self.df_desembarque['Región'] == row.region)]
+            totals = subset.groupby('Especie')['Toneladas'].sum().sort_values(ascending=False)
+            shares = totals / totals.sum()
+            self.assertAlmostEqual(row.hhi, round((shares ** 2).sum() * 10000, 2), places=2)
+            self.assertAlmostEqual(row.cr4, round(shares.head(4).sum() * 100, 2), places=2)
+            self.assertEqual(row.lider, totals.index[0])
+            self.assertEqual(row.participantes, len(totals))
+
+    def test_cr10_matches_top_ports(self):
+        """Test que CR10 de puertos coincide con porcentaje_concentracion de get_top_ports."""
+        data = pd.DataFrame(self.analytics.get_concentration('puerto')['data'])
+        for row in data.itertuples(index=False):
+            top = self.analytics.get_top_ports(year=row.año, region=row.region, top_n=10)
+            self.assertAlmostEqual(row.cr10, top['summary']['porcentaje_concentracion'], places=2)
+            self.assertEqual(row.lider, top['summary']['puerto_lider'])
+
+    def test_all_dimensions_and_national(self):
+        """Test de las tres dimensiones y del nivel nacional."""
+        result = self.analytics.get_concentration()
+        self.assertTrue(result['success'])
+        self.assertEqual(set(r['dimension'] for r in result['data']), {'puerto', 'especie', 'tipo_agente'})
+        self.assertEqual(result['summary']['grupos'], 4)
+
+        national = self.analytics.get_concentration('puerto', by_region=False)
+        self.assertEqual([r['año'] for r in national['data']], [2020, 2021])
+        self.assertTrue(all(r['region'] is None for r in national['data']))
+        self.assertEqual(national['data'][0]['participantes'], 6)
+
+    def test_compact_mode_identical(self):
+        """Test que el modo compacto produce los mismos resultados."""
+        compact = analytics_with(self.df_desembarque, compact=True)
+        self.assertEqual(compact.get_concentration()['data'], self.analytics.get_concentration()['data'])
+
+    def test_filters_and_errors(self):
+        """Test de filtros, filtros sin datos y dimensión inválida."""
+        result = self.analytics.get_concentration('puerto', year=2020, region='Lagos')
+        self.assertEqual(len(result['data']), 1)
+        self.assertFalse(self.analytics.get_concentration(year=1990)['success'])
+        with self.assertRaises(ValueError):
+            self.analytics.get_concentration('planta')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests unitarios para los cubos precomputados (motor 'numpy').
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_cubes import SupplyCube
+from fixtures import analytics_with
+
+
+class TestSupplyCube(unittest.TestCase):
+    """Suite de tests para SupplyCube y get_supply_vs_demand con engine='numpy'."""
+
+    def setUp(self):
+        """Datos con especies solo en un dataset, regiones nulas y valores faltantes."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2019, 2020, 2020, 2020, 2021, 2021, 2022],
+            'Mes': [1, 1, 2, 3, 1, 2, 1],
+            'Región': ['LAGOS', 'LAGOS', 'AYSEN', None, 'LAGOS', 'AYSEN', 'LAGOS'],
+            'Puerto': ['PUERTO MONTT', 'PUERTO MONTT', 'CHACABUCO', 'CALBUCO',
+                       'PUERTO MONTT', 'CHACABUCO', 'CALBUCO'],
+            'Especie': ['SALMON', 'SALMON', 'MERLUZA', 'SALMON', 'JUREL', 'MERLUZA', 'SALMON'],
+            'Tipo de agente': ['Industrial'] * 7,
+            'Toneladas': [10.5, 1000.25, 500.125, 20, np.nan, 300, 1100]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2020, 2021, 2023],
+            'Región': ['LAGOS', 'AYSEN', 'LAGOS', 'LAGOS'],
+            'Especie': ['SALMON', 'CENTOLLA', 'SALMON', 'SALMON'],
+            'Línea de elaboración': ['Congelado'] * 4,
+            'Materia Prima': [800, 50, 900, 10],
+            'Producción': [700, 40, 800, 9]
+        })
+
+    def _both(self, **options):
+        return (
+            analytics_with(self.df_desembarque, self.df_produccion, engine='pandas', **options),
+            analytics_with(self.df_desembarque, self.df_produccion, **options),
+        )
+
+    def test_matches_pandas_engine(self):
+        """Test que el cubo reproduce el groupby + merge outer para varios filtros."""
+        for options in ({}, {'compact': True}):
+            reference, cube = self._both(**options)
+            for params in ({'start_year': 2000}, {'start_year': 2020, 'end_year': 2021},
+                           {'start_year': 2000, 'region': 'Región de Los Lagos'},
+                           {'start_year': 2000, 'region': 'ATACAMA'}):
+                expected = reference.get_supply_vs_demand(**params)
+                result = cube.get_supply_vs_demand(**params)
+                self.assertEqual(result['data'], expected['data'], params)
+                self.assertEqual(result['summary'], expected['summary'], params)
+
+    def test_matches_pandas_engine_with_decimals(self):
+        """Test que celdas y resumen son idénticos al motor pandas con toneladas de 3 y 4 decimales."""
+        rng = np.random.default_rng(0)
+        species = [f'ESPECIE {i}' for i in range(40)]
+        for decimals in (3, 4):
+            self.df_desembarque = pd.DataFrame({
+                'Año': rng.integers(2015, 2024, 20000), 'Región': rng.choice(['LAGOS', 'AYSEN', 'BIOBIO'], 20000),
+                'Especie': rng.choice(species, 20000), 'Toneladas': np.round(rng.lognormal(3, 2, 20000), decimals)
+            })
+            self.df_produccion = pd.DataFrame({
+                'Año': rng.integers(2015, 2024, 5000), 'Región': rng.choice(['LAGOS', 'AYSEN'], 5000),
+                'Especie': rng.choice(species, 5000), 'Materia Prima': np.round(rng.lognormal(4, 2, 5000), decimals),
+                'Producción': 1.0
+            })
+            reference, cube = self._both()
+            for params in ({'start_year': 2000}, {'start_year': 2020, 'region': 'LAGOS'}):
+                expected = reference.get_supply_vs_demand(**params)
+                result = cube.get_supply_vs_demand(**params)
+                self.assertEqual((result['data'], result['summary']), (expected['data'], expected['summary']))
+
+    def test_pairs_only_in_one_dataset(self):
+        """Test que aparecen pares solo de capturas o solo de producción (fillna 0)."""
+        _, analytics = self._both()
+        data = analytics.get_supply_vs_demand(start_year=2020, end_year=2021)['data']
+        pairs = {(r['Año'], r['Especie']): r for r in data}
+
+        self.assertEqual(pairs[(2020, 'CENTOLLA')]['Capturas'], 0)
+        self.assertEqual(pairs[(2021, 'JUREL')]['Capturas'], 0)
+        self.assertEqual(pairs[(2020, 'SALMON')]['Capturas'], 1020.25)
+
+    def test_region_column_optional(self):
+        """Test que sin columna Región en producción el filtro regional no la afecta."""
+        self.df_produccion = self.df_produccion.drop(columns=['Región'])
+        reference, cube = self._both()
+
+        self.assertEqual(
+            cube.get_supply_vs_demand(start_year=2000, region='AYSEN')['data'],
+            reference.get_supply_vs_demand(start_year=2000, region='AYSEN')['data']
+        )
+
+    def test_cube_structure(self):
+        """Test del dominio compartido y de las matrices densas."""
+        cube = SupplyCube(self.df_desembarque, self.df_produccion)
+
+        self.assertEqual(list(cube.years), [2019, 2020, 2021, 2022, 2023])
+        self.assertEqual(list(cube.species), ['CENTOLLA', 'JUREL', 'MERLUZA', 'SALMON'])
+        self.assertEqual(cube.sums['capturas'].shape, (5, 4, 3))
+        self.assertAlmostEqual(cube.total_sums['capturas'].sum(), 2930.875)
+
+    def test_invalid_engine(self):
+        """Test que un motor desconocido lanza ValueError."""
+        with self.assertRaises(ValueError):
+            analytics_with(self.df_desembarque, self.df_produccion, engine='polars')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,286 @@
+"""
+Tests diferenciales: rutas aceleradas vs implementaciones de referencia.
+
+Genera datasets aleatorios con el esquema real (filtros sin filas, agentes y
+regiones nulos, meses faltantes, regiones desconocidas, toneladas con 2, 3 y
+4 decimales) y verifica que cada variante acelerada de FisheryAnalytics
+(engine='numpy' con sus tablas codificadas y cubos, modo compacto,
+estructuras descartadas por el governor de memoria, caché de resultados)
+retorna exactamente los mismos 'data' y 'summary' que engine='pandas' y, en
+los análisis que ya existían, que la implementación original congelada en
+baseline_analytics. Con Hypothesis instalado los datasets se exploran y
+reducen al caso mínimo que falla; sin Hypothesis corre solo una serie fija de
+semillas. Todo corre sin red.
+"""
+
+import inspect
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import baseline_analytics
+from fishery_analytics import FisheryAnalytics
+from fishery_cache import ResultCache
+
+try:
+    from hypothesis import HealthCheck, given, settings, strategies as st
+    HAS_HYPOTHESIS = True
+except ImportError:
+    HAS_HYPOTHESIS = False
+
+
+# Valores posibles de cada dimensión (None = nulo; ATLANTIDA no es una región chilena)
+YEARS = [2018, 2019, 2020, 2021]
+REGIONS = ['LAGOS', 'AYSEN', 'BIOBIO', 'ATLANTIDA', None]
+PORTS = ['PUERTO MONTT', 'CALBUCO', 'CHACABUCO', 'TALCAHUANO', None]
+SPECIES = ['SALMON', 'JUREL', 'MERLUZA', 'CENTOLLA', None]
+AGENTS = ['Industrial', 'Artesanal', None]
+LINES = ['Congelado', 'Fresco', 'Conserva', None]
+PLANTS = ['Planta A', 'Planta B', 'Planta C']
+TONNAGES = [0.0, 0.01, 0.5, 12.34, 100.0, 2500.75, float('nan')]
+
+# Decimales de las toneladas generadas (los anuarios traen 2, 3 o 4)
+DECIMALS = (2, 3, 4)
+
+# Filtros de las consultas: años con y sin datos, regiones válidas, sin datos y nulas
+FILTER_YEARS = [None, 2019, 2021, 1990]
+FILTER_REGIONS = [None, 'lagos', 'AYSEN', 'ATACAMA']
+
+
+
+def build_frames(landings, production, plants, decimals: int = 2):
+    """DataFrames con el esquema de los CSV a partir de tuplas de valores (toneladas redondeadas a `decimals`)."""
+    df_desembarque = pd.DataFrame(
+        landings, columns=['Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente', 'Toneladas']
+    )
+    df_produccion = pd.DataFrame(
+        production, columns=['Año', 'Región', 'Especie', 'Línea de elaboración', 'Materia Prima', 'Producción']
+    )
+    df_plantas = pd.DataFrame(plants, columns=['Año', 'Región', 'Nombre Planta', 'Línea de producción'])
+    df_desembarque['Toneladas'] = df_desembarque['Toneladas'].astype('float64').round(decimals)
+    for column in ('Materia Prima', 'Producción'):
+        df_produccion[column] = df_produccion[column].astype('float64').round(decimals)
+    return df_desembarque, df_produccion, df_plantas
+
+
+def dense_series(key, tonnages):
+    """Filas de una serie Región × Puerto × Especie con todos los meses de YEARS (anomalías y pronósticos)."""
+    region, port, species, agent = key
+    periods = [(year, month) for year in YEARS for month in range(1, 13)]
+    return [(year, month, region, port, species, agent, tons) for (year, month), tons in zip(periods, tonnages)]
+
+
+def random_frames(rng: np.random.Generator, decimals: int = 2):
+    """Dataset aleatorio con una semilla (mismos valores posibles que la estrategia de Hypothesis)."""
+    def pick(values, size):
+        return [values[i] for i in rng.integers(0, len(values), size)]
+
+    def tonnages(size):
+        # Valores de borde (0, NaN, centavos) mezclados con valores continuos
+        drawn = rng.lognormal(3, 2, size)
+        return [tons if rng.random() < 0.5 else float(value) for tons, value in zip(pick(TONNAGES, size), drawn)]
+
+    # Meses faltantes: cada dataset usa un subconjunto de meses
+    months = sorted(rng.choice(np.arange(1, 13), int(rng.integers(1, 13)), replace=False).tolist())
+    n = int(rng.integers(1, 80))
+    landings = list(zip(
+        pick(YEARS, n), pick(months, n), pick(REGIONS, n), pick(PORTS, n),
+        pick(SPECIES, n), pick(AGENTS, n), tonnages(n)
+    ))
+    if rng.random() < 0.5:
+        key = (pick(REGIONS[:-1], 1)[0], pick(PORTS[:-1], 1)[0], pick(SPECIES[:-1], 1)[0], pick(AGENTS, 1)[0])
+        series = rng.lognormal(3, 1, len(YEARS) * 12)
+        series[rng.integers(0, len(series))] *= 50
+        landings += dense_series(key, series.tolist())
+    n = int(rng.integers(1, 30))
+    production = list(zip(
+        pick(YEARS, n), pick(REGIONS, n), pick(SPECIES, n), pick(LINES, n), tonnages(n), tonnages(n)
+    ))
+    n = int(rng.integers(1, 15))
+    plants = list(zip(pick(YEARS, n), pick(REGIONS, n), pick(PLANTS, n), pick(LINES, n)))
+    return build_frames(landings, production, plants, decimals)
+
+
+def analysis_calls(year, region):
+    """Una o más llamadas por análisis de ANALYSIS_TYPES con los filtros dados."""
+    return [
+        ('supply_vs_demand', {'start_year': 2018, 'region': region}),
+        ('supply_vs_demand', {'start_year': 2019, 'end_year': 2020}),
+        ('conversion_efficiency', {'top_n': 5, 'min_materia_prima': 0.0}),
+        ('species_flow', {'year': year, 'region': region, 'top_n': 2}),
+        ('regional_dynamics', {}),
+        ('regional_dynamics', {'level': 'macrozona'}),
+        ('longitudinal_evolution', {}),
+        ('agent_share', {}),
+        ('agent_share', {'level': 'puerto'}),
+        ('agent_distribution', {'year': year, 'region': region}),
+        ('top_ports', {'year': year, 'region': region, 'top_n': 3}),
+        ('port_rank_trajectories', {'region': region, 'top_n': 2}),
+        ('species_by_agent_breakdown', {'year': year, 'region': region, 'top_n': 2}),
+        ('seasonal_context', {'current_year': year or 2021, 'region': region}),
+        ('seasonal_heatmap', {'region': region}),
+        ('seasonal_heatmap', {'by_region': False}),
+        ('plant_capacity_analysis', {}),
+        ('landing_anomalies', {'year': year, 'region': region}),
+        ('forecast', {'horizon': 3, 'region': region}),
+        ('concentration', {'year': year, 'region': region}),
+    ]
+
+
+def baseline_supports(name, params) -> bool:
+    """Si la implementación original tiene el análisis y acepta todos los parámetros."""
+    method = getattr(baseline_analytics.FisheryAnalytics, f'get_{name}', None)
+    return method is not None and set(params) <= set(inspect.signature(method).parameters)
+
+
+def assert_same(test, expected, result, path='result'):
+    """Igualdad recursiva y exacta de resultados (los float ya vienen redondeados; NaN == NaN)."""
+    if isinstance(expected, dict):
+        test.assertIsInstance(result, dict, path)
+        test.assertEqual(sorted(result), sorted(expected), path)
+        for key in expected:
+            assert_same(test, expected[key], result[key], f'{path}[{key!r}]')
+    elif isinstance(expected, (list, tuple)):
+        test.assertIsInstance(result, (list, tuple), path)
+        test.assertEqual(len(result), len(expected), path)
+        for i, (left, right) in enumerate(zip(expected, result)):
+            assert_same(test, left, right, f'{path}[{i}]')
+    elif isinstance(expected, float) and isinstance(result, (int, float)) and not isinstance(result, bool):
+        if math.isnan(expected):
+            test.assertTrue(math.isnan(result), f'{path}: {result} != nan')
+        else:
+            test.assertEqual(result, expected, path)
+    elif isinstance(result, float) and isinstance(expected, int) and not isinstance(expected, bool):
+        assert_same(test, float(expected), result, path)
+    else:
+        test.assertEqual(result, expected, path)
+
+
+def _outcome(analytics, name, params):
+    """Resultado de get_<name>(**params), o la excepción que lanza (también debe coincidir)."""
+    try:
+        return getattr(analytics, f'get_{name}')(**params)
+    except Exception as error:  # noqa: BLE001 - se compara con la de la referencia
+        return error
+
+
+class DifferentialMixin:
+    """Comparación de todas las variantes aceleradas contra engine='pandas' y la implementación original."""
+
+    def accelerated(self, frames, cache_dir):
+        """Variantes aceleradas: nombre -> FisheryAnalytics."""
+        return {
+            'numpy': FisheryAnalytics(*frames),
+            'numpy+compact': FisheryAnalytics(*frames, compact=True),
+            # Presupuesto mínimo: cada estructura derivada se descarta y se reconstruye
+            'numpy+memory_budget': FisheryAnalytics(*frames, memory_budget=1),
+            'numpy+result_cache': FisheryAnalytics(
+                *frames, result_cache=ResultCache(os.path.join(cache_dir, 'results.sqlite'))
+            ),
+        }
+
+    def assert_outcome(self, expected, result, label):
+        """Mismo 'success', 'data' y 'summary' (o la misma excepción)."""
+        if isinstance(expected, Exception) or isinstance(result, Exception):
+            self.assertEqual(repr(result), repr(expected), label)
+            return
+        self.assertEqual(result['success'], expected['success'], label)
+        assert_same(self, expected.get('data'), result.get('data'), f'{label} data')
+        assert_same(self, expected.get('summary'), result.get('summary'), f'{label} summary')
+
+    def check_frames(self, frames, year, region):
+        """Compara cada llamada en cada variante contra engine='pandas' y contra la implementación original."""
+        reference = FisheryAnalytics(*frames, engine='pandas')
+        baseline = baseline_analytics.FisheryAnalytics(*frames)
+        calls = analysis_calls(year, region)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            variants = {'pandas': reference, **self.accelerated(frames, cache_dir)}
+            for name, params in calls:
+                expected = _outcome(reference, name, params)
+                original = _outcome(baseline, name, params) if baseline_supports(name, params) else None
+                # Una excepción de la implementación original es un error ya corregido: no hay oráculo
+                if isinstance(original, Exception):
+                    original = None
+                for variant, analytics in variants.items():
+                    runs = 2 if variant == 'numpy+result_cache' else 1
+                    for _ in range(runs):
+                        label = f'{variant} get_{name}({params})'
+                        if analytics is reference:
+                            result = expected
+                        else:
+                            result = _outcome(analytics, name, params)
+                            self.assert_outcome(expected, result, label)
+                        if original is not None:
+                            self.assert_outcome(original, result, f'{label} vs baseline')
+
+
+class TestDifferentialSeeds(DifferentialMixin, unittest.TestCase):
+    """Serie fija de datasets aleatorios (corre aunque Hypothesis no esté instalado)."""
+
+    def test_calls_cover_all_analyses(self):
+        """Test que el arnés llama a cada análisis registrado."""
+        self.assertEqual({name for name, _ in analysis_calls(None, None)}, set(FisheryAnalytics.ANALYSIS_TYPES))
+
+    def test_calls_cover_baseline_analyses(self):
+        """Test que cada análisis de la implementación original se compara contra ella al menos una vez."""
+        original = {name[len('get_'):] for name in dir(baseline_analytics.FisheryAnalytics) if name.startswith('get_')}
+        compared = {name for name, params in analysis_calls(2020, 'AYSEN') if baseline_supports(name, params)}
+        self.assertEqual(compared, original)
+
+    def test_seeded_datasets(self):
+        """Test de las variantes aceleradas sobre datasets con semilla fija y 2, 3 y 4 decimales."""
+        for decimals in DECIMALS:
+            for seed in range(8):
+                rng = np.random.default_rng(seed)
+                year = FILTER_YEARS[seed % len(FILTER_YEARS)]
+                region = FILTER_REGIONS[(seed // 2) % len(FILTER_REGIONS)]
+                with self.subTest(decimals=decimals, seed=seed, year=year, region=region):
+                    self.check_frames(random_frames(rng, decimals), year, region)
+
+
+if HAS_HYPOTHESIS:
+    # Valores de borde o continuos; build_frames los redondea a los decimales del ejemplo
+    tonnage_values = st.sampled_from(TONNAGES) | st.floats(0, 50000)
+    landing_rows = st.tuples(
+        st.sampled_from(YEARS), st.integers(1, 12), st.sampled_from(REGIONS), st.sampled_from(PORTS),
+        st.sampled_from(SPECIES), st.sampled_from(AGENTS), tonnage_values
+    )
+    production_rows = st.tuples(
+        st.sampled_from(YEARS), st.sampled_from(REGIONS), st.sampled_from(SPECIES), st.sampled_from(LINES),
+        tonnage_values, tonnage_values
+    )
+    dense_keys = st.tuples(st.sampled_from(REGIONS[:-1]), st.sampled_from(PORTS[:-1]),
+                           st.sampled_from(SPECIES[:-1]), st.sampled_from(AGENTS))
+    dense_tonnages = st.lists(st.floats(0, 5000), min_size=len(YEARS) * 12, max_size=len(YEARS) * 12)
+    plant_rows = st.tuples(st.sampled_from(YEARS), st.sampled_from(REGIONS), st.sampled_from(PLANTS),
+                           st.sampled_from(LINES))
+
+
+@unittest.skipUnless(HAS_HYPOTHESIS, 'hypothesis no instalado')
+class TestDifferentialHypothesis(DifferentialMixin, unittest.TestCase):
+    """Datasets generados por Hypothesis (se reducen al caso mínimo que falla)."""
+
+    if HAS_HYPOTHESIS:
+        @settings(max_examples=40, deadline=None, suppress_health_check=[HealthCheck.too_slow])
+        @given(
+            landings=st.lists(landing_rows, min_size=1, max_size=60),
+            dense=st.none() | st.tuples(dense_keys, dense_tonnages),
+            production=st.lists(production_rows, min_size=1, max_size=20),
+            plants=st.lists(plant_rows, min_size=1, max_size=10),
+            year=st.sampled_from(FILTER_YEARS),
+            region=st.sampled_from(FILTER_REGIONS),
+            decimals=st.sampled_from(DECIMALS),
+        )
+        def test_engines_agree(self, landings, dense, production, plants, year, region, decimals):
+            """Test de las variantes aceleradas sobre datasets generados."""
+            if dense is not None:
+                landings = landings + dense_series(*dense)
+            self.check_frames(build_frames(landings, production, plants, decimals), year, region)
+
+
+if __name__ == '__main__':
+    unittest.main()
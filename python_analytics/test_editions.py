@@ -0,0 +1,125 @@
+"""
+Tests unitarios para el almacén de ediciones versionadas.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_editions import EditionStore
+
+
+class TestEditionStore(unittest.TestCase):
+    """Suite de tests para EditionStore (as_of, changes y diff)."""
+
+    def setUp(self):
+        """Tres ediciones: revisión de cifras, registro nuevo, registro eliminado y clave nula."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2020, 2021, 2021, 2021],
+            'Mes': [1, 1, 2, 1, 2, 3],
+            'Región': ['LAGOS', 'LAGOS', 'AYSEN', 'LAGOS', None, 'BIOBIO'],
+            'Puerto': ['PUERTO MONTT', 'PUERTO MONTT', 'CHACABUCO', 'CALBUCO', 'X', 'TALCAHUANO'],
+            'Especie': ['SALMON', 'SALMON', 'MERLUZA', 'JUREL', 'JUREL', 'MERLUZA'],
+            'Tipo de agente': ['Industrial', 'Industrial', 'Artesanal', 'Artesanal', 'Industrial', 'Artesanal'],
+            'Toneladas': [100.0, 5.0, 30.0, 10.0, 1.0, 80.0]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2021], 'Región': ['LAGOS', 'AYSEN'], 'Especie': ['SALMON', 'MERLUZA'],
+            'Línea de elaboración': ['Congelado'] * 2, 'Materia Prima': [80, 20], 'Producción': [70.0, 15.0]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020, 2021], 'Región': ['LAGOS', 'AYSEN'],
+            'Nombre Planta': ['Planta A', 'Planta B'], 'Línea de producción': ['Congelado'] * 2
+        })
+
+        # 2024: se revisan dos cifras (una de clave nula) y se agrega un registro
+        self.revised = self.df_desembarque.copy()
+        self.revised.loc[2, 'Toneladas'] = 35.5
+        self.revised.loc[4, 'Toneladas'] = 2.0
+        self.revised = pd.concat([self.revised, pd.DataFrame([{
+            'Año': 2021, 'Mes': 4, 'Región': 'AYSEN', 'Puerto': 'CHACABUCO', 'Especie': 'MERLUZA',
+            'Tipo de agente': 'Industrial', 'Toneladas': 12.0
+        }])], ignore_index=True)
+        # 2025: se elimina el registro de BIOBIO y cambia la producción
+        self.latest = self.revised.drop(index=5)
+        self.latest_produccion = self.df_produccion.assign(Producción=[70.0, 16.0])
+
+        self.store = EditionStore()
+        self.store.add_edition('2023', self.df_desembarque, self.df_produccion, self.df_plantas)
+        self.summary = self.store.add_edition('2024', self.revised, self.df_produccion, self.df_plantas)
+        self.store.add_edition('2025', self.latest, self.latest_produccion, self.df_plantas)
+
+    def test_add_edition_summary(self):
+        """Test del resumen del delta y de las validaciones."""
+        self.assertEqual(self.summary['desembarque'], {'agregadas': 1, 'modificadas': 2, 'eliminadas': 0})
+        self.assertEqual(self.summary['plantas'], {'agregadas': 0, 'modificadas': 0, 'eliminadas': 0})
+        with self.assertRaises(ValueError):
+            self.store.add_edition('2024', self.revised, self.df_produccion, self.df_plantas)
+        with self.assertRaises(ValueError):
+            self.store.run('top_ports', as_of='1999')
+
+    def test_as_of_matches_full_copy(self):
+        """Test que cada edición reconstruida da los mismos resultados que sus datos originales."""
+        editions = {
+            '2023': (self.df_desembarque, self.df_produccion),
+            '2024': (self.revised, self.df_produccion),
+            '2025': (self.latest, self.latest_produccion),
+        }
+        for edition, (landings, production) in editions.items():
+            reference = FisheryAnalytics(landings, production, self.df_plantas)
+            for name in ('top_ports', 'seasonal_context', 'supply_vs_demand', 'regional_dynamics'):
+                result = self.store.run(name, as_of=edition)
+                self.assertEqual(result['data'], getattr(reference, f'get_{name}')()['data'], (edition, name))
+                self.assertEqual(result['metadata']['edition'], edition)
+        self.assertEqual(self.store.describe()['loaded'], ['2025'])
+
+    def test_changes_between_editions(self):
+        """Test de las filas agregadas, modificadas y eliminadas, en ambos sentidos."""
+        changes = self.store.changes('2023', '2025')
+        self.assertEqual(changes['cambio'].value_counts().to_dict(), {'modificada': 2, 'agregada': 1, 'eliminada': 1})
+
+        removed = changes[changes['cambio'] == 'eliminada'].iloc[0]
+        self.assertEqual((removed['Región'], removed['Toneladas_antes']), ('BIOBIO', 80.0))
+        self.assertTrue(np.isnan(removed['Toneladas_despues']))
+        null_key = changes[changes['Región'].isna()].iloc[0]
+        self.assertEqual((null_key['Toneladas_antes'], null_key['Toneladas_despues']), (1.0, 2.0))
+
+        backwards = self.store.changes('2025', '2023')
+        self.assertEqual(backwards['cambio'].value_counts().to_dict(), {'modificada': 2, 'agregada': 1, 'eliminada': 1})
+        self.assertTrue(self.store.changes('2024', '2024').empty)
+
+    def test_diff_by_group(self):
+        """Test que la revisión por grupo suma la diferencia de totales entre ediciones."""
+        diff = self.store.diff('2023', '2025', by=['Año'])
+        self.assertEqual(diff['summary']['diferencia_total'],
+                         round(self.latest['Toneladas'].sum() - self.df_desembarque['Toneladas'].sum(), 2))
+        by_year = {row['Año']: row for row in diff['data']}
+        self.assertEqual(by_year[2021]['diferencia'], -67.0)
+        self.assertEqual(by_year[2020], {'Año': 2020, 'diferencia': 5.5, 'agregadas': 0, 'modificadas': 1, 'eliminadas': 0})
+
+        production = self.store.diff('2024', '2025', by=['Región'], dataset='produccion')
+        self.assertEqual(production['data'], [{'Región': 'AYSEN', 'diferencia': 1.0, 'agregadas': 0, 'modificadas': 1, 'eliminadas': 0}])
+        with self.assertRaises(ValueError):
+            self.store.diff('2023', '2025', by=['Toneladas'])
+
+    def test_save_and_load(self):
+        """Test que el almacén guardado reconstruye las mismas ediciones y ocupa menos que las copias."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ediciones.pkl')
+            self.store.save(path)
+            loaded = EditionStore.load(path, max_loaded=2)
+
+        self.assertEqual(loaded.editions, ['2023', '2024', '2025'])
+        self.assertEqual(loaded.run('agent_distribution', as_of='2023')['data'],
+                         self.store.run('agent_distribution', as_of='2023')['data'])
+        description = loaded.describe()
+        self.assertEqual(description['deltas']['2023']['desembarque'], 5)
+        self.assertLess(description['bytes_almacen'], description['bytes_copias_completas_estimado'])
+
+
+if __name__ == '__main__':
+    unittest.main()
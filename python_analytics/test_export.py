@@ -0,0 +1,185 @@
+"""
+Tests unitarios para el exportador por lotes y los snapshots.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_cache import ResultCache
+from fishery_export import build_jobs, job_filename, main, run_export
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class TestExport(unittest.TestCase):
+    """Suite de tests para fishery_export."""
+
+    def setUp(self):
+        """Datos mínimos y directorio de salida temporal."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, 'out')
+        self.analytics = FisheryAnalytics(
+            pd.DataFrame({
+                'Año': [2020, 2020, 2021, 2021], 'Mes': [1, 2, 1, 2],
+                'Región': ['LAGOS', 'AYSEN', 'LAGOS', 'LAGOS'],
+                'Puerto': ['Puerto Montt', 'Chacabuco', 'Calbuco', 'Puerto Montt'],
+                'Especie': ['SALMON', 'MERLUZA', 'SALMON', 'JUREL'],
+                'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial', 'Artesanal'],
+                'Toneladas': [1000, 500, 1200, 80.5]
+            }),
+            pd.DataFrame({
+                'Año': [2020, 2021], 'Región': ['LAGOS', 'LAGOS'], 'Especie': ['SALMON', 'SALMON'],
+                'Línea de elaboración': ['Congelado', 'Congelado'],
+                'Materia Prima': [800, 900], 'Producción': [700, 810]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+                'Línea de producción': ['Congelado']
+            })
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_jobs(self):
+        """Test que la grilla solo se aplica a los análisis que aceptan el parámetro."""
+        jobs = build_jobs(['top_ports', 'agent_share'], {'year': [2020, 2021]}, {'top_n': 3})
+
+        self.assertEqual(jobs, [
+            ('top_ports', {'top_n': 3, 'year': 2020}),
+            ('top_ports', {'top_n': 3, 'year': 2021}),
+            ('agent_share', {}),
+        ])
+        self.assertEqual(job_filename('top_ports', {'region': 'LOS RIOS', 'year': 2020}, 'csv'),
+                         'top_ports__region-LOS_RIOS__year-2020.csv')
+
+    def test_json_matches_get(self):
+        """Test que el JSON exportado equivale al resultado de get_*."""
+        jobs = build_jobs(['top_ports', 'supply_vs_demand'], {'year': [2020]})
+        manifest = run_export(self.analytics, jobs, self.output, 'json', workers=2, batch_size=1)
+
+        for entry, (analysis_type, params) in zip(manifest['jobs'], jobs):
+            with open(os.path.join(self.output, entry['file']), encoding='utf-8') as f:
+                exported = json.load(f)
+            expected = getattr(self.analytics, f'get_{analysis_type}')(**params)
+            self.assertEqual(exported['data'], expected['data'])
+            self.assertEqual(exported['summary'], json.loads(json.dumps(expected['summary'], default=int)))
+            self.assertEqual(entry['rows'], len(expected['data']))
+
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'manifest.json')))
+
+    def test_csv_and_errors(self):
+        """Test de la salida CSV y de un trabajo sin datos."""
+        jobs = [('agent_distribution', {'year': 2021}), ('agent_distribution', {'year': 1990})]
+        manifest = run_export(self.analytics, jobs, self.output, 'csv')
+        ok, failed = manifest['jobs']
+
+        with open(os.path.join(self.output, ok['file']), encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(ok['status'], 'ok')
+        self.assertEqual(sorted(r['tipo_agente'] for r in rows), ['Artesanal', 'Industrial'])
+        self.assertEqual(failed['status'], 'error')
+        self.assertNotIn('file', failed)
+
+    def test_failed_job_does_not_abort_export(self):
+        """Test que una excepción en un trabajo se informa en el manifest y los demás terminan."""
+        jobs = [('top_ports', {'year': 2020}), ('regional_dynamics', {'level': 'planeta'}), ('top_ports', {'year': 2021})]
+        manifest = run_export(self.analytics, jobs, self.output, 'json', workers=2)
+
+        self.assertEqual([entry['status'] for entry in manifest['jobs']], ['ok', 'error', 'ok'])
+        self.assertTrue(manifest['jobs'][1]['error'].startswith('ValueError'))
+        self.assertEqual(sorted(os.listdir(self.output)), [
+            'manifest.json', 'top_ports__year-2020.json', 'top_ports__year-2021.json'
+        ])
+
+    def test_failed_write_removes_partial_file(self):
+        """Test que un trabajo que falla a mitad de la escritura no deja archivos."""
+        def failing(analysis_type, batch_size, **params):
+            yield {'type': 'metadata', 'analysis_type': analysis_type, 'metadata': {}}
+            yield {'type': 'batch', 'data': [{'puerto': 'Puerto Montt'}]}
+            raise RuntimeError('disco lleno')
+
+        with mock.patch.object(self.analytics, 'iter_analysis', failing):
+            manifest = run_export(self.analytics, [('top_ports', {})], self.output, 'json')
+
+        self.assertEqual(manifest['jobs'][0]['status'], 'error')
+        self.assertEqual(manifest['jobs'][0]['error'], 'RuntimeError: disco lleno')
+        self.assertEqual(os.listdir(self.output), ['manifest.json'])
+
+    def test_parallel_jobs_build_structures_once(self):
+        """Test que los hilos del exportador construyen una sola vez cada estructura compartida."""
+        builds = []
+        build_supply_cube = self.analytics.build_supply_cube
+
+        def counted():
+            builds.append(1)
+            return build_supply_cube()
+
+        jobs = build_jobs(['supply_vs_demand'], {'start_year': list(range(2006, 2022))})
+        with mock.patch.object(self.analytics, 'build_supply_cube', counted):
+            manifest = run_export(self.analytics, jobs, self.output, 'json', workers=8)
+
+        self.assertTrue(all(entry['status'] == 'ok' for entry in manifest['jobs']))
+        self.assertEqual(len(builds), 1)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow no instalado')
+    def test_parquet_metadata(self):
+        """Test que Parquet conserva filas y metadata del análisis."""
+        import pyarrow.parquet as pq
+
+        manifest = run_export(self.analytics, [('regional_dynamics', {})], self.output, 'parquet')
+        table = pq.read_table(os.path.join(self.output, manifest['jobs'][0]['file']))
+
+        self.assertEqual(table.num_rows, manifest['jobs'][0]['rows'])
+        self.assertIn(b'fishery_analytics', table.schema.metadata)
+
+    def test_snapshot_cli(self):
+        """Test del CLI exportando desde un snapshot."""
+        snapshot = os.path.join(self.tmp.name, 'datos.pkl')
+        self.analytics.save_snapshot(snapshot)
+        restored = FisheryAnalytics.from_snapshot(snapshot, compact=True)
+        self.assertEqual(restored.get_agent_share()['data'], self.analytics.get_agent_share()['data'])
+
+        status = main(['export', '--snapshot', snapshot, '--output', self.output,
+                       '--analysis', 'top_ports', '--grid', 'year=2020:2021', '--jobs', '2'])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(os.listdir(self.output)), [
+            'manifest.json', 'top_ports__year-2020.json', 'top_ports__year-2021.json'
+        ])
+
+    def test_cache_cli(self):
+        """Test que export --cache guarda los resultados y una segunda exportación los reutiliza."""
+        snapshot = os.path.join(self.tmp.name, 'datos.pkl')
+        cache_path = os.path.join(self.tmp.name, 'results.sqlite')
+        self.analytics.save_snapshot(snapshot)
+        args = ['export', '--snapshot', snapshot, '--analysis', 'top_ports', '--grid', 'year=2020:2021',
+                '--cache', cache_path]
+
+        self.assertEqual(main(args + ['--output', self.output]), 0)
+        second = os.path.join(self.tmp.name, 'second')
+        with mock.patch.object(FisheryAnalytics, '_compute', side_effect=AssertionError('recalculado')):
+            self.assertEqual(main(args + ['--output', second]), 0)
+
+        for name in ('top_ports__year-2020.json', 'top_ports__year-2021.json'):
+            with open(os.path.join(self.output, name), encoding='utf-8') as a, \
+                    open(os.path.join(second, name), encoding='utf-8') as b:
+                self.assertEqual(json.load(a)['data'], json.load(b)['data'])
+        cache = ResultCache(cache_path)
+        self.assertEqual(cache.stats()['entries'], 2)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+"""
+Tests unitarios para los pronósticos por lotes.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_forecast import BatchForecaster
+from fixtures import analytics_with
+
+
+class TestBatchForecaster(unittest.TestCase):
+    """Suite de tests para BatchForecaster y get_forecast."""
+
+    def setUp(self):
+        """Series sintéticas: estacional pura y estacional con tendencia."""
+        months = np.arange(72)
+        self.pattern = 100 + 50 * np.sin(2 * np.pi * months / 12)
+        self.trend = self.pattern + 10 * months
+        self.history = np.vstack([self.pattern, self.trend])
+
+    def test_seasonal_naive(self):
+        """Test que seasonal_naive repite el último año."""
+        forecast = BatchForecaster(self.history).predict('seasonal_naive', 18)
+
+        np.testing.assert_allclose(forecast[:, :12], self.history[:, -12:])
+        np.testing.assert_allclose(forecast[:, 12:], self.history[:, -12:-6])
+
+    def test_linear_seasonal_recovers_trend(self):
+        """Test que la regresión reproduce una serie lineal + estacional exacta."""
+        future = np.arange(72, 84)
+        expected = 100 + 50 * np.sin(2 * np.pi * future / 12) + 10 * future
+        forecast = BatchForecaster(self.history).predict('linear_seasonal', 12)
+
+        np.testing.assert_allclose(forecast[1], expected, rtol=1e-6)
+
+    def test_auto_selection(self):
+        """Test que 'auto' elige la regresión para la serie con tendencia."""
+        forecast, chosen, errors = BatchForecaster(self.history).forecast(12, 'auto')
+
+        self.assertEqual(BatchForecaster.MODELS[chosen[1]], 'linear_seasonal')
+        self.assertAlmostEqual(errors[1], 0, places=6)
+        self.assertEqual(forecast.shape, (2, 12))
+        self.assertTrue((forecast >= 0).all())
+
+    def test_batch_equals_single(self):
+        """Test que pronosticar en lote equivale a pronosticar cada serie sola."""
+        batch = BatchForecaster(self.history)
+        for model in BatchForecaster.MODELS:
+            together = batch.predict(model, 12)
+            for i in range(len(self.history)):
+                alone = BatchForecaster(self.history[i:i + 1]).predict(model, 12)
+                np.testing.assert_allclose(together[i:i + 1], alone, rtol=1e-9, atol=1e-9)
+
+    def test_get_forecast(self):
+        """Test del envelope de get_forecast y sus filtros."""
+        rows = [
+            (year, month, region, 'PUERTO', species, 'Industrial', base * (1 + 0.3 * (month in (1, 2))))
+            for year in range(2018, 2024) for month in range(1, 13)
+            for region, species, base in (('LAGOS', 'SALMON', 1000), ('AYSEN', 'MERLUZA', 300))
+        ] + [(2018, 1, 'ATACAMA', 'CALDERA', 'JUREL', 'Artesanal', 5)]
+        df_desembarque = pd.DataFrame(rows, columns=[
+            'Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente', 'Toneladas'
+        ])
+        analytics = analytics_with(df_desembarque)
+
+        result = analytics.get_forecast(horizon=6)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['summary']['series_pronosticadas'], 2)
+        self.assertEqual(result['summary']['series_inactivas'], 1)
+        self.assertEqual(result['summary']['ultimo_periodo_observado'], '2023-12')
+        self.assertEqual(len(result['data']), 12)
+        self.assertEqual((result['data'][0]['año'], result['data'][0]['mes']), (2024, 1))
+
+        salmon = analytics.get_forecast(species='salmon', region='Los Lagos', model='seasonal_naive')
+        self.assertEqual({r['especie'] for r in salmon['data']}, {'SALMON'})
+        self.assertAlmostEqual(salmon['data'][0]['pronostico'], 1300)
+
+        self.assertFalse(analytics.get_forecast(region='ATACAMA')['success'])
+        with self.assertRaises(ValueError):
+            analytics.get_forecast(model='arima')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,194 @@
+"""
+Tests unitarios para el kernel de agregación sobre dimensiones codificadas.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_groupby import CodedTable
+
+
+class TestCodedTable(unittest.TestCase):
+    """Suite de tests para CodedTable y su uso en FisheryAnalytics."""
+
+    def setUp(self):
+        """Desembarques con nulos en las dimensiones y toneladas con decimales."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2020, 2021, 2021, 2021, 2021, 2020],
+            'Mes': [1, 2, 1, 1, 3, 3, 1, 2],
+            'Región': ['LAGOS', 'LAGOS', 'AYSEN', 'LAGOS', None, 'AYSEN', 'BIOBIO', 'BIOBIO'],
+            'Puerto': ['PUERTO MONTT', 'CALBUCO', 'CHACABUCO', 'PUERTO MONTT', 'X', None, 'TALCAHUANO', 'TALCAHUANO'],
+            'Especie': ['SALMON', 'SALMON', 'MERLUZA', 'JUREL', 'JUREL', 'MERLUZA', 'JUREL', 'SALMON'],
+            'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial', 'Artesanal', 'Industrial', None, 'Artesanal', 'Industrial'],
+            'Toneladas': [100.1, 0.2, 30.0, 10.7, 1.0, 5.5, np.nan, 80.3]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2021], 'Región': ['LAGOS', 'AYSEN'], 'Especie': ['SALMON', 'MERLUZA'],
+            'Línea de elaboración': ['Congelado'] * 2, 'Materia Prima': [80, 20], 'Producción': [70.0, 15.0]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020, 2020, 2021], 'Región': ['LAGOS', 'LAGOS', 'AYSEN'],
+            'Nombre Planta': ['Planta A', 'Planta B', 'Planta A'], 'Línea de producción': ['Congelado'] * 3
+        })
+        self.table = CodedTable(self.df_desembarque, ['Año', 'Región', 'Puerto', 'Tipo de agente'], ['Toneladas'])
+
+    def test_aggregate_matches_groupby(self):
+        """Test que sumas, tamaños y conteos distintos coinciden con pandas groupby."""
+        result = self.table.aggregate(['Año', 'Región'], values=['Toneladas'], size='n', nunique='Puerto')
+        expected = self.df_desembarque.groupby(['Año', 'Región']).agg(
+            Toneladas=('Toneladas', 'sum'), n=('Toneladas', 'size'), Puerto=('Puerto', 'nunique')
+        ).reset_index()
+
+        self.assertEqual(result[['Año', 'Región', 'n', 'Puerto']].values.tolist(),
+                         expected[['Año', 'Región', 'n', 'Puerto']].values.tolist())
+        np.testing.assert_allclose(result['Toneladas'], expected['Toneladas'])
+
+    def test_exact_sums_and_dropna(self):
+        """Test de sumas iguales a las de pandas y de los nulos como último grupo."""
+        totals = self.table.aggregate(['Año'], values=['Toneladas'])
+        self.assertEqual(totals['Toneladas'].tolist(), [210.6, 17.2])
+        self.assertEqual(self.table.total('Toneladas'), 227.8)
+
+        with_nulls = self.table.aggregate(['Región'], size='n', dropna=False)
+        self.assertEqual(with_nulls['Región'].tolist()[:3], ['AYSEN', 'BIOBIO', 'LAGOS'])
+        self.assertTrue(pd.isna(with_nulls['Región'].iloc[3]))
+        self.assertEqual(with_nulls['n'].tolist(), [2, 2, 3, 1])
+
+    def test_mask_and_derived_dimensions(self):
+        """Test de filtros por igualdad (valor inexistente = sin filas) y dimensiones derivadas."""
+        mask = self.table.mask({'Año': 2021, 'Región': 'LAGOS', 'Puerto': None})
+        self.assertEqual(int(mask.sum()), 1)
+        self.assertFalse(self.table.mask({'Región': 'ATACAMA'}).any())
+        self.assertEqual(int(self.table.mask({'Región': ('LAGOS', 'AYSEN', 'ATACAMA')}).sum()), 5)
+        self.assertTrue(self.table.aggregate(['Puerto'], mask=self.table.mask({'Año': 1990})).empty)
+
+        zones = self.table.with_mapped('Zona', 'Región', lambda s: s.map({'LAGOS': 'SUR', 'AYSEN': 'AUSTRAL'}))
+        result = zones.with_constant('Nacion', 'CHILE').aggregate(['Nacion', 'Zona'], values=['Toneladas'])
+        self.assertEqual(result['Zona'].tolist(), ['AUSTRAL', 'SUR'])
+        self.assertEqual(result['Toneladas'].tolist(), [35.5, 111.0])
+        self.assertNotIn('Zona', self.table.codes)
+
+    def test_sums_match_pandas_bitwise(self):
+        """Test que sumas y totales son idénticos a groupby/Series.sum de pandas (no solo cercanos)."""
+        rng = np.random.default_rng(7)
+        for decimals in (2, 3, 4):
+            df = pd.DataFrame({
+                'Año': rng.integers(2018, 2024, 5000),
+                'Región': rng.choice(['LAGOS', 'AYSEN', 'BIOBIO'], 5000),
+                'Toneladas': np.round(rng.lognormal(3, 2, 5000), decimals)
+            })
+            df.loc[rng.random(5000) < 0.05, 'Toneladas'] = np.nan
+            table = CodedTable(df, ['Año', 'Región'], ['Toneladas'])
+            self.assertFalse(table.exact)
+            self.assertIs(table.collapse(), table)
+
+            result = table.aggregate(['Año', 'Región'], values=['Toneladas'])
+            expected = df.groupby(['Año', 'Región'])['Toneladas'].sum()
+            self.assertEqual(result['Toneladas'].tolist(), expected.tolist(), decimals)
+            mask = table.mask({'Región': 'LAGOS'})
+            self.assertEqual(table.total('Toneladas', mask), df.loc[df['Región'] == 'LAGOS', 'Toneladas'].sum())
+
+    def test_collapse_to_sparse_cells(self):
+        """Test del tensor disperso: una fila por celda, nulos conservados y mismas agregaciones."""
+        self.df_desembarque.loc[8] = [2020, 1, 'LAGOS', 'PUERTO MONTT', 'SALMON', 'Industrial', 0.5]
+        self.df_desembarque['Toneladas'] = self.df_desembarque['Toneladas'].round()
+        table = CodedTable(self.df_desembarque, ['Año', 'Mes', 'Región', 'Puerto', 'Tipo de agente'], ['Toneladas'])
+        self.assertTrue(table.exact)
+        cube = table.collapse()
+
+        self.assertEqual(cube.n_rows, 8)
+        self.assertEqual(cube.describe()['dimensiones']['Mes'], 3)
+        for keys in (['Año'], ['Región', 'Tipo de agente'], ['Mes', 'Puerto']):
+            expected = table.aggregate(keys, values=['Toneladas'], counts={'n': 'Toneladas'}, dropna=False)
+            result = cube.aggregate(keys, values=['Toneladas'], counts={'n': 'Toneladas'}, dropna=False)
+            pd.testing.assert_frame_equal(result, expected)
+
+        # Registros no nulos por mes (la fila con toneladas NaN no cuenta)
+        counts = cube.aggregate(['Mes'], counts={'n': 'Toneladas'})
+        self.assertEqual(counts['n'].tolist(), [4, 2, 2])
+
+    def test_collapse_only_when_exact(self):
+        """Test que con toneladas de 4 decimales no se colapsa y agent_distribution coincide con pandas."""
+        rng = np.random.default_rng(3)
+        df = self.df_desembarque.sample(2000, replace=True, random_state=3).reset_index(drop=True)
+        df['Toneladas'] = np.round(rng.lognormal(3, 2, len(df)), 4)
+        analytics = FisheryAnalytics(df, self.df_produccion, self.df_plantas)
+        reference = FisheryAnalytics(df, self.df_produccion, self.df_plantas, engine='pandas')
+
+        result, expected = analytics.get_agent_distribution(), reference.get_agent_distribution()
+        self.assertEqual((result['data'], result['summary']), (expected['data'], expected['summary']))
+        self.assertEqual(analytics._coded('desembarque').n_rows, len(df))
+
+    def test_decimal_collapse(self):
+        """Test que con decimal=True las toneladas de 3 decimales se colapsan y suman exactamente."""
+        rng = np.random.default_rng(5)
+        df = self.df_desembarque.sample(3000, replace=True, random_state=5).reset_index(drop=True)
+        df['Toneladas'] = np.round(rng.lognormal(3, 2, len(df)), 3)
+        df.loc[::50, 'Toneladas'] = np.nan
+        keys = ['Año', 'Región', 'Puerto', 'Tipo de agente']
+
+        table = CodedTable(df, keys, ['Toneladas'], decimal=True)
+        cube = table.collapse()
+        self.assertEqual(CodedTable(df, keys, ['Toneladas']).collapse().n_rows, len(df))
+        self.assertLess(cube.n_rows, len(df))
+
+        # Referencia: suma decimal exacta de cada grupo, redondeada una sola vez a float64
+        kilos = df.assign(kg=np.round(df['Toneladas'] * 1000).astype('Int64'))
+        expected = kilos.groupby(['Año', 'Región'])['kg'].sum().astype('int64') / 1000
+        for source in (table, cube):
+            result = source.aggregate(['Año', 'Región'], values=['Toneladas'], counts={'n': 'Toneladas'})
+            self.assertEqual(result['Toneladas'].tolist(), expected.tolist())
+            self.assertEqual(result['n'].tolist(), df.groupby(['Año', 'Región'])['Toneladas'].count().tolist())
+        self.assertEqual(cube.total('Toneladas'), float(kilos['kg'].sum()) / 1000)
+
+        analytics = FisheryAnalytics(df, self.df_produccion, self.df_plantas, exact_tonnage=True)
+        self.assertLess(analytics._coded('desembarque').n_rows, len(df))
+        self.assertEqual(
+            [r['toneladas'] for r in analytics.get_agent_distribution()['data']],
+            [r['toneladas'] for r in FisheryAnalytics(df, self.df_produccion, self.df_plantas).get_agent_distribution()['data']]
+        )
+
+    def test_callable_filters(self):
+        """Test de filtros evaluados sobre los valores únicos (las filas nulas no los cumplen)."""
+        previous = self.table.mask({'Año': lambda years: years < 2021})
+        self.assertEqual(int(previous.sum()), 4)
+        southern = self.table.mask({'Región': lambda regions: np.isin(regions, ['LAGOS', 'AYSEN'])})
+        self.assertEqual(int(southern.sum()), 5)
+
+    def test_engines_agree(self):
+        """Test que los análisis con el kernel coinciden con el motor pandas."""
+        analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas)
+        reference = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, engine='pandas')
+        calls = [
+            ('top_ports', {}), ('top_ports', {'year': 2021, 'region': 'LAGOS'}), ('top_ports', {'year': 1990}),
+            ('agent_distribution', {}), ('agent_distribution', {'region': 'AYSEN'}),
+            ('longitudinal_evolution', {}), ('agent_share', {'level': 'puerto'}),
+            ('regional_dynamics', {'level': 'macrozona'}),
+            ('species_by_agent_breakdown', {}), ('species_by_agent_breakdown', {'year': 2020, 'top_n': 1}),
+            ('seasonal_context', {'current_year': 2021}), ('seasonal_context', {'region': 'ATACAMA'})
+        ]
+        for name, params in calls:
+            expected = getattr(reference, f'get_{name}')(**params)
+            result = getattr(analytics, f'get_{name}')(**params)
+            self.assertEqual(result['success'], expected['success'], (name, params))
+            self.assertEqual(result.get('data'), expected.get('data'), (name, params))
+
+    def test_coded_tables_built_once(self):
+        """Test que las dimensiones se codifican una sola vez por dataset."""
+        analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas)
+        analytics.get_top_ports()
+        tables = analytics._derived.get('coded_tables')
+        self.assertEqual(tables['desembarque'].describe()['filas'], 8)
+
+        analytics.get_longitudinal_evolution()
+        analytics.get_agent_distribution(year=2020)
+        analytics.get_seasonal_context(current_year=2021)
+        self.assertIs(analytics._derived.get('coded_tables'), tables)
+        self.assertIsInstance(tables['plantas'], CodedTable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests unitarios para la jerarquía territorial (macrozonas y niveles).
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_hierarchy import HierarchyAggregates, RegionHierarchy, UNASSIGNED_ZONE
+
+
+class TestRegionHierarchy(unittest.TestCase):
+    """Suite de tests para RegionHierarchy y los análisis con level/within."""
+
+    def setUp(self):
+        """Desembarques, producción y plantas en regiones de tres macrozonas."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2020, 2020, 2021, 2021, 2021],
+            'Mes': [1, 2, 1, 1, 1, 1, 1],
+            'Región': [' Lagos', 'LAGOS', 'AYSEN', 'BIOBIO', 'LAGOS', 'MAGALLANES', None],
+            'Puerto': ['PUERTO MONTT', 'CALBUCO', 'CHACABUCO', 'TALCAHUANO', 'PUERTO MONTT', 'PUNTA ARENAS', 'X'],
+            'Especie': ['SALMON'] * 7,
+            'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial', 'Artesanal', 'Artesanal', 'Industrial', 'Industrial'],
+            'Toneladas': [100.5, 50.25, 30.0, 80.0, 10.0, 5.0, 1.0]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2020, 2021, 2021],
+            'Región': ['LAGOS', 'AYSEN', 'MAGALLANES', 'BIOBIO'],
+            'Especie': ['SALMON'] * 4,
+            'Línea de elaboración': ['Congelado'] * 4,
+            'Materia Prima': [100, 50, 20, 40],
+            'Producción': [60.0, 30.0, 10.0, 20.0]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020, 2020, 2020, 2020, 2021],
+            'Región': ['LAGOS', 'LAGOS', 'AYSEN', 'AYSEN', 'MAGALLANES'],
+            'Nombre Planta': ['Planta A', 'Planta A', 'Planta A', 'Planta B', 'Planta C'],
+            'Línea de producción': ['Congelado', 'Fresco', 'Congelado', 'Congelado', 'Congelado']
+        })
+        self.analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas)
+
+    def test_default_zones(self):
+        """Test de la asignación por defecto y de regiones no configuradas."""
+        hierarchy = RegionHierarchy()
+        zones = hierarchy.zones(pd.Series(['LOS LAGOS', 'AYSÉN', 'ANTOFAGASTA', 'BIOBIO', 'ATLANTIDA', None]))
+        self.assertEqual(zones.tolist()[:5], ['SUR', 'AUSTRAL', 'NORTE', 'CENTRO', UNASSIGNED_ZONE])
+        self.assertTrue(pd.isna(zones.iloc[5]))
+
+    def test_custom_zones_and_validation(self):
+        """Test de macrozonas configurables (variantes de nombre) y regiones repetidas."""
+        hierarchy = RegionHierarchy({'Patagonia': ['Región de Aysén', 'XII']})
+        self.assertEqual(hierarchy.zone_of, {'AYSEN': 'PATAGONIA', 'MAGALLANES': 'PATAGONIA'})
+        with self.assertRaises(ValueError):
+            RegionHierarchy({'A': ['LAGOS'], 'B': ['X']})
+
+    def test_macro_zones_from_json(self):
+        """Test que macro_zones acepta la ruta de un JSON."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'zonas.json')
+            with open(path, 'w', encoding='utf-8') as handle:
+                json.dump({'AUSTRAL': ['AYSEN', 'MAGALLANES', 'LAGOS']}, handle)
+            analytics = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, macro_zones=path)
+
+        data = {r['Macrozona']: r for r in analytics.get_regional_dynamics(level='macrozona')['data']}
+        self.assertEqual(data['AUSTRAL']['Capturas_Totales'], 195.75)
+        self.assertEqual(data[UNASSIGNED_ZONE]['Capturas_Totales'], 80.0)
+
+    def test_rollups_are_consistent(self):
+        """Test que cada nivel suma lo mismo que el nivel inferior (la nación incluye región nula)."""
+        region = self.analytics.get_regional_dynamics()['data']
+        zone = {r['Macrozona']: r for r in self.analytics.get_regional_dynamics(level='macrozona')['data']}
+        nation = self.analytics.get_regional_dynamics(level='nacion')['data']
+
+        self.assertEqual(zone['SUR']['Capturas_Totales'], 160.75)
+        self.assertEqual(zone['AUSTRAL']['Produccion_Total'], 40.0)
+        self.assertEqual(sum(r['Capturas_Totales'] for r in zone.values()),
+                         sum(r['Capturas_Totales'] for r in region))
+        self.assertEqual(nation, [{'Nacion': 'NACIONAL', 'Capturas_Totales': 276.75,
+                                   'Produccion_Total': 120.0, 'Ratio_Prod_Captura': 0.4336}])
+
+    def test_plants_counted_as_distinct(self):
+        """Test que las plantas se cuentan como conjuntos distintos en cada nivel."""
+        data = self.analytics.get_plant_capacity_analysis(level='nacion')['data']
+        by_year = {r['Año']: r for r in data}
+        # 2020: Planta A en LAGOS, Planta A en AYSEN y Planta B -> 3 plantas (líneas no duplican)
+        self.assertEqual(by_year[2020]['Num_Plantas'], 3)
+        self.assertEqual(by_year[2020]['Promedio_Por_Planta'], 30.0)
+
+    def test_port_drill_down(self):
+        """Test de agent_share a nivel puerto dentro de una región."""
+        result = self.analytics.get_agent_share(level='puerto', within='Los Lagos')
+        data = {r['Puerto']: r for r in result['data']}
+
+        self.assertEqual(set(data), {'PUERTO MONTT', 'CALBUCO'})
+        self.assertEqual(data['PUERTO MONTT']['Industrial'], 100.5)
+        self.assertEqual(data['PUERTO MONTT']['Artesanal'], 10.0)
+        self.assertTrue(all(r['Region'] == 'LAGOS' for r in result['data']))
+        self.assertEqual(result['metadata']['level'], 'puerto')
+
+    def test_within_macro_zone(self):
+        """Test de regiones dentro de una macrozona."""
+        data = self.analytics.get_regional_dynamics(level='region', within='austral')['data']
+        self.assertEqual({r['Region'] for r in data}, {'AYSEN', 'MAGALLANES'})
+
+    def test_invalid_level_and_within(self):
+        """Test de nivel inválido, within no superior y nivel no disponible."""
+        with self.assertRaises(ValueError):
+            self.analytics.get_agent_share(level='comuna')
+        with self.assertRaises(ValueError):
+            self.analytics.get_agent_share(level='macrozona', within='LAGOS')
+        self.assertFalse(self.analytics.get_regional_dynamics(level='puerto')['success'])
+
+    def test_engines_agree(self):
+        """Test que los agregados precomputados coinciden con el motor pandas."""
+        reference = FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, engine='pandas')
+        for level in ('nacion', 'macrozona', 'region', 'puerto'):
+            for name in ('regional_dynamics', 'agent_share', 'plant_capacity_analysis'):
+                expected = getattr(reference, f'get_{name}')(level=level)
+                result = getattr(self.analytics, f'get_{name}')(level=level)
+                self.assertEqual(result['success'], expected['success'], (level, name))
+                self.assertEqual(result.get('data'), expected.get('data'), (level, name))
+
+    def test_aggregates_precomputed_once(self):
+        """Test que los agregados se construyen una vez y cubren todos los niveles."""
+        self.analytics.get_agent_share(level='macrozona')
+        aggregates = self.analytics._derived.get('hierarchy_aggregates')
+        self.assertIsInstance(aggregates, HierarchyAggregates)
+
+        self.analytics.get_plant_capacity_analysis(level='nacion')
+        self.assertIs(self.analytics._derived.get('hierarchy_aggregates'), aggregates)
+        self.assertEqual(set(aggregates.describe()['puerto']), {'capturas', 'capturas_total'})
+
+    def test_default_level_matches_region_groupby(self):
+        """Test que sin level los resultados son los de un groupby por región y la metadata no cambia."""
+        rng = np.random.default_rng(5)
+        df = self.df_desembarque.sample(3000, replace=True, random_state=5).reset_index(drop=True)
+        df['Toneladas'] = np.round(rng.lognormal(3, 2, len(df)), 4)
+        for engine in ('pandas', 'numpy'):
+            analytics = FisheryAnalytics(df, self.df_produccion, self.df_plantas, engine=engine)
+            result = analytics.get_regional_dynamics()
+            expected = df.assign(Región=df['Región'].str.strip().str.upper()).groupby('Región')['Toneladas'].sum()
+            self.assertEqual({r['Region']: r['Capturas_Totales'] for r in result['data']},
+                             expected.round(2).to_dict(), engine)
+            self.assertEqual(set(result['metadata']), {'generated_at'})
+            self.assertEqual(analytics.get_agent_share(within='SUR')['metadata']['level'], 'region')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests unitarios para el governor de memoria.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_memory import DerivedStore, MemoryGovernor, estimate_bytes, parse_bytes
+
+
+class TestMemoryGovernor(unittest.TestCase):
+    """Suite de tests para MemoryGovernor, DerivedStore y FisheryAnalytics.memory_usage."""
+
+    def setUp(self):
+        """Desembarques mensuales de dos regiones, suficientes para construir cubos y paneles."""
+        rows = []
+        for region, port in (('LAGOS', 'PUERTO MONTT'), ('AYSEN', 'CHACABUCO')):
+            for species in ('SALMON', 'MERLUZA'):
+                for year in range(2016, 2021):
+                    for month in range(1, 13):
+                        rows.append((year, month, region, port, species, 'Industrial', 100.0 + month))
+        self.df_desembarque = pd.DataFrame(rows, columns=[
+            'Año', 'Mes', 'Región', 'Puerto', 'Especie', 'Tipo de agente', 'Toneladas'
+        ])
+        self.df_produccion = pd.DataFrame({
+            'Año': [2019, 2020], 'Región': ['LAGOS', 'AYSEN'], 'Especie': ['SALMON', 'MERLUZA'],
+            'Línea de elaboración': ['Congelado'] * 2, 'Materia Prima': [800, 50], 'Producción': [700, 40]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+            'Línea de producción': ['Congelado']
+        })
+
+    def _analytics(self, **options):
+        return FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, **options)
+
+    def test_parse_bytes(self):
+        """Test de presupuestos expresados como texto."""
+        self.assertEqual(parse_bytes('512MB'), 512 * 1024 ** 2)
+        self.assertEqual(parse_bytes('1.5g'), int(1.5 * 1024 ** 3))
+        self.assertEqual(parse_bytes(2048), 2048)
+        self.assertIsNone(parse_bytes(None))
+        with self.assertRaises(ValueError):
+            parse_bytes('mucho')
+
+    def test_estimate_bytes(self):
+        """Test que la estimación recorre contenedores y cuenta cada arreglo una vez."""
+        array = np.zeros(1000)
+        self.assertGreaterEqual(estimate_bytes({'a': array, 'b': [array]}), array.nbytes)
+        self.assertLess(estimate_bytes({'a': array, 'b': [array]}), 2 * array.nbytes)
+        self.assertGreaterEqual(estimate_bytes(self.df_desembarque), int(self.df_desembarque.memory_usage(deep=True).sum()))
+
+    def test_lru_eviction(self):
+        """Test que al exceder el presupuesto se descarta lo usado hace más tiempo."""
+        governor = MemoryGovernor(20_000)
+        store = DerivedStore(governor)
+        store['a'] = np.zeros(1000)
+        store['b'] = np.zeros(1000)
+        store.get('a')
+        store['c'] = np.zeros(1000)
+
+        self.assertIn('a', store)
+        self.assertNotIn('b', store)
+        self.assertIn('c', store)
+        self.assertEqual(governor.evictions, 1)
+        self.assertLessEqual(governor.total_bytes(), 20_000)
+
+    def test_entry_larger_than_budget_not_retained(self):
+        """Test que una estructura que no cabe sola no se retiene."""
+        store = DerivedStore(MemoryGovernor(1000))
+        store['grande'] = np.zeros(1000)
+        self.assertNotIn('grande', store)
+
+    def test_results_unchanged_after_eviction(self):
+        """Test que los resultados no cambian cuando las estructuras se reconstruyen."""
+        unlimited = self._analytics()
+        tiny = self._analytics(memory_budget=1)
+
+        for name in ('supply_vs_demand', 'landing_anomalies', 'forecast'):
+            expected = getattr(unlimited, f'get_{name}')()
+            result = getattr(tiny, f'get_{name}')()
+            self.assertEqual(result['data'], expected['data'], name)
+            self.assertEqual(result['summary'], expected['summary'], name)
+
+        usage = tiny.memory_usage()
+        self.assertEqual(usage['derived_bytes'], {})
+        self.assertTrue(usage['governor']['over_budget'])
+        self.assertGreater(usage['governor']['evictions'], 0)
+
+    def test_stratified_sample_rebuilt_with_same_params(self):
+        """Test que la muestra descartada se reconstruye con los mismos parámetros."""
+        analytics = self._analytics()
+        analytics.build_stratified_sample(fraction=0.5, min_per_stratum=2, seed=7)
+        analytics._derived.clear()
+        sample = analytics._stratified_sample()
+        self.assertEqual(sample.fraction, 0.5)
+        self.assertEqual(sample.min_per_stratum, 2)
+
+    def test_shared_governor(self):
+        """Test que un governor compartido aplica un único presupuesto a varias instancias."""
+        governor = MemoryGovernor()
+        first = self._analytics(memory_governor=governor)
+        second = self._analytics(memory_governor=governor)
+        first.get_supply_vs_demand()
+        second.get_landing_anomalies()
+
+        # Presupuesto justo para los DataFrames y la estructura usada más recientemente
+        governor.budget_bytes = governor.total_bytes() - 1
+        governor.enforce()
+
+        self.assertNotIn('supply_cube', first._derived)
+        self.assertIn('landing_anomaly_scores', second._derived)
+        self.assertEqual(len(governor.usage()['stores']), 2)
+
+    def test_memory_usage_report(self):
+        """Test del reporte de uso para monitoreo."""
+        analytics = self._analytics(compact=True)
+        analytics.get_supply_vs_demand()
+        usage = analytics.memory_usage()
+
+        self.assertEqual(set(usage['frames_bytes']), {'desembarque', 'produccion', 'plantas'})
+        report = analytics.memory_report()['datasets']
+        self.assertEqual(usage['frames_bytes'], {name: info['bytes_actuales'] for name, info in report.items()})
+        self.assertIn('supply_cube', usage['derived_bytes'])
+        self.assertEqual(usage['total_bytes'], sum(usage['frames_bytes'].values()) + sum(usage['derived_bytes'].values()))
+        self.assertIsNone(usage['governor']['budget_bytes'])
+        self.assertFalse(usage['governor']['over_budget'])
+
+    def test_budget_and_governor_exclusive(self):
+        """Test que memory_budget y memory_governor no se combinan."""
+        with self.assertRaises(ValueError):
+            self._analytics(memory_budget='1GB', memory_governor=MemoryGovernor())
+
+
+if __name__ == '__main__':
+    unittest.main()
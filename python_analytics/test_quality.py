@@ -0,0 +1,131 @@
+"""
+Tests unitarios para el perfil de calidad de datos.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_quality import profile_dataset, quality_masks
+
+
+class TestDataQuality(unittest.TestCase):
+    """Suite de tests para fishery_quality y FisheryAnalytics(clean=...)."""
+
+    def setUp(self):
+        """Datos con un problema de cada tipo."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2020, 1800, 2021, 2021, None, 2021],
+            'Mes': [1, 1, 13, 1, 2, 2, 3, 4],
+            'Región': ['LAGOS', 'LAGOS', 'LAGOS', 'LAGOS', 'AYSEN', 'AYSEN', 'AYSEN', None],
+            'Puerto': ['PUERTO MONTT', 'PUERTO MONTT', 'PUERTO MONTT', 'CALBUCO',
+                       'CHACABUCO', 'CHACABUCO', 'CHACABUCO', None],
+            'Especie': ['SALMON'] * 8,
+            'Tipo de agente': ['Industrial', 'Industrial', 'Industrial', 'Industrial',
+                               'Industrial', 'Industrial', 'Artesanal', None],
+            'Toneladas': [100.0, 100.0, 50.0, 10.0, -5.0, 7.0, 20.0, np.inf]
+        })
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020, 2021],
+            'Región': ['LAGOS', 'AYSEN'],
+            'Especie': ['SALMON', 'SALMON'],
+            'Línea de elaboración': ['Congelado', 'Congelado'],
+            'Materia Prima': [800.0, 50.0],
+            'Producción': [700.0, 60.0]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+            'Línea de producción': ['Congelado']
+        })
+
+    def _analytics(self, **options):
+        return FisheryAnalytics(self.df_desembarque, self.df_produccion, self.df_plantas, **options)
+
+    def test_masks(self):
+        """Test que cada regla marca exactamente las filas esperadas."""
+        masks = quality_masks('desembarque', self.df_desembarque, year_range=(1950, 2024))
+
+        self.assertEqual(np.flatnonzero(masks['filas_duplicadas']).tolist(), [1])
+        self.assertEqual(np.flatnonzero(masks['mes_fuera_de_rango']).tolist(), [2])
+        self.assertEqual(np.flatnonzero(masks['año_fuera_de_rango']).tolist(), [3])
+        self.assertEqual(np.flatnonzero(masks['año_nulo']).tolist(), [6])
+        self.assertEqual(np.flatnonzero(masks['toneladas_negativas']).tolist(), [4])
+        self.assertEqual(np.flatnonzero(masks['toneladas_no_finitas']).tolist(), [7])
+        self.assertEqual(np.flatnonzero(masks['claves_duplicadas']).tolist(), [4, 5])
+
+    def test_report_without_cleaning(self):
+        """Test que sin clean se reporta pero no se elimina nada."""
+        analytics = self._analytics()
+        report = analytics.data_quality_report()
+
+        self.assertFalse(report['clean'])
+        self.assertEqual(report['total_filas_eliminadas'], 0)
+        self.assertEqual(len(analytics.df_desembarque), 8)
+        self.assertEqual(report['datasets']['desembarque']['nulos']['Año'], 1)
+        self.assertEqual(report['datasets']['produccion']['problemas']['produccion_mayor_materia_prima'], 1)
+
+    def test_clean_removes_invalid_rows(self):
+        """Test que clean=True elimina una sola vez las filas inválidas."""
+        analytics = self._analytics(clean=True)
+        report = analytics.data_quality_report()
+
+        self.assertEqual(report['datasets']['desembarque']['filas_eliminadas'], 6)
+        self.assertEqual(len(analytics.df_desembarque), 2)
+        # Producción > materia prima solo se reporta
+        self.assertEqual(len(analytics.df_produccion), 2)
+        self.assertEqual(len(analytics.data_quality_rows('produccion', 'produccion_mayor_materia_prima')), 1)
+
+        result = analytics.get_top_ports()
+        self.assertTrue(result['success'])
+        self.assertEqual(result['summary']['total_toneladas_general'], 107.0)
+
+    def test_clean_with_compact(self):
+        """Test que la limpieza deja datos compactables (sin infinitos)."""
+        analytics = self._analytics(clean=True, compact=True)
+        self.assertIn('Toneladas', analytics.memory_report()['datasets']['desembarque']['columnas_escaladas'])
+
+    def test_profile_is_lazy_without_cleaning(self):
+        """Test que sin clean el perfil se calcula recién al pedir el reporte (también compacto)."""
+        analytics = self._analytics()
+        self.assertIsNone(analytics._quality_report)
+
+        compact = self._analytics(compact=True)
+        self.assertEqual(compact.data_quality_report(), analytics.data_quality_report())
+        self.assertIsNotNone(analytics._quality_report)
+
+    def test_heatmap_equal_with_clean(self):
+        """Test que el mapa de calor omite el filtrado por consulta con clean=True sin cambiar el resultado."""
+        cleaned = self._analytics(clean=True)
+        reference = FisheryAnalytics(cleaned.df_desembarque, self.df_produccion, self.df_plantas)
+
+        result = cleaned.get_seasonal_heatmap()
+        expected = reference.get_seasonal_heatmap()
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], expected['data'])
+        self.assertEqual(result['summary'], expected['summary'])
+
+    def test_report_is_a_copy(self):
+        """Test que modificar el reporte retornado no altera el cacheado."""
+        analytics = self._analytics()
+        analytics.data_quality_report()['datasets'].clear()
+        self.assertIn('desembarque', analytics.data_quality_report()['datasets'])
+
+    def test_invalid_arguments(self):
+        """Test de dataset o regla inexistentes."""
+        analytics = self._analytics()
+        with self.assertRaises(ValueError):
+            analytics.data_quality_rows('capturas', 'filas_duplicadas')
+        with self.assertRaises(ValueError):
+            analytics.data_quality_rows('plantas', 'mes_fuera_de_rango')
+
+    def test_profile_dataset_keeps_frame_without_problems(self):
+        """Test que un dataset limpio se devuelve sin copiar."""
+        df, report = profile_dataset('plantas', self.df_plantas, clean=True)
+        self.assertIs(df, self.df_plantas)
+        self.assertEqual(sum(report['problemas'].values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
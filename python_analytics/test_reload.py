@@ -0,0 +1,182 @@
+"""
+Tests unitarios para la recarga en caliente por generaciones.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_cache import ResultCache
+from fishery_reload import GenerationManager
+from fishery_worker import AnalyticsWorker
+
+
+class TestGenerationManager(unittest.TestCase):
+    """Suite de tests para GenerationManager."""
+
+    def setUp(self):
+        """Dos versiones de los desembarques (la segunda con otro puerto líder)."""
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2021], 'Mes': [1, 2, 1], 'Región': ['LAGOS', 'AYSEN', 'LAGOS'],
+            'Puerto': ['PUERTO MONTT', 'CHACABUCO', 'PUERTO MONTT'], 'Especie': ['SALMON', 'MERLUZA', 'SALMON'],
+            'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial'], 'Toneladas': [100.0, 50.0, 80.0]
+        })
+        self.df_revised = self.df_desembarque.assign(Toneladas=[10.0, 500.0, 80.0])
+        self.df_produccion = pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Especie': ['SALMON'],
+            'Línea de elaboración': ['Congelado'], 'Materia Prima': [80.0], 'Producción': [70.0]
+        })
+        self.df_plantas = pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'], 'Línea de producción': ['Congelado']
+        })
+        self.version = {'landings': self.df_desembarque}
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.cache_dir.name, 'results.sqlite'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.cache_dir.cleanup()
+
+    def _load(self):
+        return FisheryAnalytics(self.version['landings'], self.df_produccion, self.df_plantas, result_cache=self.cache)
+
+    def _leader(self, generations):
+        return generations.run('top_ports')['data'][0]['puerto']
+
+    def test_reload_swaps_generation(self):
+        """Test que la recarga publica una generación nueva con las estructuras ya construidas."""
+        generations = GenerationManager(self._load)
+        self.assertEqual(self._leader(generations), 'PUERTO MONTT')
+        first = generations.current
+
+        self.version['landings'] = self.df_revised
+        generation = generations.reload().result()
+        self.assertIs(generations.current, generation)
+        self.assertEqual(generation.number, 2)
+        self.assertIn('coded_tables', generation.analytics._derived)
+        self.assertEqual(self._leader(generations), 'CHACABUCO')
+
+        # Sin lectores la generación anterior se libera de inmediato
+        self.assertTrue(first.released)
+        self.assertIsNone(first.analytics)
+        self.assertEqual(generations.describe()['retired'], [])
+        generations.close()
+
+    def test_readers_keep_their_generation(self):
+        """Test que un lector en curso conserva una generación consistente hasta terminar."""
+        generations = GenerationManager(self._load)
+        with generations.acquire() as generation:
+            self.version['landings'] = self.df_revised
+            generations.reload().result()
+            self.assertEqual(generation.analytics.get_top_ports()['data'][0]['puerto'], 'PUERTO MONTT')
+            self.assertFalse(generation.released)
+            self.assertEqual(generations.describe()['retired'][0]['readers'], 1)
+            # Los lectores nuevos ya toman la generación nueva
+            self.assertEqual(self._leader(generations), 'CHACABUCO')
+        self.assertTrue(generation.released)
+        self.assertEqual(generations.stats['released'], 1)
+        generations.close()
+
+    def test_concurrent_readers_during_reloads(self):
+        """Test de lectores concurrentes durante varias recargas: siempre un resultado completo."""
+        generations = GenerationManager(self._load)
+        leaders, errors = [], []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    leaders.append(self._leader(generations))
+                except Exception as exc:  # noqa: BLE001 - cualquier error hace fallar el test
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for landings in (self.df_revised, self.df_desembarque, self.df_revised):
+            self.version['landings'] = landings
+            generations.reload().result()
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(set(leaders) <= {'PUERTO MONTT', 'CHACABUCO'})
+        self.assertEqual(generations.current.number, 4)
+        self.assertEqual(generations.stats['released'], 3)
+        generations.close()
+
+    def test_failed_reload_keeps_current(self):
+        """Test que una carga fallida no cambia la generación vigente."""
+        generations = GenerationManager(self._load)
+
+        def broken():
+            raise FileNotFoundError('BD_desembarque.csv')
+
+        with self.assertRaises(FileNotFoundError):
+            generations.reload(broken).result()
+        self.assertEqual(generations.current.number, 1)
+        self.assertEqual(generations.stats['failed_reloads'], 1)
+        self.assertIn('FileNotFoundError', generations.stats['last_error'])
+        with self.assertRaises(ValueError):
+            GenerationManager(analytics=self._load()).reload()
+        generations.close()
+
+    def test_result_cache_keyed_by_generation(self):
+        """Test que los resultados de una generación liberada salen de la caché si los datos cambiaron."""
+        generations = GenerationManager(self._load)
+        generations.run('top_ports')
+        old_fingerprint = generations.current.fingerprint
+
+        # Mismos datos: misma huella, los resultados siguen siendo válidos
+        generations.reload().result()
+        self.assertEqual(generations.current.fingerprint, old_fingerprint)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+        self.version['landings'] = self.df_revised
+        generations.reload().result()
+        self.assertNotEqual(generations.current.fingerprint, old_fingerprint)
+        generations.close()  # espera la limpieza encolada en el hilo de recargas
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_cache_purged_off_the_request_thread(self):
+        """Test que el último lector de una generación reemplazada no limpia la caché en su hilo."""
+        generations = GenerationManager(self._load)
+        generations.run('top_ports')
+        threads = []
+        clear = self.cache.clear
+        self.cache.clear = lambda dataset_id=None: (threads.append(threading.current_thread().name), clear(dataset_id))
+
+        with generations.acquire():
+            self.version['landings'] = self.df_revised
+            generations.reload().result()
+        generations.close()
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.current_thread().name)
+        self.assertTrue(threads[0].startswith('fishery-reload'))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_worker_reload_operation(self):
+        """Test de la operación reload del worker."""
+        worker = AnalyticsWorker(GenerationManager(self._load))
+        self.version['landings'] = self.df_revised
+        response = worker.handle({'id': 1, 'op': 'reload'})
+        self.assertTrue(response['ok'])
+        worker.generations.close()  # espera la recarga en curso
+
+        stats = worker.handle({'id': 2, 'op': 'stats'})['result']
+        self.assertEqual((stats['generation'], stats['reloads']), (2, 1))
+        result = worker.handle({'id': 3, 'analysis': 'top_ports', 'params': {}})['result']
+        self.assertEqual(result['data'][0]['puerto'], 'CHACABUCO')
+
+        # Sin loader la recarga se informa como error de la solicitud
+        self.assertFalse(AnalyticsWorker(self._load()).handle({'id': 4, 'op': 'reload'})['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
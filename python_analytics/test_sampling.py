@@ -0,0 +1,117 @@
+"""
+Tests unitarios para el modo aproximado (muestra estratificada).
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from fishery_sampling import StratifiedSample
+from fixtures import analytics_with
+
+
+class TestStratifiedSample(unittest.TestCase):
+    """Suite de tests para StratifiedSample y los análisis con exact=False."""
+
+    def setUp(self):
+        """Dataset con varios estratos Año/Región y volumen suficiente para muestrear."""
+        rng = np.random.default_rng(7)
+        n = 4000
+        self.df_desembarque = pd.DataFrame({
+            'Año': rng.integers(2018, 2022, n),
+            'Mes': rng.integers(1, 13, n),
+            'Región': rng.choice(['LAGOS', 'AYSEN', 'MAGALLANES'], n),
+            'Puerto': rng.choice(['PUERTO MONTT', 'CHACABUCO', 'PUNTA ARENAS', 'CALBUCO'], n),
+            'Especie': rng.choice(['SALMON', 'MERLUZA', 'CENTOLLA', 'JUREL'], n),
+            'Tipo de agente': rng.choice(['Industrial', 'Artesanal'], n),
+            'Toneladas': rng.lognormal(3, 1, n).round(3)
+        })
+        self.analytics = analytics_with(self.df_desembarque)
+
+    def test_sample_sizes(self):
+        """Test que cada estrato respeta la fracción y el mínimo por estrato."""
+        sample = StratifiedSample(self.df_desembarque, fraction=0.1, min_per_stratum=20)
+
+        self.assertEqual(len(sample.population_sizes), 12)
+        self.assertTrue(np.all(sample.sample_sizes >= 20))
+        self.assertTrue(np.all(sample.sample_sizes <= sample.population_sizes))
+        self.assertEqual(sample.sample_rows, int(sample.sample_sizes.sum()))
+
+    def test_full_sample_is_exact(self):
+        """Test que con fraction=1 las estimaciones coinciden con el cálculo exacto."""
+        self.analytics.build_stratified_sample(fraction=1.0)
+        exact = self.analytics.get_top_ports(year=2020, top_n=4)
+        approx = self.analytics.get_top_ports(year=2020, top_n=4, exact=False)
+
+        self.assertFalse(approx['metadata']['exact'])
+        self.assertNotIn('exact', exact['metadata'])
+        self.assertEqual([r['puerto'] for r in approx['data']], [r['puerto'] for r in exact['data']])
+        for est, ref in zip(approx['data'], exact['data']):
+            self.assertAlmostEqual(est['toneladas'], ref['toneladas'], delta=0.011)
+            self.assertEqual(est['toneladas_ic_inf'], est['toneladas_ic_sup'])
+
+    def test_confidence_intervals(self):
+        """Test que los intervalos contienen la estimación puntual."""
+        self.analytics.build_stratified_sample(fraction=0.2)
+        result = self.analytics.get_agent_distribution(region='LAGOS', exact=False)
+
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(sum(r['porcentaje'] for r in result['data']), 100, places=0)
+        for record in result['data']:
+            self.assertLessEqual(record['toneladas_ic_inf'], record['toneladas'])
+            self.assertGreaterEqual(record['toneladas_ic_sup'], record['toneladas'])
+
+    def test_group_estimates_add_up_to_exact_total(self):
+        """Test que el total es exacto y las estimaciones por grupo suman ese total."""
+        sample = StratifiedSample(self.df_desembarque, fraction=0.1)
+        strata = sample.select(**{'Año': 2020, 'Región': ['LAGOS', 'AYSEN']})
+        exact = self.df_desembarque[
+            (self.df_desembarque['Año'] == 2020) & self.df_desembarque['Región'].isin(['LAGOS', 'AYSEN'])
+        ]['Toneladas'].sum()
+
+        total = sample.estimate_totals(strata)
+        ports = sample.estimate_totals(strata, ['Puerto'])
+
+        self.assertEqual(int(strata.sum()), 2)
+        self.assertAlmostEqual(float(total['estimacion'].iloc[0]), exact, places=6)
+        self.assertEqual(float(total['error_estandar'].iloc[0]), 0.0)
+        self.assertAlmostEqual(float(ports['estimacion'].sum()), exact, places=6)
+        self.assertEqual(list(ports['Puerto']), sorted(ports['Puerto']))
+
+    def test_select_only_strata_columns(self):
+        """Test que filtrar por una columna que no es de estratificación lanza ValueError."""
+        sample = StratifiedSample(self.df_desembarque, fraction=0.1)
+        with self.assertRaises(ValueError):
+            sample.select(Puerto='CALBUCO')
+
+    def test_species_breakdown_approx(self):
+        """Test de la estructura del desglose aproximado por especie."""
+        result = self.analytics.get_species_by_agent_breakdown(top_n=2, exact=False)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['data']), 2)
+        self.assertIn('total_ic_inf', result['data'][0])
+        self.assertEqual(result['summary']['tipos_agente'], ['Artesanal', 'Industrial'])
+
+    def test_approx_empty_filter(self):
+        """Test que un filtro sin datos retorna el error habitual."""
+        result = self.analytics.get_top_ports(year=1990, exact=False)
+
+        self.assertFalse(result['success'])
+
+    def test_zero_tonnage_distribution(self):
+        """Test que una distribución por agente con total 0 da porcentajes 0 (exacta y aproximada)."""
+        analytics = analytics_with(self.df_desembarque.assign(Toneladas=0.0))
+        for exact in (True, False):
+            result = analytics.get_agent_distribution(year=2020, exact=exact)
+
+            self.assertTrue(result['success'], exact)
+            self.assertEqual([r['porcentaje'] for r in result['data']], [0.0, 0.0], exact)
+
+    def test_invalid_fraction(self):
+        """Test que una fracción fuera de rango lanza ValueError."""
+        with self.assertRaises(ValueError):
+            StratifiedSample(self.df_desembarque, fraction=0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+"""
+Tests unitarios para el punto de entrada liviano (fishery_service).
+"""
+
+import inspect
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from canonical_names import CanonicalNames
+from fishery_analytics import FisheryAnalytics
+from fishery_service import (
+    ANALYSIS_DEFAULTS, LightweightAnalytics, ResultStore, materialize, normalize_params
+)
+
+
+class TestLightweightService(unittest.TestCase):
+    """Suite de tests para ResultStore y LightweightAnalytics."""
+
+    def setUp(self):
+        """Datos mínimos y un almacén temporal materializado."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.tmp.name, 'store')
+        self.analytics = FisheryAnalytics(
+            pd.DataFrame({
+                'Año': [2020, 2020, 2021], 'Mes': [1, 2, 1],
+                'Región': ['LAGOS', 'AYSEN', 'LAGOS'],
+                'Puerto': ['Puerto Montt', 'Chacabuco', 'Calbuco'],
+                'Especie': ['SALMON', 'MERLUZA', 'SALMON'],
+                'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial'],
+                'Toneladas': [1000, 500, 1200]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Especie': ['SALMON'],
+                'Línea de elaboración': ['Congelado'], 'Materia Prima': [800], 'Producción': [700]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+                'Línea de producción': ['Congelado']
+            })
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_defaults_match_signatures(self):
+        """Test que ANALYSIS_DEFAULTS replica las firmas de get_* (salvo output_format)."""
+        self.assertEqual(set(ANALYSIS_DEFAULTS), set(FisheryAnalytics.ANALYSIS_TYPES))
+        for analysis_type, defaults in ANALYSIS_DEFAULTS.items():
+            signature = inspect.signature(getattr(FisheryAnalytics, f'get_{analysis_type}'))
+            expected = {
+                name: param.default for name, param in signature.parameters.items()
+                if name not in ('self', 'output_format')
+            }
+            self.assertEqual(defaults, expected, analysis_type)
+
+    def test_serves_materialized_results(self):
+        """Test que un resultado materializado se sirve idéntico desde el almacén."""
+        store = ResultStore(self.store_dir)
+        materialize(self.analytics, store, requests=[('top_ports', {'year': 2020})])
+
+        service = LightweightAnalytics(self.store_dir)
+        result = service.get('top_ports', year=2020, top_n=10, region=None)
+
+        expected = self.analytics.get_top_ports(year=2020)
+        self.assertEqual(result['data'], expected['data'])
+        self.assertEqual(result['summary'], expected['summary'])
+        self.assertEqual(service.stats['hits'], 1)
+
+    def test_region_normalized_in_key(self):
+        """Test que variantes de la región resuelven la misma clave."""
+        self.assertEqual(
+            normalize_params('agent_distribution', {'region': 'Región de Los Lagos'}),
+            normalize_params('agent_distribution', {'region': 'X'})
+        )
+        with self.assertRaises(ValueError):
+            normalize_params('top_ports', {'anio': 2020})
+
+    def test_key_uses_data_labels(self):
+        """Test que la clave del almacén son las etiquetas que la región selecciona en los datos."""
+        names = CanonicalNames(os.path.join(self.tmp.name, 'nombres.json'))
+        names.add_alias('Región', 'X', 'ISLA X')
+        names.save()
+        analytics = FisheryAnalytics(
+            self.analytics.df_desembarque.assign(Región=['LAGOS', 'AYSEN', 'X']),
+            self.analytics.df_produccion, self.analytics.df_plantas, canonical_names_path=names.path
+        )
+        materialize(analytics, ResultStore(self.store_dir),
+                    requests=[('top_ports', {'region': 'Los Lagos'}), ('top_ports', {'region': 'X'})])
+
+        service = LightweightAnalytics(self.store_dir)
+        self.assertEqual(service.get('top_ports', region='Región de Los Lagos')['data'][0]['puerto'], 'Puerto Montt')
+        self.assertEqual(service.get('top_ports', region='x')['data'][0]['puerto'], 'Calbuco')
+        self.assertEqual(service.stats['hits'], 2)
+
+    def test_recompute_receives_caller_region(self):
+        """Test que un resultado recalculado usa la región de la consulta y queda en el almacén."""
+        service = LightweightAnalytics(self.store_dir, data_paths={'desembarque': 'no_usado.csv'})
+        service._analytics = self.analytics
+        with mock.patch.object(self.analytics, 'get_top_ports', wraps=self.analytics.get_top_ports) as get:
+            first = service.get('top_ports', region='Los Lagos')
+            self.assertEqual(get.call_args.kwargs['region'], 'Los Lagos')
+            self.assertEqual(service.get('top_ports', region='LAGOS', top_n=10)['data'], first['data'])
+        self.assertEqual((service.stats['recomputed'], service.stats['hits']), (1, 1))
+
+    def test_miss_without_data(self):
+        """Test que un resultado faltante sin datos retorna error."""
+        result = LightweightAnalytics(self.store_dir).get('agent_share')
+
+        self.assertFalse(result['success'])
+        self.assertIn('error', result)
+
+    def test_import_does_not_load_pandas(self):
+        """Test que servir desde el almacén no importa pandas."""
+        materialize(self.analytics, ResultStore(self.store_dir), requests=[('agent_share', {})])
+        code = (
+            'import sys; from fishery_service import LightweightAnalytics; '
+            f'r = LightweightAnalytics({self.store_dir!r}).get("agent_share"); '
+            'print(r["success"], "pandas" in sys.modules, "numpy" in sys.modules)'
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.split()
+
+        self.assertEqual(output, ['True', 'False', 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,188 @@
+"""
+Tests unitarios para la recarga automática al cambiar los CSV.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from fishery_reload import GenerationManager
+from fishery_service import default_data_paths
+from fishery_watch import CsvLoader, DataWatcher
+
+
+def _wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class TestDataWatcher(unittest.TestCase):
+    """Suite de tests para CsvLoader y DataWatcher."""
+
+    def setUp(self):
+        """Los 3 CSV en la estructura de 'Base de Datos' dentro de un directorio temporal."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = default_data_paths(self.tmp.name)
+        self.df_desembarque = pd.DataFrame({
+            'Año': [2020, 2020, 2021], 'Mes': [1, 2, 1], 'Región': ['LAGOS', 'AYSEN', 'LAGOS'],
+            'Puerto': ['PUERTO MONTT', 'CHACABUCO', 'PUERTO MONTT'], 'Especie': ['SALMON', 'MERLUZA', 'SALMON'],
+            'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial'], 'Toneladas': [100.0, 50.0, 80.0]
+        })
+        self.df_revised = self.df_desembarque.assign(Toneladas=[10.0, 500.0, 80.0])
+        self._write('desembarque', self.df_desembarque)
+        self._write('produccion', pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Especie': ['SALMON'],
+            'Línea de elaboración': ['Congelado'], 'Materia Prima': [80.0], 'Producción': [70.0]
+        }))
+        self._write('plantas', pd.DataFrame({
+            'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'], 'Línea de producción': ['Congelado']
+        }))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, df: pd.DataFrame):
+        """Reemplaza un CSV como lo haría una copia: archivo temporal y rename."""
+        path = self.paths[name]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_csv(path + '.tmp', index=False, encoding='utf-8')
+        os.replace(path + '.tmp', path)
+
+    def _touch(self, name: str):
+        """Cambia el mtime sin cambiar el contenido."""
+        stat = os.stat(self.paths[name])
+        os.utime(self.paths[name], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def _leader(self, generations) -> str:
+        return generations.run('top_ports')['data'][0]['puerto']
+
+    def test_loader_reads_only_changed_datasets(self):
+        """Test que la recarga relee solo los CSV cuyo contenido cambió."""
+        loader = CsvLoader(self.paths)
+        first = loader()
+        self.assertEqual(sorted(loader.last_changed), ['desembarque', 'plantas', 'produccion'])
+        self.assertEqual(loader.changed(), [])
+
+        self._touch('produccion')
+        self.assertEqual(loader.changed(), [])
+
+        self._write('desembarque', self.df_revised)
+        self.assertEqual(loader.changed(), ['desembarque'])
+        second = loader()
+        self.assertEqual(loader.last_changed, ['desembarque'])
+        self.assertEqual(second.get_top_ports()['data'][0]['puerto'], 'CHACABUCO')
+        pd.testing.assert_frame_equal(second.df_produccion, first.df_produccion)
+        pd.testing.assert_frame_equal(second.df_plantas, first.df_plantas)
+
+        with self.assertRaises(ValueError):
+            CsvLoader({'desembarque': self.paths['desembarque']})
+
+    def test_adopted_instance_is_not_reloaded(self):
+        """Test que una instancia adoptada cuenta como la carga vigente: solo se relee el CSV que cambia."""
+        adopted = CsvLoader(self.paths)()
+        loader = CsvLoader(self.paths)
+        generations = GenerationManager(loader, analytics=adopted)
+        watcher = DataWatcher(loader, generations.reload, debounce=0.1, poll_interval=0.05, backend='poll').start()
+        try:
+            self.assertEqual(sorted(loader.digests), ['desembarque', 'plantas', 'produccion'])
+            self.assertEqual(loader.changed(), [])
+            time.sleep(0.3)
+            self.assertEqual(watcher.stats['reloads'], 0)
+            self.assertEqual(generations.current.number, 1)
+
+            self._write('desembarque', self.df_revised)
+            self.assertTrue(_wait_for(lambda: watcher.stats['reloads'] == 1))
+            self.assertEqual(loader.last_changed, ['desembarque'])
+            pd.testing.assert_frame_equal(generations.current.analytics.df_produccion, adopted.df_produccion)
+        finally:
+            watcher.stop()
+            generations.close()
+
+        # Un watcher sin carga previa en el loader toma los CSV actuales como vigentes
+        loader = CsvLoader(self.paths)
+        watcher = DataWatcher(loader, lambda: None, backend='poll').start()
+        watcher.stop()
+        self.assertEqual(loader.changed(), [])
+
+    def _check_watcher(self, backend: str, poll_interval: float):
+        loader = CsvLoader(self.paths)
+        generations = GenerationManager(loader)
+        watcher = DataWatcher(loader, generations.reload, debounce=0.3,
+                              poll_interval=poll_interval, backend=backend).start()
+        try:
+            self.assertEqual(watcher.backend, backend)
+            self.assertEqual(self._leader(generations), 'PUERTO MONTT')
+
+            # Varias escrituras seguidas se agrupan en una sola recarga
+            self._write('desembarque', self.df_desembarque.assign(Toneladas=[1.0, 2.0, 3.0]))
+            self._write('desembarque', self.df_revised)
+            self.assertTrue(_wait_for(lambda: watcher.stats['reloads'] == 1))
+            self.assertEqual(generations.current.number, 2)
+            self.assertEqual(self._leader(generations), 'CHACABUCO')
+            self.assertEqual(watcher.history[-1]['datasets'], ['desembarque'])
+            self.assertEqual(watcher.history[-1]['generation'], 2)
+
+            # Mismo contenido con otro mtime: se revisa el hash y no se recarga
+            self._touch('plantas')
+            self.assertTrue(_wait_for(lambda: watcher.stats['unchanged'] == 1))
+            self.assertEqual(generations.current.number, 2)
+
+            state = watcher.describe()
+            self.assertEqual(state['reloads'], 1)
+            self.assertIsNotNone(state['last_reload_ms'])
+            self.assertEqual(state['mean_reload_ms'], state['last_reload_ms'])
+        finally:
+            watcher.stop()
+            generations.close()
+
+    def test_watcher_polling(self):
+        """Test del watcher con revisión periódica: debounce, hash y recarga de un dataset."""
+        self._check_watcher('poll', poll_interval=0.05)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify solo existe en Linux')
+    def test_watcher_inotify(self):
+        """Test del watcher con inotify: los eventos despiertan al watcher sin esperar la revisión periódica."""
+        self._check_watcher('inotify', poll_interval=30.0)
+
+    def test_failed_reload_keeps_generation(self):
+        """Test que un CSV inválido no cambia la generación vigente y se informa en las métricas."""
+        loader = CsvLoader(self.paths)
+        generations = GenerationManager(loader)
+        watcher = DataWatcher(loader, generations.reload, debounce=0.1, poll_interval=0.05, backend='poll').start()
+        try:
+            with self.assertLogs('fishery_watch', 'WARNING') as logs:
+                self._write('desembarque', pd.DataFrame({'columna': ['sin datos']}))
+                self.assertTrue(_wait_for(lambda: watcher.stats['failed_reloads'] == 1))
+            self.assertIn('recarga fallida (desembarque)', logs.output[0])
+            self.assertIsNotNone(watcher.stats['last_error'])
+            self.assertEqual(generations.current.number, 1)
+            self.assertEqual(self._leader(generations), 'PUERTO MONTT')
+
+            # El archivo corregido se recarga normalmente
+            with self.assertLogs('fishery_watch', 'INFO') as logs:
+                self._write('desembarque', self.df_revised)
+                self.assertTrue(_wait_for(lambda: watcher.stats['reloads'] == 1))
+            self.assertIn('recargado desembarque', logs.output[-1])
+            self.assertEqual(self._leader(generations), 'CHACABUCO')
+            self.assertIsNone(watcher.stats['last_error'])
+        finally:
+            watcher.stop()
+            generations.close()
+
+        # stop() es idempotente
+        watcher.stop()
+
+        with self.assertRaises(ValueError):
+            DataWatcher(loader, generations.reload, backend='fsevents')
+
+
+if __name__ == '__main__':
+    unittest.main()
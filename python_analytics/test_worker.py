@@ -0,0 +1,192 @@
+"""
+Tests unitarios para el worker persistente (protocolo de frames, pipelining y pool).
+"""
+
+import io
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from fishery_analytics import FisheryAnalytics
+from fishery_reload import GenerationManager
+from fishery_worker import AnalyticsWorker, WorkerClient, decode, encode, read_frame, serve_unix, write_frame
+
+try:
+    import msgpack  # noqa: F401
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+
+def _frames(*messages, codec='json') -> io.BytesIO:
+    stream = io.BytesIO()
+    for message in messages:
+        write_frame(stream, encode(message, codec))
+    stream.seek(0)
+    return stream
+
+
+def _responses(stream: io.BytesIO):
+    stream.seek(0)
+    responses = []
+    while True:
+        payload = read_frame(stream)
+        if payload is None:
+            return responses
+        responses.append(decode(payload)[0])
+
+
+class TestAnalyticsWorker(unittest.TestCase):
+    """Suite de tests para fishery_worker."""
+
+    def setUp(self):
+        """Datos mínimos y directorio temporal."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.analytics = FisheryAnalytics(
+            pd.DataFrame({
+                'Año': [2020, 2020, 2021],
+                'Mes': [1, 2, 1],
+                'Región': ['LAGOS', 'AYSEN', 'LAGOS'],
+                'Puerto': ['PUERTO MONTT', 'CHACABUCO', 'CALBUCO'],
+                'Especie': ['SALMON', 'MERLUZA', 'SALMON'],
+                'Tipo de agente': ['Industrial', 'Artesanal', 'Industrial'],
+                'Toneladas': [100.5, 20.25, 110.0]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Especie': ['SALMON'],
+                'Línea de elaboración': ['Congelado'], 'Materia Prima': [80], 'Producción': [70]
+            }),
+            pd.DataFrame({
+                'Año': [2020], 'Región': ['LAGOS'], 'Nombre Planta': ['Planta A'],
+                'Línea de producción': ['Congelado']
+            })
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_frame_roundtrip_and_errors(self):
+        """Test de frames: lectura completa, fin entre frames y frames truncados o enormes."""
+        stream = _frames({'id': 1, 'op': 'ping'}, {'id': 2, 'texto': 'Año ñ'})
+        self.assertEqual(decode(read_frame(stream)), ({'id': 1, 'op': 'ping'}, 'json'))
+        self.assertEqual(decode(read_frame(stream))[0]['texto'], 'Año ñ')
+        self.assertIsNone(read_frame(stream))
+
+        truncated = io.BytesIO(_frames({'id': 1}).getvalue()[:-2])
+        with self.assertRaises(ValueError):
+            read_frame(truncated)
+        with self.assertRaises(ValueError):
+            read_frame(_frames({'id': 1, 'x': 'y' * 100}), max_bytes=10)
+
+    def test_pipelined_stream(self):
+        """Test que un lote de solicitudes se responde en orden, incluidos los errores."""
+        output = io.BytesIO()
+        AnalyticsWorker(self.analytics).serve_stream(_frames(
+            {'id': 1, 'analysis': 'top_ports', 'params': {'region': 'Los Lagos'}},
+            {'id': 2, 'analysis': 'no_existe'},
+            {'id': 3, 'analysis': 'top_ports', 'params': {'parametro_invalido': 1}},
+            {'id': 4, 'op': 'stats'},
+            {'id': 5, 'analysis': 'agent_distribution'},
+        ), output)
+
+        responses = _responses(output)
+        self.assertEqual([r['id'] for r in responses], [1, 2, 3, 4, 5])
+        self.assertEqual([r['ok'] for r in responses], [True, False, False, True, True])
+        self.assertEqual(responses[0]['result']['data'],
+                         self.analytics.get_top_ports(region='LAGOS')['data'])
+        self.assertIn('ValueError', responses[1]['error'])
+        self.assertEqual(responses[3]['result']['requests'], 1)
+
+    @unittest.skipUnless(HAS_MSGPACK, 'msgpack no instalado')
+    def test_msgpack_codec(self):
+        """Test que el worker responde en msgpack a una solicitud msgpack."""
+        output = io.BytesIO()
+        AnalyticsWorker(self.analytics).serve_stream(
+            _frames({'id': 1, 'analysis': 'top_ports'}, codec='msgpack'), output
+        )
+        output.seek(0)
+        response, codec = decode(read_frame(output))
+        self.assertEqual(codec, 'msgpack')
+        self.assertTrue(response['ok'])
+
+    def test_socket_pool(self):
+        """Test del pool por socket Unix: varios procesos, pipelining y reemplazo de workers."""
+        path = os.path.join(self.tmp.name, 'worker.sock')
+        server = multiprocessing.get_context('fork').Process(target=serve_unix, args=(self.analytics, path, 2))
+        server.start()
+        try:
+            deadline = time.time() + 10
+            while not os.path.exists(path) and time.time() < deadline:
+                time.sleep(0.02)
+
+            requests = [('top_ports', {'year': 2020}), ('agent_distribution', {}), ('top_ports', {'year': 2021})]
+            with WorkerClient(path) as client:
+                results = client.pipeline(requests)
+                pid = client.call({'id': 'x', 'op': 'ping'})['result']['pid']
+                with self.assertRaises(RuntimeError):
+                    client.request('top_ports', top_n='diez', parametro_invalido=True)
+            expected = [getattr(self.analytics, f'get_{name}')(**params) for name, params in requests]
+            self.assertEqual([r['data'] for r in results], [r['data'] for r in expected])
+
+            # Un worker que termina se reemplaza y el pool sigue atendiendo
+            os.kill(pid, 9)
+            time.sleep(0.2)
+            for _ in range(4):
+                with WorkerClient(path, timeout=10) as client:
+                    self.assertNotEqual(client.call({'id': 1, 'op': 'ping'})['result']['pid'], pid)
+        finally:
+            server.terminate()
+            server.join(10)
+        self.assertFalse(os.path.exists(path))
+
+    @unittest.skipUnless(hasattr(signal, 'SIGHUP'), 'SIGHUP no disponible')
+    def test_socket_pool_reload_on_sighup(self):
+        """Test que SIGHUP al proceso principal recarga los datos en cada worker del pool."""
+        path = os.path.join(self.tmp.name, 'worker.sock')
+        generations = GenerationManager(lambda: FisheryAnalytics(
+            self.analytics.df_desembarque, self.analytics.df_produccion, self.analytics.df_plantas
+        ))
+        server = multiprocessing.get_context('fork').Process(target=serve_unix, args=(generations, path, 2))
+        server.start()
+        try:
+            deadline = time.time() + 10
+            while not os.path.exists(path) and time.time() < deadline:
+                time.sleep(0.02)
+            time.sleep(0.2)
+            os.kill(server.pid, signal.SIGHUP)
+
+            workers = {}
+            deadline = time.time() + 10
+            while (len(workers) < 2 or set(workers.values()) != {2}) and time.time() < deadline:
+                with WorkerClient(path, timeout=10) as client:
+                    stats = client.call({'id': 1, 'op': 'stats'})['result']
+                workers[stats['pid']] = stats['generation']
+            self.assertEqual(set(workers.values()), {2})
+        finally:
+            server.terminate()
+            server.join(10)
+
+    def test_stdio_process(self):
+        """Test del worker como proceso con --stdio desde un snapshot."""
+        snapshot = os.path.join(self.tmp.name, 'datos.pkl')
+        self.analytics.save_snapshot(snapshot)
+        stream = _frames({'id': 1, 'analysis': 'top_ports'}, {'id': 2, 'op': 'ping'})
+        completed = subprocess.run(
+            [sys.executable, 'fishery_worker.py', '--snapshot', snapshot, '--stdio'],
+            input=stream.getvalue(), capture_output=True, check=True, timeout=60,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        responses = _responses(io.BytesIO(completed.stdout))
+        self.assertEqual([r['id'] for r in responses], [1, 2])
+        self.assertEqual(responses[0]['result']['data'], self.analytics.get_top_ports()['data'])
+
+
+if __name__ == '__main__':
+    unittest.main()
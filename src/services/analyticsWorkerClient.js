@@ -0,0 +1,226 @@
+const net = require('net');
+const path = require('path');
+const { spawn } = require('child_process');
+const msgpack = require('../utils/msgpack');
+
+// Encabezado de cada frame: largo del payload (uint32 big-endian), ver python_analytics/fishery_worker.py
+const HEADER_BYTES = 4;
+
+// Codecs del payload; msgpack (default) requiere el paquete msgpack en el worker Python
+const CODECS = ['msgpack', 'json'];
+
+/**
+ * Separa frames [largo][payload] de un stream de bytes
+ */
+class FrameDecoder {
+  constructor() {
+    this.buffer = Buffer.alloc(0);
+  }
+
+  /**
+   * Agrega bytes recibidos y retorna los payloads completos
+   * @param {Buffer} chunk - Bytes recibidos
+   * @returns {Array<Buffer>} Payloads completos, en orden
+   */
+  push(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    const payloads = [];
+    while (this.buffer.length >= HEADER_BYTES) {
+      const size = this.buffer.readUInt32BE(0);
+      if (this.buffer.length < HEADER_BYTES + size) break;
+      payloads.push(this.buffer.subarray(HEADER_BYTES, HEADER_BYTES + size));
+      this.buffer = this.buffer.subarray(HEADER_BYTES + size);
+    }
+    return payloads;
+  }
+}
+
+/**
+ * Codifica un mensaje como frame
+ * @param {Object} message - Mensaje del protocolo
+ * @param {string} codec - 'json' o 'msgpack'
+ * @returns {Buffer} Frame listo para escribir
+ */
+function encodeFrame(message, codec = 'json') {
+  const payload = codec === 'msgpack' ? msgpack.encode(message) : Buffer.from(JSON.stringify(message), 'utf8');
+  const header = Buffer.alloc(HEADER_BYTES);
+  header.writeUInt32BE(payload.length, 0);
+  return Buffer.concat([header, payload]);
+}
+
+/**
+ * Decodifica un payload: un objeto JSON empieza con '{', cualquier otro se lee como msgpack
+ * (la misma regla que decode() en fishery_worker.py)
+ * @param {Buffer} payload - Payload de un frame
+ * @returns {Object} Mensaje del protocolo
+ */
+function decodePayload(payload) {
+  return payload[0] === 0x7b ? JSON.parse(payload.toString('utf8')) : msgpack.decode(payload);
+}
+
+/**
+ * Conexión con el worker de análisis; admite varias solicitudes en vuelo (pipelining)
+ */
+class WorkerConnection {
+  /**
+   * @param {net.Socket|Readable} socket - Socket conectado (o stdout de un worker --stdio)
+   * @param {Writable} writable - Destino de las solicitudes (default: el mismo socket)
+   * @param {string} codec - Codec de las solicitudes: 'msgpack' (default) o 'json'
+   */
+  constructor(socket, writable = socket, codec = 'msgpack') {
+    if (!CODECS.includes(codec)) throw new Error(`codec debe ser uno de ${CODECS.join(', ')}`);
+    this.writable = writable;
+    this.codec = codec;
+    this.pending = new Map();
+    this.nextId = 0;
+    this.decoder = new FrameDecoder();
+
+    socket.on('data', (chunk) => {
+      for (const payload of this.decoder.push(chunk)) {
+        this.resolve(decodePayload(payload));
+      }
+    });
+    socket.on('close', () => this.failAll(new Error('El worker de análisis cerró la conexión')));
+    socket.on('error', (error) => this.failAll(error));
+  }
+
+  resolve(response) {
+    // El worker responde en orden; una solicitud que no pudo decodificar vuelve con id null
+    const id = response.id === null ? this.pending.keys().next().value : response.id;
+    const entry = this.pending.get(id);
+    if (!entry) return;
+    this.pending.delete(id);
+    if (response.ok) entry.resolve(response.result);
+    else entry.reject(new Error(response.error));
+  }
+
+  failAll(error) {
+    for (const entry of this.pending.values()) entry.reject(error);
+    this.pending.clear();
+  }
+
+  /**
+   * Envía un mensaje del protocolo sin esperar las respuestas anteriores
+   * @param {Object} message - Mensaje sin id
+   * @returns {Promise<Object>} Resultado del worker
+   */
+  send(message) {
+    const id = ++this.nextId;
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      this.writable.write(encodeFrame({ ...message, id }, this.codec));
+    });
+  }
+}
+
+/**
+ * Cliente del worker persistente de FisheryAnalytics (python_analytics/fishery_worker.py).
+ *
+ * Abre varias conexiones al socket Unix del pool de workers y reparte las
+ * solicitudes entre ellas (round-robin); cada conexión admite pipelining.
+ * Usa msgpack por defecto (payloads más chicos y bytes Arrow nativos); si el
+ * worker no tiene el paquete msgpack, connect() pasa a JSON.
+ */
+class AnalyticsWorkerClient {
+  /**
+   * @param {string} socketPath - Socket Unix del worker
+   * @param {number} connections - Conexiones abiertas (idealmente = workers del pool)
+   * @param {Object} options - {codec: 'msgpack' (default) o 'json'}
+   */
+  constructor(socketPath, connections = 1, { codec = 'msgpack' } = {}) {
+    if (!CODECS.includes(codec)) throw new Error(`codec debe ser uno de ${CODECS.join(', ')}`);
+    this.socketPath = socketPath;
+    this.size = connections;
+    this.codec = codec;
+    this.connections = [];
+    this.sockets = [];
+    this.next = 0;
+  }
+
+  /**
+   * Abre las conexiones, reintentando mientras el worker termina de cargar los datos
+   * @param {number} timeoutMs - Tiempo máximo de espera
+   * @returns {Promise<AnalyticsWorkerClient>}
+   */
+  async connect(timeoutMs = 60000) {
+    const deadline = Date.now() + timeoutMs;
+    while (this.sockets.length < this.size) {
+      try {
+        const socket = await new Promise((resolve, reject) => {
+          const candidate = net.createConnection(this.socketPath, () => resolve(candidate));
+          candidate.once('error', reject);
+        });
+        this.sockets.push(socket);
+        this.connections.push(new WorkerConnection(socket, socket, this.codec));
+      } catch (error) {
+        if (Date.now() > deadline) throw error;
+        await new Promise((resolve) => setTimeout(resolve, 100));
+      }
+    }
+    if (this.codec === 'msgpack') await this.negotiateCodec();
+    return this;
+  }
+
+  /**
+   * Verifica que el worker acepte msgpack; si no tiene el paquete, usa JSON en todas las conexiones
+   */
+  async negotiateCodec() {
+    try {
+      await this.connections[0].send({ op: 'ping' });
+    } catch (error) {
+      if (!/msgpack/.test(error.message)) throw error;
+      this.codec = 'json';
+      for (const connection of this.connections) connection.codec = 'json';
+    }
+  }
+
+  /**
+   * Ejecuta get_<analysisType>(params) en el worker
+   * @param {string} analysisType - Análisis de FisheryAnalytics (p. ej. 'top_ports')
+   * @param {Object} params - Parámetros del análisis
+   * @returns {Promise<Object>} Resultado {success, analysis_type, metadata, data, summary}
+   */
+  request(analysisType, params = {}) {
+    const connection = this.connections[this.next++ % this.connections.length];
+    return connection.send({ analysis: analysisType, params });
+  }
+
+  /**
+   * Estado de un worker del pool
+   * @returns {Promise<Object>} {pid, uptime_s, requests, errors, compute_ms, generation, reloads, ...}
+   */
+  stats() {
+    return this.connections[0].send({ op: 'stats' });
+  }
+
+  close() {
+    for (const socket of this.sockets) socket.end();
+    this.sockets = [];
+    this.connections = [];
+  }
+}
+
+/**
+ * Inicia el pool de workers Python (carga los datos una vez y atiende el socket)
+ * @param {Object} options - {socketPath, dataDir, snapshot, workers, python, args}
+ * @returns {ChildProcess} Proceso principal del pool (SIGTERM lo detiene ordenadamente;
+ *   SIGHUP recarga los datos sin cortar las solicitudes en curso)
+ */
+function spawnAnalyticsWorker({ socketPath, dataDir, snapshot, workers = 2, python = 'python3', args = [] }) {
+  const source = snapshot ? ['--snapshot', snapshot] : ['--data-dir', dataDir];
+  return spawn(
+    python,
+    ['fishery_worker.py', ...source, '--socket', socketPath, '--workers', String(workers), ...args],
+    { cwd: path.join(__dirname, '..', '..', 'python_analytics'), stdio: ['ignore', 'inherit', 'inherit'] }
+  );
+}
+
+module.exports = {
+  AnalyticsWorkerClient,
+  WorkerConnection,
+  FrameDecoder,
+  encodeFrame,
+  decodePayload,
+  CODECS,
+  spawnAnalyticsWorker
+};
@@ -0,0 +1,130 @@
+/**
+ * Tests para el cliente del worker de análisis Python
+ * Valida el framing, los codecs y el pipelining contra un worker simulado
+ */
+
+const net = require('net');
+const os = require('os');
+const path = require('path');
+const {
+  AnalyticsWorkerClient,
+  FrameDecoder,
+  decodePayload,
+  encodeFrame
+} = require('../services/analyticsWorkerClient');
+
+describe('FrameDecoder', () => {
+  test('debe reconstruir frames partidos y varios frames en un mismo chunk', () => {
+    const bytes = Buffer.concat([encodeFrame({ id: 1 }), encodeFrame({ id: 2, texto: 'Año' })]);
+    const decoder = new FrameDecoder();
+
+    expect(decoder.push(bytes.subarray(0, 3))).toEqual([]);
+    const payloads = decoder.push(bytes.subarray(3));
+    expect(payloads.map((payload) => JSON.parse(payload.toString('utf8')))).toEqual([
+      { id: 1 },
+      { id: 2, texto: 'Año' }
+    ]);
+  });
+
+  test('debe detectar el codec de cada payload', () => {
+    const message = { id: 3, ok: true, result: { data: [{ especie: 'Salmón', toneladas: 1.25 }] } };
+    for (const codec of ['json', 'msgpack']) {
+      const [payload] = new FrameDecoder().push(encodeFrame(message, codec));
+      expect(decodePayload(payload)).toEqual(message);
+    }
+  });
+});
+
+/**
+ * Worker simulado con las reglas de fishery_worker.py: responde con el codec de cada
+ * solicitud, en orden inverso (para verificar la asociación por id); sin msgpack
+ * responde a esas solicitudes con id null
+ */
+function fakeWorker({ msgpack = true } = {}) {
+  return net.createServer((socket) => {
+    const decoder = new FrameDecoder();
+    socket.on('data', (chunk) => {
+      const payloads = decoder.push(chunk);
+      for (const payload of payloads.reverse()) {
+        const codec = payload[0] === 0x7b ? 'json' : 'msgpack';
+        if (codec === 'msgpack' && !msgpack) {
+          const error = "ImportError: El codec 'msgpack' requiere msgpack (pip install msgpack)";
+          socket.write(encodeFrame({ id: null, ok: false, error }));
+          continue;
+        }
+        const request = decodePayload(payload);
+        let response;
+        if (request.op === 'ping') response = { id: request.id, ok: true, result: { pong: true } };
+        else if (request.analysis === 'no_existe') response = { id: request.id, ok: false, error: "ValueError: Análisis desconocido: 'no_existe'" };
+        else response = { id: request.id, ok: true, result: { success: true, analysis_type: request.analysis, data: [request.params], codec } };
+        socket.write(encodeFrame(response, codec));
+      }
+    });
+  });
+}
+
+describe('AnalyticsWorkerClient', () => {
+  const socketPath = path.join(os.tmpdir(), `fishery-worker-test-${process.pid}.sock`);
+  let server;
+
+  beforeAll((done) => {
+    server = fakeWorker();
+    server.listen(socketPath, done);
+  });
+
+  afterAll((done) => {
+    server.close(done);
+  });
+
+  test('debe resolver solicitudes en paralelo por id y rechazar los errores del worker', async () => {
+    const client = await new AnalyticsWorkerClient(socketPath, 2).connect(2000);
+    try {
+      const results = await Promise.all([
+        client.request('top_ports', { year: 2020 }),
+        client.request('agent_distribution'),
+        client.request('top_ports', { year: 2021 })
+      ]);
+      expect(results.map((result) => result.analysis_type)).toEqual(['top_ports', 'agent_distribution', 'top_ports']);
+      expect(results[2].data).toEqual([{ year: 2021 }]);
+      expect(results[0].codec).toBe('msgpack');
+
+      await expect(client.request('no_existe')).rejects.toThrow('Análisis desconocido');
+    } finally {
+      client.close();
+    }
+  });
+});
+
+describe('AnalyticsWorkerClient sin msgpack en el worker', () => {
+  const socketPath = path.join(os.tmpdir(), `fishery-worker-json-test-${process.pid}.sock`);
+  let server;
+
+  beforeAll((done) => {
+    server = fakeWorker({ msgpack: false });
+    server.listen(socketPath, done);
+  });
+
+  afterAll((done) => {
+    server.close(done);
+  });
+
+  test('debe pasar a JSON si el worker no tiene el paquete msgpack', async () => {
+    const client = await new AnalyticsWorkerClient(socketPath, 2).connect(2000);
+    try {
+      expect(client.codec).toBe('json');
+      const results = await Promise.all([client.request('top_ports'), client.request('agent_share')]);
+      expect(results.map((result) => result.codec)).toEqual(['json', 'json']);
+    } finally {
+      client.close();
+    }
+  });
+
+  test('debe usar JSON si se indica el codec', async () => {
+    const client = await new AnalyticsWorkerClient(socketPath, 1, { codec: 'json' }).connect(2000);
+    try {
+      expect((await client.request('top_ports')).codec).toBe('json');
+    } finally {
+      client.close();
+    }
+  });
+});
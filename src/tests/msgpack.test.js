@@ -0,0 +1,42 @@
+/**
+ * Tests para el codec msgpack del protocolo del worker de análisis
+ * Valida bytes contra la especificación y la equivalencia con JSON
+ */
+
+const { encode, decode } = require('../utils/msgpack');
+
+describe('msgpack', () => {
+  test('debe producir los bytes de la especificación', () => {
+    expect(encode({ a: 1 })).toEqual(Buffer.from([0x81, 0xa1, 0x61, 0x01]));
+    expect(encode([null, true, false, -1])).toEqual(Buffer.from([0x94, 0xc0, 0xc3, 0xc2, 0xff]));
+    expect(encode(300)).toEqual(Buffer.from([0xcd, 0x01, 0x2c]));
+    expect(encode(-200)).toEqual(Buffer.from([0xd1, 0xff, 0x38]));
+    expect(encode(1.5)).toEqual(Buffer.from([0xcb, 0x3f, 0xf8, 0, 0, 0, 0, 0, 0]));
+    expect(encode('Año')).toEqual(Buffer.from([0xa4, 0x41, 0xc3, 0xb1, 0x6f]));
+    expect(encode(Buffer.from([1, 2]))).toEqual(Buffer.from([0xc4, 0x02, 0x01, 0x02]));
+  });
+
+  test('debe ida y vuelta igual que JSON para resultados del worker', () => {
+    const rows = Array.from({ length: 300 }, (_, i) => ({
+      puerto: `Puerto ${i % 7}`,
+      especie: 'MERLUZA DEL SUR',
+      toneladas: i * 1.25,
+      variacion: i % 3 ? -i * 1000 : null,
+      grande: 2 ** 40 + i
+    }));
+    const message = { id: 70000, ok: true, result: { success: true, data: rows, summary: { texto: 'ñ'.repeat(40000) } } };
+    expect(decode(encode(message))).toEqual(JSON.parse(JSON.stringify(message)));
+  });
+
+  test('debe seguir las reglas de JSON.stringify y decodificar bin como Buffer', () => {
+    const value = { omitido: undefined, fecha: new Date(0), infinito: Infinity, lista: [undefined] };
+    expect(decode(encode(value))).toEqual(JSON.parse(JSON.stringify(value)));
+    expect(decode(encode({ ipc: Buffer.from([0xff, 0x00]) })).ipc).toEqual(Buffer.from([0xff, 0x00]));
+  });
+
+  test('debe rechazar datos truncados o sobrantes', () => {
+    const bytes = encode({ especie: 'JUREL' });
+    expect(() => decode(bytes.subarray(0, bytes.length - 1))).toThrow('truncados');
+    expect(() => decode(Buffer.concat([bytes, Buffer.from([0xc0])]))).toThrow('sobrantes');
+  });
+});
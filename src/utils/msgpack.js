@@ -0,0 +1,371 @@
+/**
+ * Codec msgpack mínimo (sin dependencias) para el protocolo del worker de análisis
+ * Cubre los tipos que produce msgpack-python con use_bin_type=True: nil, booleanos,
+ * enteros, float32/64, str, bin, array y map. Los bin se decodifican como Buffer
+ * (p. ej. los bytes Arrow IPC de output_format='arrow').
+ */
+
+// Largo máximo (bytes) de los strings que se decodifican en JS; en los más largos
+// conviene la llamada nativa Buffer.toString
+const SHORT_STRING_BYTES = 64;
+
+// Claves de map cortas que se memorizan al decodificar: se repiten en cada fila y
+// reutilizar el mismo string acelera la creación de los objetos
+const KEY_CACHE_MAX_BYTES = 31;
+const KEY_CACHE_MAX_PER_LENGTH = 64;
+
+/**
+ * Serializa un valor como msgpack
+ * Sigue las reglas de JSON.stringify: las propiedades undefined o funciones se omiten,
+ * los objetos con toJSON (p. ej. Date) se serializan con su resultado y los números no
+ * finitos se envían como nil
+ * @param {*} value - Valor a serializar
+ * @returns {Buffer} Bytes msgpack
+ */
+function encode(value) {
+  const encoder = new Encoder();
+  encoder.write(value);
+  return encoder.finish();
+}
+
+class Encoder {
+  constructor() {
+    this.buffer = Buffer.allocUnsafe(1024);
+    this.offset = 0;
+  }
+
+  ensure(bytes) {
+    if (this.offset + bytes <= this.buffer.length) return;
+    let size = this.buffer.length * 2;
+    while (size < this.offset + bytes) size *= 2;
+    const next = Buffer.allocUnsafe(size);
+    this.buffer.copy(next, 0, 0, this.offset);
+    this.buffer = next;
+  }
+
+  finish() {
+    return this.buffer.subarray(0, this.offset);
+  }
+
+  byte(value) {
+    this.ensure(1);
+    this.buffer[this.offset++] = value;
+  }
+
+  header(value, bytes) {
+    this.ensure(1 + bytes);
+    this.buffer[this.offset++] = value;
+  }
+
+  write(value) {
+    if (value === null || value === undefined) return this.byte(0xc0);
+    switch (typeof value) {
+      case 'boolean':
+        return this.byte(value ? 0xc3 : 0xc2);
+      case 'number':
+        return this.number(value);
+      case 'bigint':
+        return this.bigint(value);
+      case 'string':
+        return this.string(value);
+      default:
+        break;
+    }
+    if (Buffer.isBuffer(value) || value instanceof Uint8Array) return this.binary(value);
+    if (typeof value.toJSON === 'function') return this.write(value.toJSON());
+    if (Array.isArray(value)) return this.array(value);
+    return this.map(value);
+  }
+
+  number(value) {
+    if (!Number.isFinite(value)) return this.byte(0xc0);
+    if (Number.isInteger(value) && Number.isSafeInteger(value)) return this.integer(value);
+    this.header(0xcb, 8);
+    this.buffer.writeDoubleBE(value, this.offset);
+    this.offset += 8;
+  }
+
+  integer(value) {
+    if (value >= 0) {
+      if (value < 0x80) return this.byte(value);
+      if (value < 0x100) {
+        this.header(0xcc, 1);
+        this.buffer[this.offset++] = value;
+      } else if (value < 0x10000) {
+        this.header(0xcd, 2);
+        this.buffer.writeUInt16BE(value, this.offset);
+        this.offset += 2;
+      } else if (value < 0x100000000) {
+        this.header(0xce, 4);
+        this.buffer.writeUInt32BE(value, this.offset);
+        this.offset += 4;
+      } else {
+        this.header(0xcf, 8);
+        this.buffer.writeBigUInt64BE(BigInt(value), this.offset);
+        this.offset += 8;
+      }
+      return;
+    }
+    if (value >= -0x20) return this.byte(value & 0xff);
+    if (value >= -0x80) {
+      this.header(0xd0, 1);
+      this.buffer.writeInt8(value, this.offset);
+      this.offset += 1;
+    } else if (value >= -0x8000) {
+      this.header(0xd1, 2);
+      this.buffer.writeInt16BE(value, this.offset);
+      this.offset += 2;
+    } else if (value >= -0x80000000) {
+      this.header(0xd2, 4);
+      this.buffer.writeInt32BE(value, this.offset);
+      this.offset += 4;
+    } else {
+      this.header(0xd3, 8);
+      this.buffer.writeBigInt64BE(BigInt(value), this.offset);
+      this.offset += 8;
+    }
+  }
+
+  bigint(value) {
+    if (value >= 0n) {
+      this.header(0xcf, 8);
+      this.buffer.writeBigUInt64BE(value, this.offset);
+    } else {
+      this.header(0xd3, 8);
+      this.buffer.writeBigInt64BE(value, this.offset);
+    }
+    this.offset += 8;
+  }
+
+  string(value) {
+    const size = Buffer.byteLength(value, 'utf8');
+    if (size < 0x20) {
+      this.header(0xa0 | size, size);
+    } else if (size < 0x100) {
+      this.header(0xd9, 1 + size);
+      this.buffer[this.offset++] = size;
+    } else if (size < 0x10000) {
+      this.header(0xda, 2 + size);
+      this.buffer.writeUInt16BE(size, this.offset);
+      this.offset += 2;
+    } else {
+      this.header(0xdb, 4 + size);
+      this.buffer.writeUInt32BE(size, this.offset);
+      this.offset += 4;
+    }
+    this.offset += this.buffer.write(value, this.offset, size, 'utf8');
+  }
+
+  binary(value) {
+    const size = value.length;
+    if (size < 0x100) {
+      this.header(0xc4, 1 + size);
+      this.buffer[this.offset++] = size;
+    } else if (size < 0x10000) {
+      this.header(0xc5, 2 + size);
+      this.buffer.writeUInt16BE(size, this.offset);
+      this.offset += 2;
+    } else {
+      this.header(0xc6, 4 + size);
+      this.buffer.writeUInt32BE(size, this.offset);
+      this.offset += 4;
+    }
+    this.buffer.set(value, this.offset);
+    this.offset += size;
+  }
+
+  length(size, fix, fixMax, code16, code32) {
+    if (size < fixMax) return this.byte(fix | size);
+    if (size < 0x10000) {
+      this.header(code16, 2);
+      this.buffer.writeUInt16BE(size, this.offset);
+      this.offset += 2;
+    } else {
+      this.header(code32, 4);
+      this.buffer.writeUInt32BE(size, this.offset);
+      this.offset += 4;
+    }
+  }
+
+  array(value) {
+    this.length(value.length, 0x90, 0x10, 0xdc, 0xdd);
+    for (const item of value) {
+      this.write(item === undefined || typeof item === 'function' ? null : item);
+    }
+  }
+
+  map(value) {
+    const keys = Object.keys(value).filter((key) => value[key] !== undefined && typeof value[key] !== 'function');
+    this.length(keys.length, 0x80, 0x10, 0xde, 0xdf);
+    for (const key of keys) {
+      this.string(key);
+      this.write(value[key]);
+    }
+  }
+}
+
+/**
+ * Deserializa bytes msgpack
+ * @param {Buffer} buffer - Bytes msgpack (un único objeto)
+ * @returns {*} Valor decodificado (map → objeto, bin → Buffer, int64 fuera de rango → BigInt)
+ */
+function decode(buffer) {
+  const decoder = new Decoder(buffer);
+  const value = decoder.read();
+  if (decoder.offset !== buffer.length) {
+    throw new Error(`msgpack: ${buffer.length - decoder.offset} bytes sobrantes`);
+  }
+  return value;
+}
+
+/**
+ * Decodifica el UTF-8 de un string corto sin pasar por la llamada nativa
+ */
+function shortString(bytes, start, end) {
+  let text = '';
+  let i = start;
+  while (i < end) {
+    const byte = bytes[i++];
+    if (byte < 0x80) {
+      text += String.fromCharCode(byte);
+    } else if ((byte & 0xe0) === 0xc0) {
+      text += String.fromCharCode(((byte & 0x1f) << 6) | (bytes[i++] & 0x3f));
+    } else if ((byte & 0xf0) === 0xe0) {
+      text += String.fromCharCode(((byte & 0x0f) << 12) | ((bytes[i++] & 0x3f) << 6) | (bytes[i++] & 0x3f));
+    } else {
+      return bytes.toString('utf8', start, end);
+    }
+  }
+  return text;
+}
+
+// Claves memorizadas por largo en bytes: [{bytes, key}]
+const keyCache = Array.from({ length: KEY_CACHE_MAX_BYTES + 1 }, () => []);
+
+/**
+ * Retorna la clave memorizada de bytes[start, start + size), agregándola si no existe
+ */
+function cachedKey(bytes, start, size) {
+  const entries = keyCache[size];
+  search: for (const entry of entries) {
+    const known = entry.bytes;
+    for (let i = 0; i < size; i++) {
+      if (known[i] !== bytes[start + i]) continue search;
+    }
+    return entry.key;
+  }
+  const key = shortString(bytes, start, start + size);
+  if (entries.length >= KEY_CACHE_MAX_PER_LENGTH) entries.pop();
+  entries.unshift({ bytes: Uint8Array.prototype.slice.call(bytes, start, start + size), key });
+  return key;
+}
+
+class Decoder {
+  constructor(buffer) {
+    this.buffer = buffer;
+    this.offset = 0;
+  }
+
+  need(bytes) {
+    if (this.offset + bytes > this.buffer.length) throw new Error('msgpack: datos truncados');
+  }
+
+  read() {
+    this.need(1);
+    const buffer = this.buffer;
+    const type = buffer[this.offset++];
+
+    if (type < 0x80) return type;
+    if (type < 0x90) return this.map(type & 0x0f);
+    if (type < 0xa0) return this.array(type & 0x0f);
+    if (type < 0xc0) return this.string(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return this.binary(this.uint(1));
+      case 0xc5: return this.binary(this.uint(2));
+      case 0xc6: return this.binary(this.uint(4));
+      case 0xca: this.need(4); this.offset += 4; return buffer.readFloatBE(this.offset - 4);
+      case 0xcb: this.need(8); this.offset += 8; return buffer.readDoubleBE(this.offset - 8);
+      case 0xcc: return this.uint(1);
+      case 0xcd: return this.uint(2);
+      case 0xce: return this.uint(4);
+      case 0xcf: return this.int64(buffer.readBigUInt64BE.bind(buffer));
+      case 0xd0: this.need(1); this.offset += 1; return buffer.readInt8(this.offset - 1);
+      case 0xd1: this.need(2); this.offset += 2; return buffer.readInt16BE(this.offset - 2);
+      case 0xd2: this.need(4); this.offset += 4; return buffer.readInt32BE(this.offset - 4);
+      case 0xd3: return this.int64(buffer.readBigInt64BE.bind(buffer));
+      case 0xd9: return this.string(this.uint(1));
+      case 0xda: return this.string(this.uint(2));
+      case 0xdb: return this.string(this.uint(4));
+      case 0xdc: return this.array(this.uint(2));
+      case 0xdd: return this.array(this.uint(4));
+      case 0xde: return this.map(this.uint(2));
+      case 0xdf: return this.map(this.uint(4));
+      default:
+        throw new Error(`msgpack: tipo no soportado 0x${type.toString(16)}`);
+    }
+  }
+
+  uint(bytes) {
+    this.need(bytes);
+    const value = this.buffer.readUIntBE(this.offset, bytes);
+    this.offset += bytes;
+    return value;
+  }
+
+  int64(read) {
+    this.need(8);
+    const value = read(this.offset);
+    this.offset += 8;
+    return value >= BigInt(Number.MIN_SAFE_INTEGER) && value <= BigInt(Number.MAX_SAFE_INTEGER) ? Number(value) : value;
+  }
+
+  string(size) {
+    this.need(size);
+    const start = this.offset;
+    this.offset += size;
+    return size <= SHORT_STRING_BYTES ? shortString(this.buffer, start, this.offset) : this.buffer.toString('utf8', start, this.offset);
+  }
+
+  binary(size) {
+    this.need(size);
+    const start = this.offset;
+    this.offset += size;
+    return Buffer.from(this.buffer.subarray(start, this.offset));
+  }
+
+  array(size) {
+    const items = new Array(size);
+    for (let i = 0; i < size; i++) items[i] = this.read();
+    return items;
+  }
+
+  map(size) {
+    const object = {};
+    for (let i = 0; i < size; i++) {
+      const type = this.buffer[this.offset];
+      let key;
+      if (type >= 0xa0 && type <= 0xa0 + KEY_CACHE_MAX_BYTES) {
+        const keySize = type & 0x1f;
+        this.offset += 1;
+        this.need(keySize);
+        key = cachedKey(this.buffer, this.offset, keySize);
+        this.offset += keySize;
+      } else {
+        key = this.read();
+        if (typeof key !== 'string') key = String(key);
+      }
+      object[key] = this.read();
+    }
+    return object;
+  }
+}
+
+module.exports = {
+  encode,
+  decode
+};